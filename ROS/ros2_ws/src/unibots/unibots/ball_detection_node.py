@@ -7,6 +7,7 @@ import os
 import urllib.error
 import urllib.parse
 import urllib.request
+import uuid
 from typing import Optional
 
 import cv2
@@ -25,6 +26,10 @@ ROBOT_MOTION_STATUS_TOPIC: str = '/robot_motion_status'
 # grep: exploration_scan
 EXPLORATION_SCAN_LOG_TAG: str = '[exploration_scan]'
 
+# Inference request bodies, preferred first: raw JPEG as a multipart file upload, then the
+# base64 forms for servers that only take those.
+INFER_UPLOAD_MODES: tuple[str, ...] = ('multipart', 'json_base64', 'plain_base64')
+
 
 class BallDetectionNode(Node):
     def __init__(self) -> None:
@@ -171,6 +176,8 @@ class BallDetectionNode(Node):
         self._latest_front_stamp = None
         self._latest_detections: list[dict] = []
         self._last_infer_error_warn = 0.0
+        # First upload format the inference server accepted; later frames start there.
+        self._infer_upload_mode = INFER_UPLOAD_MODES[0]
         self._last_debug_log: dict[str, float] = {}
         self._last_perf_log: dict[str, float] = {}
         self._last_error_text = 'waiting for front camera image'
@@ -917,7 +924,8 @@ class BallDetectionNode(Node):
             self._append_api_key(endpoint, self._roboflow_api_key) if self._roboflow_api_key else endpoint
         )
         endpoint_for_log = self._redact_api_key(endpoint_with_key)
-        image_bytes = encoded.tobytes()
+        # Buffer view of the encoded JPEG; it is sent as-is, without a bytes copy.
+        image_bytes = memoryview(encoded.reshape(-1))
         self._debug(
             f'infer request: endpoint={endpoint_for_log}, '
             f'api_key_set={bool(self._roboflow_api_key)}, '
@@ -1027,40 +1035,54 @@ class BallDetectionNode(Node):
     def _send_infer_request_with_fallback(
         self,
         endpoint: str,
-        image_bytes: bytes,
+        image_bytes,
         extra_headers: Optional[dict] = None,
     ) -> dict:
-        json_body, json_content_type = self._encode_json_base64_image(image_bytes)
-        try:
-            return self._send_infer_request(
-                endpoint,
-                json_body,
-                json_content_type,
-                extra_headers,
-            )
-        except urllib.error.HTTPError as exc:
-            error_body = self._read_http_error_body(exc)
-            if exc.code == 400 and (
-                'Malformed base64 input image' in error_body or 'Invalid base64 input' in error_body
-            ):
-                self._debug('json payload rejected; fallback to text/plain base64')
-                plain_body, plain_content_type = self._encode_plain_base64_image(image_bytes)
-                return self._send_infer_request(
+        modes = INFER_UPLOAD_MODES[INFER_UPLOAD_MODES.index(self._infer_upload_mode):]
+        for index, mode in enumerate(modes):
+            body, content_type = self._encode_infer_body(mode, image_bytes)
+            try:
+                payload = self._send_infer_request(
                     endpoint,
-                    plain_body,
-                    plain_content_type,
+                    body,
+                    content_type,
                     extra_headers,
                 )
-            raise
+            except urllib.error.HTTPError as exc:
+                if index + 1 < len(modes) and self._is_upload_rejected(mode, exc):
+                    self._debug(f'{mode} payload rejected (http {exc.code}); fallback to {modes[index + 1]}')
+                    continue
+                raise
+            self._infer_upload_mode = mode
+            return payload
+        raise RuntimeError('no inference upload mode left')
+
+    def _encode_infer_body(self, mode: str, image_bytes) -> tuple:
+        if mode == 'multipart':
+            return self._encode_multipart_image(image_bytes)
+        if mode == 'json_base64':
+            return self._encode_json_base64_image(image_bytes)
+        return self._encode_plain_base64_image(image_bytes)
+
+    def _is_upload_rejected(self, mode: str, exc: urllib.error.HTTPError) -> bool:
+        if mode == 'multipart':
+            return exc.code in (400, 415, 422)
+        error_body = self._read_http_error_body(exc)
+        return exc.code == 400 and (
+            'Malformed base64 input image' in error_body or 'Invalid base64 input' in error_body
+        )
 
     def _send_infer_request(
         self,
         endpoint: str,
-        body: bytes,
+        body,
         content_type: str,
         extra_headers: Optional[dict] = None,
     ) -> dict:
         headers = {'Content-Type': content_type}
+        if isinstance(body, list):
+            # Chunked body (multipart): http.client writes each buffer directly.
+            headers['Content-Length'] = str(sum(len(chunk) for chunk in body))
         if extra_headers:
             headers.update(extra_headers)
         request = urllib.request.Request(
@@ -1180,7 +1202,19 @@ class BallDetectionNode(Node):
         self._pub_ball_detection_image.publish(msg)
 
     @staticmethod
-    def _encode_json_base64_image(image_bytes: bytes) -> tuple[bytes, str]:
+    def _encode_multipart_image(image_bytes) -> tuple[list, str]:
+        """multipart/form-data with the JPEG as field `file`, as [head, image, tail] buffers."""
+        boundary = uuid.uuid4().hex
+        head = (
+            f'--{boundary}\r\n'
+            'Content-Disposition: form-data; name="file"; filename="frame.jpg"\r\n'
+            'Content-Type: image/jpeg\r\n\r\n'
+        ).encode('ascii')
+        tail = f'\r\n--{boundary}--\r\n'.encode('ascii')
+        return [head, image_bytes, tail], f'multipart/form-data; boundary={boundary}'
+
+    @staticmethod
+    def _encode_json_base64_image(image_bytes) -> tuple[bytes, str]:
         encoded = base64.b64encode(image_bytes).decode('ascii')
         payload = {
             'image': {
@@ -1191,7 +1225,7 @@ class BallDetectionNode(Node):
         return json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json'
 
     @staticmethod
-    def _encode_plain_base64_image(image_bytes: bytes) -> tuple[bytes, str]:
+    def _encode_plain_base64_image(image_bytes) -> tuple[bytes, str]:
         encoded = base64.b64encode(image_bytes).decode('ascii')
         return encoded.encode('ascii'), 'text/plain'
 
@@ -19,6 +19,7 @@ from sensor_msgs.msg import Image
 from std_msgs.msg import String
 
 from . import decision_cruise as planner
+from . import http_encoding
 
 
 THIS_DIR = os.path.dirname(__file__)
@@ -28,6 +29,17 @@ FIELD_VIEWER_ASSETS_DIR = os.path.join(THIS_DIR, "field_viewer")
 INDEX_FILE = os.path.join(FIELD_VIEWER_ASSETS_DIR, "index.html")
 SIM_DATA_FILE = os.path.join(FIELD_VIEWER_ASSETS_DIR, "simulation_data.html")
 
+# MJPEG (multipart/x-mixed-replace) streams for the camera mirrors.
+MJPEG_BOUNDARY = "frame"
+# An idle MJPEG stream re-sends its last frame this often so dead clients are noticed.
+MJPEG_KEEPALIVE_SECONDS = 15.0
+
+# GET responses: ETag + 304, and gzip/deflate for text/JSON bodies (http_encoding.py is
+# tools/field_viewer/http_encoding.py copied verbatim; change both together).
+_ENCODED_BODIES = http_encoding.EncodedBodies()
+# HTML pages kept in memory until their mtime or size changes.
+_STATIC_FILES = http_encoding.StaticFiles()
+
 
 def _load_default_linear_velocity() -> float:
     default_linear_velocity = 3.0
@@ -227,7 +239,9 @@ class _MirrorState:
             ensure_ascii=True,
             separators=(",", ":"),
         ).encode("utf-8")
-        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        # Serializes lazy encodes so concurrent viewers share one JPEG per frame.
+        self._encode_lock = threading.Lock()
         self._items = {
             "/data/simulation_data": {
                 "body": b"{}",
@@ -304,23 +318,67 @@ class _MirrorState:
         }
 
     def set(self, path: str, body: bytes, content_type: str) -> bool:
-        with self._lock:
+        with self._cond:
             item = self._items.get(path)
             if item is None:
                 return False
-            changed = (item["body"] != body) or (item["content_type"] != content_type) or (not item["has_data"])
+            changed = (
+                (item["body"] != body)
+                or (item["content_type"] != content_type)
+                or (not item["has_data"])
+                or (item.get("encode") is not None)
+            )
             item["body"] = body
             item["content_type"] = content_type
             item["has_data"] = True
+            item["encode"] = None
             if changed:
                 item["seq"] += 1
+                self._cond.notify_all()
             return changed
 
+    def set_lazy(self, path: str, encode, content_type: str) -> bool:
+        """Store a frame whose body is `encode()`, run on the first read only.
+
+        Camera topics arrive far faster than anyone looks at them; encoding on
+        demand keeps the bridge idle while no viewer is open.
+        """
+        with self._cond:
+            item = self._items.get(path)
+            if item is None:
+                return False
+            item["encode"] = encode
+            item["content_type"] = content_type
+            item["has_data"] = True
+            item["seq"] += 1
+            self._cond.notify_all()
+            return True
+
+    def _resolve_lazy(self, path: str) -> None:
+        with self._encode_lock:
+            with self._cond:
+                item = self._items.get(path)
+                encode = item.get("encode") if item is not None else None
+            if encode is None:
+                return
+            try:
+                body = encode() or b""
+            except Exception:
+                body = b""
+            with self._cond:
+                if item.get("encode") is encode:
+                    item["encode"] = None
+                    item["body"] = body
+
     def get(self, path: str):
-        with self._lock:
+        with self._cond:
             item = self._items.get(path)
             if item is None:
                 return None
+            pending = item.get("encode") is not None
+        if pending:
+            self._resolve_lazy(path)
+        with self._cond:
             return {
                 "body": item["body"],
                 "content_type": item["content_type"],
@@ -328,26 +386,53 @@ class _MirrorState:
                 "seq": item.get("seq", 0),
             }
 
+    def wait_for_change(self, path: str, last_seq: int, timeout: float) -> int:
+        """Block until the seq of `path` differs from `last_seq` or `timeout` elapses."""
+        with self._cond:
+            item = self._items.get(path)
+            if item is None:
+                return last_seq
+            self._cond.wait_for(lambda: item["seq"] != last_seq, timeout)
+            return item["seq"]
+
 
 def _build_handler(state: _MirrorState):
     class MirrorHandler(BaseHTTPRequestHandler):
-        def _send_json(self, payload, status=200):
-            body = json.dumps(payload).encode("utf-8")
-            self.send_response(status)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Cache-Control", "no-store")
+        def _send_body(self, body: bytes, status=200, content_type="text/html", etag=None):
+            """Text/JSON response; a 200 gets an ETag (304 on If-None-Match) and may be compressed."""
+            if status != 200:
+                self._send_bytes(body, status, content_type)
+                return
+            etag = etag or http_encoding.body_etag(body)
+            coding = None
+            if len(body) >= http_encoding.COMPRESS_MIN_BYTES:
+                coding = http_encoding.accepted_coding(self.headers.get("Accept-Encoding", ""))
+            sent_etag = http_encoding.coded_etag(etag, coding)
+            if http_encoding.etag_matches(etag, self.headers.get("If-None-Match", "")):
+                self.send_response(304)
+                self.send_header("ETag", sent_etag)
+                self.send_header("Vary", "Accept-Encoding")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                return
+            if coding:
+                body = _ENCODED_BODIES.get(etag, coding, body)
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("ETag", sent_etag)
+            self.send_header("Vary", "Accept-Encoding")
+            if coding:
+                self.send_header("Content-Encoding", coding)
             self.send_header("Content-Length", str(len(body)))
             self.end_headers()
             self.wfile.write(body)
 
+        def _send_json(self, payload, status=200):
+            self._send_body(json.dumps(payload).encode("utf-8"), status, "application/json")
+
         def _send_text(self, text: str, status=200, content_type="text/html"):
-            body = text.encode("utf-8")
-            self.send_response(status)
-            self.send_header("Content-Type", content_type)
-            self.send_header("Cache-Control", "no-store")
-            self.send_header("Content-Length", str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            self._send_body(text.encode("utf-8"), status, content_type)
 
         def _send_bytes(self, body: bytes, status=200, content_type="application/octet-stream"):
             self.send_response(status)
@@ -359,10 +444,11 @@ def _build_handler(state: _MirrorState):
 
         def _send_html_file(self, path: str):
             try:
-                with open(path, "r") as f:
-                    self._send_text(f.read(), 200, "text/html")
+                body, etag = _STATIC_FILES.get(path)
             except Exception:
                 self._send_text("not found", 404, "text/plain")
+                return
+            self._send_body(body, 200, "text/html", etag)
 
         def _redirect(self, location: str, status: int = 302):
             self.send_response(status)
@@ -513,6 +599,34 @@ def _build_handler(state: _MirrorState):
                 except Exception:
                     break
 
+        def _stream_mjpeg(self, source_path: str):
+            """Push a multipart part whenever the mirrored image changes (encoded lazily)."""
+            self.send_response(200)
+            self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}")
+            self.send_header("Cache-Control", "no-store")
+            self.send_header("Connection", "close")
+            self.end_headers()
+
+            last_seq = -1
+            while True:
+                try:
+                    seq = state.wait_for_change(source_path, last_seq, MJPEG_KEEPALIVE_SECONDS)
+                    item = state.get(source_path)
+                    if item and item.get("has_data") and item.get("body"):
+                        body = item["body"]
+                        head = (
+                            f"--{MJPEG_BOUNDARY}\r\n"
+                            f"Content-Type: {item.get('content_type') or 'image/jpeg'}\r\n"
+                            f"Content-Length: {len(body)}\r\n\r\n"
+                        )
+                        self.wfile.write(head.encode("latin-1") + body + b"\r\n")
+                        self.wfile.flush()
+                    last_seq = seq
+                except (BrokenPipeError, ConnectionResetError):
+                    break
+                except Exception:
+                    break
+
         def do_GET(self):
             path = urlparse(self.path).path
 
@@ -552,13 +666,20 @@ def _build_handler(state: _MirrorState):
     <script>
         const img = document.getElementById('cam');
         const meta = document.getElementById('meta');
+        let pollTimer = null;
         function refresh() {
             const ts = Date.now();
             img.src = `/data/processed_image?t=${ts}`;
             meta.textContent = `Updated ${new Date(ts).toLocaleTimeString()}`;
         }
-        refresh();
-        setInterval(refresh, 200);
+        // MJPEG stream pushes each new frame; poll single frames only if it breaks.
+        img.onerror = () => {
+            if (pollTimer) return;
+            meta.textContent = "Stream unavailable, polling";
+            pollTimer = setInterval(refresh, 200);
+        };
+        img.src = "/data/processed_image-stream";
+        meta.textContent = "Live (MJPEG)";
     </script>
 </body>
 </html>"""
@@ -588,13 +709,20 @@ def _build_handler(state: _MirrorState):
     <script>
         const img = document.getElementById('cam');
         const meta = document.getElementById('meta');
+        let pollTimer = null;
         function refresh() {
             const ts = Date.now();
             img.src = `/data/ball_detection_image?t=${ts}`;
             meta.textContent = `Updated ${new Date(ts).toLocaleTimeString()}`;
         }
-        refresh();
-        setInterval(refresh, 200);
+        // MJPEG stream pushes each new frame; poll single frames only if it breaks.
+        img.onerror = () => {
+            if (pollTimer) return;
+            meta.textContent = "Stream unavailable, polling";
+            pollTimer = setInterval(refresh, 200);
+        };
+        img.src = "/data/ball_detection_image-stream";
+        meta.textContent = "Live (MJPEG)";
     </script>
 </body>
 </html>"""
@@ -707,6 +835,9 @@ def _build_handler(state: _MirrorState):
             if path == "/data/decision_making_data-stream":
                 self._stream_json_payload("/data/decision_making_data")
                 return
+            if path in ("/data/front_camera-stream", "/data/processed_image-stream", "/data/ball_detection_image-stream"):
+                self._stream_mjpeg(path[:-len("-stream")])
+                return
 
             item = state.get(path)
             if item is None:
@@ -721,6 +852,9 @@ def _build_handler(state: _MirrorState):
                 self.end_headers()
                 self.wfile.write(b"Mirror has no upstream data yet")
                 return
+            if item["content_type"].startswith(("application/json", "text/")):
+                self._send_body(item["body"], 200, item["content_type"])
+                return
             body = item["body"]
             self.send_response(200)
             self.send_header("Content-Type", item["content_type"])
@@ -981,34 +1115,24 @@ class WebBridgeNode(Node):
         self._state.set('/data/pose_history', canonical, 'application/json; charset=utf-8')
 
     def _on_front_camera_msg(self, msg: Image) -> None:
-        try:
-            image = self._cv_bridge.imgmsg_to_cv2(msg, desired_encoding='bgr8')
-        except Exception:
-            return
-        ok, encoded = cv2.imencode('.jpg', image)
-        if not ok:
-            return
-        self._state.set('/data/front_camera', encoded.tobytes(), 'image/jpeg')
+        self._state.set_lazy('/data/front_camera', lambda: self._encode_jpeg(msg), 'image/jpeg')
 
     def _on_processed_image_msg(self, msg: Image) -> None:
-        try:
-            image = self._cv_bridge.imgmsg_to_cv2(msg, desired_encoding='bgr8')
-        except Exception:
-            return
-        ok, encoded = cv2.imencode('.jpg', image)
-        if not ok:
-            return
-        self._state.set('/data/processed_image', encoded.tobytes(), 'image/jpeg')
+        self._state.set_lazy('/data/processed_image', lambda: self._encode_jpeg(msg), 'image/jpeg')
 
     def _on_ball_detection_image_msg(self, msg: Image) -> None:
+        self._state.set_lazy('/data/ball_detection_image', lambda: self._encode_jpeg(msg), 'image/jpeg')
+
+    def _encode_jpeg(self, msg: Image) -> bytes:
+        """JPEG bytes for an Image message; runs on the HTTP thread that first needs the frame."""
         try:
             image = self._cv_bridge.imgmsg_to_cv2(msg, desired_encoding='bgr8')
         except Exception:
-            return
+            return b""
         ok, encoded = cv2.imencode('.jpg', image)
         if not ok:
-            return
-        self._state.set('/data/ball_detection_image', encoded.tobytes(), 'image/jpeg')
+            return b""
+        return encoded.tobytes()
 
     def _on_decisions(self, msg: String) -> None:
         payload = self._parse_json_payload(msg.data)
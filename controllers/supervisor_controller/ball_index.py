@@ -0,0 +1,135 @@
+# ball_index.py
+# Remembered ball points for the decision scripts (ball_memory in decision_making_data):
+# - PointHash buckets points on a uniform grid, so "is there a point within r of (x, y)"
+#   only looks at the cells that square of side 2r touches (2 x 2 or 3 x 3 when r is the
+#   cell size) instead of every point
+# - BallIndex keeps the remembered points in insertion order on top of a PointHash, with
+#   first/last-seen times and a sighting count per point; confidence decays linearly from
+#   1 to 0 over ttl_s after the last sighting and is computed when asked, not per tick;
+#   prune() forgets the balls whose confidence has reached 0, so a ball seen there again
+#   counts as new
+# - text() is the stored ball_memory text ("(x, y)" per line, 6 decimals) and only
+#   changes when a point is added; points are kept at that precision, so an index rebuilt
+#   from the text (new process, match reset) answers exactly like the one that wrote it
+# Standard library only.
+import math
+
+CELL_SIZE = 0.1
+# The tile memory holds a sighting for 180 s (180, -1 per second); match that by default.
+TTL_S = 180.0
+# Slack on the cell span so rounding in x - r / x + r never drops a neighbouring cell.
+SPAN_EPS = 1e-9
+
+
+def stored(value: float) -> float:
+    """`value` as it reads back from the 6-decimal ball_memory text."""
+    return float(f"{value:.6f}")
+
+
+class PointHash:
+    """Points (by insertion index) bucketed in square cells of `cell_size`."""
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = float(cell_size)
+        self.points = []
+        self._cells = {}
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell(self, v):
+        return int(math.floor(v / self.cell_size))
+
+    def add(self, x, y) -> int:
+        index = len(self.points)
+        self.points.append((x, y))
+        self._cells.setdefault((self._cell(x), self._cell(y)), []).append(index)
+        return index
+
+    def first_near(self, x, y, radius):
+        """Lowest index with hypot(dx, dy) <= radius, or None."""
+        best = None
+        for i in range(self._cell(x - radius - SPAN_EPS), self._cell(x + radius + SPAN_EPS) + 1):
+            for j in range(self._cell(y - radius - SPAN_EPS), self._cell(y + radius + SPAN_EPS) + 1):
+                for index in self._cells.get((i, j), ()):
+                    if best is not None and index >= best:
+                        continue
+                    px, py = self.points[index]
+                    if math.hypot(x - px, y - py) <= radius:
+                        best = index
+        return best
+
+
+class BallIndex:
+    """Remembered balls: a PointHash plus sighting times and the stored text."""
+    def __init__(self, cell_size=CELL_SIZE, ttl_s=TTL_S):
+        self.hash = PointHash(cell_size)
+        self.ttl_s = float(ttl_s)
+        self.first_seen = []
+        self.last_seen = []
+        self.sightings = []
+        self._lines = []
+        self._text = ""
+
+    @classmethod
+    def from_points(cls, points, now, cell_size=CELL_SIZE, ttl_s=TTL_S):
+        """Index of already-stored points (their history is unknown: all seen at `now`)."""
+        index = cls(cell_size, ttl_s)
+        for x, y in points:
+            index.add(x, y, now)
+        return index
+
+    def __len__(self):
+        return len(self.hash)
+
+    @property
+    def points(self):
+        return self.hash.points
+
+    def add(self, x, y, now) -> int:
+        x = stored(x)
+        y = stored(y)
+        self.first_seen.append(now)
+        self.last_seen.append(now)
+        self.sightings.append(1)
+        self._lines.append(f"({x:.6f}, {y:.6f})\n")
+        self._text = None
+        return self.hash.add(x, y)
+
+    def observe(self, x, y, radius, now) -> bool:
+        """Record a sighting; True if it is a new ball (nothing remembered within radius)."""
+        index = self.hash.first_near(x, y, radius)
+        if index is None:
+            self.add(x, y, now)
+            return True
+        self.last_seen[index] = now
+        self.sightings[index] += 1
+        return False
+
+    def confidence(self, index, now) -> float:
+        if self.ttl_s <= 0.0:
+            return 0.0
+        age = max(0.0, now - self.last_seen[index])
+        return max(0.0, 1.0 - age / self.ttl_s)
+
+    def prune(self, now) -> int:
+        """Drop the balls whose confidence is 0 at `now`; returns how many were dropped."""
+        keep = [i for i in range(len(self)) if self.confidence(i, now) > 0.0]
+        if len(keep) == len(self):
+            return 0
+        dropped = len(self) - len(keep)
+        points = self.points
+        first_seen, last_seen, sightings, lines = self.first_seen, self.last_seen, self.sightings, self._lines
+        self.hash = PointHash(self.hash.cell_size)
+        for i in keep:
+            self.hash.add(*points[i])
+        self.first_seen = [first_seen[i] for i in keep]
+        self.last_seen = [last_seen[i] for i in keep]
+        self.sightings = [sightings[i] for i in keep]
+        self._lines = [lines[i] for i in keep]
+        self._text = None
+        return dropped
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._lines)
+        return self._text
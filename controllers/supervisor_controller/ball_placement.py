@@ -0,0 +1,318 @@
+# ball_placement.py
+# Seeded start-of-match ball placement shared by the supervisor and the fast sim:
+# - rectangular avoid zones (main robot start + the four side squares)
+# - rejection sampling with a minimum ball separation (uniform-grid neighbour lookup)
+# - optional Poisson-disk sampling ("ball_placement": "poisson" in config.json)
+# - per-seed placement cache so repeated runs skip the search entirely
+# Draws from the global `random` module so a given seed yields the same layout.
+import json
+import math
+import os
+import random
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.json")
+PLACEMENT_CACHE_FILE = os.path.join(PROJECT_ROOT, "cache", "ball_placement.json")
+
+SQUARE_HALF = 0.15
+SQUARE_CENTERS = [(-0.9, 0.0), (0.9, 0.0), (0.0, 0.9), (0.0, -0.9)]
+
+PLACEMENT_METHODS = ("rejection", "poisson")
+# Candidates tried around each active Poisson-disk sample before it is retired (Bridson's k).
+POISSON_CANDIDATES = 30
+PLACEMENT_CACHE_VERSION = 1
+
+
+def _load_placement_config(default_method="rejection", default_cache=True):
+    method = default_method
+    use_cache = default_cache
+    try:
+        with open(CONFIG_FILE, "r") as f:
+            payload = json.loads(f.read().strip())
+        if isinstance(payload, dict):
+            raw = str(payload.get("ball_placement", default_method)).strip().lower()
+            if raw in PLACEMENT_METHODS:
+                method = raw
+            raw_cache = payload.get("ball_placement_cache", default_cache)
+            if isinstance(raw_cache, bool):
+                use_cache = raw_cache
+            else:
+                use_cache = str(raw_cache).strip().lower() in ("1", "true", "yes", "y", "on")
+    except Exception:
+        pass
+    return method, use_cache
+
+
+PLACEMENT_METHOD, PLACEMENT_CACHE_ENABLED = _load_placement_config()
+
+
+def _point_in_rect(px, py, rect):
+    return (rect[0] <= px <= rect[1]) and (rect[2] <= py <= rect[3])
+
+
+def avoid_zones(robot_x, robot_y, margin, square_half=SQUARE_HALF, square_centers=SQUARE_CENTERS):
+    """(xmin, xmax, ymin, ymax) rectangles no ball may spawn in."""
+    zones = [(robot_x - margin, robot_x + margin, robot_y - margin, robot_y + margin)]
+    for cx, cy in square_centers:
+        zones.append((cx - square_half, cx + square_half, cy - square_half, cy + square_half))
+    return zones
+
+
+# =============================================================================
+# GRID INDEX
+# Uniform grid with cell size >= the query radius, so a neighbour query only
+# visits the 3x3 cells around the point instead of every placed ball.
+# =============================================================================
+class GridIndex:
+    """Placed points bucketed by (floor(x / cell), floor(y / cell))."""
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self.cells = {}
+
+    def _key(self, x, y):
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+    def add(self, x, y):
+        self.cells.setdefault(self._key(x, y), []).append((x, y))
+
+    def any_within(self, x, y, min_separation):
+        """True if a point lies closer than `min_separation` (<= cell_size) to (x, y)."""
+        min_sq = min_separation ** 2
+        kx, ky = self._key(x, y)
+        for ix in (kx - 1, kx, kx + 1):
+            for iy in (ky - 1, ky, ky + 1):
+                for (px, py) in self.cells.get((ix, iy), ()):
+                    if (x-px)**2 + (y-py)**2 < min_sq:
+                        return True
+        return False
+
+
+# =============================================================================
+# SAMPLERS
+# =============================================================================
+def sample_ball_positions(names, x_range, y_range, zones, min_separation, max_tries, ensure_no_overlap=True):
+    """One (x, y) per name, in order, using the global `random` stream.
+
+    Same draws and the same accept/reject decisions as the original all-pairs
+    check, so a seed keeps its layout.
+    """
+    x_min, x_max = x_range
+    y_min, y_max = y_range
+    placed_positions = []
+    index = GridIndex(max(min_separation, 1e-9))
+
+    for name in names:
+        if not ensure_no_overlap:
+            for attempt in range(max_tries):
+                x = random.uniform(x_min, x_max)
+                y = random.uniform(y_min, y_max)
+                blocked = any(_point_in_rect(x,y,rect) for rect in zones)
+                if not blocked:
+                    break
+            else:
+                x = random.uniform(x_min, x_max)
+                y = random.uniform(y_min, y_max)
+            placed_positions.append((x,y))
+            continue
+
+        success = False
+        for attempt in range(max_tries):
+            x = random.uniform(x_min, x_max)
+            y = random.uniform(y_min, y_max)
+            if any(_point_in_rect(x,y,rect) for rect in zones):
+                continue
+            if not index.any_within(x, y, min_separation):
+                placed_positions.append((x,y))
+                index.add(x, y)
+                success = True
+                break
+        if not success:
+            for attempt in range(max_tries):
+                x = random.uniform(x_min, x_max)
+                y = random.uniform(y_min, y_max)
+                if any(_point_in_rect(x,y,rect) for rect in zones):
+                    continue
+                placed_positions.append((x,y))
+                index.add(x, y)
+                success = True
+                break
+        if not success:
+            print(f"Warning: failed to place {name} without overlap/avoid zone. Forcing placement.")
+            x = random.uniform(x_min, x_max)
+            y = random.uniform(y_min, y_max)
+            placed_positions.append((x,y))
+            index.add(x, y)
+
+    return placed_positions
+
+
+def poisson_disk_positions(names, x_range, y_range, zones, min_separation, max_tries, candidates=POISSON_CANDIDATES):
+    """Poisson-disk layout (Bridson): a maximal set of points at least
+    `min_separation` apart, from which one random point per name is taken.
+
+    Spacing is guaranteed by construction, so the cost does not blow up as the
+    field fills. Names left over when the field is full fall back to rejection
+    sampling (and its forced-placement warning).
+    """
+    x_min, x_max = x_range
+    y_min, y_max = y_range
+    r = float(min_separation)
+    index = GridIndex(max(r, 1e-9))
+    samples = []
+    active = []
+
+    def _valid(x, y):
+        if not (x_min <= x <= x_max and y_min <= y <= y_max):
+            return False
+        if any(_point_in_rect(x, y, rect) for rect in zones):
+            return False
+        return not index.any_within(x, y, r)
+
+    # Seed points by dart throwing so regions cut off by avoid zones are covered too.
+    failed_darts = 0
+    while failed_darts < candidates:
+        x = random.uniform(x_min, x_max)
+        y = random.uniform(y_min, y_max)
+        if not _valid(x, y):
+            failed_darts += 1
+            continue
+        failed_darts = 0
+        samples.append((x, y))
+        index.add(x, y)
+        active.append(len(samples) - 1)
+        while active:
+            slot = random.randrange(len(active))
+            px, py = samples[active[slot]]
+            for _ in range(candidates):
+                angle = random.uniform(0.0, 2.0 * math.pi)
+                radius = random.uniform(r, 2.0 * r)
+                cx = px + radius * math.cos(angle)
+                cy = py + radius * math.sin(angle)
+                if _valid(cx, cy):
+                    samples.append((cx, cy))
+                    index.add(cx, cy)
+                    active.append(len(samples) - 1)
+                    break
+            else:
+                active[slot] = active[-1]
+                active.pop()
+
+    random.shuffle(samples)
+    placed_positions = samples[:len(names)]
+    if len(placed_positions) < len(names):
+        rest = sample_ball_positions(
+            names[len(placed_positions):], x_range, y_range, zones, min_separation, max_tries, True
+        )
+        placed_positions.extend(rest)
+    return placed_positions
+
+
+# =============================================================================
+# PLACEMENT CACHE
+# {"version": 1, "layouts": {"<key>": [[x, y], ...]}} keyed by seed and every
+# parameter that changes the layout. JSON floats round-trip exactly.
+# =============================================================================
+def placement_cache_key(seed, method, names, x_range, y_range, zones, min_separation, max_tries, ensure_no_overlap):
+    parts = [
+        f"v{PLACEMENT_CACHE_VERSION}", method, str(int(seed)), str(len(names)),
+        repr(tuple(float(v) for v in x_range)), repr(tuple(float(v) for v in y_range)),
+        repr([tuple(float(v) for v in rect) for rect in zones]),
+        repr(float(min_separation)), str(int(max_tries)), str(bool(ensure_no_overlap)),
+    ]
+    return "|".join(parts)
+
+
+def load_placement_cache(path=PLACEMENT_CACHE_FILE):
+    try:
+        with open(path, "r") as f:
+            payload = json.load(f)
+        if isinstance(payload, dict) and payload.get("version") == PLACEMENT_CACHE_VERSION:
+            layouts = payload.get("layouts")
+            if isinstance(layouts, dict):
+                return layouts
+    except Exception:
+        pass
+    return {}
+
+
+def store_placement_cache(layouts, path=PLACEMENT_CACHE_FILE):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": PLACEMENT_CACHE_VERSION, "layouts": layouts}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return True
+    except Exception:
+        return False
+
+
+def place_balls(names, x_range, y_range, zones, min_separation, max_tries, ensure_no_overlap=True,
+                seed=None, method=None, cache_file=None):
+    """Layout for `names`, from the placement cache when this seed was placed before.
+
+    Returns (positions, from_cache). The caller seeds `random` with `seed`
+    first; without a seed nothing is cached. cache_file=False disables the cache.
+    """
+    method = (method or PLACEMENT_METHOD).strip().lower()
+    if cache_file is None:
+        cache_file = PLACEMENT_CACHE_FILE if PLACEMENT_CACHE_ENABLED else False
+    key = None
+    if seed is not None and cache_file:
+        key = placement_cache_key(seed, method, names, x_range, y_range, zones, min_separation, max_tries, ensure_no_overlap)
+        cached = load_placement_cache(cache_file).get(key)
+        if isinstance(cached, list) and len(cached) == len(names):
+            return [(float(x), float(y)) for x, y in cached], True
+
+    if method == "poisson" and ensure_no_overlap:
+        positions = poisson_disk_positions(names, x_range, y_range, zones, min_separation, max_tries)
+    else:
+        positions = sample_ball_positions(names, x_range, y_range, zones, min_separation, max_tries, ensure_no_overlap)
+
+    if key is not None:
+        # Re-read so concurrent runs (parallel benchmarks) only lose a race, not the file.
+        layouts = load_placement_cache(cache_file)
+        layouts[key] = [[x, y] for x, y in positions]
+        store_placement_cache(layouts, cache_file)
+    return positions, False
+
+
+# =============================================================================
+# OFFLINE PRECOMPUTE
+# python3 ball_placement.py --seed-start 1000 --seed-end 1029
+# fills the cache with the supervisor's default Decision_making layout.
+# =============================================================================
+DEFAULT_BALL_NAMES = [f"BALL_{i}" for i in range(40)]
+DEFAULT_FIELD_RANGE = (-0.86, 0.86)
+DEFAULT_MIN_SEPARATION = 2.0 * 0.02 + 0.001
+DEFAULT_MAX_TRIES = 2000
+DEFAULT_ROBOT_START = (-0.8, 0.0)
+DEFAULT_ROBOT_MARGIN = 0.1 + 0.05 + 0.02
+
+
+def main(argv=None):
+    import argparse
+
+    p = argparse.ArgumentParser(description="Precompute seeded ball layouts into the placement cache.")
+    p.add_argument("--seed-start", type=int, required=True)
+    p.add_argument("--seed-end", type=int, default=None)
+    p.add_argument("--count", type=int, default=len(DEFAULT_BALL_NAMES), help="number of balls (BALL_0..BALL_n-1)")
+    p.add_argument("--method", choices=PLACEMENT_METHODS, default=PLACEMENT_METHOD)
+    p.add_argument("--cache-file", default=PLACEMENT_CACHE_FILE)
+    args = p.parse_args(argv)
+
+    names = [f"BALL_{i}" for i in range(args.count)]
+    zones = avoid_zones(DEFAULT_ROBOT_START[0], DEFAULT_ROBOT_START[1], DEFAULT_ROBOT_MARGIN)
+    seed_end = args.seed_start if args.seed_end is None else args.seed_end
+    for seed in range(args.seed_start, seed_end + 1):
+        random.seed(seed)
+        _, cached = place_balls(
+            names, DEFAULT_FIELD_RANGE, DEFAULT_FIELD_RANGE, zones, DEFAULT_MIN_SEPARATION, DEFAULT_MAX_TRIES,
+            True, seed=seed, method=args.method, cache_file=args.cache_file,
+        )
+        print(f"seed={seed} count={len(names)} method={args.method} {'cached' if cached else 'computed'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+# decision_grids.py
+# Binary form of the tile maps a decision script keeps in decision_making_data:
+# - one map is one string "grid:<rows>x<cols>:<kind>:<base64>", row-major, so the dict
+#   stays plain JSON / state-bus text and merges like any other key
+# - kind "i4z": zlib of little-endian int32 thousandths, for maps already rounded to the
+#   3 decimals of the text form (exact: m / 1000 reads back as float("%.3f")); a 20 x 20
+#   map is a few dozen bytes when mostly zero instead of 4 KiB of base64 float64
+# - kind "f8": little-endian float64, for anything else; the untagged
+#   "grid:<rows>x<cols>:<base64>" of earlier versions reads as "f8"
+# - decision_making_cyc keeps its maps as arrays and never formats them as text
+# - the field viewer decodes them straight into arrays for the tile overlays and renders
+#   the comma-separated text form ("0" or "%.3f", one row per line) only for clients that
+#   ask for the text view of /data/decision_making_data
+# Standard library only (imported by the field viewer as well as the decision scripts).
+import base64
+import struct
+import sys
+import zlib
+from array import array
+
+PREFIX = "grid:"
+ZERO_EPS = 1e-12
+MILLI = 1000
+INT32_MIN = -2 ** 31
+INT32_MAX = 2 ** 31 - 1
+ZLIB_LEVEL = 6
+# Bytes per value of each kind (after decompression).
+KIND_SIZES = {"f8": 8, "i4z": 4}
+
+
+def is_grid(value) -> bool:
+    return isinstance(value, str) and value.startswith(PREFIX)
+
+
+def encode(rows: int, cols: int, data: bytes, kind: str = "f8") -> str:
+    """Wire string for rows x cols values: `data` is little-endian float64 ("f8") or
+    int32 thousandths ("i4z", compressed here)."""
+    if kind == "i4z":
+        data = zlib.compress(data, ZLIB_LEVEL)
+    return f"{PREFIX}{int(rows)}x{int(cols)}:{kind}:{base64.b64encode(data).decode('ascii')}"
+
+
+def decode(value):
+    """(rows, cols, kind, little-endian bytes) with "i4z" decompressed, or None if
+    `value` is not a valid grid."""
+    if not is_grid(value):
+        return None
+    try:
+        shape, _, payload = value[len(PREFIX):].partition(":")
+        kind, sep, encoded = payload.partition(":")
+        if not sep:
+            kind, encoded = "f8", payload
+        rows, _, cols = shape.partition("x")
+        rows = int(rows)
+        cols = int(cols)
+        data = base64.b64decode(encoded)
+        if kind == "i4z":
+            data = zlib.decompress(data)
+    except Exception:
+        return None
+    size = KIND_SIZES.get(kind)
+    if size is None or rows < 0 or cols < 0 or len(data) != rows * cols * size:
+        return None
+    return rows, cols, kind, data
+
+
+def to_array(value):
+    """(rows, cols, array("d")) for a grid string; (0, 0, empty) if it does not decode."""
+    grid = decode(value)
+    if grid is None:
+        return 0, 0, array("d")
+    rows, cols, kind, data = grid
+    if kind == "i4z":
+        return rows, cols, array("d", [m / MILLI for m in struct.unpack(f"<{rows * cols}i", data)])
+    values = array("d", data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return rows, cols, values
+
+
+def format_rows(rows: int, cols: int, values) -> str:
+    """The text form decision scripts used to write (see_tile.txt and friends)."""
+    def _fmt(v):
+        return "0" if abs(v) < ZERO_EPS else f"{v:.3f}"
+
+    return "\n".join(
+        ",".join(_fmt(values[r * cols + c]) for c in range(cols))
+        for r in range(rows)
+    ) + "\n"
+
+
+def to_text(value) -> str:
+    return format_rows(*to_array(value))
+
+
+def text_view(payload: dict) -> dict:
+    """`payload` with every grid replaced by its text form (the same dict if it has none)."""
+    if not any(is_grid(value) for value in payload.values()):
+        return payload
+    return {key: to_text(value) if is_grid(value) else value for key, value in payload.items()}
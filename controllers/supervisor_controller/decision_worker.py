@@ -0,0 +1,297 @@
+# decision_worker.py
+# Long-lived decision worker for the supervisor:
+# - loads decision_making_<branch>/waypoints_cruise.py once
+# - runs its main() (mode.txt -> _MODE_HANDLERS dispatch) on every tick
+# - talks to the supervisor over a line-based JSON pipe (stdin/stdout)
+# - each tick request can carry the simulation_data the supervisor last published, as a
+#   sim_snapshot delta envelope; the worker keeps the mirror and seeds SIM_DATA_CACHE
+#   from it, so the script does not fetch it back from the field viewer
+# - ticks are non-blocking by default; wait() blocks on one (lock-step mode)
+import copy
+import importlib.util
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+import sim_snapshot
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, "..", ".."))
+
+# Restart budget before the supervisor falls back to one-shot subprocess runs.
+MAX_WORKER_RESTARTS = 3
+
+
+# =============================================================================
+# WORKER SIDE
+# Runs inside the child process; owns the loaded waypoints_cruise module.
+# The loader and cache helpers are also used in-process by tools/testing/fast_sim.py.
+# =============================================================================
+def load_cruise_module(script_path):
+    """Import waypoints_cruise.py from an explicit path, as `python script.py` would."""
+    script_dir = os.path.dirname(os.path.abspath(script_path))
+    for path in (script_dir, PROJECT_ROOT):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    # parse_args() reads sys.argv; keep it identical to the one-shot invocation.
+    sys.argv = [script_path]
+    spec = importlib.util.spec_from_file_location("waypoints_cruise", script_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["waypoints_cruise"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def snapshot_transport_caches(module):
+    """Copy the *_CACHE dicts as they are right after import.
+
+    These hold per-run snapshots of remote state (simulation data, decisions,
+    decision_making_data). A fresh process starts each tick with them empty, so
+    the worker restores them before every tick to keep the same semantics.
+    """
+    snapshot = {}
+    for name, value in vars(module).items():
+        if name.endswith("_CACHE") and isinstance(value, dict):
+            snapshot[name] = copy.deepcopy(value)
+    return snapshot
+
+
+def restore_transport_caches(module, snapshot):
+    for name, value in snapshot.items():
+        setattr(module, name, copy.deepcopy(value))
+
+
+def seed_sim_data(module, mirror, envelope):
+    """Apply a tick's simulation_data envelope to `mirror` and, when it lines up, use it
+    as the module's SIM_DATA_CACHE. Otherwise the cache stays empty and the script
+    fetches simulation_data itself, as a one-shot run would."""
+    if not sim_snapshot.is_envelope(envelope) or not hasattr(module, "SIM_DATA_CACHE"):
+        return False
+    if not sim_snapshot.apply_envelope(mirror, envelope):
+        mirror.update(sim_snapshot.new_mirror())
+        return False
+    module.SIM_DATA_CACHE = dict(mirror["values"])
+    return True
+
+
+def _send(stream, message):
+    try:
+        stream.write(json.dumps(message) + "\n")
+        stream.flush()
+    except Exception:
+        pass
+
+
+def serve(script_path):
+    """Worker loop: one JSON request per stdin line, one JSON reply per tick."""
+    protocol = sys.stdout
+    # Decision scripts print freely; keep their output off the protocol pipe.
+    sys.stdout = sys.stderr
+
+    try:
+        module = load_cruise_module(script_path)
+    except Exception as e:
+        _send(protocol, {"error": f"failed to load {script_path}: {e}"})
+        return 1
+    snapshot = snapshot_transport_caches(module)
+    sim_mirror = sim_snapshot.new_mirror()
+    _send(protocol, {"ready": True, "pid": os.getpid()})
+
+    for raw in sys.stdin:
+        line = raw.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except Exception:
+            continue
+        if request.get("stop"):
+            break
+        tick = request.get("tick")
+        started = time.perf_counter()
+        rc = 1
+        try:
+            restore_transport_caches(module, snapshot)
+            if "sim" in request:
+                seed_sim_data(module, sim_mirror, request["sim"])
+            rc = module.main()
+        except SystemExit as e:
+            rc = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            print(f"[DecisionWorker] tick {tick} failed: {e}", file=sys.stderr)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        _send(protocol, {"tick": tick, "rc": rc, "ms": round(elapsed_ms, 3)})
+    return 0
+
+
+# =============================================================================
+# SUPERVISOR SIDE
+# Spawns the worker and drives it with non-blocking ticks.
+# =============================================================================
+class DecisionWorker:
+    """Handle to a persistent waypoints_cruise.py worker process."""
+    def __init__(self, script_path, cwd=None):
+        self.script_path = script_path
+        self.cwd = cwd
+        self.proc = None
+        self.replies = queue.Queue()
+        self.busy = False
+        self.ready = False
+        self.restarts = 0
+        self.ticks_sent = 0
+        self.ticks_done = 0
+        self.ticks_skipped = 0
+        self.last_rc = None
+        self.last_ms = None
+        # simulation_data deltas sent with the ticks; a new one per worker process.
+        self.sim_encoder = sim_snapshot.SnapshotEncoder()
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    @property
+    def usable(self):
+        return self.alive or self.restarts < MAX_WORKER_RESTARTS
+
+    def start(self):
+        if not os.path.isfile(self.script_path):
+            return False
+        try:
+            self.proc = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), self.script_path],
+                cwd=self.cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+            )
+        except Exception as e:
+            print(f"[DecisionWorker] failed to start: {e}")
+            self.proc = None
+            return False
+        self.busy = False
+        self.ready = False
+        self.replies = queue.Queue()
+        self.sim_encoder = sim_snapshot.SnapshotEncoder()
+        t = threading.Thread(target=self._read_replies, args=(self.proc.stdout, self.replies), daemon=True)
+        t.start()
+        return True
+
+    @staticmethod
+    def _read_replies(stream, q):
+        try:
+            for line in iter(stream.readline, ''):
+                if not line:
+                    break
+                try:
+                    q.put(json.loads(line))
+                except Exception:
+                    continue
+        except Exception:
+            pass
+
+    def _handle_reply(self, reply):
+        """Apply one reply; returns 1 if it finished a tick."""
+        if reply.get("ready"):
+            self.ready = True
+        elif "error" in reply:
+            print(f"[DecisionWorker] {reply['error']}")
+        elif "tick" in reply:
+            self.busy = False
+            self.ticks_done += 1
+            self.last_rc = reply.get("rc")
+            self.last_ms = reply.get("ms")
+            return 1
+        return 0
+
+    def poll(self):
+        """Drain replies without blocking; returns the number of finished ticks."""
+        finished = 0
+        while True:
+            try:
+                reply = self.replies.get_nowait()
+            except queue.Empty:
+                break
+            finished += self._handle_reply(reply)
+        return finished
+
+    def wait(self, timeout=None):
+        """Block until the in-flight tick has replied (lock-step mode).
+
+        Returns False on timeout or if the worker exited mid-tick.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.busy:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            try:
+                reply = self.replies.get(timeout=0.5 if remaining is None else min(0.5, remaining))
+            except queue.Empty:
+                if not self.alive:
+                    self.busy = False
+                    return False
+                continue
+            self._handle_reply(reply)
+        return True
+
+    def tick(self, frame, sim_data=None):
+        """Request one decision run. Returns False if the worker is unusable.
+
+        `sim_data` is the simulation_data payload the script would read this tick; the
+        worker gets it with the request (only changed keys after the first tick).
+        """
+        self.poll()
+        if not self.alive:
+            if self.restarts >= MAX_WORKER_RESTARTS:
+                return False
+            if self.proc is not None:
+                self.restarts += 1
+                print(f"[DecisionWorker] worker exited, restarting ({self.restarts}/{MAX_WORKER_RESTARTS})")
+            if not self.start():
+                self.restarts += 1
+                return False
+        if self.busy:
+            # Previous decision still running: coalesce instead of queueing stale ticks.
+            self.ticks_skipped += 1
+            return True
+        request = {"tick": int(frame)}
+        if sim_data:
+            request["sim"] = self.sim_encoder.encode(sim_data)
+        try:
+            self.proc.stdin.write(sim_snapshot.dumps(request) + "\n")
+            self.proc.stdin.flush()
+        except Exception:
+            self.sim_encoder.force_full()
+            return False
+        self.busy = True
+        self.ticks_sent += 1
+        return True
+
+    def stop(self, timeout=1.0):
+        if self.proc is None:
+            return
+        try:
+            if self.proc.poll() is None:
+                self.proc.stdin.write(json.dumps({"stop": True}) + "\n")
+                self.proc.stdin.flush()
+                self.proc.stdin.close()
+                self.proc.wait(timeout=timeout)
+        except Exception:
+            try:
+                self.proc.kill()
+            except Exception:
+                pass
+        self.proc = None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: decision_worker.py <waypoints_cruise.py>", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(serve(sys.argv[1]))
@@ -0,0 +1,238 @@
+# match_log.py
+# Append-only columnar match recording ("match_log": true in config.json):
+# - record() once per frame with the sim time, the simulation_data texts sent to the viewer
+#   and the decisions applied; nothing else happens on the step loop
+# - frames are written every CHUNK_FRAMES as numbered .npz chunks (one directory per match)
+#   by a background thread
+# - dense numeric columns for analysis: t, pose (x, y, bearing), radar (front, right, left,
+#   rear), ball_taken
+# - every text key is stored change-only (frame indices + one utf-8 blob with offsets); the
+#   first frame of a chunk carries all values, so each chunk decodes on its own
+# - MatchLog reads a match back frame by frame (tools/testing/replay_match.py)
+# Shared by supervisor_controller.py and tools/testing/fast_sim.py.
+import glob
+import json
+import math
+import os
+import queue
+import re
+import threading
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.json")
+DEFAULT_MATCH_LOG_DIR = os.path.join(PROJECT_ROOT, "match_logs")
+
+FORMAT_VERSION = 1
+# About 4 s of frames at the 4 ms basicTimeStep.
+CHUNK_FRAMES = 1024
+META_FILE = "meta.json"
+SIM_PREFIX = "sim."
+DECISION_PREFIX = "dec."
+POSE_FIELDS = ("x", "y", "bearing")
+RADAR_FIELDS = ("front", "right", "left", "rear")
+
+_NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def _parse_bool(raw):
+    if isinstance(raw, bool):
+        return raw
+    if isinstance(raw, (int, float)):
+        return bool(raw)
+    return str(raw).strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def load_match_log_config(path=CONFIG_FILE):
+    """Return (enabled, directory) from config.json ("match_log", "match_log_dir")."""
+    enabled = False
+    directory = DEFAULT_MATCH_LOG_DIR
+    try:
+        with open(path, "r") as f:
+            payload = json.loads(f.read().strip())
+        if isinstance(payload, dict):
+            enabled = _parse_bool(payload.get("match_log", False))
+            raw_dir = str(payload.get("match_log_dir", "") or "").strip()
+            if raw_dir:
+                directory = raw_dir if os.path.isabs(raw_dir) else os.path.join(PROJECT_ROOT, raw_dir)
+    except Exception:
+        pass
+    return enabled, directory
+
+
+def new_match_dir(root, label=""):
+    """Fresh per-match directory under `root`: <YYYYmmdd_HHMMSS>[_label][_n]."""
+    name = time.strftime("%Y%m%d_%H%M%S") + (f"_{label}" if label else "")
+    path = os.path.join(root, name)
+    suffix = 1
+    while os.path.exists(path):
+        suffix += 1
+        path = os.path.join(root, f"{name}_{suffix}")
+    return path
+
+
+def _text(value):
+    if isinstance(value, str):
+        return value
+    return "" if value is None else str(value)
+
+
+def _floats(text, count):
+    values = [float(v) for v in _NUMBER_RE.findall(text)[:count]]
+    return values + [math.nan] * (count - len(values))
+
+
+def _encode_chunk(frames):
+    """npz arrays for a list of (t, simulation_data, decisions) frames."""
+    n = len(frames)
+    pose = np.full((n, len(POSE_FIELDS)), np.nan, dtype=np.float32)
+    radar = np.full((n, len(RADAR_FIELDS)), np.nan, dtype=np.float32)
+    ball_taken = np.full(n, -1, dtype=np.int32)
+    for i, (_, sim, _) in enumerate(frames):
+        pose[i] = _floats(_text(sim.get("current_position")), len(POSE_FIELDS))
+        # radar_sensor: "t,front,right,left,rear"
+        radar[i] = _floats(_text(sim.get("radar_sensor")), len(RADAR_FIELDS) + 1)[1:]
+        try:
+            ball_taken[i] = int(_text(sim.get("ball_taken_number")).strip())
+        except ValueError:
+            pass
+    arrays = {
+        "t": np.array([frame[0] for frame in frames], dtype=np.float64),
+        "pose": pose,
+        "radar": radar,
+        "ball_taken": ball_taken,
+    }
+    for prefix, index in ((SIM_PREFIX, 1), (DECISION_PREFIX, 2)):
+        keys = set()
+        for frame in frames:
+            keys.update(frame[index].keys())
+        for key in sorted(keys):
+            changed_at = []
+            blobs = []
+            last = None
+            for i, frame in enumerate(frames):
+                text = _text(frame[index].get(key))
+                if i == 0 or text != last:
+                    changed_at.append(i)
+                    blobs.append(text.encode("utf-8"))
+                    last = text
+            offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+            np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+            arrays[f"{prefix}{key}.frames"] = np.array(changed_at, dtype=np.int32)
+            arrays[f"{prefix}{key}.offsets"] = offsets
+            arrays[f"{prefix}{key}.data"] = np.frombuffer(b"".join(blobs), dtype=np.uint8)
+    return arrays
+
+
+class MatchRecorder:
+    """Buffers frames and hands full chunks to a writer thread.
+
+    The dicts passed to record() are kept by reference until their chunk is written,
+    so callers must replace them rather than mutate them afterwards.
+    """
+    def __init__(self, directory, meta=None, chunk_frames=CHUNK_FRAMES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_frames = max(1, int(chunk_frames))
+        self.frames = 0
+        self.chunks = 0
+        self.errors = 0
+        self._pending = []
+        self._queue = queue.Queue()
+        info = {"version": FORMAT_VERSION, "created": time.time(), "chunk_frames": self.chunk_frames}
+        info.update(meta or {})
+        with open(os.path.join(directory, META_FILE), "w") as f:
+            json.dump(info, f, indent=2)
+        self._thread = threading.Thread(target=self._writer, name="match-log", daemon=True)
+        self._thread.start()
+
+    def record(self, t, simulation_data, decisions):
+        self._pending.append((float(t), simulation_data, decisions))
+        self.frames += 1
+        if len(self._pending) >= self.chunk_frames:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        frames, self._pending = self._pending, []
+        self._queue.put((self.chunks, frames))
+        self.chunks += 1
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            index, frames = item
+            path = os.path.join(self.directory, f"chunk_{index:06d}.npz")
+            try:
+                with open(path + ".tmp", "wb") as f:
+                    np.savez_compressed(f, **_encode_chunk(frames))
+                os.replace(path + ".tmp", path)
+            except Exception as e:
+                self.errors += 1
+                print(f"[MatchLog] failed to write {path}: {e}")
+
+    def close(self, timeout=30.0):
+        """Write the partial last chunk and wait for the writer to finish."""
+        self._flush()
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+def _decode_text_columns(data, prefix):
+    """{key: (change frame indices, texts)} for one prefix of a loaded chunk."""
+    columns = {}
+    for name in data.files:
+        if not (name.startswith(prefix) and name.endswith(".frames")):
+            continue
+        key = name[len(prefix):-len(".frames")]
+        offsets = data[f"{prefix}{key}.offsets"]
+        blob = data[f"{prefix}{key}.data"].tobytes()
+        texts = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+        columns[key] = (data[name].tolist(), texts)
+    return columns
+
+
+class MatchLog:
+    """A recorded match directory (meta.json + chunk_*.npz)."""
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), "r") as f:
+            self.meta = json.load(f)
+        self.chunk_paths = sorted(glob.glob(os.path.join(directory, "chunk_*.npz")))
+
+    def frames(self):
+        """Yield (t, simulation_data, decisions) for every recorded frame, in order."""
+        for path in self.chunk_paths:
+            with np.load(path) as data:
+                t = data["t"].tolist()
+                columns = [
+                    (target, key, changes, texts)
+                    for target, prefix in ((0, SIM_PREFIX), (1, DECISION_PREFIX))
+                    for key, (changes, texts) in _decode_text_columns(data, prefix).items()
+                ]
+            values = ({}, {})
+            cursors = [0] * len(columns)
+            for i, frame_t in enumerate(t):
+                for c, (target, key, changes, texts) in enumerate(columns):
+                    cursor = cursors[c]
+                    if cursor < len(changes) and changes[cursor] == i:
+                        values[target][key] = texts[cursor]
+                        cursors[c] = cursor + 1
+                yield frame_t, dict(values[0]), dict(values[1])
+
+    def columns(self):
+        """Dense numeric columns over the whole match: {"t", "pose", "radar", "ball_taken"}."""
+        parts = {"t": [], "pose": [], "radar": [], "ball_taken": []}
+        for path in self.chunk_paths:
+            with np.load(path) as data:
+                for name in parts:
+                    parts[name].append(data[name])
+        return {
+            name: np.concatenate(chunks) if chunks else np.zeros(0)
+            for name, chunks in parts.items()
+        }
@@ -0,0 +1,312 @@
+# motion_controller.py
+# Kinematic robot motion shared by the Webots supervisor and the headless fast sim:
+# - MotionController: non-blocking rotate/move state machine on translation/rotation fields
+# - waypoint parsing for dynamic_waypoints and obstacle_plan.txt
+import math
+import re
+
+import numpy as np
+
+DEFAULT_VELOCITY = 3.0  # m/s
+DEFAULT_ANGULAR_VELOCITY = 40.0  # deg/s
+
+# Waypoint orientation aliases (radians)
+North = math.pi / 2
+East = 0.0
+South = -math.pi / 2
+West = math.pi
+
+
+# =============================================================================
+# SHARED HELPERS
+# Small math helpers reused by controller logic.
+# =============================================================================
+def _normalize_angle(a):
+    """Normalize angle to [-pi, pi]"""
+    return (a + math.pi) % (2 * math.pi) - math.pi
+
+def _deg_to_rad(deg):
+    return deg * math.pi / 180.0
+
+# =============================================================================
+# MOTION CONTROLLER (NON-BLOCKING)
+# Per-robot motion state machine with optional cyclic waypoint traversal.
+# =============================================================================
+class MotionController:
+    """Controls robot motion with support for waypoint cycling"""
+    def __init__(self, trans_field, rot_field, dt, cycle_mode=False,
+                 default_velocity=DEFAULT_VELOCITY, angular_velocity_deg=DEFAULT_ANGULAR_VELOCITY):
+        self.trans = trans_field
+        self.rot = rot_field
+        self.dt = dt
+        self.active = False
+        self.phase = None
+        self.start_pos = None
+        self.target_pos = None
+        self.start_angle = 0.0
+        self.target_angle = None
+        self.default_velocity = default_velocity
+        self.angular_velocity_deg = angular_velocity_deg
+        self.velocity = default_velocity
+        self.angular_speed = _deg_to_rad(angular_velocity_deg)
+        self.direction = np.array([0.0, 0.0, 0.0])
+        self.total_dist = 0.0
+        self.traveled = 0.0
+        self.total_time = 0.0
+        self.elapsed = 0.0
+        self.move_speed = 0.0
+        self.angle_delta = 0.0
+        
+        # Cycle mode: automatically move to next waypoint in a list
+        self.cycle_mode = cycle_mode
+        self.waypoint_list = []
+        self.current_waypoint_index = 0
+
+    def start(self, x, y, velocity=None, angle=None):
+        """Start a motion task (non-blocking)"""
+        cur_pos = np.array(self.trans.getSFVec3f(), dtype=float)
+        cur_angle = _normalize_angle(self.rot.getSFRotation()[3])
+
+        target = np.array([x, y, cur_pos[2]], dtype=float)
+        delta = target - cur_pos
+        dist = np.linalg.norm(delta)
+
+        self.start_pos = cur_pos
+        self.target_pos = target
+        self.start_angle = cur_angle
+        self.target_angle = _normalize_angle(angle) if angle is not None else None
+        self.velocity = self.default_velocity if velocity is None else velocity
+        self.total_dist = dist
+        self.traveled = 0.0
+        self.total_time = 0.0
+        self.elapsed = 0.0
+        self.move_speed = self.velocity
+        self.angle_delta = 0.0
+        self.angular_speed = _deg_to_rad(self.angular_velocity_deg)
+        self.direction = (delta / dist) if dist > 1e-9 else np.array([0.0, 0.0, 0.0])
+
+        if dist <= 1e-6:
+            if self.target_angle is None:
+                self.phase = None
+                self.active = False
+                return
+            else:
+                self.phase = 'rotate_only'
+                self.active = True
+                return
+
+        if self.target_angle is None:
+            target_yaw = math.atan2((y - cur_pos[1]), (x - cur_pos[0]))
+            self.target_angle = _normalize_angle(target_yaw)
+            if self.cycle_mode:
+                # Obstacle robots: move while rotating at constant angular speed.
+                self.phase = 'move_and_rotate'
+                self.angle_delta = _normalize_angle(self.target_angle - self.start_angle)
+                time_linear = (self.total_dist / self.velocity) if self.velocity > 1e-9 else 0.0
+                time_angular = (abs(self.angle_delta) / self.angular_speed) if self.angular_speed > 1e-9 else 0.0
+                self.total_time = max(time_linear, time_angular, 1e-6)
+                self.move_speed = self.total_dist / self.total_time if self.total_time > 1e-9 else 0.0
+            else:
+                # Main robot: rotate in place to face the target, then move in a straight line.
+                self.phase = 'rotate_then_move'
+        else:
+            # Move and interpolate rotation to the target angle simultaneously
+            self.phase = 'move_and_rotate'
+            self.angle_delta = _normalize_angle(self.target_angle - self.start_angle)
+            time_linear = (self.total_dist / self.velocity) if self.velocity > 1e-9 else 0.0
+            time_angular = (abs(self.angle_delta) / self.angular_speed) if self.angular_speed > 1e-9 else 0.0
+            self.total_time = max(time_linear, time_angular, 1e-6)
+            self.move_speed = self.total_dist / self.total_time
+
+        self.active = True
+
+    def _complete_waypoint(self):
+        """Mark current waypoint complete and auto-advance in cycle mode."""
+        self.active = False
+        self.phase = None
+        if self.cycle_mode:
+            self.start_next_waypoint()
+
+    def cancel(self):
+        self.active = False
+        self.phase = None
+
+    def load_waypoint_list(self, waypoint_list, start_index=0):
+        """Load a list of waypoints for cycle mode
+        start_index: The index of the first waypoint to start from
+        """
+        self.waypoint_list = waypoint_list
+        self.current_waypoint_index = start_index % len(waypoint_list) if waypoint_list else 0
+        if self.waypoint_list:
+            self.start_next_waypoint()
+
+    def start_next_waypoint(self):
+        """Move to the next waypoint in the list (cycles if at end)"""
+        if not self.waypoint_list:
+            self.active = False
+            return
+        
+        wp = self.waypoint_list[self.current_waypoint_index]
+        x, y = wp[0], wp[1]
+        angle = wp[2] if len(wp) > 2 else None
+        
+        self.start(x, y, velocity=None, angle=angle)
+        self.current_waypoint_index = (self.current_waypoint_index + 1) % len(self.waypoint_list)
+
+    def update(self):
+        """Called each frame to advance motion; returns True if the task is completed or idle"""
+        if not self.active:
+            return True
+
+        cur_pos = np.array(self.trans.getSFVec3f(), dtype=float)
+        step_dist = self.velocity * self.dt
+
+        # helper: single-step rotate towards target_ang
+        def step_rotate_towards(target_ang):
+            cur = _normalize_angle(self.rot.getSFRotation()[3])
+            rem = _normalize_angle(target_ang - cur)
+            if abs(rem) <= 1e-3:
+                self.rot.setSFRotation([0, 0, 1, target_ang])
+                return True
+            max_step = self.angular_speed * self.dt
+            step_ang = max_step if abs(rem) > max_step else abs(rem)
+            sign = 1.0 if rem > 0 else -1.0
+            self.rot.setSFRotation([0, 0, 1, _normalize_angle(cur + sign * step_ang)])
+            return False
+
+        if self.phase == 'rotate_only':
+            done = step_rotate_towards(self.target_angle)
+            if done:
+                self.active = False
+                self.phase = None
+                # In cycle mode, start next waypoint after reaching this one
+                if self.cycle_mode:
+                    self.start_next_waypoint()
+                return True
+            return False
+
+        if self.phase == 'rotate_then_move':
+            rotated = step_rotate_towards(self.target_angle)
+            if not rotated:
+                return False
+            remaining = np.linalg.norm(self.target_pos - cur_pos)
+            if remaining <= step_dist:
+                self.trans.setSFVec3f(self.target_pos.tolist())
+                self.active = False
+                self.phase = None
+                # In cycle mode, start next waypoint after reaching this one
+                if self.cycle_mode:
+                    self.start_next_waypoint()
+                return True
+            new_pos = cur_pos + self.direction * step_dist
+            self.trans.setSFVec3f(new_pos.tolist())
+            return False
+
+        if self.phase == 'move_and_rotate':
+            remaining = np.linalg.norm(self.target_pos - cur_pos)
+            current_angle = _normalize_angle(self.rot.getSFRotation()[3])
+            remaining_angle = abs(_normalize_angle(self.target_angle - current_angle))
+            time_linear = (remaining / self.velocity) if self.velocity > 1e-9 else 0.0
+            time_angular = (remaining_angle / self.angular_speed) if self.angular_speed > 1e-9 else 0.0
+            self.total_time = max(time_linear, time_angular, 1e-6)
+            self.move_speed = remaining / self.total_time if self.total_time > 1e-9 else 0.0
+            step_dist = self.move_speed * self.dt
+            step_rotate_towards(self.target_angle)
+            if self.total_time <= self.dt or remaining <= step_dist:
+                self.trans.setSFVec3f(self.target_pos.tolist())
+                self.rot.setSFRotation([0, 0, 1, self.target_angle])
+                self.active = False
+                self.phase = None
+                # In cycle mode, start next waypoint after reaching this one
+                if self.cycle_mode:
+                    self.start_next_waypoint()
+                return True
+            # Position update
+            new_pos = cur_pos + self.direction * step_dist
+            self.trans.setSFVec3f(new_pos.tolist())
+            return False
+
+        return True
+
+# =============================================================================
+# WAYPOINT PARSING
+# dynamic_waypoints payloads (degrees) and obstacle plan files (radians).
+# =============================================================================
+def parse_dynamic_waypoint(raw_payload):
+    """Parse the first waypoint of a dynamic_waypoints payload.
+    Returns a single (x, y, orientation_rad) tuple or None if the payload is invalid.
+    """
+    namespace = {"North": 90.0, "East": 0.0, "South": -90.0, "West": 180.0, "None": None}
+    for raw in raw_payload.splitlines():
+        line = raw.split('#', 1)[0].strip()
+        if not line:
+            continue
+        # remove trailing comma
+        if line.endswith(','):
+            line = line[:-1].strip()
+        try:
+            # evaluate in a restricted namespace
+            wp = eval(line, {"__builtins__": None}, namespace)
+        except Exception:
+            # fallback: extract numbers
+            nums = re.findall(r'[-+]?[0-9]*\.?[0-9]+', line)
+            if len(nums) >= 2:
+                x = float(nums[0]); y = float(nums[1])
+                ang = float(nums[2]) if len(nums) >= 3 else None
+                wp = (x, y, ang)
+            else:
+                continue
+        # normalize
+        if isinstance(wp, tuple) and len(wp) >= 2:
+            if len(wp) == 2:
+                wp = (float(wp[0]), float(wp[1]), None)
+            else:
+                ang = wp[2]
+                if ang is None:
+                    ang = None
+                else:
+                    ang = math.radians(float(ang))
+                wp = (float(wp[0]), float(wp[1]), ang)
+            return wp
+    return None
+
+
+def load_waypoint_list_from_file(path):
+    """Load multiple waypoints from a file (for obstacle robot cycling).
+    Returns a list of (x, y, angle) tuples, or empty list if file doesn't exist.
+    """
+    namespace = {"North": North, "East": East, "South": South, "West": West, "None": None}
+    waypoints = []
+    try:
+        with open(path, 'r') as f:
+            for raw in f:
+                line = raw.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                if line.endswith(','):
+                    line = line[:-1].strip()
+                try:
+                    wp = eval(line, {"__builtins__": None}, namespace)
+                except Exception:
+                    nums = re.findall(r'[-+]?[0-9]*\.?[0-9]+', line)
+                    if len(nums) >= 2:
+                        x = float(nums[0]); y = float(nums[1])
+                        ang = float(nums[2]) if len(nums) >= 3 else None
+                        wp = (x, y, ang)
+                    else:
+                        continue
+                
+                if isinstance(wp, tuple) and len(wp) >= 2:
+                    if len(wp) == 2:
+                        wp = (float(wp[0]), float(wp[1]), None)
+                    else:
+                        ang = wp[2]
+                        ang = float(ang) if ang is not None else None
+                        wp = (float(wp[0]), float(wp[1]), ang)
+                    waypoints.append(wp)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[load_waypoint_list] Error loading {path}: {e}")
+    
+    return waypoints
@@ -0,0 +1,229 @@
+# radar_model.py
+# Shared 4-direction radar model (supervisor + decision_making_* scripts):
+# - analytic: clip every obstacle edge / wall segment against each direction
+#   corridor and take the exact nearest point (no sampling error)
+# - sampled: the original 1 cm obstacle-edge / 5 cm wall point sampling,
+#   kept bit-for-bit for regression comparison
+#
+# Select the model with "radar_model": "analytic" | "sampled" in config.json
+# (default "analytic"). Pure Python so the decision scripts need no NumPy.
+import json
+import math
+import os
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.json")
+
+RADAR_DIRECTIONS = ("front", "right", "left", "rear")
+RADAR_MODELS = ("analytic", "sampled")
+FIELD_HALF = 1.0
+ROBOT_HALF = 0.1
+OBSTACLE_HALF = 0.1
+
+
+def _load_radar_model(default="analytic"):
+    try:
+        with open(CONFIG_FILE, "r") as f:
+            payload = json.loads(f.read().strip())
+        if isinstance(payload, dict):
+            model = str(payload.get("radar_model", default)).strip().lower()
+            if model in RADAR_MODELS:
+                return model
+    except Exception:
+        pass
+    return default
+
+
+RADAR_MODEL = _load_radar_model()
+
+
+# =============================================================================
+# SAMPLED MODEL (COMPATIBILITY)
+# Point samples on obstacle edges and walls, classified per direction.
+# =============================================================================
+def _obstacle_edge_samples_local(obstacle_half):
+    sample_spacing = 0.1 * obstacle_half  # 0.01 spacing between sample points
+    samples = []
+    num_samples = int(2 * obstacle_half / sample_spacing) + 1
+    for i in range(num_samples):
+        offset = -obstacle_half + i * sample_spacing
+        samples.append((offset, obstacle_half))
+        samples.append((offset, -obstacle_half))
+        samples.append((-obstacle_half, offset))
+        samples.append((obstacle_half, offset))
+    return samples
+
+
+def _wall_samples():
+    edge_samples = [i * 0.05 for i in range(-20, 21)]
+    return (
+        [(x, 1.0) for x in edge_samples]
+        + [(x, -1.0) for x in edge_samples]
+        + [(1.0, y) for y in edge_samples]
+        + [(-1.0, y) for y in edge_samples]
+    )
+
+
+def sampled_hits(cx, cy, bearing_deg, obstacles=(), walls=True, max_range=0.8, corridor=0.2,
+                 robot_half=ROBOT_HALF, obstacle_half=OBSTACLE_HALF):
+    """Nearest sampled hit per direction, exactly as the original per-point loops.
+
+    `obstacles` holds (x, y, bearing_deg_or_None). Distances are not clamped at 0.
+    """
+    half_band = corridor / 2.0
+    theta = math.radians(bearing_deg)
+    cos_t = math.cos(theta)
+    sin_t = math.sin(theta)
+    hits = {}
+
+    sample_points_world = []
+    if obstacles:
+        edge_local = _obstacle_edge_samples_local(obstacle_half)
+        for ox, oy, obearing in obstacles:
+            otheta = math.radians(obearing) if obearing is not None else 0.0
+            cos_o = math.cos(otheta)
+            sin_o = math.sin(otheta)
+            for lx, ly in edge_local:
+                wx = ox + lx * cos_o - ly * sin_o
+                wy = oy + lx * sin_o + ly * cos_o
+                sample_points_world.append((wx, wy))
+    if walls:
+        sample_points_world.extend(_wall_samples())
+
+    for wx, wy in sample_points_world:
+        dx = wx - cx
+        dy = wy - cy
+        x_robot = dx * cos_t + dy * sin_t
+        y_robot = -dx * sin_t + dy * cos_t
+
+        if x_robot > 0 and abs(y_robot) <= half_band and x_robot <= max_range:
+            dist = x_robot - robot_half
+            direction = "front"
+        elif x_robot < 0 and abs(y_robot) <= half_band and -x_robot <= max_range:
+            dist = -x_robot - robot_half
+            direction = "rear"
+        elif y_robot > 0 and abs(x_robot) <= half_band and y_robot <= max_range:
+            dist = y_robot - robot_half
+            direction = "left"
+        elif y_robot < 0 and abs(x_robot) <= half_band and -y_robot <= max_range:
+            dist = -y_robot - robot_half
+            direction = "right"
+        else:
+            continue
+
+        if dist <= max_range:
+            prev = hits.get(direction)
+            if prev is None or dist < prev:
+                hits[direction] = dist
+    return hits
+
+
+# =============================================================================
+# ANALYTIC MODEL
+# Segment-vs-corridor clipping in the robot frame.
+# =============================================================================
+def _clip_segment_min(ax, ay, bx, by, box, axis, sign):
+    """Min of sign * (x or y) over segment a->b clipped to box (Liang-Barsky), or None."""
+    xmin, xmax, ymin, ymax = box
+    dx = bx - ax
+    dy = by - ay
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, ax - xmin), (dx, xmax - ax), (-dy, ay - ymin), (dy, ymax - ay)):
+        if p == 0.0:
+            if q < 0:
+                return None
+            continue
+        t = q / p
+        if p < 0:
+            if t > t1:
+                return None
+            if t > t0:
+                t0 = t
+        else:
+            if t < t0:
+                return None
+            if t < t1:
+                t1 = t
+    if axis == 0:
+        v0 = ax + t0 * dx
+        v1 = ax + t1 * dx
+    else:
+        v0 = ay + t0 * dy
+        v1 = ay + t1 * dy
+    return min(sign * v0, sign * v1)
+
+
+def _world_segments(obstacles, walls, obstacle_half):
+    segments = []
+    for ox, oy, obearing in obstacles or ():
+        otheta = math.radians(obearing) if obearing is not None else 0.0
+        cos_o = math.cos(otheta)
+        sin_o = math.sin(otheta)
+        h = obstacle_half
+        corners = [
+            (ox + lx * cos_o - ly * sin_o, oy + lx * sin_o + ly * cos_o)
+            for lx, ly in ((-h, -h), (h, -h), (h, h), (-h, h))
+        ]
+        for i in range(4):
+            segments.append((corners[i], corners[(i + 1) % 4]))
+    if walls:
+        f = FIELD_HALF
+        corners = [(-f, -f), (f, -f), (f, f), (-f, f)]
+        for i in range(4):
+            segments.append((corners[i], corners[(i + 1) % 4]))
+    return segments
+
+
+def analytic_hits(cx, cy, bearing_deg, obstacles=(), walls=True, max_range=0.8, corridor=0.2,
+                  robot_half=ROBOT_HALF, obstacle_half=OBSTACLE_HALF):
+    """Exact nearest obstacle-edge / wall distance per direction corridor.
+
+    Same corridors as the sampled model: front/rear are |y| <= corridor/2 strips,
+    left/right are |x| <= corridor/2 strips outside the front/rear band, all
+    within max_range of the robot centre. Distances are not clamped at 0.
+    """
+    half_band = corridor / 2.0
+    theta = math.radians(bearing_deg)
+    cos_t = math.cos(theta)
+    sin_t = math.sin(theta)
+    corridors = (
+        ("front", (0.0, max_range, -half_band, half_band), 0, 1.0),
+        ("right", (-half_band, half_band, -max_range, -half_band), 1, -1.0),
+        ("left", (-half_band, half_band, half_band, max_range), 1, 1.0),
+        ("rear", (-max_range, 0.0, -half_band, half_band), 0, -1.0),
+    )
+
+    best = {}
+    for (wax, way), (wbx, wby) in _world_segments(obstacles, walls, obstacle_half):
+        dax = wax - cx
+        day = way - cy
+        dbx = wbx - cx
+        dby = wby - cy
+        ax = dax * cos_t + day * sin_t
+        ay = -dax * sin_t + day * cos_t
+        bx = dbx * cos_t + dby * sin_t
+        by = -dbx * sin_t + dby * cos_t
+        for direction, box, axis, sign in corridors:
+            reach = _clip_segment_min(ax, ay, bx, by, box, axis, sign)
+            if reach is None:
+                continue
+            prev = best.get(direction)
+            if prev is None or reach < prev:
+                best[direction] = reach
+
+    hits = {}
+    for direction in RADAR_DIRECTIONS:
+        if direction not in best:
+            continue
+        dist = best[direction] - robot_half
+        if dist <= max_range:
+            hits[direction] = dist
+    return hits
+
+
+def radar_hits(cx, cy, bearing_deg, obstacles=(), walls=True, max_range=0.8, corridor=0.2,
+               model=None, robot_half=ROBOT_HALF, obstacle_half=OBSTACLE_HALF):
+    """Dispatch to the configured radar model (see RADAR_MODEL)."""
+    model = (model or RADAR_MODEL).strip().lower()
+    fn = sampled_hits if model == "sampled" else analytic_hits
+    return fn(cx, cy, bearing_deg, obstacles, walls, max_range, corridor, robot_half, obstacle_half)
@@ -0,0 +1,90 @@
+# sim_scheduler.py
+# Sim-time scheduling for periodic supervisor work (decision ticks):
+# - deadlines live on the simulation clock, not on frame counts or wall time
+# - a step that jumps over several deadlines fires once and re-aligns
+#
+# Lock-step mode ("lock_step": true in config.json) runs every decision tick
+# synchronously: the physics step waits for the decision script, so results do
+# not depend on host speed or Webots fast mode. Shared by supervisor_controller.py
+# and tools/testing/fast_sim.py.
+import json
+import math
+import os
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.json")
+
+# Slack for float sim-time comparisons (Webots time is a sum of basicTimeStep values).
+TIME_EPS = 1e-6
+# Upper bound on how long one lock-step decision tick may block the step.
+DEFAULT_LOCK_STEP_TIMEOUT_S = 30.0
+
+
+def _parse_bool(raw):
+    if isinstance(raw, bool):
+        return raw
+    if isinstance(raw, (int, float)):
+        return bool(raw)
+    return str(raw).strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def load_lock_step_config(path=CONFIG_FILE):
+    """Return (lock_step, decision_period_s or None, lock_step_timeout_s) from config.json."""
+    lock_step = False
+    decision_period_s = None
+    timeout_s = DEFAULT_LOCK_STEP_TIMEOUT_S
+    try:
+        with open(path, "r") as f:
+            payload = json.loads(f.read().strip())
+        if isinstance(payload, dict):
+            lock_step = _parse_bool(payload.get("lock_step", False))
+            try:
+                value = float(payload.get("decision_period_s"))
+                if value > 0:
+                    decision_period_s = value
+            except Exception:
+                pass
+            try:
+                value = float(payload.get("lock_step_timeout_s", timeout_s))
+                if value > 0:
+                    timeout_s = value
+            except Exception:
+                pass
+    except Exception:
+        pass
+    return lock_step, decision_period_s, timeout_s
+
+
+class SimTimeScheduler:
+    """Fires at start_s + k * period_s on the simulation clock."""
+    def __init__(self, period_s, start_s=0.0):
+        self.period_s = float(period_s)
+        if self.period_s <= 0:
+            raise ValueError("period_s must be > 0")
+        self.start_s = float(start_s)
+        self.index = 1
+        self.fired = 0
+        self.missed = 0
+
+    @property
+    def next_deadline(self):
+        return self.start_s + self.index * self.period_s
+
+    def is_due(self, sim_time):
+        """True if `sim_time` has reached the next deadline (does not advance)."""
+        return sim_time + TIME_EPS >= self.next_deadline
+
+    def due(self, sim_time):
+        """True once per reached deadline; skipped deadlines are counted, not replayed."""
+        if not self.is_due(sim_time):
+            return False
+        reached = int(math.floor((sim_time + TIME_EPS - self.start_s) / self.period_s))
+        self.missed += max(0, reached - self.index)
+        self.index = reached + 1
+        self.fired += 1
+        return True
+
+    def reset(self, sim_time):
+        """Restart the schedule so the first deadline is one period after `sim_time`."""
+        self.start_s = float(sim_time)
+        self.index = 1
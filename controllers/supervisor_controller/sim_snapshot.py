@@ -0,0 +1,141 @@
+# sim_snapshot.py
+# Versioned simulation_data snapshots with per-key sequence numbers:
+# - the supervisor sends only the keys whose text changed since the last frame
+#   (plus a periodic full snapshot)
+# - the field viewer merges deltas and serves `?since=<seq>` deltas back out
+# - decision scripts keep a mirror across ticks and fetch only what changed
+#
+# Envelope (compact JSON):
+#   {"v": 1, "epoch": "...", "seq": N, "base": B, "full": bool,
+#    "keys": {"<key>": [<key_seq>, "<text value>"], ...}}
+# `base` is the seq the receiver must already hold for a delta to apply cleanly.
+# Values stay the same text lines as before, so existing parsers are unchanged.
+import json
+import os
+import time
+from urllib.parse import urlencode
+
+SNAPSHOT_VERSION = 1
+# Frames between unconditional full snapshots (recovers receivers that restarted).
+FULL_SNAPSHOT_INTERVAL = 50
+
+
+def new_epoch():
+    """Token identifying one producer run; a change means seqs restarted."""
+    return f"{os.getpid():x}-{int(time.time() * 1000):x}"
+
+
+def dumps(payload):
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def is_envelope(payload):
+    return isinstance(payload, dict) and payload.get("v") == SNAPSHOT_VERSION and isinstance(payload.get("keys"), dict)
+
+
+# =============================================================================
+# PRODUCER
+# Tracks the last value and seq per key and builds full / delta envelopes.
+# =============================================================================
+class SnapshotEncoder:
+    """Per-key change tracker for one producer (the supervisor)."""
+    def __init__(self, full_interval=FULL_SNAPSHOT_INTERVAL):
+        self.epoch = new_epoch()
+        self.full_interval = max(1, int(full_interval))
+        self.seq = 0
+        self.values = {}
+        self.key_seq = {}
+        self._frames_since_full = 0
+        self._force_full = True
+
+    def force_full(self):
+        """Send everything on the next encode (e.g. after a failed or dropped POST)."""
+        self._force_full = True
+
+    def update(self, payload):
+        """Record this frame's values; returns the keys whose text changed."""
+        self.seq += 1
+        changed = []
+        for key, value in payload.items():
+            if key in self.values and self.values[key] == value:
+                continue
+            self.values[key] = value
+            self.key_seq[key] = self.seq
+            changed.append(key)
+        return changed
+
+    def envelope(self, keys, full=False):
+        return {
+            "v": SNAPSHOT_VERSION,
+            "epoch": self.epoch,
+            "seq": self.seq,
+            "base": self.seq - 1,
+            "full": bool(full),
+            "keys": {key: [self.key_seq[key], self.values[key]] for key in keys},
+        }
+
+    def encode(self, payload):
+        """Update with `payload` and return the envelope to send for this frame."""
+        changed = self.update(payload)
+        self._frames_since_full += 1
+        if self._force_full or self._frames_since_full >= self.full_interval:
+            self._force_full = False
+            self._frames_since_full = 0
+            return self.envelope(list(payload.keys()), full=True)
+        return self.envelope(changed)
+
+
+def merge_envelopes(older, newer):
+    """Fold two unsent envelopes into one (used when the publisher coalesces)."""
+    if not is_envelope(older) or not is_envelope(newer) or newer.get("full"):
+        return newer
+    if older.get("epoch") != newer.get("epoch"):
+        return newer
+    keys = dict(older["keys"])
+    keys.update(newer["keys"])
+    merged = dict(newer)
+    merged["keys"] = keys
+    merged["base"] = older.get("base")
+    merged["full"] = bool(older.get("full"))
+    return merged
+
+
+# =============================================================================
+# CONSUMER
+# A mirror is {"epoch", "seq", "values", "key_seq"}; start from new_mirror().
+# =============================================================================
+def new_mirror():
+    return {"epoch": "", "seq": -1, "values": {}, "key_seq": {}}
+
+
+def apply_envelope(mirror, envelope):
+    """Merge `envelope` into `mirror` in place.
+
+    Returns True when the mirror is consistent afterwards, False when a delta
+    did not line up (wrong epoch or missed frames) and a full resync is needed.
+    The newer values are merged either way.
+    """
+    full = bool(envelope.get("full"))
+    in_sync = full or (
+        envelope.get("epoch") == mirror.get("epoch") and envelope.get("base") == mirror.get("seq")
+    )
+    values = {} if full else dict(mirror["values"])
+    key_seq = {} if full else dict(mirror["key_seq"])
+    for key, item in envelope["keys"].items():
+        try:
+            seq, value = item
+        except Exception:
+            continue
+        values[key] = value
+        key_seq[key] = seq
+    # Swap in new dicts so concurrent readers never see a half-merged snapshot.
+    mirror["values"] = values
+    mirror["key_seq"] = key_seq
+    mirror["epoch"] = envelope.get("epoch", "")
+    mirror["seq"] = envelope.get("seq", -1)
+    return in_sync
+
+
+def delta_url(base_url, mirror):
+    """`base_url` with the ?since=&epoch= query for the next delta of `mirror`."""
+    return f"{base_url}?{urlencode({'since': mirror.get('seq', -1), 'epoch': mirror.get('epoch', '')})}"
@@ -0,0 +1,706 @@
+# state_bus.py
+# Shared-memory state bus for "data_flow": "shm" (supervisor, field viewer and decision
+# script on one host, no HTTP round trips per tick):
+# - one multiprocessing.shared_memory segment, created by the supervisor and named after the
+#   field viewer port ("oxbots_bus_<port>"; "state_bus_name" in config.json overrides it)
+# - every region is a seqlock: its single writer makes the seq odd, writes, makes it even;
+#   readers copy the region and retry while the seq is odd or moved during the copy
+# - text channels with the same key -> text dicts as the HTTP endpoints (simulation_data,
+#   decisions, decision_making_data), as compact JSON; the field viewer and the keys no
+#   record carries read these
+# - fixed-layout records, written right after their text channel and parsed from it once by
+#   the writer, so the per-tick readers only unpack numbers:
+#     world     which simulation_data keys are set, sim time, pose, obstacles, visible balls,
+#               all balls and waypoint_status, parsed with the decision scripts' own rules
+#               (a value those rules would read differently, e.g. a NaN or an unknown ball
+#               kind, is left to the text)
+#     decision  the decisions revision (bumped when the dict changes), the first dynamic
+#               waypoint when it is a plain "(x, y[, bearing])" line, and speed
+#   each record holds the seq of the text write it was parsed from
+# - one writer per region: the supervisor writes simulation_data/world; the decision script
+#   (or the field viewer, on behalf of HTTP clients) writes decisions/decision and
+#   decision_making_data
+# Python has no memory fences: the seq re-check plus the length and JSON checks on text
+# channels turn a torn read into a retry. Run as a script to watch a live bus.
+import argparse
+import json
+import math
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+from collections.abc import Mapping
+from multiprocessing import resource_tracker, shared_memory
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.json")
+HTML_PORT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "html_port.txt")
+
+MAGIC = b"OXBUS\x00\x00\x00"
+VERSION = 2
+MAX_BALLS = 64
+MAX_OBSTACLES = 8
+# Text channel capacities (bytes of compact JSON).
+CHANNELS = (
+    ("simulation_data", 256 * 1024),
+    ("decisions", 16 * 1024),
+    ("decision_making_data", 1024 * 1024),
+)
+# simulation_data keys the world record knows about (bit i of its key masks); any other
+# key only sets OTHER_KEYS.
+SIM_KEYS = (
+    "time",
+    "current_position",
+    "obstacle_robot",
+    "visible_balls",
+    "ball_position",
+    "waypoint_status",
+    "ball_taken_number",
+    "radar_sensor",
+)
+OTHER_KEYS = 1 << 31
+# "ping" is what the decision scripts assume for a ball line without a kind.
+BALL_KINDS = ("ping", "PING", "METAL")
+WAYPOINT_STATUSES = ("going", "reached")
+# decision record flags
+WAYPOINT = 1
+SPEED = 2
+# A reader gives up after this many torn/odd reads (a writer that died mid-write).
+READ_RETRIES = 1000
+# Record + text channel pairs: attempts at reading both from the same publish.
+PAIR_RETRIES = 10
+# Connector: how often a non-owner re-checks that it is attached to the live segment.
+REATTACH_CHECK_SECONDS = 1.0
+
+_HEADER = struct.Struct("<8sIIQdI")  # magic, version, size, token, created, closed
+_SEQ = struct.Struct("<Q")
+_WORLD = struct.Struct("<QIIi4d")  # text seq, keys set, keys parsed, status, t, x, y, bearing
+_COUNT = struct.Struct("<I")
+_OBSTACLE = struct.Struct("<3d")
+_BALL = struct.Struct("<2di")
+_DECISION = struct.Struct("<QQI4d")  # text seq, revision, flags, x, y, bearing, speed
+_TEXT = struct.Struct("<Id")  # length, wall time of the write
+_ALIGN = 64
+_WORLD_SIZE = (
+    _WORLD.size
+    + _COUNT.size + MAX_OBSTACLES * _OBSTACLE.size
+    + 2 * (_COUNT.size + MAX_BALLS * _BALL.size)
+)
+
+# keys: the SIM_KEYS set in the text; other_keys: it has keys outside SIM_KEYS;
+# values: key -> what the decision scripts' parser returns for it (waypoint_status: its text).
+World = namedtuple("World", "seq source keys other_keys values")
+Decision = namedtuple("Decision", "seq source revision flags x y bearing speed")
+
+_NUMBER = r"[-+]?(?:(?:0|[1-9][0-9]*)(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][-+]?[0-9]+)?"
+_WAYPOINT_RE = re.compile(
+    rf"\s*({_NUMBER})\s*,\s*({_NUMBER})\s*(?:,\s*({_NUMBER}|North|East|South|West|None)\s*)?"
+)
+_BEARING_NAMES = {"North": 90.0, "East": 0.0, "South": -90.0, "West": 180.0, "None": None}
+
+
+class _Unrecordable(Exception):
+    """A value the record would not give back exactly as the text parser does."""
+
+
+def _aligned(size):
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _layout():
+    """name -> (offset, region size incl. its seq, payload capacity) and the total size."""
+    regions = {}
+    offset = _aligned(_HEADER.size)
+    fixed = (
+        ("world", _WORLD_SIZE),
+        ("decision", _DECISION.size),
+    )
+    for name, payload in fixed + tuple((name, _TEXT.size + capacity) for name, capacity in CHANNELS):
+        size = _aligned(_SEQ.size + payload)
+        regions[name] = (offset, size, payload)
+        offset += size
+    return regions, offset
+
+
+REGIONS, SEGMENT_SIZE = _layout()
+
+
+def load_bus_name(path=CONFIG_FILE, port=None):
+    """Segment name: "state_bus_name" from config.json, else oxbots_bus_<field viewer port>."""
+    try:
+        with open(path, "r") as f:
+            payload = json.loads(f.read().strip())
+        if isinstance(payload, dict):
+            name = str(payload.get("state_bus_name", "") or "").strip()
+            if name:
+                return name
+    except Exception:
+        pass
+    if port is None:
+        port = 5001
+        try:
+            with open(HTML_PORT_FILE, "r") as f:
+                port = int(f.read().strip())
+        except Exception:
+            pass
+    return f"oxbots_bus_{port}"
+
+
+def _text(value):
+    return value if isinstance(value, str) else str(value)
+
+
+# -- parsing, with the rules of the decision scripts' text parsers ------------------------
+def _point(text):
+    """(x, y, third part or None) of one "(x, y[, ...])" line, or None."""
+    line = text.strip()
+    if line.startswith("(") and line.endswith(")"):
+        line = line[1:-1]
+    parts = [p.strip() for p in line.split(",")]
+    if len(parts) < 2:
+        return None
+    try:
+        return float(parts[0]), float(parts[1]), (parts[2] if len(parts) >= 3 else None)
+    except ValueError:
+        return None
+
+
+def _recordable(*values):
+    # NaN marks None in the record, so a NaN the text really holds stays with the text.
+    if any(v is not None and math.isnan(v) for v in values):
+        raise _Unrecordable()
+
+
+def _parse_time(text):
+    try:
+        t = float(text.strip())
+    except ValueError:
+        return None
+    _recordable(t)
+    return t
+
+
+def _parse_pose(text):
+    point = _point(text)
+    if point is None:
+        return None
+    x, y, bearing = point
+    try:
+        bearing = float(bearing) if bearing is not None else None
+    except ValueError:
+        return None
+    _recordable(x, y, bearing)
+    return x, y, bearing
+
+
+def _parse_obstacles(text):
+    out = []
+    for line in text.splitlines():
+        point = _point(line)
+        if point is None:
+            continue
+        x, y, bearing = point
+        try:
+            bearing = float(bearing) if bearing is not None else None
+        except ValueError:
+            continue
+        _recordable(bearing)
+        out.append((x, y, bearing))
+    if len(out) > MAX_OBSTACLES:
+        raise _Unrecordable()
+    return out
+
+
+def _parse_balls(text):
+    out = []
+    for line in text.splitlines():
+        point = _point(line)
+        if point is None:
+            continue
+        x, y, kind = point
+        kind = "ping" if kind is None else kind
+        if kind not in BALL_KINDS:
+            raise _Unrecordable()
+        out.append((x, y, kind))
+    if len(out) > MAX_BALLS:
+        raise _Unrecordable()
+    return out
+
+
+def _parse_status(text):
+    if text not in WAYPOINT_STATUSES:
+        raise _Unrecordable()
+    return text
+
+
+_SIM_PARSERS = {
+    "time": _parse_time,
+    "current_position": _parse_pose,
+    "obstacle_robot": _parse_obstacles,
+    "visible_balls": _parse_balls,
+    "ball_position": _parse_balls,
+    "waypoint_status": _parse_status,
+}
+
+
+def _waypoint(text):
+    """(x, y, bearing deg or None) as the supervisor's parse_dynamic_waypoint reads a plain
+    first line ("x, y[, bearing]", bearing a number or North/East/South/West/None, in
+    balanced parentheses or none); None for anything else."""
+    for raw in text.splitlines():
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        if line.endswith(","):
+            line = line[:-1].strip()
+        if line.startswith("(") and line.endswith(")"):
+            line = line[1:-1]
+        match = _WAYPOINT_RE.fullmatch(line)
+        if match is None:
+            return None
+        x, y = (_number(v) for v in match.group(1, 2))
+        bearing = match.group(3)
+        if bearing in _BEARING_NAMES:
+            bearing = _BEARING_NAMES[bearing]
+        elif bearing is not None:
+            bearing = _number(bearing)
+        return x, y, bearing
+    return None
+
+
+def _number(literal):
+    # As eval() reads it: int literals go through int, so "-0" is 0.0 and not -0.0.
+    if literal.lstrip("+-").isdigit():
+        return float(int(literal))
+    return float(literal)
+
+
+def _nan(value):
+    return math.nan if value is None else value
+
+
+def _none(value):
+    return None if math.isnan(value) else value
+
+
+def _kind(code):
+    return BALL_KINDS[code] if 0 <= code < len(BALL_KINDS) else ""
+
+
+def _open_untracked(name):
+    """Attach without registering with the resource tracker, which would unlink the
+    owner's segment when this (non-owner) process exits."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+class StateBus:
+    """One attached (or owned) bus segment."""
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+        self._buf = shm.buf
+        magic, version, size, self.token, self.created, _ = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION or size != SEGMENT_SIZE:
+            self._buf = None
+            shm.close()
+            raise ValueError(f"{shm.name} is not a version {VERSION} state bus")
+        self._dicts = {}
+
+    @classmethod
+    def create(cls, name):
+        """Owner side (supervisor): a fresh segment, replacing a stale one of the same name."""
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=SEGMENT_SIZE)
+        shm.buf[:SEGMENT_SIZE] = bytes(SEGMENT_SIZE)
+        token = int.from_bytes(os.urandom(8), "little")
+        _HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, SEGMENT_SIZE, token, time.time(), 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Reader/writer side; raises FileNotFoundError while no supervisor owns the bus."""
+        return cls(_open_untracked(name), owner=False)
+
+    @property
+    def closed(self):
+        return self._buf is None or _HEADER.unpack_from(self._buf, 0)[5] != 0
+
+    def close(self):
+        if self._buf is None:
+            return
+        if self.owner:
+            magic, version, size, token, created, _ = _HEADER.unpack_from(self._buf, 0)
+            _HEADER.pack_into(self._buf, 0, magic, version, size, token, created, 1)
+        self._buf = None
+        self._dicts.clear()
+        try:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+        except Exception:
+            pass
+
+    # -- seqlock ------------------------------------------------------------------------
+    def seq(self, region):
+        """Current seq of a region (0 = never written); cheap change detection."""
+        return _SEQ.unpack_from(self._buf, REGIONS[region][0])[0]
+
+    def _write(self, region, write):
+        offset = REGIONS[region][0]
+        buf = self._buf
+        seq = _SEQ.unpack_from(buf, offset)[0] | 1
+        _SEQ.pack_into(buf, offset, seq)
+        try:
+            write(buf, offset + _SEQ.size)
+        finally:
+            _SEQ.pack_into(buf, offset, seq + 1)
+        return seq + 1
+
+    def _read(self, region, read):
+        """(seq, read(buf, payload offset)) from a consistent copy; (0, None) if never
+        written, (None, None) if no consistent copy could be made."""
+        offset = REGIONS[region][0]
+        buf = self._buf
+        for _ in range(READ_RETRIES):
+            before = _SEQ.unpack_from(buf, offset)[0]
+            if before & 1:
+                time.sleep(0)
+                continue
+            if before == 0:
+                return 0, None
+            value = read(buf, offset + _SEQ.size)
+            if _SEQ.unpack_from(buf, offset)[0] == before:
+                return before, value
+        return None, None
+
+    # -- text channels ------------------------------------------------------------------
+    def write_dict(self, channel, payload):
+        """Publish a key -> text dict; False if it does not fit the channel."""
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        capacity = REGIONS[channel][2] - _TEXT.size
+        if len(body) > capacity:
+            return False
+
+        def write(buf, start):
+            _TEXT.pack_into(buf, start, len(body), time.time())
+            buf[start + _TEXT.size:start + _TEXT.size + len(body)] = body
+        seq = self._write(channel, write)
+        # The writer's own read_dict (publish_decisions) need not decode it again.
+        self._dicts[channel] = (seq, dict(payload))
+        return True
+
+    def read_dict(self, channel):
+        """(seq, dict) of a text channel, (0, None) before its first write. The dict is
+        shared between calls until the seq changes: treat it as read-only."""
+        capacity = REGIONS[channel][2] - _TEXT.size
+        cached = self._dicts.get(channel)
+        if cached is not None and self.seq(channel) == cached[0]:
+            return cached
+
+        def read(buf, start):
+            length = _TEXT.unpack_from(buf, start)[0]
+            if length > capacity:
+                return None
+            return bytes(buf[start + _TEXT.size:start + _TEXT.size + length])
+
+        for _ in range(3):
+            seq, raw = self._read(channel, read)
+            if not seq or raw is None:
+                return (0, None) if seq == 0 else (seq, None)
+            try:
+                payload = json.loads(raw.decode("utf-8"))
+            except Exception:
+                continue
+            if isinstance(payload, dict):
+                self._dicts[channel] = (seq, payload)
+                return seq, payload
+        return None, None
+
+    # -- fixed records ------------------------------------------------------------------
+    def write_world(self, source, payload):
+        """World record of a simulation_data dict (parsed here, once for every reader)."""
+        keys = parsed = 0
+        values = {}
+        for bit, key in enumerate(SIM_KEYS):
+            value = payload.get(key)
+            if value is None:
+                continue
+            keys |= 1 << bit
+            parse = _SIM_PARSERS.get(key)
+            if parse is None:
+                continue
+            try:
+                values[key] = parse(_text(value))
+            except _Unrecordable:
+                continue
+            parsed |= 1 << bit
+        if any(key not in SIM_KEYS and value is not None for key, value in payload.items()):
+            keys |= OTHER_KEYS
+        t = _nan(values.get("time"))
+        x, y, bearing = values.get("current_position") or (math.nan, math.nan, None)
+        status = values.get("waypoint_status")
+        status = WAYPOINT_STATUSES.index(status) if status is not None else -1
+        obstacles = values.get("obstacle_robot") or []
+        visible = values.get("visible_balls") or []
+        balls = values.get("ball_position") or []
+
+        def write(buf, start):
+            _WORLD.pack_into(buf, start, source, keys, parsed, status, t, x, y, _nan(bearing))
+            start += _WORLD.size
+            _COUNT.pack_into(buf, start, len(obstacles))
+            start += _COUNT.size
+            for i, (ox, oy, ob) in enumerate(obstacles):
+                _OBSTACLE.pack_into(buf, start + i * _OBSTACLE.size, ox, oy, _nan(ob))
+            start += MAX_OBSTACLES * _OBSTACLE.size
+            for items in (visible, balls):
+                _COUNT.pack_into(buf, start, len(items))
+                start += _COUNT.size
+                for i, (bx, by, kind) in enumerate(items):
+                    _BALL.pack_into(buf, start + i * _BALL.size, bx, by, BALL_KINDS.index(kind))
+                start += MAX_BALLS * _BALL.size
+        self._write("world", write)
+
+    def read_world(self):
+        """World of the last write; None before the first one."""
+        def read(buf, start):
+            source, keys, parsed, status, t, x, y, bearing = _WORLD.unpack_from(buf, start)
+            start += _WORLD.size
+            count = min(_COUNT.unpack_from(buf, start)[0], MAX_OBSTACLES)
+            start += _COUNT.size
+            obstacles = list(_OBSTACLE.iter_unpack(buf[start:start + count * _OBSTACLE.size]))
+            start += MAX_OBSTACLES * _OBSTACLE.size
+            lists = []
+            for _ in range(2):
+                count = min(_COUNT.unpack_from(buf, start)[0], MAX_BALLS)
+                start += _COUNT.size
+                lists.append(list(_BALL.iter_unpack(buf[start:start + count * _BALL.size])))
+                start += MAX_BALLS * _BALL.size
+            return source, keys, parsed, status, t, x, y, bearing, obstacles, lists
+
+        seq, raw = self._read("world", read)
+        if raw is None:
+            return None
+        source, keys, parsed, status, t, x, y, bearing, obstacles, (visible, balls) = raw
+        present = frozenset(key for bit, key in enumerate(SIM_KEYS) if keys >> bit & 1)
+        recorded = frozenset(key for bit, key in enumerate(SIM_KEYS) if parsed >> bit & 1)
+        values = {}
+        if "time" in recorded:
+            values["time"] = _none(t)
+        if "current_position" in recorded:
+            values["current_position"] = None if math.isnan(x) else (x, y, _none(bearing))
+        if "obstacle_robot" in recorded:
+            values["obstacle_robot"] = [(ox, oy, _none(ob)) for ox, oy, ob in obstacles]
+        if "visible_balls" in recorded:
+            values["visible_balls"] = [(bx, by, _kind(code)) for bx, by, code in visible]
+        if "ball_position" in recorded:
+            values["ball_position"] = [(bx, by, _kind(code)) for bx, by, code in balls]
+        if "waypoint_status" in recorded and 0 <= status < len(WAYPOINT_STATUSES):
+            values["waypoint_status"] = WAYPOINT_STATUSES[status]
+        return World(seq, source, present, bool(keys & OTHER_KEYS), values)
+
+    def write_decision(self, source, revision, flags, x, y, bearing, speed):
+        values = (source, revision, flags, x, y, _nan(bearing), speed)
+        self._write("decision", lambda buf, start: _DECISION.pack_into(buf, start, *values))
+
+    def read_decision(self):
+        """Decision of the last write (bearing in degrees, None when not given); None before
+        the first one."""
+        seq, values = self._read("decision", _DECISION.unpack_from)
+        if not values:
+            return None
+        source, revision, flags, x, y, bearing, speed = values
+        return Decision(seq, source, revision, flags, x, y, _none(bearing), speed)
+
+    def read_decisions(self):
+        """(Decision, decisions dict) from the same publish; (None, None) when there is none."""
+        for _ in range(PAIR_RETRIES):
+            record = self.read_decision()
+            if record is None:
+                return None, None
+            seq, payload = self.read_dict("decisions")
+            if payload is not None and seq == record.source:
+                return record, payload
+        return None, None
+
+    def read_simulation_data(self):
+        """SimulationData of the last world record; None before the first one."""
+        world = self.read_world()
+        return None if world is None else SimulationData(self, world)
+
+    # -- whole updates --------------------------------------------------------------------
+    def publish_simulation_data(self, payload):
+        """simulation_data text channel plus the world record parsed from it."""
+        if not self.write_dict("simulation_data", payload):
+            return False
+        self.write_world(self.seq("simulation_data"), payload)
+        return True
+
+    def publish_decisions(self, payload):
+        """decisions text channel plus the decision record parsed from it."""
+        _, previous = self.read_dict("decisions")
+        record = self.read_decision()
+        revision = record.revision if record is not None else 0
+        if previous is None or payload != previous:
+            revision += 1
+        if not self.write_dict("decisions", payload):
+            return False
+        flags = 0
+        x = y = speed = math.nan
+        bearing = None
+        text = payload.get("dynamic_waypoints")
+        waypoint = _waypoint(text) if isinstance(text, str) else None
+        if waypoint is not None:
+            flags |= WAYPOINT
+            x, y, bearing = waypoint
+        if payload.get("speed") is not None:
+            try:
+                speed = float(payload["speed"])
+                flags |= SPEED
+            except (TypeError, ValueError):
+                pass
+        self.write_decision(self.seq("decisions"), revision, flags, x, y, bearing, speed)
+        return True
+
+
+class SimulationData(Mapping):
+    """simulation_data as a read-only dict over one world record.
+
+    The record answers which keys are set, waypoint_status, and (through `world.values`)
+    the parsed keys; anything else decodes the text channel once, on first use. That text
+    is the latest one, so it can be a publish newer than the record.
+    """
+    def __init__(self, bus, world):
+        self.bus = bus
+        self.world = world
+        self._payload = None
+
+    def _text(self):
+        if self._payload is None:
+            try:
+                self._payload = self.bus.read_dict("simulation_data")[1] or {}
+            except Exception:
+                self._payload = {}
+        return self._payload
+
+    def _absent(self, key):
+        if key in SIM_KEYS:
+            return key not in self.world.keys
+        return not self.world.other_keys
+
+    def __getitem__(self, key):
+        if self._absent(key):
+            raise KeyError(key)
+        if key == "waypoint_status" and key in self.world.values:
+            return self.world.values[key]
+        return self._text()[key]
+
+    def __contains__(self, key):
+        return not self._absent(key)
+
+    def __bool__(self):
+        return bool(self.world.keys) or self.world.other_keys
+
+    def __iter__(self):
+        return iter(self._text())
+
+    def __len__(self):
+        return len(self._text())
+
+
+class Connector:
+    """Lazily attached bus for processes that do not own it (viewer, decision scripts).
+
+    get() returns the attached StateBus or None while there is none; the segment is
+    re-opened by name at most every `check_seconds`, so a restarted supervisor (new
+    segment, same name) is picked up without the caller noticing. Writes through the
+    returned bus must still come from one thread per region.
+    """
+    def __init__(self, name, check_seconds=REATTACH_CHECK_SECONDS):
+        self.name = name
+        self.check_seconds = check_seconds
+        self.bus = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        if now < self._next_check and (self.bus is None or not self.bus.closed):
+            return self.bus
+        with self._lock:
+            return self._reattach(now)
+
+    def _reattach(self, now):
+        if now < self._next_check and (self.bus is None or not self.bus.closed):
+            return self.bus
+        self._next_check = now + self.check_seconds
+        try:
+            fresh = StateBus.attach(self.name)
+        except Exception:
+            fresh = None
+        if fresh is not None and self.bus is not None and fresh.token == self.bus.token and not self.bus.closed:
+            fresh.close()
+            return self.bus
+        if self.bus is not None:
+            self.bus.close()
+        self.bus = fresh
+        return self.bus
+
+    def close(self):
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Watch a live state bus (data_flow \"shm\").")
+    p.add_argument("--name", default=None, help="segment name (default: from config.json / html_port.txt)")
+    p.add_argument("--interval", type=float, default=0.5, help="seconds between prints")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    connector = Connector(args.name or load_bus_name())
+    try:
+        while True:
+            bus = connector.get()
+            if bus is None:
+                print(f"[StateBus] waiting for {connector.name}")
+            else:
+                world = bus.read_world()
+                decision = bus.read_decision()
+                values = world.values if world is not None else {}
+                seqs = " ".join(f"{name}={bus.seq(name)}" for name, _ in CHANNELS)
+                print(
+                    f"[StateBus] t={values.get('time')} pose={values.get('current_position')} "
+                    f"{len(values.get('visible_balls') or [])} visible | {decision} | {seqs}"
+                )
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        connector.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,7 +9,6 @@ import math
 import numpy as np
 import os
 import random
-import re
 import signal
 import socket
 import subprocess
@@ -17,6 +16,16 @@ import sys
 import time
 import urllib.request
 
+from decision_worker import DecisionWorker
+from motion_controller import MotionController, load_waypoint_list_from_file, parse_dynamic_waypoint
+from world_registry import WorldRegistry
+import ball_placement
+import match_log
+import sim_scheduler
+import sim_snapshot
+import state_bus
+from telemetry_publisher import TelemetryPublisher
+
 # optionally use OpenCV for external window
 try:
     import cv2
@@ -24,17 +33,13 @@ except ImportError:
     cv2 = None
 
 
+# Background HTTP publisher: the step only enqueues, a thread POSTs over keep-alive.
+TELEMETRY = TelemetryPublisher(timeout=0.3)
+
+
 def _post_binary(url, data, content_type):
     try:
-        req = urllib.request.Request(
-            url,
-            data=data,
-            method="POST",
-            headers={"Content-Type": content_type, "Content-Length": str(len(data))},
-        )
-        with urllib.request.urlopen(req, timeout=0.3) as res:
-            res.read()
-        return True
+        return TELEMETRY.publish(url, url, bytes(data), content_type)
     except Exception:
         return False
 
@@ -46,7 +51,7 @@ def _load_early_data_flow(default="web"):
             payload = json.loads(f.read().strip())
         if isinstance(payload, dict):
             flow = str(payload.get("data_flow", payload.get("data flow", default))).strip().lower()
-            if flow in ("web", "file"):
+            if flow in ("web", "file", "shm"):
                 return flow
     except Exception:
         pass
@@ -359,6 +364,8 @@ West = math.pi
 
 # Cruise script execution config
 CRUISE_INTERVAL_FRAMES = 15
+# Keep waypoints_cruise.py loaded in one worker process instead of spawning it per tick
+CRUISE_PERSISTENT_WORKER = True
 
 # Field viewer config
 def _load_html_port(path, default_port=5001):
@@ -388,9 +395,17 @@ FIELD_VIEWER_PATH = os.path.abspath(
 HTML_PORT_FILE = os.path.join(THIS_DIR, "html_port.txt")
 FIELD_VIEWER_PORT = _load_html_port(HTML_PORT_FILE)
 SIM_DATA_ENDPOINT = f"http://localhost:{FIELD_VIEWER_PORT}/data/simulation_data"
+# Per-key change tracking for simulation_data (delta envelopes / changed-file writes).
+SIM_SNAPSHOT = sim_snapshot.SnapshotEncoder()
+SIM_DATA_FILE_FRAMES = 0
+SIM_DATA_LOST = 0
+# Last published simulation_data; handed to the decision worker with each tick.
+SIM_DATA_LAST = None
 DEFAULT_PI_IP = "10.26.243.139"
 DECISIONS_CACHE = {}
 DECISIONS_SEQ = 0
+# data_flow "shm": the bus's decision record of DECISIONS_CACHE (parsed waypoint and speed).
+DECISION_RECORD = None
 
 
 def _load_runtime_config():
@@ -409,7 +424,7 @@ def _load_runtime_config():
         if isinstance(payload, dict):
             branch = str(payload.get("develop_branch", payload.get("develope_brancch", ""))).strip().lower()
             flow_raw = str(payload.get("data_flow", payload.get("data flow", "web"))).strip().lower()
-            if flow_raw in ("web", "file"):
+            if flow_raw in ("web", "file", "shm"):
                 data_flow = flow_raw
             run_on_pi_raw = payload.get("run_on_pi", False)
             if isinstance(run_on_pi_raw, bool):
@@ -517,6 +532,48 @@ RADAR_SENSOR_FILE = os.path.join(REAL_TIME_DATA_DIR, "radar_sensor.txt")
 CRUISE_SCRIPT_PATH = os.path.join(DECISION_MAKING_DIR, "waypoints_cruise.py")
 SUPERVISOR_STATUS_FILE = os.path.join(REAL_TIME_DATA_DIR, "supervisor_controller_status.txt")
 
+# Lock-step: decision ticks on a sim-time schedule, each one blocking the step until done.
+LOCK_STEP, DECISION_PERIOD_S, LOCK_STEP_TIMEOUT_S = sim_scheduler.load_lock_step_config(WHO_IS_DEV_FILE)
+if LOCK_STEP and RUN_ON_PI:
+    print("[LockStep] run_on_pi: decisions come from the Pi, lock-step disabled")
+    LOCK_STEP = False
+if DECISION_PERIOD_S is None:
+    DECISION_PERIOD_S = CRUISE_INTERVAL_FRAMES * dt
+
+# Shared-memory state bus (data_flow "shm", see state_bus.py); this process owns the segment.
+STATE_BUS = None
+if DATA_FLOW == "shm" and RUN_ON_PI:
+    print("[StateBus] run_on_pi: decisions come from the Pi, using the web data flow")
+    DATA_FLOW = "web"
+if DATA_FLOW == "shm":
+    try:
+        STATE_BUS = state_bus.StateBus.create(state_bus.load_bus_name(WHO_IS_DEV_FILE, FIELD_VIEWER_PORT))
+        print(f"[StateBus] {STATE_BUS.name} ({state_bus.SEGMENT_SIZE // 1024} KiB)")
+    except Exception as e:
+        print(f"[StateBus] unavailable ({e}), using the web data flow")
+        DATA_FLOW = "web"
+
+# Match recording: every frame's sim data and applied decisions (see match_log.py).
+MATCH_LOG_ON, MATCH_LOG_DIR = match_log.load_match_log_config(WHO_IS_DEV_FILE)
+MATCH_LOG = None
+if MATCH_LOG_ON:
+    try:
+        MATCH_LOG = match_log.MatchRecorder(
+            match_log.new_match_dir(MATCH_LOG_DIR, f"seed{RANDOM_SEED}"),
+            meta={
+                "source": "supervisor",
+                "develop_branch": DEVELOP_BRANCH,
+                "data_flow": DATA_FLOW,
+                "random_seed": RANDOM_SEED,
+                "time_step_ms": TIME_STEP,
+                "decision_period_s": DECISION_PERIOD_S,
+                "lock_step": LOCK_STEP,
+            },
+        )
+        print(f"[MatchLog] recording to {MATCH_LOG.directory}")
+    except Exception as e:
+        print(f"[MatchLog] disabled: {e}")
+
 
 # =============================================================================
 # RUNTIME STATE
@@ -529,9 +586,6 @@ STEEL_HIT = 0
 PING_HIT = 0
 MAIN_BALL_TAKEN = 0
 
-# Tracks whether each ball has been absorbed to prevent double counting
-ball_simple_state = {}  # name -> {"absorbed": bool}
-
 
 # =============================================================================
 # ROBOT REFERENCES
@@ -550,6 +604,10 @@ for name in OBSTACLE_ROBOT_NAMES:
     else:
         print(f"Warning: DEF {name} not found in world.")
 
+# Node/field handles and ball types are resolved once; WORLD.ball_xyz and
+# WORLD.robot_pose hold the per-frame snapshot (absorption state included).
+WORLD = WorldRegistry(supervisor, BALL_PREFIX, BALL_COUNT, MAIN_ROBOT_NAME, OBSTACLE_ROBOT_NAMES)
+
 def _start_field_viewer():
     try:
         def _is_port_open(port):
@@ -631,309 +689,42 @@ def _start_field_viewer():
 
 _start_field_viewer()
 
-# =============================================================================
-# SHARED HELPERS
-# Small math helpers reused by controller logic.
-# =============================================================================
-def _normalize_angle(a):
-    """Normalize angle to [-pi, pi]"""
-    return (a + math.pi) % (2 * math.pi) - math.pi
-
-def _deg_to_rad(deg):
-    return deg * math.pi / 180.0
-
-# =============================================================================
-# MOTION CONTROLLER (NON-BLOCKING)
-# Per-robot motion state machine with optional cyclic waypoint traversal.
-# =============================================================================
-class MotionController:
-    """Controls robot motion with support for waypoint cycling"""
-    def __init__(self, trans_field, rot_field, dt, cycle_mode=False):
-        self.trans = trans_field
-        self.rot = rot_field
-        self.dt = dt
-        self.active = False
-        self.phase = None
-        self.start_pos = None
-        self.target_pos = None
-        self.start_angle = 0.0
-        self.target_angle = None
-        self.velocity = DEFAULT_VELOCITY
-        self.angular_speed = _deg_to_rad(
-            DEFAULT_ANGULAR_VELOCITY_OBSTACLE if cycle_mode else DEFAULT_ANGULAR_VELOCITY_MAIN
-        )
-        self.direction = np.array([0.0, 0.0, 0.0])
-        self.total_dist = 0.0
-        self.traveled = 0.0
-        self.total_time = 0.0
-        self.elapsed = 0.0
-        self.move_speed = 0.0
-        self.angle_delta = 0.0
-        
-        # Cycle mode: automatically move to next waypoint in a list
-        self.cycle_mode = cycle_mode
-        self.waypoint_list = []
-        self.current_waypoint_index = 0
-
-    def start(self, x, y, velocity=None, angle=None):
-        """Start a motion task (non-blocking)"""
-        cur_pos = np.array(self.trans.getSFVec3f(), dtype=float)
-        cur_angle = _normalize_angle(self.rot.getSFRotation()[3])
-
-        target = np.array([x, y, cur_pos[2]], dtype=float)
-        delta = target - cur_pos
-        dist = np.linalg.norm(delta)
-
-        self.start_pos = cur_pos
-        self.target_pos = target
-        self.start_angle = cur_angle
-        self.target_angle = _normalize_angle(angle) if angle is not None else None
-        self.velocity = DEFAULT_VELOCITY if velocity is None else velocity
-        self.total_dist = dist
-        self.traveled = 0.0
-        self.total_time = 0.0
-        self.elapsed = 0.0
-        self.move_speed = self.velocity
-        self.angle_delta = 0.0
-        self.angular_speed = _deg_to_rad(
-            DEFAULT_ANGULAR_VELOCITY_OBSTACLE if self.cycle_mode else DEFAULT_ANGULAR_VELOCITY_MAIN
-        )
-        self.direction = (delta / dist) if dist > 1e-9 else np.array([0.0, 0.0, 0.0])
-
-        if dist <= 1e-6:
-            if self.target_angle is None:
-                self.phase = None
-                self.active = False
-                return
-            else:
-                self.phase = 'rotate_only'
-                self.active = True
-                return
-
-        if self.target_angle is None:
-            target_yaw = math.atan2((y - cur_pos[1]), (x - cur_pos[0]))
-            self.target_angle = _normalize_angle(target_yaw)
-            if self.cycle_mode:
-                # Obstacle robots: move while rotating at constant angular speed.
-                self.phase = 'move_and_rotate'
-                self.angle_delta = _normalize_angle(self.target_angle - self.start_angle)
-                time_linear = (self.total_dist / self.velocity) if self.velocity > 1e-9 else 0.0
-                time_angular = (abs(self.angle_delta) / self.angular_speed) if self.angular_speed > 1e-9 else 0.0
-                self.total_time = max(time_linear, time_angular, 1e-6)
-                self.move_speed = self.total_dist / self.total_time if self.total_time > 1e-9 else 0.0
-            else:
-                # Main robot: rotate in place to face the target, then move in a straight line.
-                self.phase = 'rotate_then_move'
-        else:
-            # Move and interpolate rotation to the target angle simultaneously
-            self.phase = 'move_and_rotate'
-            self.angle_delta = _normalize_angle(self.target_angle - self.start_angle)
-            time_linear = (self.total_dist / self.velocity) if self.velocity > 1e-9 else 0.0
-            time_angular = (abs(self.angle_delta) / self.angular_speed) if self.angular_speed > 1e-9 else 0.0
-            self.total_time = max(time_linear, time_angular, 1e-6)
-            self.move_speed = self.total_dist / self.total_time
-
-        self.active = True
-
-    def _complete_waypoint(self):
-        """Mark current waypoint complete and auto-advance in cycle mode."""
-        self.active = False
-        self.phase = None
-        if self.cycle_mode:
-            self.start_next_waypoint()
-
-    def cancel(self):
-        self.active = False
-        self.phase = None
-
-    def load_waypoint_list(self, waypoint_list, start_index=0):
-        """Load a list of waypoints for cycle mode
-        start_index: The index of the first waypoint to start from
-        """
-        self.waypoint_list = waypoint_list
-        self.current_waypoint_index = start_index % len(waypoint_list) if waypoint_list else 0
-        if self.waypoint_list:
-            self.start_next_waypoint()
-
-    def start_next_waypoint(self):
-        """Move to the next waypoint in the list (cycles if at end)"""
-        if not self.waypoint_list:
-            self.active = False
-            return
-        
-        wp = self.waypoint_list[self.current_waypoint_index]
-        x, y = wp[0], wp[1]
-        angle = wp[2] if len(wp) > 2 else None
-        
-        self.start(x, y, velocity=None, angle=angle)
-        self.current_waypoint_index = (self.current_waypoint_index + 1) % len(self.waypoint_list)
-
-    def update(self):
-        """Called each frame to advance motion; returns True if the task is completed or idle"""
-        if not self.active:
-            return True
-
-        cur_pos = np.array(self.trans.getSFVec3f(), dtype=float)
-        step_dist = self.velocity * self.dt
-
-        # helper: single-step rotate towards target_ang
-        def step_rotate_towards(target_ang):
-            cur = _normalize_angle(self.rot.getSFRotation()[3])
-            rem = _normalize_angle(target_ang - cur)
-            if abs(rem) <= 1e-3:
-                self.rot.setSFRotation([0, 0, 1, target_ang])
-                return True
-            max_step = self.angular_speed * self.dt
-            step_ang = max_step if abs(rem) > max_step else abs(rem)
-            sign = 1.0 if rem > 0 else -1.0
-            self.rot.setSFRotation([0, 0, 1, _normalize_angle(cur + sign * step_ang)])
-            return False
-
-        if self.phase == 'rotate_only':
-            done = step_rotate_towards(self.target_angle)
-            if done:
-                self.active = False
-                self.phase = None
-                # In cycle mode, start next waypoint after reaching this one
-                if self.cycle_mode:
-                    self.start_next_waypoint()
-                return True
-            return False
-
-        if self.phase == 'rotate_then_move':
-            rotated = step_rotate_towards(self.target_angle)
-            if not rotated:
-                return False
-            remaining = np.linalg.norm(self.target_pos - cur_pos)
-            if remaining <= step_dist:
-                self.trans.setSFVec3f(self.target_pos.tolist())
-                self.active = False
-                self.phase = None
-                # In cycle mode, start next waypoint after reaching this one
-                if self.cycle_mode:
-                    self.start_next_waypoint()
-                return True
-            new_pos = cur_pos + self.direction * step_dist
-            self.trans.setSFVec3f(new_pos.tolist())
-            return False
-
-        if self.phase == 'move_and_rotate':
-            remaining = np.linalg.norm(self.target_pos - cur_pos)
-            current_angle = _normalize_angle(self.rot.getSFRotation()[3])
-            remaining_angle = abs(_normalize_angle(self.target_angle - current_angle))
-            time_linear = (remaining / self.velocity) if self.velocity > 1e-9 else 0.0
-            time_angular = (remaining_angle / self.angular_speed) if self.angular_speed > 1e-9 else 0.0
-            self.total_time = max(time_linear, time_angular, 1e-6)
-            self.move_speed = remaining / self.total_time if self.total_time > 1e-9 else 0.0
-            step_dist = self.move_speed * self.dt
-            step_rotate_towards(self.target_angle)
-            if self.total_time <= self.dt or remaining <= step_dist:
-                self.trans.setSFVec3f(self.target_pos.tolist())
-                self.rot.setSFRotation([0, 0, 1, self.target_angle])
-                self.active = False
-                self.phase = None
-                # In cycle mode, start next waypoint after reaching this one
-                if self.cycle_mode:
-                    self.start_next_waypoint()
-                return True
-            # Position update
-            new_pos = cur_pos + self.direction * step_dist
-            self.trans.setSFVec3f(new_pos.tolist())
-            return False
-
-        return True
-
 # =============================================================================
 # BALL PLACEMENT
 # Randomized spawn with avoid-zones and overlap mitigation.
 # =============================================================================
 
-def _point_in_rect(px, py, rect):
-    return (rect[0] <= px <= rect[1]) and (rect[2] <= py <= rect[3])
-
 def randomize_balls(seed=None, ensure_no_overlap=True):
     if seed is not None:
         random.seed(seed)
         np.random.seed(seed)
 
-    avoid_zones = []
     margin = ROBOT_HALF_SIZE + CLEARANCE + BALL_RADIUS
-    robot_rect = (ROBOT_X - margin, ROBOT_X + margin, ROBOT_Y - margin, ROBOT_Y + margin)
-    avoid_zones.append(robot_rect)
-
-    square_half = 0.15
-    square_centers = [(-0.9, 0.0), (0.9, 0.0), (0.0, 0.9), (0.0, -0.9)]
-    for cx, cy in square_centers:
-        avoid_zones.append((cx - square_half, cx + square_half, cy - square_half, cy + square_half))
-
-    placed_positions = []
+    zones = ball_placement.avoid_zones(ROBOT_X, ROBOT_Y, margin)
 
+    names = []
     for i in range(BALL_COUNT):
         name = f"{BALL_PREFIX}{i}"
-        node = supervisor.getFromDef(name)
-        if node is None:
+        if WORLD.ball_index.get(name) is None:
             print(f"Warning: {name} not found, skipping.")
             continue
-        trans_field = node.getField("translation")
-
-        if not ensure_no_overlap:
-            for attempt in range(MAX_TRIES_PER_BALL):
-                x = random.uniform(X_MIN, X_MAX)
-                y = random.uniform(Y_MIN, Y_MAX)
-                blocked = any(_point_in_rect(x,y,rect) for rect in avoid_zones)
-                if not blocked:
-                    break
-            else:
-                x = random.uniform(X_MIN, X_MAX)
-                y = random.uniform(Y_MIN, Y_MAX)
-            z = BALL_RADIUS + Z_EPS
-            trans_field.setSFVec3f([x,y,z])
-            node.resetPhysics()
-            placed_positions.append((x,y))
-            continue
+        names.append(name)
 
-        success = False
-        for attempt in range(MAX_TRIES_PER_BALL):
-            x = random.uniform(X_MIN, X_MAX)
-            y = random.uniform(Y_MIN, Y_MAX)
-            if any(_point_in_rect(x,y,rect) for rect in avoid_zones):
-                continue
-            ok = True
-            for (px,py) in placed_positions:
-                if (x-px)**2 + (y-py)**2 < (MIN_SEPARATION**2):
-                    ok = False
-                    break
-            if ok:
-                z = BALL_RADIUS + Z_EPS
-                trans_field.setSFVec3f([x,y,z])
-                node.resetPhysics()
-                placed_positions.append((x,y))
-                success = True
-                break
-        if not success:
-            for attempt in range(MAX_TRIES_PER_BALL):
-                x = random.uniform(X_MIN, X_MAX)
-                y = random.uniform(Y_MIN, Y_MAX)
-                if any(_point_in_rect(x,y,rect) for rect in avoid_zones):
-                    continue
-                z = BALL_RADIUS + Z_EPS
-                trans_field.setSFVec3f([x,y,z])
-                node.resetPhysics()
-                placed_positions.append((x,y))
-                success = True
-                break
-        if not success:
-            print(f"Warning: failed to place {name} without overlap/avoid zone. Forcing placement.")
-            x = random.uniform(X_MIN, X_MAX)
-            y = random.uniform(Y_MIN, Y_MAX)
-            z = BALL_RADIUS + Z_EPS
-            trans_field.setSFVec3f([x,y,z])
-            node.resetPhysics()
-            placed_positions.append((x,y))
+    # Cached per seed (cache/ball_placement.json); a cache hit skips the placement search.
+    placed_positions, from_cache = ball_placement.place_balls(
+        names, (X_MIN, X_MAX), (Y_MIN, Y_MAX), zones, MIN_SEPARATION, MAX_TRIES_PER_BALL, ensure_no_overlap,
+        seed=seed,
+    )
+    if from_cache:
+        print(f"[BallPlacement] seed={seed}: layout loaded from cache")
+    z = BALL_RADIUS + Z_EPS
+    for name, (x, y) in zip(names, placed_positions):
+        WORLD.set_ball_position(WORLD.ball_index[name], (x, y, z))
 
     # Let physics settle for a few steps (short blocking)
     for _ in range(SETTLE_STEPS_AFTER_PLACEMENT):
         supervisor.step(TIME_STEP)
+    WORLD.refresh()
 
     print(f"Randomized {len(placed_positions)} balls. seed={seed}, no_overlap={ensure_no_overlap}")
 
@@ -943,15 +734,9 @@ def randomize_balls(seed=None, ensure_no_overlap=True):
 # =============================================================================
 
 def monitor_simple_init(ball_prefix="BALL_", ball_count=40):
-    """Initialize ball_simple_state (call once)"""
-    ball_simple_state.clear()
-    for i in range(ball_count):
-        name = f"{ball_prefix}{i}"
-        node = supervisor.getFromDef(name)
-        if node is None:
-            continue
-        ball_simple_state[name] = {"absorbed": False}
-    # print(f"[monitor_simple] initialized for {len(ball_simple_state)} balls")
+    """Reset per-ball absorption flags (call once)"""
+    WORLD.ball_absorbed[:] = False
+    # print(f"[monitor_simple] initialized for {WORLD.ball_count} balls")
 
 def monitor_simple_step(ball_prefix="BALL_", ball_count=40, half_x=ABSORB_BOX_HALF_X, half_y=ABSORB_BOX_HALF_Y, absorb_location=ABSORB_LOCATION):
     """
@@ -968,72 +753,22 @@ def _monitor_absorption_for_robot(robot, ball_prefix="BALL_", ball_count=40, hal
     Generic absorption check for any robot.
     """
     global PING_STORED, STEEL_STORED, MAIN_BALL_TAKEN
-    # Robot pose in world coordinates
-    robot_pos = np.array(robot.getField("translation").getSFVec3f(), dtype=float)
-    rx, ry = float(robot_pos[0]), float(robot_pos[1])
-    robot_rot = np.array(robot.getField("rotation").getSFRotation())
-    rangle = float(robot_rot[3])
-
-    for i in range(ball_count):
-        name = f"{ball_prefix}{i}"
-        # Ensure the ball exists and is in the state table
-        if name not in ball_simple_state:
-            node_tmp = supervisor.getFromDef(name)
-            if node_tmp is None:
-                continue
-            ball_simple_state[name] = {"absorbed": False}
-
-        if ball_simple_state[name]["absorbed"]:
-            continue
-
-        node = supervisor.getFromDef(name)
-        if node is None:
-            continue
+    # Robot pose in world coordinates (from this frame's snapshot)
+    ridx = WORLD.robot_index(robot)
+    if ridx is None:
+        return
 
-        # Read position
-        pos = node.getField("translation").getSFVec3f()
-        bx, by = float(pos[0]), float(pos[1])
-
-        # World -> robot coordinate transform (2D, assuming rotation around z axis)
-        x_rel = bx - rx
-        y_rel = by - ry
-        x_ball_robot = x_rel * math.cos(-rangle) - y_rel * math.sin(-rangle)
-        y_ball_robot = x_rel * math.sin(-rangle) + y_rel * math.cos(-rangle)
-
-        # Determine type from robotName; default to ping
-        name_field = node.getField("robotName").getSFString()
-        ball_type = "ping"
-        if name_field is not None:
-            node_name = name_field.lower()
-            if "steel" in node_name:
-                ball_type = "steel"
-            else:
-                ball_type = "ping"
-
-        # Decide absorption based on type
-        absorbed = False
-        if ball_type == "ping":
-            if (x_ball_robot > 0) and (x_ball_robot < half_x) and (abs(y_ball_robot) < half_y):
-                absorbed = True
-                PING_STORED += 1
-        elif ball_type == "steel":
-            if (x_ball_robot > 0) and (x_ball_robot < half_x - 0.01) and (abs(y_ball_robot) < half_y):
-                absorbed = True
-                STEEL_STORED += 1
-
-        if absorbed:
-            # Absorb by teleporting outside arena and resetting physics
-            node.getField("translation").setSFVec3f([absorb_location[0], absorb_location[1], absorb_location[2]])
-            try:
-                node.resetPhysics()
-            except Exception:
-                pass
-            ball_simple_state[name]["absorbed"] = True
-            if robot == main_robot:
-                MAIN_BALL_TAKEN += 1
-                _append_ball_taken_history(BALL_TAKEN_HISTORY_FILE, supervisor.getTime(), MAIN_BALL_TAKEN)
-            SCORE = PING_HIT * 4 + STEEL_HIT * 2 + STEEL_STORED * 1
-            # print(f"Score: {SCORE} | Ping Hit: {PING_HIT} | Steel Hit: {STEEL_HIT} | Steel Stored: {STEEL_STORED} | Ping Stored: {PING_STORED}")
+    # Absorb by teleporting outside arena and resetting physics
+    for i in WORLD.absorb(ridx, half_x, half_y, absorb_location):
+        if WORLD.ball_is_steel[i]:
+            STEEL_STORED += 1
+        else:
+            PING_STORED += 1
+        if robot == main_robot:
+            MAIN_BALL_TAKEN += 1
+            _append_ball_taken_history(BALL_TAKEN_HISTORY_FILE, supervisor.getTime(), MAIN_BALL_TAKEN)
+        SCORE = PING_HIT * 4 + STEEL_HIT * 2 + STEEL_STORED * 1
+        # print(f"Score: {SCORE} | Ping Hit: {PING_HIT} | Steel Hit: {STEEL_HIT} | Steel Stored: {STEEL_STORED} | Ping Stored: {PING_STORED}")
 
 # =============================================================================
 # BOOTSTRAP
@@ -1077,14 +812,9 @@ except Exception as e:
         pass
 
 def _load_dynamic_waypoint():
-    # -------------------------------------------------------------------------
-    # WAYPOINT PARSING HELPERS
-    # Parse dynamic waypoint input from shared txt file.
-    # -------------------------------------------------------------------------
-    """Load a single waypoint from dynamic_waypoints.txt (read-only).
-    Returns a single (x, y, orientation) tuple or None if file is empty/invalid.
+    """Load a single waypoint from dynamic_waypoints (read-only).
+    Returns a single (x, y, orientation) tuple or None if the payload is empty/invalid.
     """
-    namespace = {"North": 90.0, "East": 0.0, "South": -90.0, "West": 180.0, "None": None}
     raw_payload = _get_decision_value("dynamic_waypoints")
     if not raw_payload:
         pos = main_robot.getField("translation").getSFVec3f()
@@ -1092,38 +822,10 @@ def _load_dynamic_waypoint():
         rot = main_robot.getField("rotation").getSFRotation()
         ang = float(rot[3])
         return (x, y, ang)
-    for raw in raw_payload.splitlines():
-        line = raw.split('#', 1)[0].strip()
-        if not line:
-            continue
-        # remove trailing comma
-        if line.endswith(','):
-            line = line[:-1].strip()
-        try:
-            # evaluate in a restricted namespace
-            wp = eval(line, {"__builtins__": None}, namespace)
-        except Exception:
-            # fallback: extract numbers
-            nums = re.findall(r'[-+]?[0-9]*\.?[0-9]+', line)
-            if len(nums) >= 2:
-                x = float(nums[0]); y = float(nums[1])
-                ang = float(nums[2]) if len(nums) >= 3 else None
-                wp = (x, y, ang)
-            else:
-                continue
-        # normalize
-        if isinstance(wp, tuple) and len(wp) >= 2:
-            if len(wp) == 2:
-                wp = (float(wp[0]), float(wp[1]), None)
-            else:
-                ang = wp[2]
-                if ang is None:
-                    ang = None
-                else:
-                    ang = math.radians(float(ang))
-                wp = (float(wp[0]), float(wp[1]), ang)
-            return wp
-    return None
+    if DECISION_RECORD is not None and DECISION_RECORD.flags & state_bus.WAYPOINT:
+        bearing = DECISION_RECORD.bearing
+        return (DECISION_RECORD.x, DECISION_RECORD.y, None if bearing is None else math.radians(bearing))
+    return parse_dynamic_waypoint(raw_payload)
 
 def _append_to_history(path, waypoint, status, timestamp=None):
     """Append a waypoint record to waypoints_history.txt with status ('reached' or 'cut').
@@ -1153,46 +855,6 @@ def _trim_history_file(path, max_lines=2000):
     except Exception:
         pass
 
-def _load_waypoint_list_from_file(path):
-    """Load multiple waypoints from a file (for obstacle robot cycling).
-    Returns a list of (x, y, angle) tuples, or empty list if file doesn't exist.
-    """
-    namespace = {"North": North, "East": East, "South": South, "West": West, "None": None}
-    waypoints = []
-    try:
-        with open(path, 'r') as f:
-            for raw in f:
-                line = raw.split('#', 1)[0].strip()
-                if not line:
-                    continue
-                if line.endswith(','):
-                    line = line[:-1].strip()
-                try:
-                    wp = eval(line, {"__builtins__": None}, namespace)
-                except Exception:
-                    nums = re.findall(r'[-+]?[0-9]*\.?[0-9]+', line)
-                    if len(nums) >= 2:
-                        x = float(nums[0]); y = float(nums[1])
-                        ang = float(nums[2]) if len(nums) >= 3 else None
-                        wp = (x, y, ang)
-                    else:
-                        continue
-                
-                if isinstance(wp, tuple) and len(wp) >= 2:
-                    if len(wp) == 2:
-                        wp = (float(wp[0]), float(wp[1]), None)
-                    else:
-                        ang = wp[2]
-                        ang = float(ang) if ang is not None else None
-                        wp = (float(wp[0]), float(wp[1]), ang)
-                    waypoints.append(wp)
-    except FileNotFoundError:
-        pass
-    except Exception as e:
-        print(f"[load_waypoint_list] Error loading {path}: {e}")
-    
-    return waypoints
-
 def _append_history_header(path):
     """Append a new session header to waypoints_history.txt with current timestamp.
     Called once at program startup.
@@ -1204,148 +866,36 @@ def _append_history_header(path):
     _trim_history_file(path, max_lines=2000)
 
 def _format_ball_positions():
-    lines = []
-    written_count = 0
-    for i in range(BALL_COUNT):
-        name = f"{BALL_PREFIX}{i}"
-        node = supervisor.getFromDef(name)
-        if node is None:
-            continue
-        try:
-            pos = node.getField("translation").getSFVec3f()
-            x, y = float(pos[0]), float(pos[1])
-        except Exception:
-            continue
-        if x < -1.0 or x > 1.0 or y < -1.0 or y > 1.0:
-            continue
-        typ = "ping"
-        try:
-            name_field = node.getField("robotName").getSFString()
-            if name_field is not None and "steel" in name_field.lower():
-                typ = "metal"
-        except Exception:
-            pass
-        lines.append(f"({x:.6f}, {y:.6f}, {typ.upper()})")
-        written_count += 1
-    return "\n".join(lines), written_count
+    return WORLD.format_ball_positions()
 
 
 def _format_current_position():
-    pos = main_robot.getField("translation").getSFVec3f()
-    x, y = float(pos[0]), float(pos[1])
-    rot = main_robot.getField("rotation").getSFRotation()
-    bearing_rad = float(rot[3])
-    bearing_deg = math.degrees(bearing_rad)
-    return f"({x:.6f}, {y:.6f}, {bearing_deg:.2f})"
+    return WORLD.format_current_position()
 
 def _format_obstacle_positions():
-    lines = []
-    for robot in obstacle_robots:
-        pos = robot.getField("translation").getSFVec3f()
-        x, y = float(pos[0]), float(pos[1])
-        rot = robot.getField("rotation").getSFRotation()
-        bearing_deg = math.degrees(float(rot[3]))
-        lines.append(f"({x:.6f}, {y:.6f}, {bearing_deg:.2f})")
-    return "\n".join(lines)
+    return WORLD.format_obstacle_positions()
 
 def _format_webots_time():
     return f"{supervisor.getTime():.6f}"
 
 def _radar_sensor_distances(max_range=RADAR_MAX_RANGE, corridor=RADAR_CORRIDOR):
-    """Return nearest radar distances by direction using world geometry samples."""
-    pos = main_robot.getField("translation").getSFVec3f()
-    rot = main_robot.getField("rotation").getSFRotation()
-    cx, cy = float(pos[0]), float(pos[1])
-    bearing_deg = math.degrees(float(rot[3]))
-
-    half_band = corridor / 2.0
-    theta = math.radians(bearing_deg)
-    cos_t = math.cos(theta)
-    sin_t = math.sin(theta)
-    robot_half = 0.1
-    obstacle_half = 0.1
-
-    sample_points_world = []
-
-    sample_spacing = 0.1 * obstacle_half
-    obstacle_edge_samples_local = []
-    num_samples = int(2 * obstacle_half / sample_spacing) + 1
-    for i in range(num_samples):
-        offset = -obstacle_half + i * sample_spacing
-        obstacle_edge_samples_local.append((offset, obstacle_half))
-        obstacle_edge_samples_local.append((offset, -obstacle_half))
-        obstacle_edge_samples_local.append((-obstacle_half, offset))
-        obstacle_edge_samples_local.append((obstacle_half, offset))
-
-    for robot in obstacle_robots:
-        pos_o = robot.getField("translation").getSFVec3f()
-        ox, oy = float(pos_o[0]), float(pos_o[1])
-        rot_o = robot.getField("rotation").getSFRotation()
-        otheta = float(rot_o[3])
-        cos_o = math.cos(otheta)
-        sin_o = math.sin(otheta)
-        for lx, ly in obstacle_edge_samples_local:
-            wx = ox + lx * cos_o - ly * sin_o
-            wy = oy + lx * sin_o + ly * cos_o
-            sample_points_world.append((wx, wy))
-
-    edge_samples = [i * 0.05 for i in range(-20, 21)]
-    wall_samples = (
-        [(x, 1.0) for x in edge_samples]
-        + [(x, -1.0) for x in edge_samples]
-        + [(1.0, y) for y in edge_samples]
-        + [(-1.0, y) for y in edge_samples]
-    )
-    sample_points_world.extend(wall_samples)
-
-    hits = {}
-    for wx, wy in sample_points_world:
-        dx = wx - cx
-        dy = wy - cy
-        x_robot = dx * cos_t + dy * sin_t
-        y_robot = -dx * sin_t + dy * cos_t
-
-        if x_robot > 0 and abs(y_robot) <= half_band and x_robot <= max_range:
-            dist = x_robot - robot_half
-            direction = "front"
-        elif x_robot < 0 and abs(y_robot) <= half_band and -x_robot <= max_range:
-            dist = -x_robot - robot_half
-            direction = "rear"
-        elif y_robot > 0 and abs(x_robot) <= half_band and y_robot <= max_range:
-            dist = y_robot - robot_half
-            direction = "left"
-        elif y_robot < 0 and abs(x_robot) <= half_band and -y_robot <= max_range:
-            dist = -y_robot - robot_half
-            direction = "right"
-        else:
-            continue
-
-        if dist <= max_range:
-            dist = max(0.0, dist)
-            prev = hits.get(direction)
-            if prev is None or dist < prev:
-                hits[direction] = dist
-
-    memory_values = {
-        "front": max_range,
-        "right": max_range,
-        "left": max_range,
-        "rear": max_range,
-    }
-    for direction, dist in hits.items():
-        if direction in memory_values:
-            memory_values[direction] = max(0.0, dist)
-    return memory_values
+    """Return nearest radar distances by direction (config "radar_model": analytic | sampled)."""
+    return WORLD.radar_distances(max_range, corridor)
 
 def _read_speed_mps(default_value):
     """Read cruise speed in m/s from decisions data (web-only)."""
-    raw = _get_decision_value("speed")
-    if raw is None:
-        return default_value
-    try:
-        value = float(raw)
-    except Exception:
-        return default_value
+    if DECISION_RECORD is not None:
+        if not DECISION_RECORD.flags & state_bus.SPEED:
+            return default_value
+        value = DECISION_RECORD.speed
+    else:
+        raw = _get_decision_value("speed")
+        if raw is None:
+            return default_value
+        try:
+            value = float(raw)
+        except Exception:
+            return default_value
     if value <= 0:
         return default_value
     return value
@@ -1354,26 +904,43 @@ def _read_speed_mps(default_value):
 
 
 def _post_sim_data(payload):
+    global SIM_DATA_LOST, SIM_DATA_FILE_FRAMES, SIM_DATA_LAST
     if DATA_FLOW == "file":
-        for key, value in payload.items():
+        # Only rewrite files whose text changed (every file again on full-snapshot frames).
+        changed = SIM_SNAPSHOT.update(payload)
+        SIM_DATA_FILE_FRAMES += 1
+        if SIM_DATA_FILE_FRAMES >= sim_snapshot.FULL_SNAPSHOT_INTERVAL:
+            SIM_DATA_FILE_FRAMES = 0
+            changed = list(payload.keys())
+        for key in changed:
             path = os.path.join(REAL_TIME_DATA_DIR, f"{key}.txt")
-            _write_local_text(path, f"{value}\n")
+            _write_local_text(path, f"{payload[key]}\n")
+        return
+    SIM_DATA_LAST = payload
+    if DATA_FLOW == "shm":
+        if not STATE_BUS.publish_simulation_data(payload):
+            print("[StateBus] simulation_data does not fit its channel")
         return
     try:
-        body = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(
+        # A failed, rejected (409) or dropped POST leaves the viewer behind: resend everything.
+        stats = TELEMETRY.counters()
+        lost = stats["errors"] + stats["dropped"]
+        if lost != SIM_DATA_LOST:
+            SIM_DATA_LOST = lost
+            SIM_SNAPSHOT.force_full()
+        envelope = SIM_SNAPSHOT.encode(payload)
+        # Serialized and sent on the publisher thread; unsent deltas are merged, not replaced.
+        TELEMETRY.publish(
+            "simulation_data",
             SIM_DATA_ENDPOINT,
-            data=body,
-            method="POST",
-            headers={"Content-Type": "application/json", "Content-Length": str(len(body))},
+            envelope,
+            merge=sim_snapshot.merge_envelopes,
         )
-        with urllib.request.urlopen(req, timeout=0.3) as res:
-            res.read()
     except Exception:
         pass
 
 def _refresh_decisions_data():
-    global DECISIONS_CACHE, DECISIONS_SEQ
+    global DECISIONS_CACHE, DECISIONS_SEQ, DECISION_RECORD
     if DATA_FLOW == "file":
         payload = {}
         for key in ("dynamic_waypoints", "speed"):
@@ -1384,6 +951,20 @@ def _refresh_decisions_data():
         DECISIONS_CACHE = payload
         DECISIONS_SEQ += 1
         return True
+    if DATA_FLOW == "shm":
+        record = STATE_BUS.read_decision()
+        if record is None:
+            return False
+        if DECISION_RECORD is not None and record.revision == DECISION_RECORD.revision:
+            # Republished unchanged: the dict we hold is still current.
+            return True
+        record, payload = STATE_BUS.read_decisions()
+        if payload is None:
+            return False
+        DECISIONS_CACHE = payload
+        DECISION_RECORD = record
+        DECISIONS_SEQ += 1
+        return True
     if RUN_ON_PI:
         deadline = time.time() + DECISIONS_RETRY_SECONDS_ON_PI
         last_error = None
@@ -1439,6 +1020,24 @@ def _require_decision_value(key, allow_empty=False, retries=1, sleep_s=0.02):
 def _get_decision_value(key):
     return DECISIONS_CACHE.get(key)
 
+def _run_decision_tick_lock_step(frame):
+    """One synchronous decision tick: the script reads the last posted frame and
+    its decisions are applied from the next frame, whatever the host speed."""
+    if DATA_FLOW == "web":
+        if not TELEMETRY.flush(timeout=LOCK_STEP_TIMEOUT_S):
+            print(f"[LockStep] frame {frame}: simulation data not delivered before the decision tick")
+    ran = False
+    if cruise_worker is not None and cruise_worker.tick(frame, SIM_DATA_LAST):
+        ran = True
+        if not cruise_worker.wait(timeout=LOCK_STEP_TIMEOUT_S):
+            print(f"[LockStep] frame {frame}: decision tick did not finish in {LOCK_STEP_TIMEOUT_S:.1f}s")
+    if not ran:
+        try:
+            subprocess.run([sys.executable, CRUISE_SCRIPT_PATH], check=False, timeout=LOCK_STEP_TIMEOUT_S)
+        except Exception as e:
+            print(f"[Cruise] Error running waypoints_cruise.py: {e}")
+    _refresh_decisions_data()
+
 def _append_ball_taken_history(path, taken_time_s, taken_count):
     """Append main-robot ball taken history as: <time_seconds>,<cumulative_count>."""
     try:
@@ -1466,97 +1065,7 @@ def _write_supervisor_status(path, status):
             pass
 
 def _format_visible_balls(viewfield_deg=FIELD_OF_VIEW_DEGREES, visible_range_m=VISIBLE_RANGE_METERS):
-    lines = []
-    pos = main_robot.getField("translation").getSFVec3f()
-    rx, ry = float(pos[0]), float(pos[1])
-    rot = main_robot.getField("rotation").getSFRotation()
-    rangle = float(rot[3])
-    half_fov = math.radians(viewfield_deg) / 2.0
-    range_sq = visible_range_m * visible_range_m
-
-    def _segment_intersects_aabb(p0, p1, half):
-        x0, y0 = p0
-        x1, y1 = p1
-        dx = x1 - x0
-        dy = y1 - y0
-        t0, t1 = 0.0, 1.0
-        for p, q in ((-dx, x0 + half), (dx, half - x0), (-dy, y0 + half), (dy, half - y0)):
-            if abs(p) < 1e-12:
-                if q < 0:
-                    return False
-            else:
-                t = q / p
-                if p < 0:
-                    if t > t1:
-                        return False
-                    if t > t0:
-                        t0 = t
-                else:
-                    if t < t0:
-                        return False
-                    if t < t1:
-                        t1 = t
-        return True
-
-    def _is_occluded_by_obstacles(ball_x, ball_y):
-        for robot in obstacle_robots:
-            opos = robot.getField("translation").getSFVec3f()
-            ox, oy = float(opos[0]), float(opos[1])
-            orot = robot.getField("rotation").getSFRotation()
-            oangle = float(orot[3])
-
-            def to_local(px, py):
-                dx = px - ox
-                dy = py - oy
-                lx = dx * math.cos(-oangle) - dy * math.sin(-oangle)
-                ly = dx * math.sin(-oangle) + dy * math.cos(-oangle)
-                return lx, ly
-
-            p0 = to_local(rx, ry)
-            p1 = to_local(ball_x, ball_y)
-            if _segment_intersects_aabb(p0, p1, 0.1):
-                return True
-        return False
-
-    for i in range(BALL_COUNT):
-        name = f"{BALL_PREFIX}{i}"
-        node = supervisor.getFromDef(name)
-        if node is None:
-            continue
-        try:
-            bpos = node.getField("translation").getSFVec3f()
-            bx, by = float(bpos[0]), float(bpos[1])
-        except Exception:
-            continue
-        if bx < -1.0 or bx > 1.0 or by < -1.0 or by > 1.0:
-            continue
-
-        x_rel = bx - rx
-        y_rel = by - ry
-        x_robot = x_rel * math.cos(-rangle) - y_rel * math.sin(-rangle)
-        y_robot = x_rel * math.sin(-rangle) + y_rel * math.cos(-rangle)
-        dist_sq = x_robot * x_robot + y_robot * y_robot
-        if dist_sq > range_sq:
-            continue
-
-        angle = math.atan2(y_robot, x_robot)
-        if abs(angle) > half_fov:
-            continue
-
-        if _is_occluded_by_obstacles(bx, by):
-            continue
-
-        typ = "PING"
-        try:
-            name_field = node.getField("robotName").getSFString()
-            if name_field is not None and "steel" in name_field.lower():
-                typ = "METAL"
-        except Exception:
-            pass
-
-        lines.append(f"({bx:.6f}, {by:.6f}, {typ})")
-
-    return "\n".join(lines)
+    return WORLD.format_visible_balls(viewfield_deg, visible_range_m)
 
 # =============================================================================
 # MOTION CONTROLLER INITIALIZATION
@@ -1565,18 +1074,24 @@ def _format_visible_balls(viewfield_deg=FIELD_OF_VIEW_DEGREES, visible_range_m=V
 # Main robot: single waypoint navigation from dynamic_waypoints.txt
 main_trans = main_robot.getField("translation")
 main_rot = main_robot.getField("rotation")
-main_motion = MotionController(main_trans, main_rot, dt, cycle_mode=False)
+main_motion = MotionController(
+    main_trans, main_rot, dt, cycle_mode=False,
+    default_velocity=DEFAULT_VELOCITY, angular_velocity_deg=DEFAULT_ANGULAR_VELOCITY_MAIN,
+)
 
 # Obstacle robots: cyclic waypoint navigation from obstacle_plan.txt (optional)
 obstacle_motions = []
-obstacle_waypoints = _load_waypoint_list_from_file(OBSTACLE_PLAN_FILE)
+obstacle_waypoints = load_waypoint_list_from_file(OBSTACLE_PLAN_FILE)
 
 if obstacle_waypoints:
     print(f"Loaded {len(obstacle_waypoints)} waypoints from {OBSTACLE_PLAN_FILE}")
     for i, robot in enumerate(obstacle_robots):
         obs_trans = robot.getField("translation")
         obs_rot = robot.getField("rotation")
-        obs_motion = MotionController(obs_trans, obs_rot, dt, cycle_mode=True)
+        obs_motion = MotionController(
+            obs_trans, obs_rot, dt, cycle_mode=True,
+            default_velocity=DEFAULT_VELOCITY, angular_velocity_deg=DEFAULT_ANGULAR_VELOCITY_OBSTACLE,
+        )
         
         # Load waypoints with different starting index for each robot
         start_idx = OBSTACLE_START_INDICES[i] if i < len(OBSTACLE_START_INDICES) else i * 2
@@ -1604,9 +1119,19 @@ if current_waypoint is not None:
 # Note: Camera display is handled automatically by Webots
 # To view the camera feed: right-click on 'front_camera' in Scene Tree and select 'View'
 
+# Persistent decision worker (falls back to one-shot subprocess runs if unusable)
+cruise_worker = None
+if CRUISE_PERSISTENT_WORKER and (not RUN_ON_PI):
+    cruise_worker = DecisionWorker(CRUISE_SCRIPT_PATH)
+    if not cruise_worker.start():
+        cruise_worker = None
+
 frame_counter = 0
 decisions_frame_counter = 0
 ball_taken_180_logged = False
+decision_scheduler = sim_scheduler.SimTimeScheduler(DECISION_PERIOD_S, start_s=supervisor.getTime())
+if LOCK_STEP:
+    print(f"[LockStep] decision tick every {DECISION_PERIOD_S:.3f}s of sim time (blocking)")
 
 # Mark supervisor status as running at initiation.
 _write_supervisor_status(SUPERVISOR_STATUS_FILE, "runnung")
@@ -1619,7 +1144,8 @@ while supervisor.step(TIME_STEP) != -1:
     sim_time = supervisor.getTime()
 
     decisions_frame_counter += 1
-    if decisions_frame_counter % DECISIONS_REFRESH_EVERY_FRAMES == 0:
+    # Lock-step refreshes decisions right after each tick instead.
+    if (not LOCK_STEP) and decisions_frame_counter % DECISIONS_REFRESH_EVERY_FRAMES == 0:
         _refresh_decisions_data()
 
     if (sim_time > 180.0) and (not ball_taken_180_logged):
@@ -1655,6 +1181,9 @@ while supervisor.step(TIME_STEP) != -1:
     # 1.2) Advance all obstacle robots motion
     for obs_motion in obstacle_motions:
         obs_motion.update()
+
+    # 1.3) Snapshot ball positions and robot poses once for every consumer below
+    WORLD.refresh()
     
     # 1.5) Update real-time status (in-memory only for sim data)
     waypoint_status = "going" if main_motion.active else "reached"
@@ -1672,11 +1201,17 @@ while supervisor.step(TIME_STEP) != -1:
             if POSE_ESTIMATION_ON and (not RUN_ON_PI):
                 _trigger_pose_estimation_if_ready()
                 _print_ground_truth_current_position(main_robot)
-    if (not RUN_ON_PI) and frame_counter % CRUISE_INTERVAL_FRAMES == 0:
-        try:
-            subprocess.run([sys.executable, CRUISE_SCRIPT_PATH], check=False)
-        except Exception as e:
-            print(f"[Cruise] Error running waypoints_cruise.py: {e}")
+    if cruise_worker is not None:
+        cruise_worker.poll()
+    if LOCK_STEP:
+        if decision_scheduler.due(sim_time):
+            _run_decision_tick_lock_step(frame_counter)
+    elif (not RUN_ON_PI) and frame_counter % CRUISE_INTERVAL_FRAMES == 0:
+        if cruise_worker is None or not cruise_worker.tick(frame_counter, SIM_DATA_LAST):
+            try:
+                subprocess.run([sys.executable, CRUISE_SCRIPT_PATH], check=False)
+            except Exception as e:
+                print(f"[Cruise] Error running waypoints_cruise.py: {e}")
 
     # 2) Call absorption check for main robot
     monitor_simple_step(ball_prefix=BALL_PREFIX, ball_count=BALL_COUNT, half_x=ABSORB_BOX_HALF_X, half_y=ABSORB_BOX_HALF_Y, absorb_location=ABSORB_LOCATION)
@@ -1718,6 +1253,8 @@ while supervisor.step(TIME_STEP) != -1:
         "radar_sensor": radar_sensor_text,
     }
     _post_sim_data(payload)
+    if MATCH_LOG is not None:
+        MATCH_LOG.record(sim_time, payload, DECISIONS_CACHE)
 
     # 3) If main robot motion completed, record as 'reached' and wait for next dynamic waypoint
     if not main_motion.active and current_waypoint is not None:
@@ -1728,5 +1265,21 @@ while supervisor.step(TIME_STEP) != -1:
     SCORE = PING_HIT * 4 + STEEL_HIT * 2 + STEEL_STORED * 1
 
 # Exit
+if cruise_worker is not None:
+    cruise_worker.stop()
+if MATCH_LOG is not None:
+    MATCH_LOG.close()
+    print(f"[MatchLog] {MATCH_LOG.frames} frames in {MATCH_LOG.chunks} chunks: {MATCH_LOG.directory}")
+TELEMETRY.close()
+if STATE_BUS is not None:
+    STATE_BUS.close()
+try:
+    stats = TELEMETRY.counters()
+    print(
+        f"[Telemetry] published={stats['published']} sent={stats['sent']} "
+        f"coalesced={stats['coalesced']} dropped={stats['dropped']} errors={stats['errors']}"
+    )
+except Exception:
+    pass
 _write_supervisor_status(SUPERVISOR_STATUS_FILE, "exited")
 print("Supervisor controller exiting.")
\ No newline at end of file
@@ -0,0 +1,170 @@
+# telemetry_publisher.py
+# Non-blocking telemetry publisher for the supervisor:
+# - the Webots step only enqueues; a background thread does the HTTP POSTs
+# - one pending slot per channel, so a slow viewer coalesces to the latest frame
+# - one persistent keep-alive connection per host
+# - flush() waits for the queue to drain (lock-step mode)
+import http.client
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+
+class TelemetryPublisher:
+    """Background POSTer with latest-wins channels and drop/coalesce counters.
+
+    publish() never blocks on the network. Each channel (for example
+    "simulation_data" or "front_camera") holds at most one pending message;
+    publishing again before it is sent replaces it and counts as coalesced.
+    At most `max_pending` channels can be queued; beyond that the oldest
+    pending message is dropped.
+    """
+    def __init__(self, timeout=0.3, max_pending=4):
+        self.timeout = timeout
+        self.max_pending = max(1, int(max_pending))
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()  # channel -> (url, body, content_type)
+        self._conns = {}  # (host, port) -> HTTPConnection
+        self._inflight = 0
+        self._stopping = False
+        self._thread = None
+        self.stats = {
+            "published": 0,
+            "sent": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "errors": 0,
+            "last_send_ms": 0.0,
+        }
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="telemetry-publisher", daemon=True)
+        self._thread.start()
+
+    def publish(self, channel, url, body, content_type="application/json", merge=None):
+        """Queue `body` (bytes, or a JSON-serializable object) for `url`; returns immediately.
+
+        `merge(older_body, body)` folds a still-pending message into the new one
+        instead of replacing it (needed for delta payloads).
+        """
+        self.start()
+        with self._cond:
+            self.stats["published"] += 1
+            if channel in self._pending:
+                self.stats["coalesced"] += 1
+                if merge is not None:
+                    body = merge(self._pending[channel][1], body)
+                del self._pending[channel]
+            elif len(self._pending) >= self.max_pending:
+                self._pending.popitem(last=False)
+                self.stats["dropped"] += 1
+            self._pending[channel] = (url, body, content_type)
+            self._cond.notify_all()
+        return True
+
+    def flush(self, timeout=None):
+        """Block until everything published so far has been sent or failed.
+
+        Used by lock-step mode so the decision script reads the frame that was
+        just published. Returns False if `timeout` seconds pass first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._inflight:
+                if self._thread is None or not self._thread.is_alive():
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def counters(self):
+        with self._cond:
+            return dict(self.stats)
+
+    def close(self, timeout=1.0):
+        """Flush what is pending (best effort) and stop the sender thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        for conn in list(self._conns.values()):
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._conns.clear()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                _, item = self._pending.popitem(last=False)
+                self._inflight += 1
+            url, body, content_type = item
+            started = time.perf_counter()
+            ok = self._post(url, body, content_type)
+            with self._cond:
+                self.stats["last_send_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+                if ok:
+                    self.stats["sent"] += 1
+                else:
+                    self.stats["errors"] += 1
+                    self.stats["dropped"] += 1
+                self._inflight -= 1
+                self._cond.notify_all()
+
+    def _connection(self, host, port, fresh=False):
+        key = (host, port)
+        conn = self._conns.get(key)
+        if conn is not None and fresh:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            conn = None
+        if conn is None:
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+            self._conns[key] = conn
+        return conn
+
+    def _post(self, url, body, content_type):
+        try:
+            if not isinstance(body, (bytes, bytearray, memoryview)):
+                body = json.dumps(body, separators=(",", ":")).encode("utf-8")
+            parts = urlsplit(url)
+            host = parts.hostname or "localhost"
+            port = parts.port or 80
+            path = parts.path or "/"
+            if parts.query:
+                path = f"{path}?{parts.query}"
+            headers = {"Content-Type": content_type, "Content-Length": str(len(body))}
+        except Exception:
+            return False
+
+        # A kept-alive connection may have been closed by the server; retry once on a fresh one.
+        for attempt in range(2):
+            try:
+                conn = self._connection(host, port, fresh=(attempt > 0))
+                conn.request("POST", path, body=body, headers=headers)
+                res = conn.getresponse()
+                res.read()
+                if res.will_close:
+                    self._connection(host, port, fresh=True)
+                return 200 <= res.status < 300
+            except Exception:
+                try:
+                    self._conns.pop((host, port)).close()
+                except Exception:
+                    pass
+        return False
@@ -0,0 +1,269 @@
+# tile_grid.py
+# Vectorized tile-grid maps for the decision scripts (seen / unseen / ball-memory tiles):
+# - TileGrid holds the tile centres of the square field as NumPy arrays; maps are float
+#   arrays of shape (rows, cols) with row 0 at the top (+y), the layout of FIELD_TILES
+# - view_mask, footprint_mask, balls_in_tiles, box_mean, nearest_tile and best_tile replace
+#   the per-tile Python loops with array operations that give the same numbers
+# - the tile size is a constructor argument, so refining the grid (5 cm, 2.5 cm) only
+#   changes array sizes; box_mean uses cumulative sums, so its cost does not grow with
+#   the window; window / near_tiles / nearest_tile look only at the block of tiles around
+#   one point, so per-ball updates cost the same on any grid
+# - parse_map / format_map keep the text format of the decision_making_data maps
+#   (one row per line, comma separated, "0" or "%.3f"); to_grid / from_grid are the binary
+#   form (decision_grids.py), and quantize gives the values the text would read back as
+import math
+import re
+
+import numpy as np
+
+import decision_grids
+
+FIELD_HALF = 1.0
+# Tile centres are rounded like the original FIELD_TILES (round(..., 3) on a 0.1 m grid);
+# 6 digits keeps finer grids exact and gives the same floats on the 0.1 m one.
+CENTRE_DIGITS = 6
+ZERO_EPS = 1e-12
+
+_NUMBER_RE = re.compile(r"[-+]?[0-9]*\.?[0-9]+")
+
+
+class TileGrid:
+    """Square grid of `tile_size` tiles covering [-field_half, field_half]^2."""
+    def __init__(self, tile_size=0.1, field_half=FIELD_HALF):
+        self.tile_size = float(tile_size)
+        self.tile_half = self.tile_size / 2.0
+        self.count = int(round(2.0 * field_half / self.tile_size))
+        self.shape = (self.count, self.count)
+        xs = [round(-field_half + self.tile_half + i * self.tile_size, CENTRE_DIGITS) for i in range(self.count)]
+        ys = [round(field_half - self.tile_half - i * self.tile_size, CENTRE_DIGITS) for i in range(self.count)]
+        self.xs = np.array(xs, dtype=float)
+        self.ys = np.array(ys, dtype=float)
+        # X[r, c], Y[r, c]: centre of tile (r, c).
+        self.X, self.Y = np.meshgrid(self.xs, self.ys)
+
+    def tiles(self):
+        """Nested list of (x, y) tile centres, FIELD_TILES[row][col]."""
+        return [[(float(x), float(y)) for x in self.xs] for y in self.ys]
+
+    def zeros(self):
+        return np.zeros(self.shape, dtype=float)
+
+    def cells(self, radius_m):
+        """Window radius in tiles for a distance in metres (0.2 m -> 2 on the 0.1 m grid)."""
+        return int(round(radius_m / self.tile_size))
+
+    def corners(self):
+        """The four tile-corner grids, in the order the scalar helpers visit them."""
+        h = self.tile_half
+        return (
+            (self.X - h, self.Y - h),
+            (self.X - h, self.Y + h),
+            (self.X + h, self.Y - h),
+            (self.X + h, self.Y + h),
+        )
+
+    def distance(self, x, y):
+        return np.hypot(self.X - x, self.Y - y)
+
+    def distance2(self, x, y):
+        dx = self.X - x
+        dy = self.Y - y
+        return dx * dx + dy * dy
+
+    def view_mask(self, pose, fov_deg, view_range, points=None):
+        """Bool array: which points (default: tile centres) are in the robot's view cone.
+
+        Same tests as waypoints_cruise.in_view: inside the field, pose with a bearing,
+        0.1 m <= distance <= view_range and within +/- fov/2 of the bearing.
+        """
+        px, py = (self.X, self.Y) if points is None else points
+        if pose is None or pose[2] is None or view_range <= 0.0 or fov_deg <= 0.0:
+            return np.zeros(np.shape(px), dtype=bool)
+        cx, cy, bearing = pose
+        dx = px - cx
+        dy = py - cy
+        dist = np.hypot(dx, dy)
+        target_angle = np.arctan2(dy, dx)
+        heading = math.radians(bearing)
+        angle_diff = np.arctan2(np.sin(target_angle - heading), np.cos(target_angle - heading))
+        return (
+            (np.abs(px) <= FIELD_HALF) & (np.abs(py) <= FIELD_HALF)
+            & (dist <= view_range) & ~(dist < 0.1)
+            & ~(np.abs(angle_diff) > math.radians(fov_deg) * 0.5)
+        )
+
+    def completely_seen_mask(self, pose, fov_deg, view_range):
+        """Tiles whose four corners are all in view."""
+        mask = np.ones(self.shape, dtype=bool)
+        for corner in self.corners():
+            mask &= self.view_mask(pose, fov_deg, view_range, points=corner)
+        return mask
+
+    def footprint_mask(self, pose, half, whole_tile=True):
+        """Tiles under the robot's square footprint (side 2 * half, rotated by the bearing).
+
+        whole_tile: all four tile corners must be inside; otherwise only the centre.
+        """
+        cx, cy, bearing = pose
+        theta = math.radians(bearing) if bearing is not None else 0.0
+        cos_t = math.cos(theta)
+        sin_t = math.sin(theta)
+        points = self.corners() if whole_tile else ((self.X, self.Y),)
+        mask = np.ones(self.shape, dtype=bool)
+        for px, py in points:
+            dx = px - cx
+            dy = py - cy
+            x_robot = dx * cos_t + dy * sin_t
+            y_robot = -dx * sin_t + dy * cos_t
+            mask &= (np.abs(x_robot) <= half) & (np.abs(y_robot) <= half)
+        return mask
+
+    def _span(self, offset, radius):
+        # Index range covering offset +/- radius (in tiles), one tile of slack each side,
+        # clamped to the grid; never empty, so off-field points get the edge tiles.
+        lo = min(max(int(math.floor(offset - radius)) - 1, 0), self.count - 1)
+        hi = max(min(int(math.ceil(offset + radius)) + 2, self.count), lo + 1)
+        return slice(lo, hi)
+
+    def window(self, x, y, radius):
+        """(row slice, col slice) holding every tile whose centre is within radius of (x, y).
+
+        Updates around one ball touch only this block instead of the whole map.
+        """
+        radius = radius / self.tile_size
+        rows = self._span((self.ys[0] - y) / self.tile_size, radius)
+        cols = self._span((x - self.xs[0]) / self.tile_size, radius)
+        return rows, cols
+
+    def near_tiles(self, x, y, radius):
+        """(rows, cols, mask): window() and which of its tiles are within radius (d^2 <= r^2)."""
+        rows, cols = self.window(x, y, radius)
+        dx = self.X[rows, cols] - x
+        dy = self.Y[rows, cols] - y
+        return rows, cols, dx * dx + dy * dy <= radius * radius
+
+    def balls_in_tiles(self, balls_xy):
+        """Tiles that contain at least one of the (n, 2) ball positions (edges inclusive)."""
+        mask = np.zeros(self.shape, dtype=bool)
+        h = self.tile_half
+        for bx, by in np.asarray(balls_xy, dtype=float).reshape(-1, 2):
+            rows, cols = self.window(bx, by, h)
+            mask[rows, cols] |= (np.abs(bx - self.X[rows, cols]) <= h) & (np.abs(by - self.Y[rows, cols]) <= h)
+        return mask
+
+    def nearest_tile(self, x, y):
+        """(row, col) of the tile centre nearest to (x, y); the first in row order on ties."""
+        rows, cols = self.window(x, y, 0.0)
+        dx = self.X[rows, cols] - x
+        dy = self.Y[rows, cols] - y
+        r, c = divmod(int(np.argmin(dx * dx + dy * dy)), cols.stop - cols.start)
+        return rows.start + r, cols.start + c
+
+    def best_tile(self, values, x, y, tol=1e-9):
+        """(row, col, value) of the largest value, nearest to (x, y) among values within tol.
+
+        Matches the scan in goto_unseen_region for maps read back from their 3-decimal text.
+        """
+        best = float(np.max(values))
+        d2 = np.where(np.abs(values - best) < tol, self.distance2(x, y), np.inf)
+        r, c = divmod(int(np.argmin(d2)), self.count)
+        return r, c, best
+
+
+def decay(values, amount):
+    """Subtract `amount` from every tile, floored at 0."""
+    return np.maximum(0.0, values - amount)
+
+
+def box_mean(values, radius):
+    """Mean over the (2 * radius + 1)^2 window around every tile, counting in-field tiles only.
+
+    Window sums come from 2-D cumulative sums. They are exact (and equal to the nested-loop
+    sums) while the map holds integers, as the per-second unseen counters do.
+    """
+    rows, cols = values.shape
+    padded = np.zeros((rows + 1, cols + 1), dtype=float)
+    np.cumsum(np.cumsum(values, axis=0), axis=1, out=padded[1:, 1:])
+    r0 = np.clip(np.arange(rows) - radius, 0, rows)
+    r1 = np.clip(np.arange(rows) + radius + 1, 0, rows)
+    c0 = np.clip(np.arange(cols) - radius, 0, cols)
+    c1 = np.clip(np.arange(cols) + radius + 1, 0, cols)
+    total = (
+        padded[np.ix_(r1, c1)] - padded[np.ix_(r0, c1)]
+        - padded[np.ix_(r1, c0)] + padded[np.ix_(r0, c0)]
+    )
+    count = np.outer(r1 - r0, c1 - c0)
+    return np.where(count > 0, total / np.maximum(count, 1), 0.0)
+
+
+def quantize(values):
+    """`values` as format_map + parse_map would return them, without the text round trip.
+
+    np.round(values, 3) except for the near-ties, where it can pick the other neighbour
+    than "%.3f" does; those few are formatted like the text.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.round(values, 3)
+    scaled = values * 1000.0
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        out[near_tie] = [float(f"{v:.3f}") for v in values[near_tie].tolist()]
+    out[np.abs(values) < ZERO_EPS] = 0.0
+    return out
+
+
+def fit(values, shape):
+    """`values` cut or zero-padded to `shape` (top-left aligned), like parse_map does."""
+    if values.shape == tuple(shape):
+        return values
+    out = np.zeros(shape, dtype=float)
+    rows = min(shape[0], values.shape[0])
+    cols = min(shape[1], values.shape[1])
+    out[:rows, :cols] = values[:rows, :cols]
+    return out
+
+
+def to_grid(values) -> str:
+    """Grid string of a map: int32 thousandths when that is exact (maps from quantize()),
+    float64 otherwise."""
+    values = np.ascontiguousarray(values, dtype=float)
+    rows, cols = values.shape
+    milli = np.rint(values * decision_grids.MILLI)
+    if (np.all(np.abs(milli) <= decision_grids.INT32_MAX)
+            and np.array_equal(milli / decision_grids.MILLI, values)):
+        return decision_grids.encode(rows, cols, milli.astype("<i4").tobytes(), "i4z")
+    return decision_grids.encode(rows, cols, values.astype("<f8").tobytes())
+
+
+def from_grid(value, shape):
+    """Map from its grid string, fitted to `shape`; None if it does not decode."""
+    grid = decision_grids.decode(value)
+    if grid is None:
+        return None
+    rows, cols, kind, data = grid
+    if kind == "i4z":
+        values = np.frombuffer(data, dtype="<i4").reshape(rows, cols) / decision_grids.MILLI
+    else:
+        values = np.frombuffer(data, dtype="<f8").astype(float).reshape(rows, cols)
+    return fit(values, shape)
+
+
+def parse_map(text, shape):
+    """Map from its text form; missing rows/values stay 0."""
+    rows, cols = shape
+    values = np.zeros(shape, dtype=float)
+    for r, line in enumerate(text.splitlines()[:rows]):
+        nums = _NUMBER_RE.findall(line)[:cols]
+        for c, num in enumerate(nums):
+            try:
+                values[r, c] = float(num)
+            except Exception:
+                values[r, c] = 0.0
+    return values
+
+
+def format_map(values):
+    def _fmt(v):
+        return "0" if abs(v) < ZERO_EPS else f"{v:.3f}"
+
+    return "\n".join(",".join(_fmt(v) for v in row) for row in np.asarray(values).tolist()) + "\n"
@@ -0,0 +1,176 @@
+# world_registry.py
+# Ball and robot registry for the supervisor:
+# - resolves Webots node and field handles once at bootstrap
+# - reads each ball type once (robotName never changes at runtime)
+# - keeps a per-frame NumPy snapshot of ball positions and robot poses
+# - absorption and the simulation_data text lines computed from that snapshot
+#   (shared by the Webots supervisor and the headless fast sim)
+import math
+
+import numpy as np
+
+import field_geometry
+import radar_model
+
+
+class WorldRegistry:
+    """Cached node handles plus a per-frame pose snapshot shared by all consumers.
+
+    Rows of `robot_pose` are (x, y, theta_rad) with the main robot at index 0
+    followed by the obstacle robots that exist in the world, in name order.
+    Rows of `ball_xyz` follow `ball_names` (missing DEFs are skipped).
+    """
+    def __init__(self, supervisor, ball_prefix, ball_count, main_robot_name, obstacle_robot_names):
+        self.supervisor = supervisor
+
+        self.ball_names = []
+        self.ball_nodes = []
+        self.ball_trans = []
+        steel = []
+        for i in range(ball_count):
+            name = f"{ball_prefix}{i}"
+            node = supervisor.getFromDef(name)
+            if node is None:
+                continue
+            is_steel = False
+            try:
+                name_field = node.getField("robotName").getSFString()
+                if name_field is not None and "steel" in name_field.lower():
+                    is_steel = True
+            except Exception:
+                pass
+            self.ball_names.append(name)
+            self.ball_nodes.append(node)
+            self.ball_trans.append(node.getField("translation"))
+            steel.append(is_steel)
+        self.ball_index = {name: i for i, name in enumerate(self.ball_names)}
+        self.ball_is_steel = np.array(steel, dtype=bool)
+        self.ball_absorbed = np.zeros(len(self.ball_names), dtype=bool)
+        self.ball_xyz = np.zeros((len(self.ball_names), 3), dtype=float)
+
+        self.robot_names = []
+        self.robot_nodes = []
+        self.robot_trans = []
+        self.robot_rot = []
+        for name in [main_robot_name] + list(obstacle_robot_names):
+            node = supervisor.getFromDef(name)
+            if node is None:
+                continue
+            self.robot_names.append(name)
+            self.robot_nodes.append(node)
+            self.robot_trans.append(node.getField("translation"))
+            self.robot_rot.append(node.getField("rotation"))
+        self.robot_pose = np.zeros((len(self.robot_nodes), 3), dtype=float)
+
+        self.refresh()
+
+    @property
+    def ball_count(self):
+        return len(self.ball_names)
+
+    def ball_type(self, i):
+        return "steel" if self.ball_is_steel[i] else "ping"
+
+    def robot_index(self, node):
+        for j, candidate in enumerate(self.robot_nodes):
+            if candidate == node:
+                return j
+        return None
+
+    def refresh_balls(self):
+        for i, field in enumerate(self.ball_trans):
+            pos = field.getSFVec3f()
+            self.ball_xyz[i, 0] = float(pos[0])
+            self.ball_xyz[i, 1] = float(pos[1])
+            self.ball_xyz[i, 2] = float(pos[2])
+
+    def refresh_robots(self):
+        for j in range(len(self.robot_nodes)):
+            pos = self.robot_trans[j].getSFVec3f()
+            rot = self.robot_rot[j].getSFRotation()
+            self.robot_pose[j, 0] = float(pos[0])
+            self.robot_pose[j, 1] = float(pos[1])
+            self.robot_pose[j, 2] = float(rot[3])
+
+    def refresh(self):
+        """Take this frame's snapshot; call once per step after motion updates."""
+        self.refresh_balls()
+        self.refresh_robots()
+
+    def set_ball_position(self, i, xyz, reset_physics=True):
+        """Move a ball and keep the snapshot in sync with the write."""
+        self.ball_trans[i].setSFVec3f([float(xyz[0]), float(xyz[1]), float(xyz[2])])
+        self.ball_xyz[i, 0] = float(xyz[0])
+        self.ball_xyz[i, 1] = float(xyz[1])
+        self.ball_xyz[i, 2] = float(xyz[2])
+        if reset_physics:
+            try:
+                self.ball_nodes[i].resetPhysics()
+            except Exception:
+                pass
+
+    # -------------------------------------------------------------------------
+    # GAME RULES ON THE SNAPSHOT
+    # -------------------------------------------------------------------------
+    def absorb(self, ridx, half_x, half_y, absorb_location):
+        """Teleport balls inside robot `ridx`'s intake box to `absorb_location`.
+
+        Returns the absorbed ball indices in ascending order.
+        """
+        mask = field_geometry.absorption_mask(
+            self.ball_xyz[:, :2], self.ball_is_steel, self.ball_absorbed, self.robot_pose[ridx], half_x, half_y
+        )
+        absorbed = [int(i) for i in np.nonzero(mask)[0]]
+        for i in absorbed:
+            self.set_ball_position(i, absorb_location)
+            self.ball_absorbed[i] = True
+        return absorbed
+
+    def radar_distances(self, max_range, corridor, model=None):
+        """Nearest radar distance per direction for the main robot, clamped to [0, max_range]."""
+        model = (model or radar_model.RADAR_MODEL).strip().lower()
+        if model == "sampled":
+            return field_geometry.radar_minima(self.robot_pose[0], self.robot_pose[1:], max_range, corridor)
+        cx, cy, bearing_rad = (float(v) for v in self.robot_pose[0])
+        obstacles = [(float(x), float(y), math.degrees(float(t))) for x, y, t in self.robot_pose[1:]]
+        hits = radar_model.analytic_hits(
+            cx, cy, math.degrees(bearing_rad), obstacles, walls=True, max_range=max_range, corridor=corridor
+        )
+        memory_values = {direction: max_range for direction in radar_model.RADAR_DIRECTIONS}
+        for direction, dist in hits.items():
+            memory_values[direction] = max(0.0, dist)
+        return memory_values
+
+    def format_ball_positions(self):
+        """In-field balls as "(x, y, TYPE)" lines; returns (text, line_count)."""
+        lines = []
+        for i in np.nonzero(field_geometry.in_field_mask(self.ball_xyz[:, :2]))[0]:
+            x = float(self.ball_xyz[i, 0])
+            y = float(self.ball_xyz[i, 1])
+            typ = "metal" if self.ball_is_steel[i] else "ping"
+            lines.append(f"({x:.6f}, {y:.6f}, {typ.upper()})")
+        return "\n".join(lines), len(lines)
+
+    def format_current_position(self):
+        x, y, bearing_rad = (float(v) for v in self.robot_pose[0])
+        bearing_deg = math.degrees(bearing_rad)
+        return f"({x:.6f}, {y:.6f}, {bearing_deg:.2f})"
+
+    def format_obstacle_positions(self):
+        lines = []
+        for x, y, theta in self.robot_pose[1:]:
+            bearing_deg = math.degrees(float(theta))
+            lines.append(f"({float(x):.6f}, {float(y):.6f}, {bearing_deg:.2f})")
+        return "\n".join(lines)
+
+    def format_visible_balls(self, viewfield_deg, visible_range_m):
+        lines = []
+        mask = field_geometry.visible_mask(
+            self.ball_xyz[:, :2], self.robot_pose[0], self.robot_pose[1:], viewfield_deg, visible_range_m
+        )
+        for i in np.nonzero(mask)[0]:
+            bx = float(self.ball_xyz[i, 0])
+            by = float(self.ball_xyz[i, 1])
+            typ = "METAL" if self.ball_is_steel[i] else "PING"
+            lines.append(f"({bx:.6f}, {by:.6f}, {typ})")
+        return "\n".join(lines)
@@ -0,0 +1,108 @@
+# write_batch.py
+# Tick-scoped write batching for the decision scripts' decision_making_data:
+# - `with batch.tick():` wraps one main() run; the script stages its writes locally and
+#   the batch sends them as one merged payload when the outermost tick exits, also when
+#   the handler raises
+# - outside a tick, written() flushes at once, so a helper called on its own still
+#   writes through as before
+# - async flush ("decision_making_data_async_flush": true in config.json): the tick-end
+#   payload is sent by one background thread, in order; an unsent payload is replaced by
+#   a newer one (each carries the whole dict), and the next tick waits for the send
+#   before it reads anything, so it sees what the previous tick wrote
+# Standard library only.
+import atexit
+import json
+import threading
+from contextlib import contextmanager
+
+CONFIG_KEY = "decision_making_data_async_flush"
+# Longer than the scripts' 0.3 s POST timeout.
+WAIT_TIMEOUT_S = 2.0
+
+
+def load_async_flush(path) -> bool:
+    try:
+        with open(path, "r") as f:
+            payload = json.loads(f.read().strip())
+        if isinstance(payload, dict):
+            return bool(payload.get(CONFIG_KEY, False))
+    except Exception:
+        pass
+    return False
+
+
+class WriteBatch:
+    """One script's staged writes, flushed through build() and send().
+
+    build() runs on the caller's thread and returns the payload to send, or None when
+    nothing is staged; send(payload) -> bool is the transport.
+    """
+    def __init__(self, build, send, async_flush=False):
+        self.build = build
+        self.send = send
+        self.async_flush = bool(async_flush)
+        self.depth = 0
+        self._cond = threading.Condition()
+        self._pending = None
+        self._sending = False
+        self._thread = None
+
+    @property
+    def active(self) -> bool:
+        return self.depth > 0
+
+    @contextmanager
+    def tick(self):
+        if self.depth == 0:
+            self.wait()
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+            if self.depth == 0:
+                self.flush(background=self.async_flush)
+
+    def written(self) -> bool:
+        """Call after staging a write: True inside a tick, else the result of flushing now."""
+        if self.active:
+            return True
+        return self.flush()
+
+    def flush(self, background=False) -> bool:
+        payload = self.build()
+        if payload is None:
+            return True
+        if not background:
+            self.wait()
+            return bool(self.send(payload))
+        with self._cond:
+            self._pending = payload
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write_batch", daemon=True)
+                self._thread.start()
+                # One-shot runs exit right after main(); let the last payload go out.
+                atexit.register(self.wait)
+            self._cond.notify_all()
+        return True
+
+    def wait(self, timeout=WAIT_TIMEOUT_S) -> bool:
+        """Block until no background send is queued or running; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._sending, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None)
+                payload = self._pending
+                self._pending = None
+                self._sending = True
+            try:
+                self.send(payload)
+            except Exception:
+                pass
+            finally:
+                with self._cond:
+                    self._sending = False
+                    self._cond.notify_all()
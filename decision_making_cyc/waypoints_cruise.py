@@ -29,6 +29,8 @@ import re
 import urllib.request
 from typing import Optional
 
+import numpy as np
+
 from decision_making_ros.waypoints_cruise import VISIBLE_RANGE_METERS
 
 
@@ -42,6 +44,17 @@ WHO_IS_DEV_JSON_FILE = os.path.join(PROJECT_ROOT, "config.json")
 REAL_TIME_DIR = os.path.join(THIS_DIR, "real_time_data")
 BASE_DIR = os.path.abspath(os.path.join(THIS_DIR, "..", "controllers", "supervisor_controller", "real_time_data"))
 SUPERVISOR_DIR = os.path.dirname(BASE_DIR)
+
+# Shared radar model lives next to the supervisor controller.
+if SUPERVISOR_DIR not in sys.path:
+    sys.path.append(SUPERVISOR_DIR)
+import radar_model
+import sim_snapshot
+import state_bus
+import tile_grid
+import decision_grids
+import write_batch
+import ball_index
 HTML_PORT_FILE = os.path.join(SUPERVISOR_DIR, "html_port.txt")
 
 WAYPOINT_STATUS_FILE = os.path.join(BASE_DIR, "waypoint_status.txt")
@@ -107,6 +120,20 @@ def _load_default_angular_velocity() -> float:
         pass
     return default_angular_velocity
 
+def _load_ball_memory_ttl() -> Optional[float]:
+    """"ball_memory_ttl_s" in config.json: seconds after its last sighting that a remembered
+    ball is forgotten (None, the default: remembered for the whole match)."""
+    try:
+        with open(WHO_IS_DEV_JSON_FILE, "r") as f:
+            payload = json.loads(f.read().strip())
+        if isinstance(payload, dict):
+            ttl = float(payload.get("ball_memory_ttl_s", 0) or 0)
+            if ttl > 0:
+                return ttl
+    except Exception:
+        pass
+    return None
+
 # generation bounds (match supervisor playground bounds)
 X_MIN, X_MAX = -0.86, 0.86
 Y_MIN, Y_MAX = -0.86, 0.86
@@ -114,6 +141,7 @@ RADAR_MAX_RANGE = 0.8
 MAX_LINEAR_VELOCITY = 0.7
 DEFAULT_LINEAR_VELOCITY = _load_default_linear_velocity()
 DEFAULT_ANGULAR_VELOCITY = _load_default_angular_velocity() # degrees per second
+BALL_MEMORY_TTL_S = _load_ball_memory_ttl()
 VIRTUAL_WALL = 1.1  # Virtual wall distance for collision avoiding (meters)
 INTAKE_RANGE = 0.1  # Range within which the robot can reliably intake the ball (meters)
 FIELD_OF_VIEW_DEGREES = 120.0
@@ -129,11 +157,35 @@ def _load_html_port(path, default_port=5001):
         pass
     return default_port
 
+def _load_data_flow() -> str:
+    """"shm" reads/writes the supervisor's shared-memory state bus; anything else is HTTP."""
+    try:
+        with open(WHO_IS_DEV_JSON_FILE, "r") as f:
+            payload = json.loads(f.read().strip())
+        if isinstance(payload, dict):
+            flow = str(payload.get("data_flow", payload.get("data flow", "web"))).strip().lower()
+            if flow == "shm":
+                return flow
+    except Exception:
+        pass
+    return "web"
+
 FIELD_VIEWER_PORT = _load_html_port(HTML_PORT_FILE)
+DATA_FLOW = _load_data_flow()
+# Attached lazily; until the supervisor has created the bus every call falls back to HTTP.
+STATE_BUS = state_bus.Connector(state_bus.load_bus_name(WHO_IS_DEV_JSON_FILE, FIELD_VIEWER_PORT)) if DATA_FLOW == "shm" else None
 SIM_DATA_URL = f"http://localhost:{FIELD_VIEWER_PORT}/simulation_data"
 SIM_DATA_URL_FALLBACK = f"http://localhost:{FIELD_VIEWER_PORT}/data/simulation_data"
 SIM_DATA_TIMEOUT = 0.2
 SIM_DATA_CACHE = {}
+# Delta mirror of /data/simulation_data; not a *_CACHE so it survives across
+# ticks in the persistent decision worker and only changed keys are fetched.
+SIM_DATA_MIRROR = sim_snapshot.new_mirror()
+# Typed view of SIM_DATA_CACHE (see _world()); rebuilt whenever the cache is replaced.
+WORLD_MODEL = None
+# Remembered balls per ball_memory path (ball_index.py), rebuilt only when the stored
+# text is not the one the index wrote; like SIM_DATA_MIRROR it persists across ticks.
+BALL_INDEXES = {}
 DECISIONS_URL = f"http://localhost:{FIELD_VIEWER_PORT}/decisions"
 DECISIONS_URL_FALLBACK = f"http://localhost:{FIELD_VIEWER_PORT}/data/decisions"
 DECISIONS_TIMEOUT = 0.2
@@ -144,6 +196,8 @@ DECISIONS_LOCAL_CACHE = {
 }
 DECISION_MAKING_DATA_URL = f"http://localhost:{FIELD_VIEWER_PORT}/decision_making_data"
 DECISION_MAKING_DATA_URL_FALLBACK = f"http://localhost:{FIELD_VIEWER_PORT}/data/decision_making_data"
+# Tile maps as sent (decision_grids.py), not the viewer's text view.
+DECISION_MAKING_DATA_RAW_URL = f"{DECISION_MAKING_DATA_URL_FALLBACK}?view=raw"
 DECISION_MAKING_DATA_TIMEOUT = 0.2
 DECISION_MAKING_DATA_CACHE = {}
 DECISION_MAKING_DATA_LOCAL_CACHE = {}
@@ -210,19 +264,13 @@ SEARCHING_SEQUENCE = [
 
 # Build 0.1m point grid over [-1, 1] x [-1, 1].
 # Top-left is (-0.95, 0.95), bottom-right is (0.95, -0.95).
+# The tile maps below are NumPy arrays over TILE_GRID (tile_grid.py), so a finer
+# TILE_SIZE only makes the arrays larger.
 TILE_SIZE = 0.1
 TILE_HALF = TILE_SIZE / 2.0
-GRID_COUNT = int(round(2.0 / TILE_SIZE))
-FIELD_TILES = [
-    [
-        (
-            round(-1.0 + TILE_HALF + col * TILE_SIZE, 3),
-            round(1.0 - TILE_HALF - row * TILE_SIZE, 3),
-        )
-        for col in range(GRID_COUNT)
-    ]
-    for row in range(GRID_COUNT)
-]
+TILE_GRID = tile_grid.TileGrid(TILE_SIZE)
+GRID_COUNT = TILE_GRID.count
+FIELD_TILES = TILE_GRID.tiles()
 
 
 # =============================================================================
@@ -241,8 +289,31 @@ def _parse_sim_data_from_html(text: str) -> dict:
         return {}
 
 
+def _state_bus():
+    return STATE_BUS.get() if STATE_BUS is not None else None
+
+
 def _refresh_sim_data() -> None:
     global SIM_DATA_CACHE
+    bus = _state_bus()
+    if bus is not None:
+        # Backed by the bus's world record; only keys it does not carry decode the JSON.
+        data = bus.read_simulation_data()
+        if data:
+            SIM_DATA_CACHE = data
+            return
+    try:
+        url = sim_snapshot.delta_url(SIM_DATA_URL_FALLBACK, SIM_DATA_MIRROR)
+        with urllib.request.urlopen(url, timeout=SIM_DATA_TIMEOUT) as res:
+            envelope = json.loads(res.read().decode("utf-8", errors="ignore"))
+        if sim_snapshot.is_envelope(envelope):
+            if sim_snapshot.apply_envelope(SIM_DATA_MIRROR, envelope) and SIM_DATA_MIRROR["values"]:
+                SIM_DATA_CACHE = dict(SIM_DATA_MIRROR["values"])
+                return
+            # Out of step with the viewer: drop the mirror and take a full read below.
+            SIM_DATA_MIRROR.update(sim_snapshot.new_mirror())
+    except Exception:
+        pass
     for url in (SIM_DATA_URL_FALLBACK, SIM_DATA_URL):
         try:
             with urllib.request.urlopen(url, timeout=SIM_DATA_TIMEOUT) as res:
@@ -268,6 +339,12 @@ def _get_sim_value(key: str):
 
 def _refresh_decisions_data() -> None:
     global DECISIONS_CACHE
+    bus = _state_bus()
+    if bus is not None:
+        _, data = bus.read_dict("decisions")
+        if data is not None:
+            DECISIONS_CACHE = data
+            return
     for url in (DECISIONS_URL_FALLBACK, DECISIONS_URL):
         try:
             with urllib.request.urlopen(url, timeout=DECISIONS_TIMEOUT) as res:
@@ -305,6 +382,10 @@ def _require_decision_value(key: str, source_path: str):
 
 def _post_decisions_data(payload: dict) -> bool:
     global DECISIONS_CACHE
+    bus = _state_bus()
+    if bus is not None and bus.publish_decisions(payload):
+        DECISIONS_CACHE = payload
+        return True
     try:
         body = json.dumps(payload).encode("utf-8")
         req = urllib.request.Request(
@@ -323,9 +404,15 @@ def _post_decisions_data(payload: dict) -> bool:
 
 def _refresh_decision_making_data() -> bool:
     global DECISION_MAKING_DATA_CACHE
+    bus = _state_bus()
+    if bus is not None:
+        _, data = bus.read_dict("decision_making_data")
+        if data is not None:
+            DECISION_MAKING_DATA_CACHE = data
+            return True
     try:
         with urllib.request.urlopen(
-            DECISION_MAKING_DATA_URL_FALLBACK,
+            DECISION_MAKING_DATA_RAW_URL,
             timeout=DECISION_MAKING_DATA_TIMEOUT,
         ) as res:
             data = json.loads(res.read().decode("utf-8"))
@@ -338,6 +425,8 @@ def _refresh_decision_making_data() -> bool:
 
 
 def _get_decision_making_value(key: str):
+    if key in DECISION_MAKING_DATA_LOCAL_CACHE:
+        return DECISION_MAKING_DATA_LOCAL_CACHE[key]
     if DECISION_MAKING_DATA_CACHE:
         return DECISION_MAKING_DATA_CACHE.get(key)
     _refresh_decision_making_data()
@@ -346,8 +435,18 @@ def _get_decision_making_value(key: str):
 
 def _post_decision_making_data(payload: dict) -> bool:
     global DECISION_MAKING_DATA_CACHE
+    bus = _state_bus()
+    if bus is not None and bus.write_dict("decision_making_data", payload):
+        DECISION_MAKING_DATA_CACHE = payload
+        return True
+    # The viewer merges posted keys: values it already has this tick (e.g. a tile map
+    # that did not change) are not sent again.
+    base = DECISION_MAKING_DATA_CACHE
+    changed = {key: value for key, value in payload.items() if key not in base or base[key] != value}
+    if base and not changed:
+        return True
     try:
-        body = json.dumps(payload).encode("utf-8")
+        body = json.dumps(changed).encode("utf-8")
         req = urllib.request.Request(
             DECISION_MAKING_DATA_URL_FALLBACK,
             data=body,
@@ -362,13 +461,43 @@ def _post_decision_making_data(payload: dict) -> bool:
         return False
 
 
-def _update_decision_making_local(key: str, value: str) -> bool:
+def _update_decision_making_local(key: str, value) -> bool:
+    """Stage one decision_making_data value (text, or a tile-map array).
+
+    Reads see it at once; inside main() (DECISION_MAKING_DATA_BATCH.tick()) everything
+    staged is sent in one payload when the tick ends, otherwise it is sent now.
+    """
     DECISION_MAKING_DATA_LOCAL_CACHE[key] = value
+    return DECISION_MAKING_DATA_BATCH.written()
+
+
+def _wire_value(value):
+    return tile_grid.to_grid(value) if isinstance(value, np.ndarray) else value
+
+
+def _staged_decision_making_payload():
+    """The staged values merged over the viewer's decision_making_data; None if none."""
+    if not DECISION_MAKING_DATA_LOCAL_CACHE:
+        return None
     if not DECISION_MAKING_DATA_CACHE:
         _refresh_decision_making_data()
     payload = dict(DECISION_MAKING_DATA_CACHE) if DECISION_MAKING_DATA_CACHE else {}
-    payload.update(DECISION_MAKING_DATA_LOCAL_CACHE)
-    return _post_decision_making_data(payload)
+    payload.update({key: _wire_value(value) for key, value in DECISION_MAKING_DATA_LOCAL_CACHE.items()})
+    return payload
+
+
+def _send_decision_making_payload(payload: dict) -> bool:
+    if not _post_decision_making_data(payload):
+        return False
+    DECISION_MAKING_DATA_LOCAL_CACHE.clear()
+    return True
+
+
+DECISION_MAKING_DATA_BATCH = write_batch.WriteBatch(
+    _staged_decision_making_payload,
+    _send_decision_making_payload,
+    async_flush=write_batch.load_async_flush(WHO_IS_DEV_JSON_FILE),
+)
 
 
 def _bootstrap_stack_data() -> None:
@@ -388,7 +517,13 @@ def _decision_key(path: str) -> str:
 def _read_decision_text(path: str) -> str:
     key = _decision_key(path)
     value = _get_decision_making_value(key)
-    return "" if value is None else str(value)
+    if value is None:
+        return ""
+    if isinstance(value, np.ndarray):
+        return tile_grid.format_map(value)
+    if decision_grids.is_grid(value):
+        return decision_grids.to_text(value)
+    return str(value)
 
 
 def _write_decision_text(path: str, content: str) -> bool:
@@ -655,8 +790,7 @@ def _write_collision_status(active: bool) -> None:
 
 def _read_ball_positions(path: str):
     """Return list of (x,y,typ) from ball_position.txt. Ignores invalid lines."""
-    cached = _require_sim_value("ball_position", path)
-    return _parse_ball_lines(str(cached))
+    return list(_world_for(("ball_position", path)).balls)
 
 
 def _parse_ball_lines(text: str):
@@ -701,25 +835,31 @@ def _read_ball_memory_points(path: str) -> list[tuple[float, float]]:
     return out
 
 
-def _write_ball_memory_points(path: str, points: list[tuple[float, float]]) -> bool:
-    content = "\n".join(f"({x:.6f}, {y:.6f})" for x, y in points) + ("\n" if points else "")
-    return _atomic_write(path, content)
+def _ball_memory_index(path: str, now: float) -> ball_index.BallIndex:
+    """The BallIndex behind ball_memory.txt, reused while the stored text is its own.
+
+    With BALL_MEMORY_TTL_S set, balls unseen for that long (confidence 0) are dropped
+    first, so a later sighting there is a new ball again (update_ball_memory_v1 scores
+    its tiles anew).
+    """
+    index = BALL_INDEXES.get(path)
+    if index is None or index.text() != _read_decision_text(path):
+        index = ball_index.BallIndex.from_points(
+            _read_ball_memory_points(path), now, ttl_s=BALL_MEMORY_TTL_S or ball_index.TTL_S,
+        )
+        BALL_INDEXES[path] = index
+    if BALL_MEMORY_TTL_S is not None:
+        index.prune(now)
+    return index
 
 
 def _read_visible_ball_positions(path: str):
     """Return list of (x,y,typ) from visible_balls.txt. Ignores invalid lines."""
-    cached = _require_sim_value("visible_balls", path)
-    return _parse_ball_lines(str(cached))
+    return list(_world_for(("visible_balls", path)).visible_balls)
 
 
-def _read_current_position(path: str):
-    """Return (x, y, bearing_deg) from current_position.txt or None.
-    
-    Returns tuple of (x, y, bearing_deg) if bearing is present,
-    or (x, y, None) if only coordinates are available.
-    """
-    cached = _require_sim_value("current_position", path)
-    raw = str(cached).strip()
+def _parse_position_text(text: str):
+    raw = text.strip()
     if not raw:
         return None
     line = raw
@@ -737,10 +877,18 @@ def _read_current_position(path: str):
         return None
 
 
+def _read_current_position(path: str):
+    """Return (x, y, bearing_deg) from current_position.txt or None.
+    
+    Returns tuple of (x, y, bearing_deg) if bearing is present,
+    or (x, y, None) if only coordinates are available.
+    """
+    return _world_for(("current_position", path)).pose
+
+
 def _read_obstacle_positions(path: str):
     """Return list of (x, y, bearing_deg_or_none) from obstacle_robot.txt. Ignores invalid lines."""
-    cached = _require_sim_value("obstacle_robot", path)
-    return _parse_obstacle_lines(str(cached))
+    return list(_world_for(("obstacle_robot", path)).obstacles)
 
 
 def _parse_obstacle_lines(text: str):
@@ -764,15 +912,73 @@ def _parse_obstacle_lines(text: str):
     return out
 
 
-def _read_time_seconds(path: str) -> Optional[float]:
-    """Return current simulation time in seconds from time.txt, or None."""
-    cached = _require_sim_value("time", path)
+def _parse_time_text(text: str) -> Optional[float]:
     try:
-        return float(str(cached).strip())
+        return float(text.strip())
     except Exception:
         return None
 
 
+def _read_time_seconds(path: str) -> Optional[float]:
+    """Return current simulation time in seconds from time.txt, or None."""
+    return _world_for(("time", path)).time
+
+
+# =============================================================================
+# WORLD MODEL
+# simulation_data parsed once per snapshot instead of once per helper call.
+# =============================================================================
+def _xy_array(items) -> np.ndarray:
+    return np.array([(item[0], item[1]) for item in items], dtype=float).reshape(-1, 2)
+
+
+class WorldModel:
+    """Typed fields of one SIM_DATA_CACHE snapshot.
+
+    Each field is what the matching _read_* helper used to return, or None when
+    the key is missing from the snapshot. visible_ball_xy holds the (x, y)
+    columns of visible_balls for the vectorized tile masks. A snapshot read from
+    the state bus comes with those keys already parsed (world.values).
+    """
+    __slots__ = ("source", "time", "pose", "obstacles", "visible_balls", "visible_ball_xy", "balls")
+
+    def __init__(self, source: dict):
+        self.source = source
+        parsed = source.world.values if isinstance(source, state_bus.SimulationData) else {}
+        self.time = self._field("time", _parse_time_text, parsed)
+        self.pose = self._field("current_position", _parse_position_text, parsed)
+        self.obstacles = self._field("obstacle_robot", _parse_obstacle_lines, parsed)
+        self.visible_balls = self._field("visible_balls", _parse_ball_lines, parsed)
+        self.balls = self._field("ball_position", _parse_ball_lines, parsed)
+        self.visible_ball_xy = _xy_array(self.visible_balls or [])
+
+    def _field(self, key: str, parse, parsed: dict):
+        if key in parsed:
+            return parsed[key]
+        value = self.source.get(key) if self.source else None
+        if value is None:
+            return None
+        return parse(str(value))
+
+
+def _world() -> WorldModel:
+    """The world model of the current SIM_DATA_CACHE, parsed on first use after each refresh."""
+    global WORLD_MODEL
+    if WORLD_MODEL is None or WORLD_MODEL.source is not SIM_DATA_CACHE:
+        WORLD_MODEL = WorldModel(SIM_DATA_CACHE)
+    return WORLD_MODEL
+
+
+def _world_for(*required: tuple[str, str]) -> WorldModel:
+    """_world(), after the same refresh-or-raise as _require_sim_value for each (key, path)."""
+    world = _world()
+    for key, path in required:
+        if _get_sim_value(key) is None:
+            _require_sim_value(key, path)
+            world = _world()
+    return world
+
+
 def _read_wall_only_memory(
     path: str = WALL_ONLY_RADAR_MEMORY_FILE,
 ) -> list[tuple[float, dict[str, float]]]:
@@ -994,13 +1200,16 @@ def in_view(point,
             FOV: float = FIELD_OF_VIEW_DEGREES,
             Range: float = 0.8,
             current_file: str = CURRENT_POSITION_FILE,
-            obstacle_file: str = OBSTACLE_ROBOT_FILE) -> bool:
+            obstacle_file: str = OBSTACLE_ROBOT_FILE,
+            world: Optional[WorldModel] = None) -> bool:
     """Return whether robot can see a world point, considering FOV/range/occlusion.
 
     - If point is outside field bounds [-1, 1] x [-1, 1], return False.
     - Visibility is constrained by robot pose, FOV (degrees), and Range (meters).
     - Obstacles are modeled as 0.2 x 0.2 squares centered at obstacle positions,
       rotated by each obstacle bearing (if missing, 0 deg).
+    - Pass `world` (see _world()) when checking many points in one tick, so the
+      pose and obstacles are read once.
     """
 
     def _cross(ax: float, ay: float, bx: float, by: float) -> float:
@@ -1045,7 +1254,7 @@ def in_view(point,
     if abs(px) > 1.0 or abs(py) > 1.0:
         return False
 
-    cur = _read_current_position(current_file)
+    cur = _read_current_position(current_file) if world is None else world.pose
     if cur is None:
         return False
     cx, cy, bearing = cur
@@ -1071,7 +1280,7 @@ def in_view(point,
         return False
 
     # Occlusion by obstacle robots (0.2 x 0.2 square).
-    obstacles = _read_obstacle_positions(obstacle_file)
+    obstacles = _read_obstacle_positions(obstacle_file) if world is None else world.obstacles
     if not obstacles:
         return True
 
@@ -1116,83 +1325,18 @@ def radar_sensor(max_range: float = RADAR_MAX_RANGE, corridor: float = 0.2) -> l
     Directions: "front", "right", "left", "rear" within +/- corridor/2
     lateral band, and within max_range. Returns [] if nothing.
     """
-    cur = _read_current_position(CURRENT_POSITION_FILE)
+    world = _world_for(
+        ("current_position", CURRENT_POSITION_FILE),
+        ("obstacle_robot", OBSTACLE_ROBOT_FILE),
+    )
+    cur = world.pose
     if cur is None:
         return []
     cx, cy, bearing = cur
     if bearing is None:
         return []
 
-    half_band = corridor / 2.0
-    theta = math.radians(bearing)
-    cos_t = math.cos(theta)
-    sin_t = math.sin(theta)
-    hits = {}
-
-    obstacle_half = 0.1
-    robot_half = 0.1
-    sample_points_world = []
-
-    # 1) Collect obstacle edge samples in world frame.
-    obstacles = _read_obstacle_positions(OBSTACLE_ROBOT_FILE)
-    if obstacles:
-        sample_spacing = 0.1 * obstacle_half  # 0.01 spacing between sample points
-        obstacle_edge_samples_local = []
-
-        num_samples = int(2 * obstacle_half / sample_spacing) + 1
-        for i in range(num_samples):
-            offset = -obstacle_half + i * sample_spacing
-            obstacle_edge_samples_local.append((offset, obstacle_half))
-            obstacle_edge_samples_local.append((offset, -obstacle_half))
-            obstacle_edge_samples_local.append((-obstacle_half, offset))
-            obstacle_edge_samples_local.append((obstacle_half, offset))
-
-        for ox, oy, obearing in obstacles:
-            otheta = math.radians(obearing) if obearing is not None else 0.0
-            cos_o = math.cos(otheta)
-            sin_o = math.sin(otheta)
-            for lx, ly in obstacle_edge_samples_local:
-                wx = ox + lx * cos_o - ly * sin_o
-                wy = oy + lx * sin_o + ly * cos_o
-                sample_points_world.append((wx, wy))
-
-    # 2) Collect wall boundary samples in world frame.
-    edge_samples = [i * 0.05 for i in range(-20, 21)]
-    wall_samples = (
-        [(x, 1.0) for x in edge_samples]
-        + [(x, -1.0) for x in edge_samples]
-        + [(1.0, y) for y in edge_samples]
-        + [(-1.0, y) for y in edge_samples]
-    )
-    sample_points_world.extend(wall_samples)
-
-    # 3) Single pass radar projection/classification for all sample points.
-    for wx, wy in sample_points_world:
-        dx = wx - cx
-        dy = wy - cy
-        x_robot = dx * cos_t + dy * sin_t
-        y_robot = -dx * sin_t + dy * cos_t
-
-        if x_robot > 0 and abs(y_robot) <= half_band and x_robot <= max_range:
-            dist = x_robot - robot_half
-            direction = "front"
-        elif x_robot < 0 and abs(y_robot) <= half_band and -x_robot <= max_range:
-            dist = -x_robot - robot_half
-            direction = "rear"
-        elif y_robot > 0 and abs(x_robot) <= half_band and y_robot <= max_range:
-            dist = y_robot - robot_half
-            direction = "left"
-        elif y_robot < 0 and abs(x_robot) <= half_band and -y_robot <= max_range:
-            dist = -y_robot - robot_half
-            direction = "right"
-        else:
-            continue
-
-        # dist = max(0.0, dist)
-        if dist <= max_range:
-            prev = hits.get(direction)
-            if prev is None or dist < prev:
-                hits[direction] = dist
+    hits = radar_model.radar_hits(cx, cy, bearing, world.obstacles, walls=True, max_range=max_range, corridor=corridor)
 
     memory_values = {
         "front": RADAR_MAX_RANGE,
@@ -1260,49 +1404,10 @@ def wall_only_radar(
 
     max_range = RADAR_MAX_RANGE
     corridor = 0.2
-    half_band = corridor / 2.0
-
-    theta = math.radians(bearing)
-    cos_t = math.cos(theta)
-    sin_t = math.sin(theta)
-    robot_half = 0.1
-    predicted: dict[str, float] = {}
-
-    edge_samples = [i * 0.05 for i in range(-20, 21)]
-    wall_samples = (
-        [(x, 1.0) for x in edge_samples]
-        + [(x, -1.0) for x in edge_samples]
-        + [(1.0, y) for y in edge_samples]
-        + [(-1.0, y) for y in edge_samples]
+    predicted: dict[str, float] = radar_model.radar_hits(
+        cx, cy, bearing, (), walls=True, max_range=max_range, corridor=corridor
     )
 
-    for wx, wy in wall_samples:
-        dx = wx - cx
-        dy = wy - cy
-        x_robot = dx * cos_t + dy * sin_t
-        y_robot = -dx * sin_t + dy * cos_t
-
-        if x_robot > 0 and abs(y_robot) <= half_band and x_robot <= max_range:
-            dist = x_robot - robot_half
-            direction = "front"
-        elif x_robot < 0 and abs(y_robot) <= half_band and -x_robot <= max_range:
-            dist = -x_robot - robot_half
-            direction = "rear"
-        elif y_robot > 0 and abs(x_robot) <= half_band and y_robot <= max_range:
-            dist = y_robot - robot_half
-            direction = "left"
-        elif y_robot < 0 and abs(x_robot) <= half_band and -y_robot <= max_range:
-            dist = -y_robot - robot_half
-            direction = "right"
-        else:
-            continue
-
-        # dist = max(0.0, dist)
-        if dist <= max_range:
-            prev = predicted.get(direction)
-            if prev is None or dist < prev:
-                predicted[direction] = dist
-
     sim_time = _read_time_seconds(TIME_FILE)
     if sim_time is None:
         return predicted
@@ -1357,65 +1462,13 @@ def robot_only_radar(
 
     max_range = RADAR_MAX_RANGE
     corridor = 0.2
-    half_band = corridor / 2.0
-
-    theta = math.radians(bearing)
-    cos_t = math.cos(theta)
-    sin_t = math.sin(theta)
-    robot_half = 0.1
-    predicted: dict[str, float] = {}
-
-    obstacle_half = 0.1
-    sample_spacing = 0.1 * obstacle_half  # 0.01m
-    sample_points_world: list[tuple[float, float]] = []
-
     obstacles = _read_obstacle_positions(obstacle_file)
     if not obstacles:
         return {}
 
-    obstacle_edge_samples_local: list[tuple[float, float]] = []
-    num_samples = int(2 * obstacle_half / sample_spacing) + 1
-    for i in range(num_samples):
-        offset = -obstacle_half + i * sample_spacing
-        obstacle_edge_samples_local.append((offset, obstacle_half))
-        obstacle_edge_samples_local.append((offset, -obstacle_half))
-        obstacle_edge_samples_local.append((-obstacle_half, offset))
-        obstacle_edge_samples_local.append((obstacle_half, offset))
-
-    for ox, oy, obearing in obstacles:
-        otheta = math.radians(obearing) if obearing is not None else 0.0
-        cos_o = math.cos(otheta)
-        sin_o = math.sin(otheta)
-        for lx, ly in obstacle_edge_samples_local:
-            wx = ox + lx * cos_o - ly * sin_o
-            wy = oy + lx * sin_o + ly * cos_o
-            sample_points_world.append((wx, wy))
-
-    for wx, wy in sample_points_world:
-        dx = wx - cx
-        dy = wy - cy
-        x_robot = dx * cos_t + dy * sin_t
-        y_robot = -dx * sin_t + dy * cos_t
-
-        if x_robot > 0 and abs(y_robot) <= half_band and x_robot <= max_range:
-            dist = x_robot - robot_half
-            direction = "front"
-        elif x_robot < 0 and abs(y_robot) <= half_band and -x_robot <= max_range:
-            dist = -x_robot - robot_half
-            direction = "rear"
-        elif y_robot > 0 and abs(x_robot) <= half_band and y_robot <= max_range:
-            dist = y_robot - robot_half
-            direction = "left"
-        elif y_robot < 0 and abs(x_robot) <= half_band and -y_robot <= max_range:
-            dist = -y_robot - robot_half
-            direction = "right"
-        else:
-            continue
-
-        if dist <= max_range:
-            prev = predicted.get(direction)
-            if prev is None or dist < prev:
-                predicted[direction] = dist
+    predicted: dict[str, float] = radar_model.radar_hits(
+        cx, cy, bearing, obstacles, walls=False, max_range=max_range, corridor=corridor
+    )
 
     sim_time = _read_time_seconds(TIME_FILE)
     if sim_time is None:
@@ -2221,30 +2274,24 @@ def mode_realistic_nearest(status_file: str = WAYPOINT_STATUS_FILE,
 # =============================================================================
 def _read_seen_tile_matrix(path: str, rows: int, cols: int) -> list[list[float]]:
     """Read seen tile matrix from text file; return zero matrix on failure/missing data."""
-    matrix = [[0.0 for _ in range(cols)] for _ in range(rows)]
-    lines = _read_decision_text(path).splitlines()
-    if not lines:
-        return matrix
+    return tile_grid.fit(_read_tile_map(path), (rows, cols)).tolist()
 
-    for r in range(min(rows, len(lines))):
-        nums = re.findall(r"[-+]?[0-9]*\.?[0-9]+", lines[r])
-        for c in range(min(cols, len(nums))):
-            try:
-                matrix[r][c] = float(nums[c])
-            except Exception:
-                matrix[r][c] = 0.0
-    return matrix
 
+def _read_tile_map(path: str) -> np.ndarray:
+    """Tile map over TILE_GRID as a float array (a copy); zeros on failure/missing data."""
+    value = _get_decision_making_value(_decision_key(path))
+    if isinstance(value, np.ndarray):
+        return tile_grid.fit(value, TILE_GRID.shape).copy()
+    if decision_grids.is_grid(value):
+        values = tile_grid.from_grid(value, TILE_GRID.shape)
+        if values is not None:
+            return values
+    return tile_grid.parse_map("" if value is None else str(value), TILE_GRID.shape)
 
-def _write_seen_tile_matrix(path: str, matrix: list[list[float]]) -> bool:
-    def _fmt(v: float) -> str:
-        return "0" if abs(v) < 1e-12 else f"{v:.3f}"
 
-    content = "\n".join(
-        ",".join(_fmt(v) for v in row)
-        for row in matrix
-    ) + "\n"
-    return _atomic_write(path, content)
+def _write_seen_tile_matrix(path: str, matrix) -> bool:
+    """Stage a tile map; kept as an array with the precision of the old text format."""
+    return _update_decision_making_local(_decision_key(path), tile_grid.quantize(matrix))
 
 
 def update_seen_tiles(seen_tile_file: str = SEEN_TILE_FILE,
@@ -2257,36 +2304,25 @@ def update_seen_tiles(seen_tile_file: str = SEEN_TILE_FILE,
     - Visible & old value == 0: write current simulation time.
     - Not visible: write 0.
     """
-    rows = len(FIELD_TILES)
-    cols = len(FIELD_TILES[0]) if rows > 0 else 0
-    if rows == 0 or cols == 0:
+    if TILE_GRID.count == 0:
         return False
 
-    seen = _read_seen_tile_matrix(seen_tile_file, rows, cols)
+    seen = _read_tile_map(seen_tile_file)
     sim_time = _read_time_seconds(TIME_FILE)
     current_time = sim_time if sim_time is not None else time.time()
+    world = _world_for(
+        ("current_position", CURRENT_POSITION_FILE),
+        ("obstacle_robot", OBSTACLE_ROBOT_FILE),
+    )
 
-    for r in range(rows):
-        for c in range(cols):
-            point = FIELD_TILES[r][c]
-            visible = in_view(point, FOV=fov, Range=view_range)
-            old_val = seen[r][c]
-
-            if visible:
-                if abs(old_val) < 1e-12:
-                    seen[r][c] = current_time
-            else:
-                seen[r][c] = 0.0
+    # in_view's obstacle occlusion test is disabled, so visibility is the view cone alone.
+    visible = TILE_GRID.view_mask(world.pose, fov, view_range)
+    unset = np.abs(seen) < 1e-12
+    seen = np.where(visible, np.where(unset, current_time, seen), 0.0)
 
     seen_ok = _write_seen_tile_matrix(seen_tile_file, seen)
 
-    tile_seen_time = [
-        [
-            0.0 if abs(v) < 1e-12 else max(0.0, current_time - v)
-            for v in row
-        ]
-        for row in seen
-    ]
+    tile_seen_time = np.where(np.abs(seen) < 1e-12, 0.0, np.maximum(0.0, current_time - seen))
     time_ok = _write_seen_tile_matrix(TILE_SEEN_TIME_FILE, tile_seen_time)
 
     return seen_ok and time_ok
@@ -2303,15 +2339,14 @@ def update_ball_memory_v1(memory_tile_file: str = BALL_MEMORY_FILE,
     - tiles within 0.1m: +3
     - tiles within 0.2m: +2
     """
-    rows = len(FIELD_TILES)
-    cols = len(FIELD_TILES[0]) if rows > 0 else 0
-    if rows == 0 or cols == 0:
+    if TILE_GRID.count == 0:
         return False
 
-    memory = _read_seen_tile_matrix(memory_tile_file, rows, cols)
+    memory = _read_tile_map(memory_tile_file)
 
     sim_time = _read_time_seconds(TIME_FILE)
-    current_second = int(sim_time if sim_time is not None else time.time())
+    current_time = sim_time if sim_time is not None else time.time()
+    current_second = int(current_time)
     last_second_raw = _read_status(last_second_file)
     last_second = None
     if last_second_raw is not None:
@@ -2322,67 +2357,25 @@ def update_ball_memory_v1(memory_tile_file: str = BALL_MEMORY_FILE,
 
     if last_second != current_second:
         _atomic_write(last_second_file, f"{current_second}\n")
-        for r in range(rows):
-            for c in range(cols):
-                memory[r][c] = max(0.0, memory[r][c] - 1.0)
+        memory = tile_grid.decay(memory, 1.0)
 
     visible_balls = _read_visible_ball_positions(visible_balls_file)
-    remembered_points = _read_ball_memory_points(ball_memory_file)
-    new_visible_balls = []
-
-    for bx, by, _ in visible_balls:
-        is_new = True
-        for mx, my in remembered_points:
-            if math.hypot(bx - mx, by - my) <= 0.1:
-                is_new = False
-                break
-        if is_new:
-            remembered_points.append((bx, by))
-            new_visible_balls.append((bx, by))
-
-    points_ok = _write_ball_memory_points(ball_memory_file, remembered_points)
+    remembered = _ball_memory_index(ball_memory_file, current_time)
+    new_visible_balls = [
+        (bx, by) for bx, by, _ in visible_balls
+        if remembered.observe(bx, by, 0.1, current_time)
+    ]
 
-    flat_tiles = []
-    for r in range(rows):
-        for c in range(cols):
-            tx, ty = FIELD_TILES[r][c]
-            flat_tiles.append((r, c, tx, ty))
+    points_ok = _atomic_write(ball_memory_file, remembered.text())
 
     for bx, by in new_visible_balls:
-        nearest_rc = None
-        nearest_d2 = None
-
-        for r, c, tx, ty in flat_tiles:
-            dx = tx - bx
-            dy = ty - by
-            d2 = dx * dx + dy * dy
-
-            if nearest_d2 is None or d2 < nearest_d2:
-                nearest_d2 = d2
-                nearest_rc = (r, c)
-
-            if d2 <= 0.1 * 0.1:
-                memory[r][c] += 3.0
-
-        if nearest_rc is not None:
-            nr, nc = nearest_rc
-            memory[nr][nc] += 5
+        rows, cols, near = TILE_GRID.near_tiles(bx, by, 0.1)
+        memory[rows, cols][near] += 3.0
+        memory[TILE_GRID.nearest_tile(bx, by)] += 5
 
     cur = _read_current_position(CURRENT_POSITION_FILE)
     if cur is not None:
-        cx, cy, bearing = cur
-        theta = math.radians(bearing) if bearing is not None else 0.0
-        cos_t = math.cos(theta)
-        sin_t = math.sin(theta)
-        half = 0.2
-
-        for r, c, tx, ty in flat_tiles:
-            dx = tx - cx
-            dy = ty - cy
-            x_robot = dx * cos_t + dy * sin_t
-            y_robot = -dx * sin_t + dy * cos_t
-            if abs(x_robot) <= half and abs(y_robot) <= half:
-                memory[r][c] = 0.0
+        memory[TILE_GRID.footprint_mask(cur, 0.2, whole_tile=False)] = 0.0
 
     tile_ok = _write_seen_tile_matrix(memory_tile_file, memory)
     return points_ok and tile_ok
@@ -2398,13 +2391,11 @@ def update_unseen_tiles(unseen_tile_file: str = UNSEEN_TILE_MEMORY_FILE,
         - Then read see_tile.txt and reset unseen tile memory cell to 0 only when
             a tile has remained visible for at least 2.0 seconds.
     """
-    rows = len(FIELD_TILES)
-    cols = len(FIELD_TILES[0]) if rows > 0 else 0
-    if rows == 0 or cols == 0:
+    if TILE_GRID.count == 0:
         return False
 
-    unseen = _read_seen_tile_matrix(unseen_tile_file, rows, cols)
-    seen = _read_seen_tile_matrix(seen_tile_file, rows, cols)
+    unseen = _read_tile_map(unseen_tile_file)
+    seen = _read_tile_map(seen_tile_file)
 
     sim_time = _read_time_seconds(TIME_FILE)
     current_time = sim_time if sim_time is not None else time.time()
@@ -2420,9 +2411,7 @@ def update_unseen_tiles(unseen_tile_file: str = UNSEEN_TILE_MEMORY_FILE,
     second_ok = True
     if last_second != current_second:
         second_ok = _atomic_write(last_second_tiles_file, f"{current_second}\n")
-        for r in range(rows):
-            for c in range(cols):
-                unseen[r][c] += 1.0
+        unseen += 1.0
 
     radar_hits = radar_sensor()
     radar_front = RADAR_MAX_RANGE
@@ -2437,12 +2426,8 @@ def update_unseen_tiles(unseen_tile_file: str = UNSEEN_TILE_MEMORY_FILE,
     cur = _read_current_position(CURRENT_POSITION_FILE)
     cx, cy, _ = (0.0, 0.0, None) if cur is None else cur
 
-    for r in range(rows):
-        for c in range(cols):
-            seen_since = seen[r][c]
-            distance = math.hypot(FIELD_TILES[r][c][0] - cx, FIELD_TILES[r][c][1] - cy)
-            if seen_since > 0.0 and (current_time - seen_since) >= 0.5 and distance <= radar_front + 0.1:
-                unseen[r][c] = 0.0
+    settled = (seen > 0.0) & ((current_time - seen) >= 0.5)
+    unseen[settled & (TILE_GRID.distance(cx, cy) <= radar_front + 0.1)] = 0.0
 
     unseen_ok = _write_seen_tile_matrix(unseen_tile_file, unseen)
     return second_ok and unseen_ok
@@ -2456,29 +2441,11 @@ def update_unseen_regions(unseen_tile_file: str = UNSEEN_TILE_MEMORY_FILE,
     Out-of-field samples contribute 0 to the sum and are excluded from the
     average denominator (average by actually existing points).
     """
-    rows = len(FIELD_TILES)
-    cols = len(FIELD_TILES[0]) if rows > 0 else 0
-    if rows == 0 or cols == 0:
+    if TILE_GRID.count == 0:
         return False
 
-    unseen = _read_seen_tile_matrix(unseen_tile_file, rows, cols)
-    regions = [[0.0 for _ in range(cols)] for _ in range(rows)]
-
-    radius = int(round(0.2 / TILE_SIZE))
-    for r in range(rows):
-        for c in range(cols):
-            total = 0.0
-            count = 0
-            for rr in range(r - radius, r + radius + 1):
-                for cc in range(c - radius, c + radius + 1):
-                    if 0 <= rr < rows and 0 <= cc < cols:
-                        total += unseen[rr][cc]
-                        count += 1
-                    else:
-                        total += 0.0
-
-            regions[r][c] = (total / count) if count > 0 else 0.0
-
+    unseen = _read_tile_map(unseen_tile_file)
+    regions = tile_grid.box_mean(unseen, TILE_GRID.cells(0.2))
     return _write_seen_tile_matrix(unseen_regions_file, regions)
 
 def goto_unseen_region(cx: float,
@@ -2488,37 +2455,14 @@ def goto_unseen_region(cx: float,
 
     If all unseen tiles are 0, return False.
     """
-    rows = len(FIELD_TILES)
-    cols = len(FIELD_TILES[0]) if rows > 0 else 0
-    if rows == 0 or cols == 0:
+    if TILE_GRID.count == 0:
         return False
 
-    memory_unseen = _read_seen_tile_matrix(unseen_tile_file, rows, cols)
-    best_unseen_rc = None
-    best_unseen_val = -1.0
-    best_unseen_d2 = None
-
-    for r in range(rows):
-        for c in range(cols):
-            v = memory_unseen[r][c]
-            tx, ty = FIELD_TILES[r][c]
-            dx = tx - cx
-            dy = ty - cy
-            d2 = dx * dx + dy * dy
-
-            if v > best_unseen_val:
-                best_unseen_val = v
-                best_unseen_rc = (r, c)
-                best_unseen_d2 = d2
-            elif abs(v - best_unseen_val) < 1e-9:
-                if best_unseen_d2 is None or d2 < best_unseen_d2:
-                    best_unseen_rc = (r, c)
-                    best_unseen_d2 = d2
-
-    if best_unseen_rc is None or best_unseen_val <= 0.0:
+    memory_unseen = _read_tile_map(unseen_tile_file)
+    tr, tc, best_unseen_val = TILE_GRID.best_tile(memory_unseen, cx, cy)
+    if best_unseen_val <= 0.0:
         return False
 
-    tr, tc = best_unseen_rc
     tx, ty = FIELD_TILES[tr][tc]
     dx = tx - tx / math.hypot(ty, tx) * 0.4
     dy = ty - ty / math.hypot(ty, tx) * 0.4
@@ -2637,13 +2581,24 @@ def mode_improved_nearest_v1(status_file: str = WAYPOINT_STATUS_FILE,
 
 def tile_completely_seen(tx, ty, FOV=FIELD_OF_VIEW_DEGREES, Range=VISIBLE_RANGE_METERS) -> bool:
     """Check if tile center is completely seen by current radar."""
-    corners = [
-        (tx - TILE_HALF, ty - TILE_HALF),
-        (tx - TILE_HALF, ty + TILE_HALF),
-        (tx + TILE_HALF, ty - TILE_HALF),
-        (tx + TILE_HALF, ty + TILE_HALF),
-    ]
-    return all(in_view(corner, FOV=FOV, Range=Range) for corner in corners)
+    corners = (
+        np.array([tx - TILE_HALF, tx - TILE_HALF, tx + TILE_HALF, tx + TILE_HALF]),
+        np.array([ty - TILE_HALF, ty + TILE_HALF, ty - TILE_HALF, ty + TILE_HALF]),
+    )
+    world = _world_for(
+        ("current_position", CURRENT_POSITION_FILE),
+        ("obstacle_robot", OBSTACLE_ROBOT_FILE),
+    )
+    return bool(TILE_GRID.view_mask(world.pose, FOV, Range, points=corners).all())
+
+
+def _tiles_completely_seen(FOV=FIELD_OF_VIEW_DEGREES, Range=VISIBLE_RANGE_METERS) -> np.ndarray:
+    """tile_completely_seen for every tile of TILE_GRID at once."""
+    world = _world_for(
+        ("current_position", CURRENT_POSITION_FILE),
+        ("obstacle_robot", OBSTACLE_ROBOT_FILE),
+    )
+    return TILE_GRID.completely_seen_mask(world.pose, FOV, Range)
 
 def update_ball_memory_v2(memory_tile_file: str = BALL_MEMORY_FILE,
                        visible_balls_file: str = VISIBLE_BALLS_FILE,
@@ -2656,15 +2611,14 @@ def update_ball_memory_v2(memory_tile_file: str = BALL_MEMORY_FILE,
     - tiles within 0.1m: +3
     - tiles within 0.2m: +2
     """
-    rows = len(FIELD_TILES)
-    cols = len(FIELD_TILES[0]) if rows > 0 else 0
-    if rows == 0 or cols == 0:
+    if TILE_GRID.count == 0:
         return False
 
-    memory = _read_seen_tile_matrix(memory_tile_file, rows, cols)
+    memory = _read_tile_map(memory_tile_file)
 
     sim_time = _read_time_seconds(TIME_FILE)
-    current_second = int(sim_time if sim_time is not None else time.time())
+    current_time = sim_time if sim_time is not None else time.time()
+    current_second = int(current_time)
     last_second_raw = _read_status(last_second_file)
     last_second = None
     if last_second_raw is not None:
@@ -2675,93 +2629,31 @@ def update_ball_memory_v2(memory_tile_file: str = BALL_MEMORY_FILE,
 
     if last_second != current_second:
         _atomic_write(last_second_file, f"{current_second}\n")
-        for r in range(rows):
-            for c in range(cols):
-                memory[r][c] = max(0.0, memory[r][c] - 1.0)
+        memory = tile_grid.decay(memory, 1.0)
 
-    visible_balls = _read_visible_ball_positions(visible_balls_file)
-    remembered_points = _read_ball_memory_points(ball_memory_file)
+    world = _world_for(("visible_balls", visible_balls_file))
+    visible_balls = list(world.visible_balls)
+    remembered = _ball_memory_index(ball_memory_file, current_time)
+    # Every sighting refreshes its tile below; ball_memory itself only gains balls that
+    # are more than 0.1 m from all remembered ones.
     new_visible_balls = []
-
     for bx, by, _ in visible_balls:
-        is_new = True
-        # for mx, my in remembered_points:
-        #     if math.hypot(bx - mx, by - my) <= 0.1:
-        #         is_new = False
-        #         break
-        if is_new:
-            remembered_points.append((bx, by))
-            new_visible_balls.append((bx, by))
-
-    points_ok = _write_ball_memory_points(ball_memory_file, remembered_points)
-
-    flat_tiles = []
-    for r in range(rows):
-        for c in range(cols):
-            tx, ty = FIELD_TILES[r][c]
-            flat_tiles.append((r, c, tx, ty))
+        remembered.observe(bx, by, 0.1, current_time)
+        new_visible_balls.append((bx, by))
+
+    points_ok = _atomic_write(ball_memory_file, remembered.text())
 
     cur = _read_current_position(CURRENT_POSITION_FILE)
     if cur is not None:
-        cx, cy, bearing = cur
-        theta = math.radians(bearing) if bearing is not None else 0.0
-        cos_t = math.cos(theta)
-        sin_t = math.sin(theta)
-        half = 0.2  # robot half-size (actually 0.2m square)
-        tile_half = TILE_HALF
-
-        for r, c, tx, ty in flat_tiles:
-            # Four corners of the tile
-            corners = [
-                (tx - tile_half, ty - tile_half),
-                (tx - tile_half, ty + tile_half),
-                (tx + tile_half, ty - tile_half),
-                (tx + tile_half, ty + tile_half),
-            ]
-            all_in_robot = True
-            for corner_x, corner_y in corners:
-                dx = corner_x - cx
-                dy = corner_y - cy
-                x_robot = dx * cos_t + dy * sin_t
-                y_robot = -dx * sin_t + dy * cos_t
-                if not (abs(x_robot) <= half and abs(y_robot) <= half):
-                    all_in_robot = False
-                    break
-            if all_in_robot:
-                memory[r][c] = 0.0
-
-        for r, c, tx, ty in flat_tiles:
-            if not tile_completely_seen(tx, ty, FOV=FIELD_OF_VIEW_DEGREES, Range=VISIBLE_RANGE_METERS):
-                continue
-
-            has_ball_in_tile = False
-            for bx, by, _ in visible_balls:
-                if abs(bx - tx) <= tile_half and abs(by - ty) <= tile_half:
-                    has_ball_in_tile = True
-                    break
+        # Tiles wholly under the robot (0.2 m half-size square).
+        memory[TILE_GRID.footprint_mask(cur, 0.2)] = 0.0
 
-            if not has_ball_in_tile:
-                memory[r][c] = 0.0
+        seen = _tiles_completely_seen(FOV=FIELD_OF_VIEW_DEGREES, Range=VISIBLE_RANGE_METERS)
+        has_ball = TILE_GRID.balls_in_tiles(world.visible_ball_xy)
+        memory[seen & ~has_ball] = 0.0
 
     for bx, by in new_visible_balls:
-        nearest_rc = None
-        nearest_d2 = None
-
-        for r, c, tx, ty in flat_tiles:
-            dx = tx - bx
-            dy = ty - by
-            d2 = dx * dx + dy * dy
-
-            if nearest_d2 is None or d2 < nearest_d2:
-                nearest_d2 = d2
-                nearest_rc = (r, c)
-
-            # if d2 <= 0.1 * 0.1:
-            #     memory[r][c] = 50
-
-        if nearest_rc is not None:
-            nr, nc = nearest_rc
-            memory[nr][nc] = 180
+        memory[TILE_GRID.nearest_tile(bx, by)] = 180
 
     tile_ok = _write_seen_tile_matrix(memory_tile_file, memory)
     return points_ok and tile_ok
@@ -3498,15 +3390,14 @@ def update_ball_memory_v3(memory_tile_file: str = BALL_MEMORY_FILE,
     - tiles within 0.1m: +3
     - tiles within 0.2m: +2
     """
-    rows = len(FIELD_TILES)
-    cols = len(FIELD_TILES[0]) if rows > 0 else 0
-    if rows == 0 or cols == 0:
+    if TILE_GRID.count == 0:
         return False
 
-    memory = _read_seen_tile_matrix(memory_tile_file, rows, cols)
+    memory = _read_tile_map(memory_tile_file)
 
     sim_time = _read_time_seconds(TIME_FILE)
-    current_second = int(sim_time if sim_time is not None else time.time())
+    current_time = sim_time if sim_time is not None else time.time()
+    current_second = int(current_time)
     last_second_raw = _read_status(last_second_file)
     last_second = None
     if last_second_raw is not None:
@@ -3517,31 +3408,19 @@ def update_ball_memory_v3(memory_tile_file: str = BALL_MEMORY_FILE,
 
     if last_second != current_second:
         _atomic_write(last_second_file, f"{current_second}\n")
-        for r in range(rows):
-            for c in range(cols):
-                memory[r][c] = max(0.0, memory[r][c] - 1.0)
+        memory = tile_grid.decay(memory, 1.0)
 
-    visible_balls = _read_visible_ball_positions(visible_balls_file)
-    remembered_points = _read_ball_memory_points(ball_memory_file)
+    world = _world_for(("visible_balls", visible_balls_file))
+    visible_balls = list(world.visible_balls)
+    remembered = _ball_memory_index(ball_memory_file, current_time)
+    # Every sighting refreshes its tile below; ball_memory itself only gains balls that
+    # are more than 0.1 m from all remembered ones.
     new_visible_balls = []
-
     for bx, by, _ in visible_balls:
-        is_new = True
-        # for mx, my in remembered_points:
-        #     if math.hypot(bx - mx, by - my) <= 0.1:
-        #         is_new = False
-        #         break
-        if is_new:
-            remembered_points.append((bx, by))
-            new_visible_balls.append((bx, by))
-
-    points_ok = _write_ball_memory_points(ball_memory_file, remembered_points)
-
-    flat_tiles = []
-    for r in range(rows):
-        for c in range(cols):
-            tx, ty = FIELD_TILES[r][c]
-            flat_tiles.append((r, c, tx, ty))
+        remembered.observe(bx, by, 0.1, current_time)
+        new_visible_balls.append((bx, by))
+
+    points_ok = _atomic_write(ball_memory_file, remembered.text())
 
     cur = _read_current_position(CURRENT_POSITION_FILE)
     radar_hits = radar_sensor()
@@ -3555,67 +3434,17 @@ def update_ball_memory_v3(memory_tile_file: str = BALL_MEMORY_FILE,
     radar_front = max(0.0, min(RADAR_MAX_RANGE, radar_front))
     # print(f"[update_ball_memory_v3] radar front distance={radar_front}", file=sys.stderr)
     if cur is not None:
-        cx, cy, bearing = cur
-        theta = math.radians(bearing) if bearing is not None else 0.0
-        cos_t = math.cos(theta)
-        sin_t = math.sin(theta)
-        half = 0.15  # robot half-size (actually 0.2m square)
-        tile_half = TILE_HALF
-
-        for r, c, tx, ty in flat_tiles:
-            # Four corners of the tile
-            corners = [
-                (tx - tile_half, ty - tile_half),
-                (tx - tile_half, ty + tile_half),
-                (tx + tile_half, ty - tile_half),
-                (tx + tile_half, ty + tile_half),
-            ]
-            all_in_robot = True
-            for corner_x, corner_y in corners:
-                dx = corner_x - cx
-                dy = corner_y - cy
-                x_robot = dx * cos_t + dy * sin_t
-                y_robot = -dx * sin_t + dy * cos_t
-                if not (abs(x_robot) <= half and abs(y_robot) <= half):
-                    all_in_robot = False
-                    break
-            if all_in_robot:
-                memory[r][c] = 0.0
-
-        for r, c, tx, ty in flat_tiles:
-            if not tile_completely_seen(tx, ty, FOV=FIELD_OF_VIEW_DEGREES, Range=RADAR_MAX_RANGE):
-                continue
+        cx, cy, _ = cur
+        # Tiles wholly under the robot (0.15 m half-size square).
+        memory[TILE_GRID.footprint_mask(cur, 0.15)] = 0.0
 
-            has_ball_in_tile = False
-            for bx, by, _ in visible_balls:
-                if abs(bx - tx) <= tile_half and abs(by - ty) <= tile_half:
-                    has_ball_in_tile = True
-                    break
-                
-            distance = math.hypot(tx - cx, ty - cy)
-            if (memory[r][c] > 0.0) and (not has_ball_in_tile) and distance < radar_front:
-                # print(f"tile ({tx}, {ty}), no balls inside and seen for {seen[r][c]} second, zeroed.")
-                memory[r][c] = 0.0
+        # Seen, empty tiles in front of the nearest radar return are cleared.
+        seen = _tiles_completely_seen(FOV=FIELD_OF_VIEW_DEGREES, Range=RADAR_MAX_RANGE)
+        has_ball = TILE_GRID.balls_in_tiles(world.visible_ball_xy)
+        memory[seen & (memory > 0.0) & ~has_ball & (TILE_GRID.distance(cx, cy) < radar_front)] = 0.0
 
     for bx, by in new_visible_balls:
-        nearest_rc = None
-        nearest_d2 = None
-
-        for r, c, tx, ty in flat_tiles:
-            dx = tx - bx
-            dy = ty - by
-            d2 = dx * dx + dy * dy
-
-            if nearest_d2 is None or d2 < nearest_d2:
-                nearest_d2 = d2
-                nearest_rc = (r, c)
-
-            # if d2 <= 0.1 * 0.1:
-            #     memory[r][c] = 50
-
-        if nearest_rc is not None:
-            nr, nc = nearest_rc
-            memory[nr][nc] = 180
+        memory[TILE_GRID.nearest_tile(bx, by)] = 180
 
     tile_ok = _write_seen_tile_matrix(memory_tile_file, memory)
     return points_ok and tile_ok
@@ -3642,16 +3471,18 @@ def mode_seen_ball_path_planned(status_file: str = WAYPOINT_STATUS_FILE,
     if rows == 0 or cols == 0:
         return 0
 
-    memory = _read_seen_tile_matrix(BALL_MEMORY_FILE, rows, cols)
+    memory = tile_grid.fit(_read_tile_map(BALL_MEMORY_FILE), (rows, cols))
     visible_balls = _read_visible_ball_positions(visible_balls_file)
     high_memory_keys: set[tuple[float, float]] = set()
 
     balls: list[tuple[float, float, str]] = []
+    # Spatial hash over `balls`: the 0.05 m duplicate test looks at neighbouring cells only.
+    taken = ball_index.PointHash(0.05)
 
     def _append_ball_if_new(x: float, y: float, typ: str) -> None:
-        for bx, by, _ in balls:
-            if math.hypot(bx - x, by - y) <= 0.05:
-                return
+        if taken.first_near(x, y, 0.05) is not None:
+            return
+        taken.add(x, y)
         balls.append((x, y, str(typ).strip().upper()))
 
     # 1) Add all currently visible balls first.
@@ -3659,14 +3490,11 @@ def mode_seen_ball_path_planned(status_file: str = WAYPOINT_STATUS_FILE,
         _append_ball_if_new(x, y, typ)
 
     # 2) Add non-zero ball-memory points that are currently not in view.
-    for r in range(rows):
-        for c in range(cols):
-            if memory[r][c] <= 0.0:
-                continue
-            tx, ty = FIELD_TILES[r][c]
-            if memory[r][c] > 176.0:
-                high_memory_keys.add((round(tx, 3), round(ty, 3)))
-            _append_ball_if_new(tx, ty, "MEMORY")
+    for r, c in np.argwhere(memory > 0.0).tolist():
+        tx, ty = FIELD_TILES[r][c]
+        if memory[r, c] > 176.0:
+            high_memory_keys.add((round(tx, 3), round(ty, 3)))
+        _append_ball_if_new(tx, ty, "MEMORY")
 
     plan_range = 20  # only consider balls within 1.0m for planning
     cur = _read_current_position(current_file)
@@ -3870,19 +3698,23 @@ def parse_args() -> argparse.Namespace:
 
 
 def main() -> int:
-    _refresh_sim_data()
-    _bootstrap_stack_data()
-    args = parse_args()
-    # precedence: mode.txt -> CLI arg -> MODE env var -> DEFAULT_MODE
-    mode = _read_mode(MODE_FILE) or args.mode or os.environ.get("MODE") or DEFAULT_MODE
-    mode = mode.strip().lower()
-
-    handler = _MODE_HANDLERS.get(mode)
-    if handler is None:
-        print(f"[waypoints_cruise] unknown mode: {mode}", file=sys.stderr)
-        return 2
-
-    return handler()
+    with DECISION_MAKING_DATA_BATCH.tick():
+        # Already filled when the decision worker sent this tick's simulation_data.
+        if not SIM_DATA_CACHE:
+            _refresh_sim_data()
+        _world()
+        _bootstrap_stack_data()
+        args = parse_args()
+        # precedence: mode.txt -> CLI arg -> MODE env var -> DEFAULT_MODE
+        mode = _read_mode(MODE_FILE) or args.mode or os.environ.get("MODE") or DEFAULT_MODE
+        mode = mode.strip().lower()
+
+        handler = _MODE_HANDLERS.get(mode)
+        if handler is None:
+            print(f"[waypoints_cruise] unknown mode: {mode}", file=sys.stderr)
+            return 2
+
+        return handler()
 
 
 if __name__ == "__main__":
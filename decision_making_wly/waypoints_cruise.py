@@ -54,6 +54,13 @@ DEFAULT_LINEAR_VELOCITY = _load_default_linear_velocity()
 
 BASE_DIR = os.path.abspath(os.path.join(THIS_DIR, "..", "controllers", "supervisor_controller", "real_time_data"))
 SUPERVISOR_DIR = os.path.dirname(BASE_DIR)
+
+# Shared radar model lives next to the supervisor controller.
+if SUPERVISOR_DIR not in sys.path:
+    sys.path.append(SUPERVISOR_DIR)
+import radar_model
+import sim_snapshot
+import write_batch
 HTML_PORT_FILE = os.path.join(SUPERVISOR_DIR, "html_port.txt")
 WAYPOINT_STATUS_FILE = os.path.join(BASE_DIR, "waypoint_status.txt")
 DYNAMIC_WAYPOINTS_FILE = os.path.join(BASE_DIR, "dynamic_waypoints.txt")
@@ -97,6 +104,9 @@ SIM_DATA_URL = f"http://localhost:{FIELD_VIEWER_PORT}/simulation_data"
 SIM_DATA_URL_FALLBACK = f"http://localhost:{FIELD_VIEWER_PORT}/data/simulation_data"
 SIM_DATA_TIMEOUT = 0.2
 SIM_DATA_CACHE = {}
+# Delta mirror of /data/simulation_data; not a *_CACHE so it survives across
+# ticks in the persistent decision worker and only changed keys are fetched.
+SIM_DATA_MIRROR = sim_snapshot.new_mirror()
 DECISIONS_URL = f"http://localhost:{FIELD_VIEWER_PORT}/decisions"
 DECISIONS_URL_FALLBACK = f"http://localhost:{FIELD_VIEWER_PORT}/data/decisions"
 DECISIONS_TIMEOUT = 0.2
@@ -160,6 +170,18 @@ def _parse_sim_data_from_html(text: str) -> dict:
 
 def _refresh_sim_data() -> None:
     global SIM_DATA_CACHE
+    try:
+        url = sim_snapshot.delta_url(SIM_DATA_URL_FALLBACK, SIM_DATA_MIRROR)
+        with urllib.request.urlopen(url, timeout=SIM_DATA_TIMEOUT) as res:
+            envelope = json.loads(res.read().decode("utf-8", errors="ignore"))
+        if sim_snapshot.is_envelope(envelope):
+            if sim_snapshot.apply_envelope(SIM_DATA_MIRROR, envelope) and SIM_DATA_MIRROR["values"]:
+                SIM_DATA_CACHE = dict(SIM_DATA_MIRROR["values"])
+                return
+            # Out of step with the viewer: drop the mirror and take a full read below.
+            SIM_DATA_MIRROR.update(sim_snapshot.new_mirror())
+    except Exception:
+        pass
     for url in (SIM_DATA_URL_FALLBACK, SIM_DATA_URL):
         try:
             with urllib.request.urlopen(url, timeout=SIM_DATA_TIMEOUT) as res:
@@ -255,6 +277,8 @@ def _refresh_decision_making_data() -> bool:
 
 
 def _get_decision_making_value(key: str):
+    if key in DECISION_MAKING_DATA_LOCAL_CACHE:
+        return DECISION_MAKING_DATA_LOCAL_CACHE[key]
     if DECISION_MAKING_DATA_CACHE:
         return DECISION_MAKING_DATA_CACHE.get(key)
     _refresh_decision_making_data()
@@ -280,12 +304,33 @@ def _post_decision_making_data(payload: dict) -> bool:
 
 
 def _update_decision_making_local(key: str, value: str) -> bool:
+    # Sent when main()'s DECISION_MAKING_DATA_BATCH tick ends (at once outside it).
     DECISION_MAKING_DATA_LOCAL_CACHE[key] = value
+    return DECISION_MAKING_DATA_BATCH.written()
+
+
+def _staged_decision_making_payload():
+    if not DECISION_MAKING_DATA_LOCAL_CACHE:
+        return None
     if not DECISION_MAKING_DATA_CACHE:
         _refresh_decision_making_data()
     payload = dict(DECISION_MAKING_DATA_CACHE) if DECISION_MAKING_DATA_CACHE else {}
     payload.update(DECISION_MAKING_DATA_LOCAL_CACHE)
-    return _post_decision_making_data(payload)
+    return payload
+
+
+def _send_decision_making_payload(payload: dict) -> bool:
+    if not _post_decision_making_data(payload):
+        return False
+    DECISION_MAKING_DATA_LOCAL_CACHE.clear()
+    return True
+
+
+DECISION_MAKING_DATA_BATCH = write_batch.WriteBatch(
+    _staged_decision_making_payload,
+    _send_decision_making_payload,
+    async_flush=write_batch.load_async_flush(WHO_IS_DEV_JSON_FILE),
+)
 
 
 def _decision_key(path: str) -> str:
@@ -858,96 +903,7 @@ def radar_sensor(max_range: float = RADAR_MAX_RANGE, corridor: float = 0.2) -> l
     if not obstacles:
         return []
 
-    half_band = corridor / 2.0
-    theta = math.radians(bearing)
-    hits = {}
-
-    obstacle_half = 0.1
-    robot_half = 0.1
-    sample_spacing = 0.1 * obstacle_half  # 0.01 spacing between sample points
-    corners_local = []
-    
-    # Generate dense samples along all four edges of the obstacle
-    num_samples = int(2 * obstacle_half / sample_spacing) + 1
-    for i in range(num_samples):
-        offset = -obstacle_half + i * sample_spacing
-        # Top edge (y = obstacle_half)
-        corners_local.append((offset, obstacle_half))
-        # Bottom edge (y = -obstacle_half)
-        corners_local.append((offset, -obstacle_half))
-        # Left edge (x = -obstacle_half)
-        corners_local.append((-obstacle_half, offset))
-        # Right edge (x = obstacle_half)
-        corners_local.append((obstacle_half, offset))
-
-    for ox, oy, obearing in obstacles:
-        otheta = math.radians(obearing) if obearing is not None else 0.0
-        cos_o = math.cos(otheta)
-        sin_o = math.sin(otheta)
-        for lx, ly in corners_local:
-            # Obstacle local -> world
-            wx = ox + lx * cos_o - ly * sin_o
-            wy = oy + lx * sin_o + ly * cos_o
-
-            dx = wx - cx
-            dy = wy - cy
-            # World -> robot frame: x forward, y left
-            x_robot = dx * math.cos(theta) + dy * math.sin(theta)
-            y_robot = -dx * math.sin(theta) + dy * math.cos(theta)
-
-            if x_robot > 0 and abs(y_robot) <= half_band and x_robot <= max_range:
-                dist = x_robot - robot_half
-                direction = "front"
-            elif x_robot < 0 and abs(y_robot) <= half_band and -x_robot <= max_range:
-                dist = -x_robot - robot_half
-                direction = "rear"
-            elif y_robot > 0 and abs(x_robot) <= half_band and y_robot <= max_range:
-                dist = y_robot - robot_half
-                direction = "left"
-            elif y_robot < 0 and abs(x_robot) <= half_band and -y_robot <= max_range:
-                dist = -y_robot - robot_half
-                direction = "right"
-            else:
-                continue
-
-            if dist <= max_range:
-                prev = hits.get(direction)
-                if prev is None or dist < prev:
-                    hits[direction] = dist
-
-    # Add virtual points along boundaries using evenly spaced samples.
-    edge_samples = [i * 0.05 for i in range(-20, 21)]
-    virtual_points = (
-        [(x, 1.0) for x in edge_samples]
-        + [(x, -1.0) for x in edge_samples]
-        + [(1.0, y) for y in edge_samples]
-        + [(-1.0, y) for y in edge_samples]
-    )
-    for vx, vy in virtual_points:
-        dx = vx - cx
-        dy = vy - cy
-        x_robot = dx * math.cos(theta) + dy * math.sin(theta)
-        y_robot = -dx * math.sin(theta) + dy * math.cos(theta)
-
-        if x_robot > 0 and abs(y_robot) <= half_band and x_robot <= max_range:
-            dist = x_robot - robot_half
-            direction = "front"
-        elif x_robot < 0 and abs(y_robot) <= half_band and -x_robot <= max_range:
-            dist = -x_robot - robot_half
-            direction = "rear"
-        elif y_robot > 0 and abs(x_robot) <= half_band and y_robot <= max_range:
-            dist = y_robot - robot_half
-            direction = "left"
-        elif y_robot < 0 and abs(x_robot) <= half_band and -y_robot <= max_range:
-            dist = -y_robot - robot_half
-            direction = "right"
-        else:
-            continue
-
-        if dist <= max_range:
-            prev = hits.get(direction)
-            if prev is None or dist < prev:
-                hits[direction] = dist
+    hits = radar_model.radar_hits(cx, cy, bearing, obstacles, walls=True, max_range=max_range, corridor=corridor)
 
     memory_values = {
         "front": RADAR_MAX_RANGE,
@@ -1015,48 +971,10 @@ def wall_only_radar(
 
     max_range = RADAR_MAX_RANGE
     corridor = 0.2
-    half_band = corridor / 2.0
-
-    theta = math.radians(bearing)
-    cos_t = math.cos(theta)
-    sin_t = math.sin(theta)
-    robot_half = 0.1
-    predicted: dict[str, float] = {}
-
-    edge_samples = [i * 0.05 for i in range(-20, 21)]
-    wall_samples = (
-        [(x, 1.0) for x in edge_samples]
-        + [(x, -1.0) for x in edge_samples]
-        + [(1.0, y) for y in edge_samples]
-        + [(-1.0, y) for y in edge_samples]
+    predicted: dict[str, float] = radar_model.radar_hits(
+        cx, cy, bearing, (), walls=True, max_range=max_range, corridor=corridor
     )
 
-    for wx, wy in wall_samples:
-        dx = wx - cx
-        dy = wy - cy
-        x_robot = dx * cos_t + dy * sin_t
-        y_robot = -dx * sin_t + dy * cos_t
-
-        if x_robot > 0 and abs(y_robot) <= half_band and x_robot <= max_range:
-            dist = x_robot - robot_half
-            direction = "front"
-        elif x_robot < 0 and abs(y_robot) <= half_band and -x_robot <= max_range:
-            dist = -x_robot - robot_half
-            direction = "rear"
-        elif y_robot > 0 and abs(x_robot) <= half_band and y_robot <= max_range:
-            dist = y_robot - robot_half
-            direction = "left"
-        elif y_robot < 0 and abs(x_robot) <= half_band and -y_robot <= max_range:
-            dist = -y_robot - robot_half
-            direction = "right"
-        else:
-            continue
-
-        if dist <= max_range:
-            prev = predicted.get(direction)
-            if prev is None or dist < prev:
-                predicted[direction] = dist
-
     sim_time = _read_time_seconds(TIME_FILE)
     if sim_time is None:
         return predicted
@@ -1111,65 +1029,13 @@ def robot_only_radar(
 
     max_range = RADAR_MAX_RANGE
     corridor = 0.2
-    half_band = corridor / 2.0
-
-    theta = math.radians(bearing)
-    cos_t = math.cos(theta)
-    sin_t = math.sin(theta)
-    robot_half = 0.1
-    predicted: dict[str, float] = {}
-
-    obstacle_half = 0.1
-    sample_spacing = 0.1 * obstacle_half  # 0.01m
-    sample_points_world: list[tuple[float, float]] = []
-
     obstacles = _read_obstacle_positions(obstacle_file)
     if not obstacles:
         return {}
 
-    obstacle_edge_samples_local: list[tuple[float, float]] = []
-    num_samples = int(2 * obstacle_half / sample_spacing) + 1
-    for i in range(num_samples):
-        offset = -obstacle_half + i * sample_spacing
-        obstacle_edge_samples_local.append((offset, obstacle_half))
-        obstacle_edge_samples_local.append((offset, -obstacle_half))
-        obstacle_edge_samples_local.append((-obstacle_half, offset))
-        obstacle_edge_samples_local.append((obstacle_half, offset))
-
-    for ox, oy, obearing in obstacles:
-        otheta = math.radians(obearing) if obearing is not None else 0.0
-        cos_o = math.cos(otheta)
-        sin_o = math.sin(otheta)
-        for lx, ly in obstacle_edge_samples_local:
-            wx = ox + lx * cos_o - ly * sin_o
-            wy = oy + lx * sin_o + ly * cos_o
-            sample_points_world.append((wx, wy))
-
-    for wx, wy in sample_points_world:
-        dx = wx - cx
-        dy = wy - cy
-        x_robot = dx * cos_t + dy * sin_t
-        y_robot = -dx * sin_t + dy * cos_t
-
-        if x_robot > 0 and abs(y_robot) <= half_band and x_robot <= max_range:
-            dist = x_robot - robot_half
-            direction = "front"
-        elif x_robot < 0 and abs(y_robot) <= half_band and -x_robot <= max_range:
-            dist = -x_robot - robot_half
-            direction = "rear"
-        elif y_robot > 0 and abs(x_robot) <= half_band and y_robot <= max_range:
-            dist = y_robot - robot_half
-            direction = "left"
-        elif y_robot < 0 and abs(x_robot) <= half_band and -y_robot <= max_range:
-            dist = -y_robot - robot_half
-            direction = "right"
-        else:
-            continue
-
-        if dist <= max_range:
-            prev = predicted.get(direction)
-            if prev is None or dist < prev:
-                predicted[direction] = dist
+    predicted: dict[str, float] = radar_model.radar_hits(
+        cx, cy, bearing, obstacles, walls=False, max_range=max_range, corridor=corridor
+    )
 
     sim_time = _read_time_seconds(TIME_FILE)
     if sim_time is None:
@@ -2432,21 +2298,24 @@ def parse_args() -> argparse.Namespace:
 
 
 def main() -> int:
-    _refresh_sim_data()
-    _bootstrap_stack_data()
-    args = parse_args()
-    # precedence: CLI arg -> MODE env var -> DEFAULT_MODE
-    mode = args.mode or os.environ.get("MODE") or DEFAULT_MODE
-    mode = mode.strip().lower()
-    if mode == "developing":
-        _bootstrap_developing_data()
-
-    handler = _MODE_HANDLERS.get(mode)
-    if handler is None:
-        print(f"[waypoints_cruise] unknown mode: {mode}", file=sys.stderr)
-        return 2
-
-    return handler()
+    with DECISION_MAKING_DATA_BATCH.tick():
+        # Already filled when the decision worker sent this tick's simulation_data.
+        if not SIM_DATA_CACHE:
+            _refresh_sim_data()
+        _bootstrap_stack_data()
+        args = parse_args()
+        # precedence: CLI arg -> MODE env var -> DEFAULT_MODE
+        mode = args.mode or os.environ.get("MODE") or DEFAULT_MODE
+        mode = mode.strip().lower()
+        if mode == "developing":
+            _bootstrap_developing_data()
+
+        handler = _MODE_HANDLERS.get(mode)
+        if handler is None:
+            print(f"[waypoints_cruise] unknown mode: {mode}", file=sys.stderr)
+            return 2
+
+        return handler()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+# async_server.py
+# asyncio transport for the field viewer ("viewer_server": "asyncio" in config.json):
+# - one event loop instead of one OS thread per connection; an SSE client costs a coroutine
+# - HTTP/1.1 keep-alive with an idle timeout, at most `max_connections` open sockets (503 beyond)
+# - routes, JSON contract and SSE hubs are server.py's (route_get / route_post / ingest_post / Reply);
+#   route handlers run on a small fixed thread pool because file reads, Pi pulls and
+#   frame encoding can block
+# Standard library only, like server.py.
+import asyncio
+import concurrent.futures
+import http.client
+import io
+from http import HTTPStatus
+from urllib.parse import urlparse
+
+DEFAULT_MAX_CONNECTIONS = 64
+DEFAULT_WORKER_THREADS = 4
+# Idle keep-alive connections are closed after this long without a new request.
+KEEP_ALIVE_IDLE_SECONDS = 30.0
+MAX_HEADER_BYTES = 64 * 1024
+
+
+def _status_line(status):
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+    return f"HTTP/1.1 {status} {reason}\r\n"
+
+
+def _encode_head(status, headers, content_length=None, close=False):
+    lines = [_status_line(status)]
+    for name, value in headers:
+        lines.append(f"{name}: {value}\r\n")
+    if content_length is not None:
+        lines.append(f"Content-Length: {content_length}\r\n")
+    if close:
+        lines.append("Connection: close\r\n")
+    lines.append("\r\n")
+    return "".join(lines).encode("latin-1")
+
+
+def _plain_response(status, text):
+    body = text.encode("utf-8")
+    head = _encode_head(status, [("Content-Type", "text/plain"), ("Cache-Control", "no-store")], len(body), True)
+    return head + body
+
+
+class AsyncViewerServer:
+    """Serves route_get/route_post replies over asyncio streams."""
+    def __init__(self, route_get, route_post, post_paths, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 workers=DEFAULT_WORKER_THREADS, keepalive=15.0, write_timeout=10.0,
+                 idle_timeout=KEEP_ALIVE_IDLE_SECONDS, ingest_post=None, ingest_paths=(),
+                 max_ingest_bytes=None):
+        self.route_get = route_get
+        self.route_post = route_post
+        self.post_paths = post_paths
+        self.ingest_post = ingest_post
+        self.ingest_paths = ingest_paths
+        self.max_ingest_bytes = max_ingest_bytes
+        self.max_connections = max_connections
+        self.keepalive = keepalive
+        self.write_timeout = write_timeout
+        self.idle_timeout = idle_timeout
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="viewer")
+        self.active = 0
+        self.rejected = 0
+
+    def run_blocking(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    async def _write(self, writer, data):
+        writer.write(data)
+        await asyncio.wait_for(writer.drain(), self.write_timeout)
+
+    async def handle(self, reader, writer):
+        if self.active >= self.max_connections:
+            self.rejected += 1
+            try:
+                writer.write(_plain_response(503, "too many connections"))
+                await asyncio.wait_for(writer.drain(), self.write_timeout)
+            except Exception:
+                pass
+            writer.close()
+            return
+        self.active += 1
+        try:
+            while await self._serve_one(reader, writer):
+                pass
+        except Exception:
+            pass
+        finally:
+            self.active -= 1
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    async def _serve_one(self, reader, writer):
+        """Handle one request; returns True if the connection stays open for another."""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+            return False
+        request_line, _, header_block = head.partition(b"\r\n")
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            await self._write(writer, _plain_response(400, "bad request"))
+            return False
+        method, target, version = parts
+        headers = http.client.parse_headers(io.BytesIO(header_block))
+        connection = headers.get("Connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        if method == "GET":
+            reply = await self.run_blocking(self.route_get, target, headers)
+        elif method == "POST":
+            try:
+                length = int(headers.get("Content-Length", "0"))
+            except Exception:
+                length = 0
+            path = urlparse(target).path
+            if (path in self.ingest_paths and self.max_ingest_bytes is not None
+                    and length > self.max_ingest_bytes):
+                # Rejected before reading, like the threaded Handler; the unread body
+                # makes the connection unusable, so it is closed.
+                await self._write(writer, _plain_response(413, "image too large"))
+                return False
+            raw = b""
+            if length > 0 and (path in self.post_paths or path in self.ingest_paths):
+                try:
+                    raw = await asyncio.wait_for(reader.readexactly(length), self.idle_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    await self._write(writer, _plain_response(400, "invalid payload"))
+                    return False
+            if self.ingest_post is not None and path in self.ingest_paths:
+                # StreamReader has no readinto(): the body arrives as bytes and is copied once.
+                def fill(view, data=raw):
+                    view[:] = data
+                    return len(data)
+                reply = await self.run_blocking(self.ingest_post, target, headers, len(raw), fill)
+            else:
+                reply = await self.run_blocking(self.route_post, target, headers, raw)
+        else:
+            await self._write(writer, _plain_response(501, f"unsupported method {method}"))
+            return False
+
+        try:
+            if reply.stream is not None:
+                await self._write(writer, _encode_head(reply.status, reply.headers))
+                await self._serve_stream(reader, writer, *reply.stream)
+                return False
+
+            close = reply.close or not keep_alive
+            body = b"" if reply.status == 304 else reply.body
+            content_length = None if reply.status == 304 else len(body)
+            await self._write(writer, _encode_head(reply.status, reply.headers, content_length, close) + body)
+            return not close
+        finally:
+            reply.done()
+
+    async def _serve_stream(self, reader, writer, hub, make_renderer, min_interval=0.0):
+        pump = asyncio.ensure_future(self._pump_stream(writer, hub, make_renderer, min_interval))
+        # SSE clients send nothing after the request: EOF means they left, so the
+        # connection slot is released without waiting for the next write to fail.
+        closed = asyncio.ensure_future(reader.read(1))
+        await asyncio.wait({pump, closed}, return_when=asyncio.FIRST_COMPLETED)
+        for task in (pump, closed):
+            task.cancel()
+        await asyncio.gather(pump, closed, return_exceptions=True)
+
+    async def _pump_stream(self, writer, hub, make_renderer, min_interval):
+        render = make_renderer()
+        updates = hub.aupdates(self.run_blocking, self.keepalive)
+        try:
+            async for frame in updates:
+                event = await self.run_blocking(render, frame)
+                if event:
+                    await self._write(writer, event)
+                    if min_interval > 0:
+                        # Rate cap; frames published meanwhile coalesce into the next one.
+                        await asyncio.sleep(min_interval)
+        except Exception:
+            pass
+        finally:
+            await updates.aclose()
+
+    async def serve_forever(self, host, port, on_listening=None):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES, reuse_address=True)
+        if on_listening is not None:
+            on_listening()
+        async with server:
+            await server.serve_forever()
+
+
+def serve(host, port, route_get, route_post, post_paths, max_connections=DEFAULT_MAX_CONNECTIONS,
+          keepalive=15.0, write_timeout=10.0, on_listening=None, ingest_post=None, ingest_paths=(),
+          max_ingest_bytes=None):
+    """Run the asyncio field viewer until interrupted (raises OSError if the port is taken)."""
+    server = AsyncViewerServer(
+        route_get,
+        route_post,
+        post_paths,
+        max_connections=max_connections,
+        keepalive=keepalive,
+        write_timeout=write_timeout,
+        ingest_post=ingest_post,
+        ingest_paths=ingest_paths,
+        max_ingest_bytes=max_ingest_bytes,
+    )
+    try:
+        asyncio.run(server.serve_forever(host, port, on_listening))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.pool.shutdown(wait=False)
@@ -0,0 +1,69 @@
+# frame_history.py
+# Fixed-size, in-memory history of what the field viewer has seen during a match:
+# - one Snapshot per recorded simulation update: sim time, wall time and the simulation_data,
+#   decisions and decision_making_data dicts current at that moment
+# - the dicts are the server's own caches, which are replaced (never mutated) on update, so
+#   consecutive snapshots share unchanged dicts and strings instead of copying them
+# - at most one snapshot per `min_interval` seconds of sim time; the oldest drop off once
+#   `capacity` is reached; sim time going backwards (world reset) starts a new history
+# Standard library only, like server.py.
+import bisect
+import itertools
+import threading
+import time
+from collections import deque, namedtuple
+
+DEFAULT_CAPACITY = 12000
+DEFAULT_MIN_INTERVAL_SECONDS = 0.02
+
+Snapshot = namedtuple("Snapshot", "seq t wall simulation_data decisions decision_making_data")
+
+
+class FrameHistory:
+    """Ring buffer of Snapshots ordered by sim time `t`."""
+    def __init__(self, capacity=DEFAULT_CAPACITY, min_interval=DEFAULT_MIN_INTERVAL_SECONDS):
+        self.capacity = max(1, int(capacity))
+        self.min_interval = float(min_interval)
+        self._times = deque(maxlen=self.capacity)
+        self._entries = deque(maxlen=self.capacity)
+        self._lock = threading.Lock()
+        self.seq = 0
+
+    def record(self, t, simulation_data, decisions, decision_making_data):
+        """Append a snapshot at sim time `t`; returns False if it was too close to the last one."""
+        with self._lock:
+            if self._times:
+                last = self._times[-1]
+                if t < last:
+                    self._times.clear()
+                    self._entries.clear()
+                elif t - last < self.min_interval:
+                    return False
+            self.seq += 1
+            self._times.append(t)
+            self._entries.append(Snapshot(self.seq, t, time.time(), simulation_data, decisions, decision_making_data))
+            return True
+
+    def between(self, t_from=None, t_to=None):
+        """Snapshots with t_from <= t <= t_to (either bound optional), oldest first."""
+        with self._lock:
+            start = 0 if t_from is None else bisect.bisect_left(self._times, t_from)
+            end = len(self._times) if t_to is None else bisect.bisect_right(self._times, t_to)
+            return list(itertools.islice(self._entries, start, end))
+
+    def at(self, t=None):
+        """Newest snapshot with sim time <= t (the oldest one if t predates it); None if empty."""
+        with self._lock:
+            if not self._entries:
+                return None
+            if t is None:
+                return self._entries[-1]
+            index = bisect.bisect_right(self._times, t) - 1
+            return self._entries[max(index, 0)]
+
+    def bounds(self):
+        """(first t, last t, count); (None, None, 0) while empty."""
+        with self._lock:
+            if not self._times:
+                return None, None, 0
+            return self._times[0], self._times[-1], len(self._times)
@@ -0,0 +1,176 @@
+# frame_ring.py
+# Preallocated ring of the latest camera frames for the field viewer:
+# - one bytearray of `slots` x `slot_bytes`; a POST body is read straight into the next
+#   slot (readinto), so there is no intermediate bytes object and no base64 round trip
+# - each slot records seq, arrival timestamp and MIME type; readers get read-only
+#   memoryviews of the slot, never copies
+# - the slot size grows (whole buffer reallocated once) when a larger frame arrives;
+#   views handed out earlier keep the old buffer alive and stay valid
+# - a view from latest()/get() refers to a slot that is reused `slots` frames later;
+#   acquire() pins the slot instead (release() unpins it) and write_into skips pinned
+#   slots, so a response written to a slow client is never overwritten mid-send; with
+#   every slot pinned the buffer is reallocated, which leaves the pinned views alone
+# Standard library only, like server.py.
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_SLOTS = 8
+DEFAULT_SLOT_BYTES = 256 * 1024
+
+# slot: (buffer generation, index) of a pinned frame, None for unpinned ones
+Frame = namedtuple("Frame", "seq timestamp mime data slot", defaults=(None,))
+
+
+def fill_from_reader(readinto):
+    """fill() for FrameRing.write_into that reads a stream (e.g. rfile.readinto) until full."""
+    def fill(view):
+        got = 0
+        size = len(view)
+        while got < size:
+            n = readinto(view[got:])
+            if not n:
+                break
+            got += n
+        return got
+    return fill
+
+
+def fill_from_bytes(data):
+    """fill() for FrameRing.write_into that copies an existing buffer."""
+    def fill(view):
+        view[:] = data
+        return len(view)
+    return fill
+
+
+class FrameRing:
+    """Latest `slots` frames in one preallocated buffer; seq starts at 1."""
+    def __init__(self, slots=DEFAULT_SLOTS, slot_bytes=DEFAULT_SLOT_BYTES):
+        self.slots = max(1, int(slots))
+        self.slot_bytes = max(1, int(slot_bytes))
+        self._view = memoryview(bytearray(self.slots * self.slot_bytes))
+        # (seq, timestamp, mime, length) per slot; None while empty or being written
+        self._meta = [None] * self.slots
+        # acquire() count per slot of the current buffer
+        self._pins = [0] * self.slots
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._index = 0
+        self.seq = 0
+
+    def _grow(self, slot_bytes):
+        """Reallocate with `slot_bytes` slots, keeping the frames already stored (write lock
+        held). Nothing writes the old buffer again, so every pin is released with it."""
+        view = memoryview(bytearray(self.slots * slot_bytes))
+        with self._lock:
+            for index, meta in enumerate(self._meta):
+                if meta is None:
+                    continue
+                length = meta[3]
+                old = index * self.slot_bytes
+                new = index * slot_bytes
+                view[new:new + length] = self._view[old:old + length]
+            self._view = view
+            self.slot_bytes = slot_bytes
+            self._pins = [0] * self.slots
+            self._generation += 1
+
+    def _free_slot(self):
+        """Next unpinned slot after the newest frame, or None (lock held)."""
+        for step in range(1, self.slots + 1):
+            index = (self._index + step) % self.slots
+            if not self._pins[index]:
+                return index
+        return None
+
+    def write_into(self, size, fill, mime, timestamp=None):
+        """Let `fill(view)` write `size` bytes into the next slot, then publish it.
+
+        `fill` gets a writable memoryview of exactly `size` bytes and returns how many
+        bytes it wrote; a short write (client went away) drops the frame. Returns the
+        new seq, or None if nothing was stored.
+        """
+        size = int(size)
+        if size <= 0:
+            return None
+        with self._write_lock:
+            if size > self.slot_bytes:
+                self._grow(max(size, self.slot_bytes * 2))
+            with self._lock:
+                index = self._free_slot()
+            if index is None:
+                self._grow(self.slot_bytes)
+                index = (self._index + 1) % self.slots
+            seq = self.seq + 1
+            with self._lock:
+                # Hide the slot from readers while it is overwritten.
+                self._meta[index] = None
+                start = index * self.slot_bytes
+                view = self._view[start:start + size]
+            if fill(view) != size:
+                return None
+            with self._lock:
+                self._meta[index] = (seq, time.time() if timestamp is None else timestamp, mime, size)
+                self._index = index
+                self.seq = seq
+            return seq
+
+    def write(self, data, mime, timestamp=None):
+        return self.write_into(len(data), fill_from_bytes(data), mime, timestamp)
+
+    def _frame_at(self, index, pin=False):
+        meta = self._meta[index]
+        if meta is None:
+            return None
+        seq, timestamp, mime, length = meta
+        start = index * self.slot_bytes
+        slot = None
+        if pin:
+            self._pins[index] += 1
+            slot = (self._generation, index)
+        return Frame(seq, timestamp, mime, self._view[start:start + length].toreadonly(), slot)
+
+    def _index_of(self, seq):
+        """Slot holding `seq`, or None (lock held)."""
+        if seq <= 0 or seq > self.seq:
+            return None
+        for index, meta in enumerate(self._meta):
+            if meta is not None and meta[0] == seq:
+                return index
+        return None
+
+    def latest(self):
+        """Newest Frame, or None before the first one."""
+        with self._lock:
+            if self.seq <= 0:
+                return None
+            return self._frame_at(self._index)
+
+    def get(self, seq):
+        """Frame with this seq if it is still in the ring, else None."""
+        with self._lock:
+            index = self._index_of(seq)
+            return None if index is None else self._frame_at(index)
+
+    def acquire(self, seq=None):
+        """Like get(seq) (latest() when seq is None), with the slot pinned until release()."""
+        with self._lock:
+            index = self._index if seq is None and self.seq > 0 else self._index_of(seq or 0)
+            return None if index is None else self._frame_at(index, pin=True)
+
+    def release(self, frame):
+        """Unpin a frame from acquire(); frames that are not pinned are ignored."""
+        if frame is None or frame.slot is None:
+            return
+        generation, index = frame.slot
+        with self._lock:
+            if generation == self._generation and self._pins[index] > 0:
+                self._pins[index] -= 1
+
+    def frames(self):
+        """Stored frames, oldest first."""
+        with self._lock:
+            found = [self._frame_at(index) for index in range(self.slots)]
+        return sorted((frame for frame in found if frame is not None), key=lambda frame: frame.seq)
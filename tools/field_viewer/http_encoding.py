@@ -0,0 +1,124 @@
+# http_encoding.py
+# Conditional and compressed responses for the field viewer (both transports, via route_get):
+# - ETag = short blake2b of the body; If-None-Match hits become empty 304s
+# - gzip / deflate when Accept-Encoding allows it, for text and JSON bodies of at least
+#   COMPRESS_MIN_BYTES; the encoded variant gets its own ETag ("<tag>-gzip")
+# - encoded bodies are kept per (ETag, coding), so a memoized /data/* body or an unchanged
+#   page is compressed once, not once per poll
+# - StaticFiles keeps HTML pages in memory and re-reads one only when its mtime/size changes
+# Standard library only, like server.py.
+import gzip
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_LEVEL = 6
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+# Preferred first when the client accepts several with the same q.
+CODINGS = ("gzip", "deflate")
+DEFAULT_CACHE_ENTRIES = 64
+
+
+def body_etag(body) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def coded_etag(etag: str, coding) -> str:
+    if not coding or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{coding}"'
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """True if If-None-Match names `etag` or one of its coded variants (weak or strong)."""
+    if not etag or not if_none_match:
+        return False
+    accepted = {etag} | {coded_etag(etag, coding) for coding in CODINGS}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*" or tag in accepted:
+            return True
+    return False
+
+
+def is_compressible(content_type) -> bool:
+    content_type = (content_type or "").lower()
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+def accepted_coding(accept_encoding: str):
+    """Best of CODINGS allowed by an Accept-Encoding header, or None for identity."""
+    qualities = {}
+    for item in (accept_encoding or "").lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[name.strip()] = q
+    best = None
+    best_q = 0.0
+    for coding in CODINGS:
+        q = qualities.get(coding, qualities.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, coding) -> bytes:
+    if coding == "gzip":
+        # mtime=0 keeps the output (and so its ETag) a pure function of the body.
+        return gzip.compress(body, COMPRESS_LEVEL, mtime=0)
+    return zlib.compress(body, COMPRESS_LEVEL)
+
+
+class EncodedBodies:
+    """Bounded, thread-safe map (ETag, coding) -> compressed body."""
+    def __init__(self, entries=DEFAULT_CACHE_ENTRIES):
+        self.entries = max(1, int(entries))
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag, coding, body) -> bytes:
+        key = (etag, coding)
+        with self._lock:
+            encoded = self._bodies.get(key)
+            if encoded is not None:
+                self._bodies.move_to_end(key)
+                return encoded
+        encoded = compress(body, coding)
+        with self._lock:
+            self._bodies[key] = encoded
+            while len(self._bodies) > self.entries:
+                self._bodies.popitem(last=False)
+        return encoded
+
+
+class StaticFiles:
+    """Files read once and kept in memory until their mtime or size changes."""
+    def __init__(self):
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """(body, ETag) of `path`; raises OSError if it cannot be read."""
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._files.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1], entry[2]
+        with open(path, "rb") as f:
+            body = f.read()
+        etag = body_etag(body)
+        with self._lock:
+            self._files[path] = (stamp, body, etag)
+        return body, etag
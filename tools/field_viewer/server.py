@@ -3,18 +3,32 @@
 
 from __future__ import annotations
 
-import base64
+import hashlib
+from array import array
 import json
 from typing import Optional
 import os
 import re
+import sys
+import threading
 import time
 import urllib.request
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, urlparse
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(ROOT_DIR, "..", ".."))
+SUPERVISOR_DIR = os.path.join(PROJECT_ROOT, "controllers", "supervisor_controller")
+if SUPERVISOR_DIR not in sys.path:
+    sys.path.append(SUPERVISOR_DIR)
+import decision_grids
+import sim_snapshot
+import state_bus
+import async_server
+import frame_history
+import frame_ring
+import http_encoding
+import stream_hub
 
 CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.json")
 
@@ -44,7 +58,7 @@ def _load_runtime_config() -> tuple[str, str, bool, str, float]:
         if isinstance(payload, dict):
             branch = str(payload.get("develop_branch", payload.get("develope_brancch", ""))).strip().lower()
             flow_raw = str(payload.get("data_flow", payload.get("data flow", "web"))).strip().lower()
-            if flow_raw in ("web", "file"):
+            if flow_raw in ("web", "file", "shm"):
                 data_flow = flow_raw
             run_on_pi_raw = payload.get("run_on_pi", False)
             if isinstance(run_on_pi_raw, bool):
@@ -82,7 +96,45 @@ def _load_html_port(path: str, default_port: int = 5001) -> int:
     return default_port
 
 
+def _load_server_config() -> tuple[str, int, int, int]:
+    """("threading" | "asyncio", max open connections for the asyncio server, camera frames kept,
+    history snapshots kept)."""
+    mode = "threading"
+    max_connections = async_server.DEFAULT_MAX_CONNECTIONS
+    camera_frames = frame_ring.DEFAULT_SLOTS
+    history_frames = frame_history.DEFAULT_CAPACITY
+    try:
+        with open(CONFIG_FILE, "r") as f:
+            payload = json.loads(f.read().strip())
+        if isinstance(payload, dict):
+            mode_raw = str(payload.get("viewer_server", mode)).strip().lower()
+            if mode_raw in ("threading", "asyncio"):
+                mode = mode_raw
+            try:
+                value = int(payload.get("viewer_max_connections", max_connections))
+                if value > 0:
+                    max_connections = value
+            except Exception:
+                pass
+            try:
+                value = int(payload.get("front_camera_frames", camera_frames))
+                if value > 0:
+                    camera_frames = value
+            except Exception:
+                pass
+            try:
+                value = int(payload.get("viewer_history_frames", history_frames))
+                if value > 0:
+                    history_frames = value
+            except Exception:
+                pass
+    except Exception:
+        pass
+    return mode, max_connections, camera_frames, history_frames
+
+
 DEVELOP_BRANCH, DATA_FLOW, RUN_ON_PI, PI_IP, VIEWER_REFRESH_SECONDS = _load_runtime_config()
+VIEWER_SERVER, VIEWER_MAX_CONNECTIONS, FRONT_CAMERA_FRAMES, VIEWER_HISTORY_FRAMES = _load_server_config()
 FIELD_VIEWER_PORT = _load_html_port(HTML_PORT_FILE)
 REMOTE_HOST = PI_IP if RUN_ON_PI else "localhost"
 DECISION_MAKING_DIR = os.path.join(PROJECT_ROOT, f"decision_making_{DEVELOP_BRANCH}") if DEVELOP_BRANCH else ""
@@ -90,6 +142,12 @@ DECISION_DATA_DIR = os.path.join(DECISION_MAKING_DIR, "real_time_data") if DECIS
 
 SIM_DATA_CACHE = {}
 SIM_DATA_SEQ = 0
+# Delta-encoded simulation_data (see sim_snapshot.py): supervisor-side epoch/seq
+# mirror plus a generation bumped whenever the mirror had to be resynced.
+SIM_DATA_MIRROR = sim_snapshot.new_mirror()
+SIM_DATA_GENERATION = 0
+SIM_DATA_DESYNC = False
+SIM_DATA_LOCK = threading.Lock()
 DECISIONS_CACHE = {}
 DECISIONS_SEQ = 0
 DECISION_MAKING_DATA_CACHE = {}
@@ -98,14 +156,49 @@ DECISION_MAKING_DEFAULTS = {
     "waypoints_stack": "",
 }
 
-FRONT_CAMERA_IMAGE = b""
-FRONT_CAMERA_MIME = "image/png"
-FRONT_CAMERA_UPDATED = 0.0
+# Latest camera frames; POST /front_camera bodies are read straight into a slot.
+FRONT_CAMERA_RING = frame_ring.FrameRing(FRONT_CAMERA_FRAMES)
+FRONT_CAMERA_MAX_BYTES = 16 * 1024 * 1024
+# multipart/x-mixed-replace boundary for /data/front_camera-stream (MJPEG).
+MJPEG_BOUNDARY = "frame"
+
+# data_flow "shm": the supervisor's state bus feeds the same caches the web POSTs do.
+STATE_BUS = state_bus.Connector(state_bus.load_bus_name(CONFIG_FILE, FIELD_VIEWER_PORT)) if DATA_FLOW == "shm" else None
+STATE_BUS_POLL_SECONDS = 0.005
+# channel -> last bus seq applied to (or written from) the caches.
+_STATE_BUS_SEEN = {}
+# Each bus region has a single writer: POST handler threads take turns.
+STATE_BUS_WRITE_LOCK = threading.Lock()
 
 REMOTE_PULL_INTERVAL_SECONDS = VIEWER_REFRESH_SECONDS
 _LAST_DECISIONS_PULL_TS = 0.0
 _LAST_DECISION_MAKING_PULL_TS = 0.0
 
+# SSE streams: a write that blocks this long drops the (stalled) client.
+STREAM_WRITE_TIMEOUT_SECONDS = 10.0
+STREAM_KEEPALIVE_SECONDS = stream_hub.DEFAULT_KEEPALIVE_SECONDS
+# /data/frame-stream pushes at most this often; clients always get the newest frame.
+FRAME_STREAM_MIN_INTERVAL_SECONDS = 0.05
+
+# Match history for /data/history and /data/replay: one snapshot per 20 ms of sim time.
+HISTORY = frame_history.FrameHistory(VIEWER_HISTORY_FRAMES)
+# file data_flow has no POSTs to record from; the data files are sampled this often instead.
+HISTORY_FILE_POLL_SECONDS = 0.1
+# Radar window drawn by the dashboard when the decision script writes no radar_memory.
+RADAR_HISTORY_WINDOW_SECONDS = 2.0
+# /data/replay frames are built from history snapshots with their own response memo.
+REPLAY_LOCK = threading.Lock()
+
+# GET replies: static pages from memory (re-read on mtime change), compressed bodies per ETag.
+STATIC_FILES = http_encoding.StaticFiles()
+ENCODED_BODIES = http_encoding.EncodedBodies()
+
+# Aggregated dashboard frame (/data/frame): built once per data update, served with an ETag.
+FRAME_LOCK = threading.Lock()
+_FRAME_SOURCE_KEY = None
+_FRAME_BODY = b""
+_FRAME_ETAG = ""
+
 
 def _fetch_json(url: str, timeout: float = 0.25) -> dict:
     try:
@@ -139,7 +232,7 @@ def _maybe_pull_remote_decision_making_data(force: bool = False) -> None:
     if not force and (now - _LAST_DECISION_MAKING_PULL_TS) < REMOTE_PULL_INTERVAL_SECONDS:
         return
     _LAST_DECISION_MAKING_PULL_TS = now
-    remote = _fetch_json(f"http://{REMOTE_HOST}:{FIELD_VIEWER_PORT}/data/decision_making_data")
+    remote = _fetch_json(f"http://{REMOTE_HOST}:{FIELD_VIEWER_PORT}/data/decision_making_data?view=raw")
     if remote:
         _set_decision_making_data_cache(remote)
 
@@ -252,6 +345,50 @@ def _get_decisions_lines(key: str) -> list[str]:
     return _read_lines_from_text(_get_decisions_text(key))
 
 
+def _text_value(value) -> str:
+    return value if isinstance(value, str) else ""
+
+
+class _LiveSources:
+    """Source texts for DATA_ENDPOINTS: the current caches (web) or data files (file)."""
+    live = True
+
+    def sim(self, key: str) -> str:
+        return _get_sim_text(key)
+
+    def decisions(self, key: str) -> str:
+        return _get_decisions_text(key)
+
+    def decision(self, key: str) -> str:
+        return _get_decision_text(key)
+
+    def history_time(self):
+        return HISTORY.bounds()[1]
+
+
+class _SnapshotSources:
+    """Source texts for DATA_ENDPOINTS from one frame_history.Snapshot (/data/replay)."""
+    live = False
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def sim(self, key: str) -> str:
+        return _text_value(self.snapshot.simulation_data.get(key))
+
+    def decisions(self, key: str) -> str:
+        return _text_value(self.snapshot.decisions.get(key))
+
+    def decision(self, key: str) -> str:
+        return _text_value(self.snapshot.decision_making_data.get(key, DECISION_MAKING_DEFAULTS.get(key)))
+
+    def history_time(self):
+        return self.snapshot.t
+
+
+LIVE_SOURCES = _LiveSources()
+
+
 def _parse_tuple(line: str) -> list[str]:
     if line.startswith("(") and line.endswith(")"):
         line = line[1:-1]
@@ -322,8 +459,8 @@ def _parse_current(line: str):
     return {"x": x, "y": y, "bearing": bearing}
 
 
-def _get_current():
-    lines = _get_sim_lines("current_position")
+def _current_from_text(text: str):
+    lines = _read_lines_from_text(text)
     if not lines:
         return None
     return _parse_current(lines[0])
@@ -340,9 +477,9 @@ def _get_balls_from_lines(lines: list[str]):
     return out
 
 
-def _get_obstacles():
+def _obstacles_from_text(text: str):
     out = []
-    for line in _get_sim_lines("obstacle_robot"):
+    for line in _read_lines_from_text(text):
         item = _parse_xy_bearing(line)
         if item is None:
             continue
@@ -351,62 +488,67 @@ def _get_obstacles():
     return out
 
 
-def _get_dynamic_waypoint():
-    for line in _get_decisions_lines("dynamic_waypoints"):
+def _xy_points_from_text(text: str) -> list[dict[str, float]]:
+    out = []
+    for line in _read_lines_from_text(text):
         item = _extract_xy_from_line(line)
         if item is None:
             continue
         x, y = item
-        return {"x": x, "y": y}
-    return None
+        out.append({"x": x, "y": y})
+    return out
 
 
-def _get_stack_waypoint():
-    lines = _get_decision_lines("waypoints_stack")
-    for line in reversed(lines):
-        item = _extract_xy_from_line(line)
-        if item is None:
-            continue
-        x, y = item
-        return {"x": x, "y": y}
-    return None
+def _dynamic_waypoint_from_text(text: str):
+    points = _xy_points_from_text(text)
+    return points[0] if points else None
 
 
-def _get_robot_around():
-    out = []
-    for line in _get_decision_lines("robot_around"):
-        item = _extract_xy_from_line(line)
-        if item is None:
-            continue
-        x, y = item
-        out.append({"x": x, "y": y})
-    return out
+def _stack_waypoint_from_text(text: str):
+    points = _xy_points_from_text(text)
+    return points[-1] if points else None
 
 
-def _get_radar_history():
-    out = []
-    for line in _get_decision_lines("radar_memory"):
+# Typed views of text cache entries, parsed once per distinct text:
+# (kind, key) -> (text, parsed value).
+_PARSED_TEXT_CACHE: dict[tuple[str, str], tuple[str, object]] = {}
+
+
+def _parse_once(kind: str, key: str, text: str, parser):
+    entry = _PARSED_TEXT_CACHE.get((kind, key))
+    if entry is not None and entry[0] == text:
+        return entry[1]
+    value = parser(text)
+    _PARSED_TEXT_CACHE[(kind, key)] = (text, value)
+    return value
+
+
+RADAR_HISTORY_FIELDS = ("t", "front", "right", "left", "rear")
+
+
+def _parse_radar_memory(text: str) -> array:
+    """radar_memory lines "t, front, right, left, rear" -> flat float array, 5 values per sample."""
+    values = array("d")
+    width = len(RADAR_HISTORY_FIELDS)
+    for line in _read_lines_from_text(text):
         parts = [p.strip() for p in line.split(",")]
-        if len(parts) < 5:
+        if len(parts) < width:
             continue
         try:
-            t = float(parts[0])
-            front = float(parts[1])
-            right = float(parts[2])
-            left = float(parts[3])
-            rear = float(parts[4])
+            sample = [float(p) for p in parts[:width]]
         except Exception:
             continue
-        out.append({
-            "t": t,
-            "front": front,
-            "right": right,
-            "left": left,
-            "rear": rear,
-        })
-    return out
+        values.extend(sample)
+    return values
 
 
+def _radar_history_from_text(text: str):
+    values = _parse_once("radar", "radar_memory", text, _parse_radar_memory)
+    width = len(RADAR_HISTORY_FIELDS)
+    return [
+        dict(zip(RADAR_HISTORY_FIELDS, values[i:i + width]))
+        for i in range(0, len(values), width)
+    ]
 
 
 def _read_numeric_matrix_from_text(text: str) -> list[list[float]]:
@@ -429,19 +571,29 @@ def _read_numeric_matrix_from_text(text: str) -> list[list[float]]:
     return matrix
 
 
-def _matrix_to_world_tiles(matrix: list[list[float]]) -> list[dict[str, float]]:
-    """Map matrix cells to tile-center world coordinates over [-1, 1] x [-1, 1].
+def _parse_tile_grid(text: str) -> tuple[int, int, array]:
+    """Tile matrix text -> (rows, cols, row-major values); ragged rows are cut to the shortest."""
+    if decision_grids.is_grid(text):
+        return decision_grids.to_array(text)
+    matrix = _read_numeric_matrix_from_text(text)
+    if not matrix:
+        return 0, 0, array("d")
+    cols = min(len(row) for row in matrix)
+    values = array("d")
+    for row in matrix:
+        values.extend(row[:cols])
+    return len(matrix), cols, values
+
+
+def _tile_grid_to_world_tiles(grid: tuple[int, int, array]) -> list[dict[str, float]]:
+    """Map grid cells to tile-center world coordinates over [-1, 1] x [-1, 1].
 
     For an N-column matrix, x centers are at:
     -1 + (1/N), -1 + 3*(1/N), ..., 1 - (1/N)
     Equivalent to x = -1 + tile_half + c * tile_size where tile_size = 2/N.
     Same for y (top to bottom).
     """
-    if not matrix:
-        return []
-
-    rows = len(matrix)
-    cols = min(len(r) for r in matrix if r) if any(matrix) else 0
+    rows, cols, values = grid
     if rows <= 0 or cols <= 0:
         return []
 
@@ -452,67 +604,251 @@ def _matrix_to_world_tiles(matrix: list[list[float]]) -> list[dict[str, float]]:
 
     out: list[dict[str, float]] = []
     for r in range(rows):
+        y = y0 - r * tile_h
+        base = r * cols
         for c in range(cols):
-            try:
-                v = float(matrix[r][c])
-            except Exception:
-                v = 0.0
-            x = x0 + c * tile_w
-            y = y0 - r * tile_h
-            out.append({"x": x, "y": y, "value": v})
+            out.append({"x": x0 + c * tile_w, "y": y, "value": values[base + c]})
     return out
 
 
-def _get_tile_seen_time():
-    matrix = _read_numeric_matrix_from_text(_get_decision_text("tile_seen_time"))
-    return _matrix_to_world_tiles(matrix)
+def _world_tiles_from_text(key: str, text: str) -> list[dict[str, float]]:
+    return _tile_grid_to_world_tiles(_parse_once("tile_grid", key, text, _parse_tile_grid))
+
+
+def _text_status_sources(src) -> tuple[str, ...]:
+    if DATA_FLOW == "file" and src.live:
+        random_seed = _read_text(RANDOM_SEED_FILE)
+        last_ball_taken = _read_last_line(BALL_TAKEN_HISTORY_FILE)
+    else:
+        random_seed = src.sim("random_seed")
+        last_ball_taken = _read_last_line_from_text(src.sim("ball_taken_history"))
+    return (
+        src.sim("waypoint_status"),
+        src.decision("mode"),
+        src.decision("collision_avoiding"),
+        src.sim("time"),
+        random_seed,
+        src.decision("collision_counter"),
+        last_ball_taken,
+    )
+
+
+def _text_status_from_sources(sources: tuple[str, ...]) -> dict:
+    waypoint_status, mode, collision_avoiding, sim_time, random_seed, collision_counter, last_ball_taken = sources
+    return {
+        "waypoint_status": waypoint_status,
+        "mode": mode,
+        "collision_avoiding": collision_avoiding,
+        "simulation_time": _read_first_line_number_from_text(sim_time),
+        "random_seed": random_seed,
+        "collision_counter": _read_first_line_number_from_text(collision_counter),
+        "last_ball_taken": last_ball_taken,
+    }
+
+
+def _all_ball_path_from_text(text: str):
+    path = _xy_points_from_text(text)
+    return {"enabled": len(path) > 0, "path": path}
 
 
-def _get_ball_tile_memory():
-    matrix = _read_numeric_matrix_from_text(_get_decision_text("ball_tile_memory"))
-    return _matrix_to_world_tiles(matrix)
+def _radar_memory_text(src) -> str:
+    """radar_memory from the decision script, else the last 2 s of radar_sensor from HISTORY."""
+    text = src.decision("radar_memory")
+    if text:
+        return text
+    end = src.history_time()
+    if end is None:
+        return ""
+    lines: list[str] = []
+    for snapshot in HISTORY.between(end - RADAR_HISTORY_WINDOW_SECONDS, end):
+        line = _text_value(snapshot.simulation_data.get("radar_sensor"))
+        if line and (not lines or lines[-1] != line):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _tile_endpoint(key: str):
+    return (
+        lambda src: (src.decision(key),),
+        lambda sources: {"tiles": _world_tiles_from_text(key, sources[0])},
+    )
+
+
+# Derived GET /data/* payloads: path -> (raw texts the payload depends on, read from a
+# source view, builder).
+# Responses are encoded once and reused until one of those texts changes.
+DATA_ENDPOINTS = {
+    "/data/current": (
+        lambda src: (src.sim("current_position"),),
+        lambda sources: {"current": _current_from_text(sources[0])},
+    ),
+    "/data/balls": (
+        lambda src: (src.sim("visible_balls"),),
+        lambda sources: {"balls": _get_balls_from_lines(_read_lines_from_text(sources[0]))},
+    ),
+    "/data/visible": (
+        lambda src: (src.sim("visible_balls"),),
+        lambda sources: {"visible": _get_balls_from_lines(_read_lines_from_text(sources[0]))},
+    ),
+    "/data/obstacles": (
+        lambda src: (src.sim("obstacle_robot"),),
+        lambda sources: {"obstacles": _obstacles_from_text(sources[0])},
+    ),
+    "/data/waypoints": (
+        lambda src: (src.decisions("dynamic_waypoints"), src.decision("waypoints_stack")),
+        lambda sources: {
+            "dynamic": _dynamic_waypoint_from_text(sources[0]),
+            "stack": _stack_waypoint_from_text(sources[1]),
+        },
+    ),
+    "/data/robot-around": (
+        lambda src: (src.decision("robot_around"),),
+        lambda sources: {"vectors": _xy_points_from_text(sources[0])},
+    ),
+    "/data/radar-history": (
+        lambda src: (_radar_memory_text(src),),
+        lambda sources: {"history": _radar_history_from_text(sources[0])},
+    ),
+    "/data/tile-seen-time": _tile_endpoint("tile_seen_time"),
+    "/data/ball-tile-memory": _tile_endpoint("ball_tile_memory"),
+    "/data/unseen-tile-memory": _tile_endpoint("unseen_tile_memory"),
+    "/data/unseen-regions": _tile_endpoint("unseen_regions"),
+    "/data/text-status": (_text_status_sources, _text_status_from_sources),
+    "/data/all-ball-path": (
+        lambda src: (src.decision("planned_waypoints"),),
+        lambda sources: _all_ball_path_from_text(sources[0]),
+    ),
+}
+_DATA_RESPONSE_CACHE: dict[str, tuple[tuple[str, ...], bytes]] = {}
 
 
-def _get_unseen_tile_memory():
-    matrix = _read_numeric_matrix_from_text(_get_decision_text("unseen_tile_memory"))
-    return _matrix_to_world_tiles(matrix)
+_REPLAY_RESPONSE_CACHE: dict[str, tuple[tuple[str, ...], bytes]] = {}
 
 
-def _get_unseen_regions():
-    matrix = _read_numeric_matrix_from_text(_get_decision_text("unseen_regions"))
-    return _matrix_to_world_tiles(matrix)
+def _get_data_response(path: str, src=LIVE_SOURCES, cache=_DATA_RESPONSE_CACHE) -> bytes:
+    """Encoded JSON for a DATA_ENDPOINTS path, memoized on the texts it was built from."""
+    read_sources, build = DATA_ENDPOINTS[path]
+    sources = read_sources(src)
+    entry = cache.get(path)
+    if entry is not None and entry[0] == sources:
+        return entry[1]
+    body = json.dumps(build(sources)).encode("utf-8")
+    cache[path] = (sources, body)
+    return body
 
 
-def _get_text_status():
-    if DATA_FLOW == "file":
-        random_seed = _read_text(RANDOM_SEED_FILE)
-        last_ball_taken = _read_last_line(BALL_TAKEN_HISTORY_FILE)
-    else:
-        random_seed = _get_sim_text("random_seed")
-        last_ball_taken = _read_last_line_from_text(_get_sim_text("ball_taken_history"))
+# Dashboard frame members: frame key -> DATA_ENDPOINTS path.
+FRAME_PARTS = (
+    ("current", "/data/current"),
+    ("balls", "/data/balls"),
+    ("visible", "/data/visible"),
+    ("obstacles", "/data/obstacles"),
+    ("waypoints", "/data/waypoints"),
+    ("robot_around", "/data/robot-around"),
+    ("radar_history", "/data/radar-history"),
+    ("tile_seen_time", "/data/tile-seen-time"),
+    ("ball_tile_memory", "/data/ball-tile-memory"),
+    ("unseen_tile_memory", "/data/unseen-tile-memory"),
+    ("unseen_regions", "/data/unseen-regions"),
+    ("text_status", "/data/text-status"),
+    ("all_ball_path", "/data/all-ball-path"),
+)
+
+
+def _build_frame_body(src=LIVE_SOURCES, cache=_DATA_RESPONSE_CACHE) -> bytes:
+    """Everything the dashboard draws in one tick, spliced from the memoized /data/* bodies."""
+    parts = [b'"%s": %s' % (name.encode("ascii"), _get_data_response(path, src, cache)) for name, path in FRAME_PARTS]
+    return b"{" + b", ".join(parts) + b"}"
+
+
+def _record_history(simulation_data: dict) -> None:
+    try:
+        t = float(simulation_data.get("time"))
+    except Exception:
+        return
+    HISTORY.record(t, simulation_data, DECISIONS_CACHE, DECISION_MAKING_DATA_CACHE)
+
+
+def _history_file_recorder() -> None:
+    """file data_flow: snapshot the data files whenever time.txt moves on."""
+    last_time = None
+    while True:
+        time.sleep(HISTORY_FILE_POLL_SECONDS)
+        sim_time = _read_first_line_number(os.path.join(SIM_DATA_DIR, "time.txt"))
+        if not sim_time or sim_time == last_time:
+            continue
+        last_time = sim_time
+        simulation_data = _get_simulation_data()
+        simulation_data["time"] = sim_time
+        decisions = _read_data_dir_snapshot(DECISION_DATA_DIR) if DECISION_DATA_DIR else {}
+        try:
+            HISTORY.record(float(sim_time), simulation_data, decisions, decisions)
+        except ValueError:
+            pass
+
+
+def _query_float(query: dict, name: str) -> Optional[float]:
+    """Optional float query parameter; raises ValueError when present but malformed."""
+    raw = query.get(name, [""])[0].strip()
+    return float(raw) if raw else None
+
+
+def _history_payload(snapshots, keys: list[str]) -> dict:
+    start, end, count = HISTORY.bounds()
+
+    def pick(values: dict) -> dict:
+        if not keys:
+            return values
+        return {key: values[key] for key in keys if key in values}
 
     return {
-        "waypoint_status": _get_sim_text("waypoint_status"),
-        "mode": _get_decision_text("mode"),
-        "collision_avoiding": _get_decision_text("collision_avoiding"),
-        "simulation_time": _read_first_line_number_from_text(_get_sim_text("time")),
-        "random_seed": random_seed,
-        "collision_counter": _read_first_line_number_from_text(
-            _get_decision_text("collision_counter")
-        ),
-        "last_ball_taken": last_ball_taken,
+        "start": start,
+        "end": end,
+        "count": count,
+        "frames": [
+            {
+                "seq": snapshot.seq,
+                "t": snapshot.t,
+                "wall": snapshot.wall,
+                "simulation_data": pick(snapshot.simulation_data),
+                "decisions": pick(snapshot.decisions),
+                "decision_making_data": pick(snapshot.decision_making_data),
+            }
+            for snapshot in snapshots
+        ],
     }
 
 
-def _get_all_ball_path():
-    path = []
-    for line in _get_decision_lines("planned_waypoints"):
-        item = _extract_xy_from_line(line)
-        if item is None:
-            continue
-        x, y = item
-        path.append({"x": x, "y": y})
-    return {"enabled": len(path) > 0, "path": path}
+def _build_replay_body(snapshot) -> bytes:
+    """Dashboard frame rebuilt from a history snapshot, plus a "replay" member with its position."""
+    with REPLAY_LOCK:
+        body = _build_frame_body(_SnapshotSources(snapshot), _REPLAY_RESPONSE_CACHE)
+    start, end, count = HISTORY.bounds()
+    meta = {"t": snapshot.t, "seq": snapshot.seq, "wall": snapshot.wall, "start": start, "end": end, "count": count}
+    return body[:-1] + b', "replay": ' + json.dumps(meta).encode("utf-8") + b"}"
+
+
+def _frame_source_key():
+    """What a frame was built from: POST sequence numbers (web) or a refresh bucket (file)."""
+    if DATA_FLOW == "file":
+        return ("file", int(time.monotonic() / VIEWER_REFRESH_SECONDS))
+    _maybe_pull_remote_decisions()
+    _maybe_pull_remote_decision_making_data()
+    return (SIM_DATA_SEQ, DECISIONS_SEQ, DECISION_MAKING_DATA_SEQ)
+
+
+def _get_frame_cached() -> tuple[bytes, str]:
+    """(JSON body, ETag) of the dashboard frame; rebuilt only when the source data changed."""
+    global _FRAME_SOURCE_KEY, _FRAME_BODY, _FRAME_ETAG
+    with FRAME_LOCK:
+        key = _frame_source_key()
+        if key != _FRAME_SOURCE_KEY:
+            body = _build_frame_body()
+            if body != _FRAME_BODY:
+                _FRAME_BODY = body
+                _FRAME_ETAG = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+            _FRAME_SOURCE_KEY = key
+        return _FRAME_BODY, _FRAME_ETAG
 
 
 def _get_simulation_data():
@@ -536,10 +872,75 @@ def _get_simulation_data_cached():
     return SIM_DATA_CACHE if SIM_DATA_CACHE else {}
 
 
-def _set_simulation_cache(payload: dict):
-    global SIM_DATA_CACHE, SIM_DATA_SEQ
-    SIM_DATA_CACHE = payload
-    SIM_DATA_SEQ += 1
+def _set_simulation_cache(payload: dict) -> bool:
+    """Apply a POSTed snapshot/delta envelope or a legacy full dict.
+
+    Returns False when a delta did not line up with the mirror; the caller
+    answers 409 so the supervisor sends a full snapshot next.
+    """
+    global SIM_DATA_CACHE, SIM_DATA_SEQ, SIM_DATA_GENERATION, SIM_DATA_DESYNC
+    with SIM_DATA_LOCK:
+        if not sim_snapshot.is_envelope(payload):
+            # Legacy producer: whole dict each frame; still track per-key seqs.
+            seq = SIM_DATA_MIRROR["seq"] + 1 if SIM_DATA_MIRROR["epoch"] == "legacy" else 0
+            previous = SIM_DATA_MIRROR["values"]
+            keys = {
+                key: [SIM_DATA_MIRROR["key_seq"].get(key, seq) if previous.get(key) == value else seq, value]
+                for key, value in payload.items()
+            }
+            payload = {"v": sim_snapshot.SNAPSHOT_VERSION, "epoch": "legacy", "seq": seq, "full": True, "keys": keys}
+        if payload.get("full") and SIM_DATA_DESYNC:
+            SIM_DATA_GENERATION += 1
+        in_sync = sim_snapshot.apply_envelope(SIM_DATA_MIRROR, payload)
+        if payload.get("full"):
+            SIM_DATA_DESYNC = False
+        elif not in_sync:
+            SIM_DATA_DESYNC = True
+        SIM_DATA_CACHE = SIM_DATA_MIRROR["values"]
+        SIM_DATA_SEQ += 1
+        simulation_data = SIM_DATA_CACHE
+    _record_history(simulation_data)
+    SIM_STREAM_HUB.publish()
+    SIM_DELTA_STREAM_HUB.publish()
+    FRAME_STREAM_HUB.publish()
+    return in_sync
+
+
+def _simulation_epoch() -> str:
+    return f"{SIM_DATA_MIRROR['epoch']}.{SIM_DATA_GENERATION}"
+
+
+def _get_simulation_delta(since: int = -1, epoch: str = "") -> dict:
+    """Envelope with the keys changed after `since` (full on epoch mismatch)."""
+    if DATA_FLOW == "file":
+        values = _get_simulation_data()
+        return {
+            "v": sim_snapshot.SNAPSHOT_VERSION,
+            "epoch": "file",
+            "seq": 0,
+            "base": -1,
+            "full": True,
+            "keys": {key: [0, value] for key, value in values.items()},
+        }
+    with SIM_DATA_LOCK:
+        current_epoch = _simulation_epoch()
+        seq = SIM_DATA_MIRROR["seq"]
+        values = SIM_DATA_MIRROR["values"]
+        key_seq = SIM_DATA_MIRROR["key_seq"]
+        full = epoch != current_epoch or since < 0 or since > seq
+        keys = {
+            key: [key_seq.get(key, seq), value]
+            for key, value in values.items()
+            if full or key_seq.get(key, seq) > since
+        }
+    return {
+        "v": sim_snapshot.SNAPSHOT_VERSION,
+        "epoch": current_epoch,
+        "seq": seq,
+        "base": -1 if full else since,
+        "full": full,
+        "keys": keys,
+    }
 
 
 def _get_decisions_data_cached():
@@ -555,6 +956,8 @@ def _set_decisions_cache(payload: dict):
     global DECISIONS_CACHE, DECISIONS_SEQ
     DECISIONS_CACHE = payload
     DECISIONS_SEQ += 1
+    DECISIONS_STREAM_HUB.publish()
+    FRAME_STREAM_HUB.publish()
 
 
 def _get_decision_making_data_cached():
@@ -586,6 +989,20 @@ def _get_decision_making_data() -> dict:
     return DECISION_MAKING_DATA_CACHE if DECISION_MAKING_DATA_CACHE else {}
 
 
+# (cache dict, its text view); the cache is replaced on every update, never mutated.
+_DECISION_MAKING_TEXT_VIEW = (None, None)
+
+
+def _decision_making_text_view(payload: dict) -> dict:
+    """decision_making_data with binary tile maps (decision_grids.py) rendered as text."""
+    global _DECISION_MAKING_TEXT_VIEW
+    source, view = _DECISION_MAKING_TEXT_VIEW
+    if source is not payload:
+        view = decision_grids.text_view(payload)
+        _DECISION_MAKING_TEXT_VIEW = (payload, view)
+    return view
+
+
 def _set_decision_making_data_cache(payload: dict):
     global DECISION_MAKING_DATA_CACHE, DECISION_MAKING_DATA_SEQ
     merged = dict(DECISION_MAKING_DATA_CACHE)
@@ -594,80 +1011,192 @@ def _set_decision_making_data_cache(payload: dict):
         merged.setdefault(key, value)
     DECISION_MAKING_DATA_CACHE = merged
     DECISION_MAKING_DATA_SEQ += 1
+    DECISION_MAKING_DATA_STREAM_HUB.publish()
+    FRAME_STREAM_HUB.publish()
+
+
+def _state_bus_pump() -> None:
+    """shm data_flow: apply every new state bus write to the web caches (history, SSE, frames)."""
+    appliers = (
+        ("simulation_data", _set_simulation_cache),
+        ("decisions", _set_decisions_cache),
+        ("decision_making_data", _set_decision_making_data_cache),
+    )
+    token = None
+    while True:
+        time.sleep(STATE_BUS_POLL_SECONDS)
+        bus = STATE_BUS.get()
+        if bus is None:
+            continue
+        if bus.token != token:
+            token = bus.token
+            _STATE_BUS_SEEN.clear()
+        for channel, apply in appliers:
+            seq = bus.seq(channel)
+            if seq & 1 or seq == _STATE_BUS_SEEN.get(channel, 0):
+                continue
+            seq, payload = bus.read_dict(channel)
+            if payload is None:
+                continue
+            _STATE_BUS_SEEN[channel] = seq
+            apply(payload)
 
 
-def _set_front_camera_image(image_bytes: bytes, mime: Optional[str] = None):
-    global FRONT_CAMERA_IMAGE, FRONT_CAMERA_MIME, FRONT_CAMERA_UPDATED
-    if image_bytes:
-        FRONT_CAMERA_IMAGE = image_bytes
-        if mime:
-            FRONT_CAMERA_MIME = mime
-        FRONT_CAMERA_UPDATED = time.time()
+def _forward_to_state_bus(path: str) -> None:
+    """shm data_flow: HTTP clients (wly, ROS scripts) still reach the supervisor through the bus."""
+    bus = STATE_BUS.get()
+    if bus is None:
+        return
+    with STATE_BUS_WRITE_LOCK:
+        if path == "/data/decisions":
+            bus.publish_decisions(DECISIONS_CACHE)
+            _STATE_BUS_SEEN["decisions"] = bus.seq("decisions")
+        elif path == "/data/decision_making_data":
+            bus.write_dict("decision_making_data", DECISION_MAKING_DATA_CACHE)
+            _STATE_BUS_SEEN["decision_making_data"] = bus.seq("decision_making_data")
 
 
-class Handler(BaseHTTPRequestHandler):
-    def _send_json(self, payload, status=200):
-        body = json.dumps(payload).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Cache-Control", "no-store")
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
-
-    def _send_text(self, text: str, status=200, content_type="text/html"):
-        body = text.encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Cache-Control", "no-store")
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
-
-    def _send_bytes(self, body: bytes, status=200, content_type="application/octet-stream"):
-        self.send_response(status)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Cache-Control", "no-store")
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
+def _ingest_front_camera(length: int, content_type: str, fill) -> Reply:
+    """Store one binary camera frame; `fill(view)` writes the request body into the ring slot."""
+    if content_type.startswith("application/json"):
+        return _text_reply("send raw image bytes (e.g. Content-Type: image/jpeg)", 415, "text/plain")
+    if length <= 0:
+        return _text_reply("empty payload", 400, "text/plain")
+    if length > FRONT_CAMERA_MAX_BYTES:
+        reply = _text_reply("image too large", 413, "text/plain")
+        reply.close = True
+        return reply
+    if FRONT_CAMERA_RING.write_into(length, fill, content_type) is None:
+        return _text_reply("invalid payload", 400, "text/plain")
+    FRONT_CAMERA_STREAM_HUB.publish()
+    return _text_reply("ok", 200, "text/plain")
 
-    def do_GET(self):
-        path = urlparse(self.path).path
-        if path in ("/", "/index.html"):
-            try:
-                with open(INDEX_FILE, "r") as f:
-                    self._send_text(f.read(), 200, "text/html")
-            except Exception:
-                self._send_text("index.html not found", 404, "text/plain")
-            return
 
-        if path == "/simulation_data":
-            try:
-                with open(SIM_DATA_FILE, "r") as f:
-                    self._send_text(f.read(), 200, "text/html")
-            except Exception:
-                self._send_text("simulation_data.html not found", 404, "text/plain")
-            return
+def _sse_event(text: str) -> bytes:
+    return f"data: {text}\n\n".encode("utf-8")
 
-        if path == "/decisions":
-            try:
-                with open(DECISIONS_FILE, "r") as f:
-                    self._send_text(f.read(), 200, "text/html")
-            except Exception:
-                self._send_text("decisions.html not found", 404, "text/plain")
-            return
 
-        if path == "/decision_making_data":
-            try:
-                with open(DECISION_MAKING_DATA_FILE, "r") as f:
-                    self._send_text(f.read(), 200, "text/html")
-            except Exception:
-                self._send_text("decision_making_data.html not found", 404, "text/plain")
-            return
+# SSE fan-out: each stream has one hub; POST handlers publish, subscribers share the
+# encoded event bytes (see stream_hub.py).
+_SIM_DELTA_STREAM_SEQ = -1
+_SIM_DELTA_STREAM_EPOCH = ""
+
+
+def _encode_simulation_stream():
+    with SIM_DATA_LOCK:
+        if not SIM_DATA_CACHE:
+            return None
+        return _sse_event(json.dumps(SIM_DATA_CACHE))
+
+
+def _encode_simulation_delta_stream():
+    """Shared delta event: keys changed since the previous shared event.
+
+    Returns (epoch, base, seq, full, event) so each subscriber can check the event
+    lines up with what it already has (_simulation_delta_event).
+    """
+    global _SIM_DELTA_STREAM_SEQ, _SIM_DELTA_STREAM_EPOCH
+    if not SIM_DATA_CACHE:
+        return None
+    envelope = _get_simulation_delta(_SIM_DELTA_STREAM_SEQ, _SIM_DELTA_STREAM_EPOCH)
+    # Nothing changed: keep the base so the next delta still lines up.
+    if not envelope["keys"] and not envelope["full"]:
+        return None
+    _SIM_DELTA_STREAM_SEQ = envelope["seq"]
+    _SIM_DELTA_STREAM_EPOCH = envelope["epoch"]
+    return (
+        envelope["epoch"],
+        envelope["base"],
+        envelope["seq"],
+        envelope["full"],
+        _sse_event(sim_snapshot.dumps(envelope)),
+    )
 
-        if path == "/front_camera":
-            page = """<!doctype html>
+
+def _simulation_delta_event(shared, client_seq: int, client_epoch: str):
+    """Reuse the shared delta event when it applies to this client, else build a catch-up one.
+
+    Returns (event bytes or b"", new client seq, new client epoch).
+    """
+    epoch, base, seq, full, event = shared
+    if epoch == client_epoch and seq <= client_seq:
+        return b"", client_seq, client_epoch
+    if full or (epoch == client_epoch and base == client_seq):
+        return event, seq, epoch
+    # New subscriber or one that skipped frames while writing: personal envelope.
+    envelope = _get_simulation_delta(client_seq, client_epoch)
+    if not envelope["keys"] and not envelope["full"]:
+        return b"", client_seq, client_epoch
+    return _sse_event(sim_snapshot.dumps(envelope)), envelope["seq"], envelope["epoch"]
+
+
+def _encode_decisions_stream():
+    if DATA_FLOW == "file":
+        return _sse_event(json.dumps(_read_data_dir_snapshot(DECISION_DATA_DIR)))
+    return _sse_event(json.dumps(DECISIONS_CACHE))
+
+
+def _encode_decision_making_data_stream():
+    if DATA_FLOW == "file":
+        return _sse_event(json.dumps(_get_decision_making_data_cached()))
+    return _sse_event(json.dumps(_decision_making_text_view(DECISION_MAKING_DATA_CACHE)))
+
+
+def _stream_refresh(file_encode, remote_pull):
+    """Poll hook for a stream hub: re-read files, pull from the Pi, or nothing (push only)."""
+    if DATA_FLOW == "file":
+        return file_encode
+    if RUN_ON_PI:
+        return remote_pull
+    return None
+
+
+def _encode_frame_stream():
+    body, _ = _get_frame_cached()
+    return b"data: " + body + b"\n\n"
+
+
+def _mjpeg_part(image: bytes, mime: str) -> bytes:
+    head = f"--{MJPEG_BOUNDARY}\r\nContent-Type: {mime}\r\nContent-Length: {len(image)}\r\n\r\n"
+    return head.encode("latin-1") + image + b"\r\n"
+
+
+def _encode_front_camera_stream():
+    frame = FRONT_CAMERA_RING.acquire()
+    if frame is None:
+        return None
+    try:
+        return _mjpeg_part(frame.data, frame.mime)
+    finally:
+        FRONT_CAMERA_RING.release(frame)
+
+
+def _maybe_pull_remote_frame_sources():
+    _maybe_pull_remote_decisions()
+    _maybe_pull_remote_decision_making_data()
+
+
+SIM_STREAM_HUB = stream_hub.StreamHub(_encode_simulation_stream)
+FRONT_CAMERA_STREAM_HUB = stream_hub.StreamHub(_encode_front_camera_stream)
+SIM_DELTA_STREAM_HUB = stream_hub.StreamHub(_encode_simulation_delta_stream)
+DECISIONS_STREAM_HUB = stream_hub.StreamHub(
+    _encode_decisions_stream,
+    _stream_refresh(_encode_decisions_stream, _maybe_pull_remote_decisions),
+    REMOTE_PULL_INTERVAL_SECONDS,
+)
+DECISION_MAKING_DATA_STREAM_HUB = stream_hub.StreamHub(
+    _encode_decision_making_data_stream,
+    _stream_refresh(_encode_decision_making_data_stream, _maybe_pull_remote_decision_making_data),
+    REMOTE_PULL_INTERVAL_SECONDS,
+)
+FRAME_STREAM_HUB = stream_hub.StreamHub(
+    _encode_frame_stream,
+    _stream_refresh(_encode_frame_stream, _maybe_pull_remote_frame_sources),
+    REMOTE_PULL_INTERVAL_SECONDS,
+)
+
+
+FRONT_CAMERA_PAGE = """<!doctype html>
 <html lang=\"en\">
 <head>
     <meta charset=\"utf-8\" />
@@ -690,238 +1219,356 @@ class Handler(BaseHTTPRequestHandler):
     <script>
         const img = document.getElementById('cam');
         const meta = document.getElementById('meta');
+        let pollTimer = null;
         function refresh() {
             const ts = Date.now();
             img.src = `/data/front_camera?t=${ts}`;
             meta.textContent = `Updated ${new Date(ts).toLocaleTimeString()}`;
         }
-        refresh();
-        setInterval(refresh, 200);
+        // MJPEG stream pushes each new frame; poll single frames only if it breaks.
+        img.onerror = () => {
+            if (pollTimer) return;
+            meta.textContent = "Stream unavailable, polling";
+            pollTimer = setInterval(refresh, 200);
+        };
+        img.src = "/data/front_camera-stream";
+        meta.textContent = "Live (MJPEG)";
     </script>
 </body>
 </html>"""
-            self._send_text(page, 200, "text/html")
-            return
 
-        if path == "/data/current":
-            self._send_json({"current": _get_current()})
-            return
-        if path == "/data/balls":
-            self._send_json({"balls": _get_balls_from_lines(_get_sim_lines("visible_balls"))})
-            return
-        if path == "/data/visible":
-            self._send_json({"visible": _get_balls_from_lines(_get_sim_lines("visible_balls"))})
-            return
-        if path == "/data/obstacles":
-            self._send_json({"obstacles": _get_obstacles()})
-            return
-        if path == "/data/waypoints":
-            self._send_json({"dynamic": _get_dynamic_waypoint(), "stack": _get_stack_waypoint()})
-            return
-        if path == "/data/robot-around":
-            self._send_json({"vectors": _get_robot_around()})
-            return
-        if path == "/data/radar-history":
-            self._send_json({"history": _get_radar_history()})
-            return
-        if path == "/data/tile-seen-time":
-            self._send_json({"tiles": _get_tile_seen_time()})
-            return
-        if path == "/data/ball-tile-memory":
-            self._send_json({"tiles": _get_ball_tile_memory()})
-            return
-        if path == "/data/unseen-tile-memory":
-            self._send_json({"tiles": _get_unseen_tile_memory()})
-            return
-        if path == "/data/unseen-regions":
-            self._send_json({"tiles": _get_unseen_regions()})
-            return
-        if path == "/data/text-status":
-            self._send_json(_get_text_status())
-            return
-        if path == "/data/all-ball-path":
-            self._send_json(_get_all_ball_path())
-            return
-        if path == "/data/simulation_data":
-            self._send_json(_get_simulation_data_cached())
-            return
-        if path == "/data/decisions":
-            self._send_json(_get_decisions_data_cached())
-            return
-        if path == "/data/decision_making_data":
-            self._send_json(_get_decision_making_data_cached())
-            return
-        if path == "/data/front_camera":
-            if FRONT_CAMERA_IMAGE:
-                self._send_bytes(FRONT_CAMERA_IMAGE, 200, FRONT_CAMERA_MIME)
-            else:
-                self._send_text("no image", 404, "text/plain")
-            return
-        if path == "/data/simulation-stream":
-            self.send_response(200)
-            self.send_header("Content-Type", "text/event-stream")
-            self.send_header("Cache-Control", "no-store")
-            self.send_header("Connection", "keep-alive")
-            self.end_headers()
+# Static pages: path -> (file, name used in the 404 text).
+HTML_PAGES = {
+    "/": (INDEX_FILE, "index.html"),
+    "/index.html": (INDEX_FILE, "index.html"),
+    "/simulation_data": (SIM_DATA_FILE, "simulation_data.html"),
+    "/decisions": (DECISIONS_FILE, "decisions.html"),
+    "/decision_making_data": (DECISION_MAKING_DATA_FILE, "decision_making_data.html"),
+}
 
-            last_seq = -1
-            last_payload_text = ""
-            while True:
-                try:
-                    if SIM_DATA_CACHE:
-                        seq = SIM_DATA_SEQ
-                        if seq != last_seq:
-                            payload_text = json.dumps(SIM_DATA_CACHE)
-                            self.wfile.write(f"data: {payload_text}\n\n".encode("utf-8"))
-                            self.wfile.flush()
-                            last_seq = seq
-                    time.sleep(0.1)
-                except (BrokenPipeError, ConnectionResetError):
-                    break
-                except Exception:
-                    break
-            return
+POST_PATHS = (
+    "/data/simulation_data",
+    "/data/decisions",
+    "/data/decision_making_data",
+)
+# POST paths whose body the transport hands to ingest_post() instead of reading it into bytes.
+INGEST_PATHS = (
+    "/front_camera",
+)
 
-        if path == "/data/decisions-stream":
-            self.send_response(200)
-            self.send_header("Content-Type", "text/event-stream")
-            self.send_header("Cache-Control", "no-store")
-            self.send_header("Connection", "keep-alive")
-            self.end_headers()
 
-            last_seq = -1
-            last_payload_text = ""
-            while True:
-                try:
-                    _maybe_pull_remote_decisions()
-                    if DECISIONS_CACHE:
-                        seq = DECISIONS_SEQ
-                        if seq != last_seq:
-                            payload_text = json.dumps(DECISIONS_CACHE)
-                            self.wfile.write(f"data: {payload_text}\n\n".encode("utf-8"))
-                            self.wfile.flush()
-                            last_seq = seq
-                    else:
-                        payload = _get_decisions_data()
-                        payload_text = json.dumps(payload)
-                        if payload_text != last_payload_text:
-                            self.wfile.write(f"data: {payload_text}\n\n".encode("utf-8"))
-                            self.wfile.flush()
-                            last_payload_text = payload_text
-                    time.sleep(0.1)
-                except (BrokenPipeError, ConnectionResetError):
-                    break
-                except Exception:
-                    break
-            return
+class Reply:
+    """Transport-neutral response from route_get/route_post.
 
-        if path == "/data/decision_making_data-stream":
-            self.send_response(200)
-            self.send_header("Content-Type", "text/event-stream")
-            self.send_header("Cache-Control", "no-store")
-            self.send_header("Connection", "keep-alive")
-            self.end_headers()
+    Written by Handler (threading server) and by async_server.py. Content-Length is
+    added by the transport. `stream` is (hub, renderer factory, min interval) for SSE.
+    `etag` skips hashing the body when the route already knows its ETag. `release` is
+    called once the transport is done with the body (e.g. to unpin a camera frame).
+    """
+    def __init__(self, status=200, body=b"", content_type="text/plain", cache_control="no-store",
+                 headers=None, stream=None, close=False, etag=None, release=None):
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.etag = etag
+        self.headers = []
+        if content_type:
+            self.headers.append(("Content-Type", content_type))
+        self.headers.append(("Cache-Control", cache_control))
+        self.headers.extend(headers or [])
+        self.stream = stream
+        self.close = close
+        self.release = release
 
-            last_seq = -1
-            last_payload_text = ""
-            while True:
-                try:
-                    _maybe_pull_remote_decision_making_data()
-                    if DECISION_MAKING_DATA_CACHE:
-                        seq = DECISION_MAKING_DATA_SEQ
-                        if seq != last_seq:
-                            payload_text = json.dumps(DECISION_MAKING_DATA_CACHE)
-                            self.wfile.write(f"data: {payload_text}\n\n".encode("utf-8"))
-                            self.wfile.flush()
-                            last_seq = seq
-                    else:
-                        payload = _get_decision_making_data_cached()
-                        payload_text = json.dumps(payload)
-                        if payload_text != last_payload_text:
-                            self.wfile.write(f"data: {payload_text}\n\n".encode("utf-8"))
-                            self.wfile.flush()
-                            last_payload_text = payload_text
-                    time.sleep(0.1)
-                except (BrokenPipeError, ConnectionResetError):
-                    break
-                except Exception:
-                    break
-            return
+    def done(self):
+        """Transport side: the body has been written (or the write failed)."""
+        release, self.release = self.release, None
+        if release is not None:
+            release()
 
-        self._send_text("not found", 404, "text/plain")
 
-    def do_POST(self):
-        path = urlparse(self.path).path
-        if path not in (
-            "/data/simulation_data",
-            "/data/decisions",
-            "/data/decision_making_data",
-            "/front_camera",
-        ):
-            self._send_text("not found", 404, "text/plain")
-            return
+def _json_reply(payload, status=200) -> Reply:
+    return Reply(status, json.dumps(payload).encode("utf-8"), "application/json")
 
+
+def _text_reply(text: str, status=200, content_type="text/html") -> Reply:
+    return Reply(status, text.encode("utf-8"), content_type)
+
+
+def _file_reply(path: str, name: str) -> Reply:
+    try:
+        body, etag = STATIC_FILES.get(path)
+    except Exception:
+        return _text_reply(f"{name} not found", 404, "text/plain")
+    return Reply(200, body, "text/html", etag=etag)
+
+
+def _finish_get(reply: Reply, headers) -> Reply:
+    """ETag (304 on If-None-Match) and gzip/deflate for plain 200 text and JSON replies."""
+    if reply.status != 200 or reply.stream is not None or not http_encoding.is_compressible(reply.content_type):
+        return reply
+    etag = reply.etag or http_encoding.body_etag(reply.body)
+    coding = None
+    if len(reply.body) >= http_encoding.COMPRESS_MIN_BYTES:
+        coding = http_encoding.accepted_coding(headers.get("Accept-Encoding", ""))
+    extra = [("ETag", http_encoding.coded_etag(etag, coding)), ("Vary", "Accept-Encoding")]
+    if http_encoding.etag_matches(etag, headers.get("If-None-Match", "")):
+        return Reply(304, b"", None, "no-cache", extra)
+    if coding:
+        reply.body = ENCODED_BODIES.get(etag, coding, reply.body)
+        extra.append(("Content-Encoding", coding))
+    # Browsers may keep the body but must revalidate it (cheap: 304 or the memoized body).
+    reply.headers = [
+        (name, "no-cache") if name == "Cache-Control" else (name, value) for name, value in reply.headers
+    ] + extra
+    return reply
+
+
+def _plain_stream_renderer():
+    return lambda frame: stream_hub.KEEPALIVE_EVENT if frame is None else frame
+
+
+def _mjpeg_renderer():
+    """Per-subscriber MJPEG renderer; an SSE comment would corrupt the multipart body,
+    so keepalives re-send the last part instead."""
+    last = {"part": b""}
+
+    def render(frame):
+        if frame is None:
+            return last["part"]
+        last["part"] = frame
+        return frame
+    return render
+
+
+def _simulation_delta_renderer():
+    """Per-subscriber renderer for ?delta=1: tracks which seq/epoch this client has."""
+    client = {"seq": -1, "epoch": ""}
+
+    def render(frame):
+        if frame is None:
+            return stream_hub.KEEPALIVE_EVENT
+        event, client["seq"], client["epoch"] = _simulation_delta_event(frame, client["seq"], client["epoch"])
+        return event
+    return render
+
+
+def _stream_reply(hub, make_renderer=_plain_stream_renderer, min_interval=0.0,
+                  content_type="text/event-stream") -> Reply:
+    return Reply(
+        200,
+        b"",
+        content_type,
+        headers=[("Connection", "keep-alive")],
+        stream=(hub, make_renderer, min_interval),
+        close=True,
+    )
+
+
+def route_get(raw_path: str, headers) -> Reply:
+    return _finish_get(_route_get(raw_path, headers), headers)
+
+
+def _route_get(raw_path: str, headers) -> Reply:
+    parsed = urlparse(raw_path)
+    path = parsed.path
+    if path in HTML_PAGES:
+        return _file_reply(*HTML_PAGES[path])
+    if path == "/front_camera":
+        return _text_reply(FRONT_CAMERA_PAGE, 200, "text/html")
+
+    if path in DATA_ENDPOINTS:
+        return Reply(200, _get_data_response(path), "application/json")
+    if path == "/data/history":
+        # ?from=&to= in sim seconds (both optional), ?keys=a,b keeps only those keys.
+        query = parse_qs(parsed.query)
         try:
-            length = int(self.headers.get("Content-Length", "0"))
+            t_from = _query_float(query, "from")
+            t_to = _query_float(query, "to")
+        except ValueError:
+            return _text_reply("invalid from/to", 400, "text/plain")
+        keys = [key for key in query.get("keys", [""])[0].split(",") if key]
+        return _json_reply(_history_payload(HISTORY.between(t_from, t_to), keys))
+    if path == "/data/replay":
+        # Dashboard frame as it was at sim time ?t= (default: the newest snapshot).
+        try:
+            t = _query_float(parse_qs(parsed.query), "t")
+        except ValueError:
+            return _text_reply("invalid t", 400, "text/plain")
+        snapshot = HISTORY.at(t)
+        if snapshot is None:
+            return _text_reply("no history yet", 404, "text/plain")
+        return Reply(200, _build_replay_body(snapshot), "application/json")
+    if path == "/data/frame":
+        body, etag = _get_frame_cached()
+        return Reply(200, body, "application/json", etag=etag)
+    if path == "/data/simulation_data":
+        query = parse_qs(parsed.query)
+        if "since" in query:
+            try:
+                since = int(query["since"][0])
+            except Exception:
+                since = -1
+            epoch = query.get("epoch", [""])[0]
+            return _text_reply(sim_snapshot.dumps(_get_simulation_delta(since, epoch)), 200, "application/json")
+        return _json_reply(_get_simulation_data_cached())
+    if path == "/data/decisions":
+        return _json_reply(_get_decisions_data_cached())
+    if path == "/data/decision_making_data":
+        # ?view=raw keeps tile maps in their binary form (for the decision script itself).
+        payload = _get_decision_making_data_cached()
+        if parse_qs(parsed.query).get("view", [""])[0] != "raw":
+            payload = _decision_making_text_view(payload)
+        return _json_reply(payload)
+    if path == "/data/front_camera":
+        # ?seq=N: one of the last FRONT_CAMERA_FRAMES frames (see /data/front_camera/frames).
+        seq = parse_qs(parsed.query).get("seq", [""])[0]
+        try:
+            # Pinned: the slot is not reused while a slow client is still reading it.
+            frame = FRONT_CAMERA_RING.acquire(int(seq) if seq else None)
+        except ValueError:
+            frame = None
+        if frame is None:
+            return _text_reply("no image", 404, "text/plain")
+        return Reply(200, frame.data, frame.mime, headers=[
+            ("X-Frame-Seq", str(frame.seq)),
+            ("X-Frame-Timestamp", f"{frame.timestamp:.6f}"),
+        ], release=lambda: FRONT_CAMERA_RING.release(frame))
+    if path == "/data/front_camera/frames":
+        return _json_reply([
+            {"seq": frame.seq, "timestamp": frame.timestamp, "mime": frame.mime, "bytes": len(frame.data)}
+            for frame in FRONT_CAMERA_RING.frames()
+        ])
+    if path == "/data/front_camera-stream":
+        # MJPEG: one multipart part per new frame, only while someone is watching.
+        return _stream_reply(
+            FRONT_CAMERA_STREAM_HUB,
+            _mjpeg_renderer,
+            content_type=f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}",
+        )
+
+    if path == "/data/simulation-stream":
+        # ?delta=1: first event is a full envelope, then only changed keys.
+        delta = parse_qs(parsed.query).get("delta", ["0"])[0] in ("1", "true")
+        if delta:
+            return _stream_reply(SIM_DELTA_STREAM_HUB, _simulation_delta_renderer)
+        return _stream_reply(SIM_STREAM_HUB)
+    if path == "/data/frame-stream":
+        return _stream_reply(FRAME_STREAM_HUB, min_interval=FRAME_STREAM_MIN_INTERVAL_SECONDS)
+    if path == "/data/decisions-stream":
+        return _stream_reply(DECISIONS_STREAM_HUB)
+    if path == "/data/decision_making_data-stream":
+        return _stream_reply(DECISION_MAKING_DATA_STREAM_HUB)
+
+    return _text_reply("not found", 404, "text/plain")
+
+
+def ingest_post(raw_path: str, headers, length: int, fill) -> Reply:
+    """POST to one of INGEST_PATHS; `fill(view)` copies the body into the caller-provided view."""
+    path = urlparse(raw_path).path
+    if path == "/front_camera":
+        return _ingest_front_camera(length, headers.get("Content-Type", "application/octet-stream"), fill)
+    return _text_reply("not found", 404, "text/plain")
+
+
+def route_post(raw_path: str, headers, raw: bytes) -> Reply:
+    """`raw` is the request body; transports only read it for POST_PATHS."""
+    path = urlparse(raw_path).path
+    if path not in POST_PATHS:
+        reply = _text_reply("not found", 404, "text/plain")
+        reply.close = True
+        return reply
+    if not raw:
+        return _text_reply("empty payload", 400, "text/plain")
+
+    try:
+        payload = json.loads(raw.decode("utf-8"))
+        if not isinstance(payload, dict):
+            raise ValueError("payload must be object")
+    except Exception:
+        return _text_reply("invalid json", 400, "text/plain")
+
+    if path == "/data/decisions":
+        _set_decisions_cache(payload)
+    elif path == "/data/decision_making_data":
+        _set_decision_making_data_cache(payload)
+    elif not _set_simulation_cache(payload):
+        return _text_reply("resync", 409, "text/plain")
+    if STATE_BUS is not None:
+        _forward_to_state_bus(path)
+    return _text_reply("ok", 200, "text/plain")
+
+
+class Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 lets the supervisor's telemetry publisher reuse one keep-alive connection.
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; avoid Nagle + delayed-ACK stalls on reused sockets.
+    disable_nagle_algorithm = True
+
+    def _send_reply(self, reply: Reply):
+        try:
+            self.send_response(reply.status)
+            for name, value in reply.headers:
+                self.send_header(name, value)
+            if reply.stream is None and reply.status != 304:
+                self.send_header("Content-Length", str(len(reply.body)))
+            self.end_headers()
+            if reply.close:
+                self.close_connection = True
+            if reply.stream is not None:
+                self._send_event_stream(*reply.stream)
+            elif reply.body and reply.status != 304:
+                self.wfile.write(reply.body)
+        finally:
+            reply.done()
+
+    def _send_event_stream(self, hub, make_renderer, min_interval=0.0):
+        """Serve one SSE subscriber of `hub` until the client goes away."""
+        try:
+            self.connection.settimeout(STREAM_WRITE_TIMEOUT_SECONDS)
         except Exception:
-            length = 0
-        if length <= 0:
-            self._send_text("empty payload", 400, "text/plain")
-            return
+            pass
 
+        render = make_renderer()
         try:
-            raw = self.rfile.read(length)
+            for frame in hub.updates(STREAM_KEEPALIVE_SECONDS):
+                event = render(frame)
+                if event:
+                    self.wfile.write(event)
+                    self.wfile.flush()
+                    if min_interval > 0:
+                        # Rate cap; frames published meanwhile coalesce into the next one.
+                        time.sleep(min_interval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
         except Exception:
-            self._send_text("invalid payload", 400, "text/plain")
-            return
+            pass
 
-        if path == "/front_camera":
-            content_type = self.headers.get("Content-Type", "application/octet-stream")
-            if content_type.startswith("application/json"):
-                try:
-                    payload = json.loads(raw.decode("utf-8"))
-                    if not isinstance(payload, dict):
-                        raise ValueError("payload must be object")
-                    data_uri = payload.get("image")
-                    image_base64 = payload.get("image_base64")
-                    mime = payload.get("mime")
-                    if isinstance(data_uri, str) and data_uri.startswith("data:"):
-                        header, b64 = data_uri.split(",", 1)
-                        mime = header.split(";", 1)[0].split(":", 1)[1]
-                        image_bytes = base64.b64decode(b64)
-                        _set_front_camera_image(image_bytes, mime)
-                    elif isinstance(image_base64, str):
-                        image_bytes = base64.b64decode(image_base64)
-                        _set_front_camera_image(image_bytes, mime)
-                    else:
-                        self._send_text("invalid image payload", 400, "text/plain")
-                        return
-                except Exception:
-                    self._send_text("invalid json", 400, "text/plain")
-                    return
-            else:
-                if not raw:
-                    self._send_text("empty payload", 400, "text/plain")
-                    return
-                _set_front_camera_image(raw, content_type)
-            self._send_text("ok", 200, "text/plain")
-            return
+    def do_GET(self):
+        self._send_reply(route_get(self.path, self.headers))
 
+    def do_POST(self):
         try:
-            payload = json.loads(raw.decode("utf-8"))
-            if not isinstance(payload, dict):
-                raise ValueError("payload must be object")
+            length = int(self.headers.get("Content-Length", "0"))
         except Exception:
-            self._send_text("invalid json", 400, "text/plain")
+            length = 0
+        if urlparse(self.path).path in INGEST_PATHS:
+            # The body is read while the ring's write lock is held; don't let a stalled upload keep it.
+            try:
+                self.connection.settimeout(STREAM_WRITE_TIMEOUT_SECONDS)
+            except Exception:
+                pass
+            fill = frame_ring.fill_from_reader(self.rfile.readinto)
+            self._send_reply(ingest_post(self.path, self.headers, length, fill))
             return
-
-        if path == "/data/decisions":
-            _set_decisions_cache(payload)
-        elif path == "/data/decision_making_data":
-            _set_decision_making_data_cache(payload)
-        else:
-            _set_simulation_cache(payload)
-        self._send_text("ok", 200, "text/plain")
+        raw = b""
+        if length > 0 and urlparse(self.path).path in POST_PATHS:
+            try:
+                raw = self.rfile.read(length)
+            except Exception:
+                self._send_reply(_text_reply("invalid payload", 400, "text/plain"))
+                return
+        self._send_reply(route_post(self.path, self.headers, raw))
 
     def log_message(self, format, *args):
         return
@@ -929,8 +1576,31 @@ class Handler(BaseHTTPRequestHandler):
 
 def main():
     port = int(os.environ.get("PORT", "5001"))
-    ThreadingHTTPServer.allow_reuse_address = True
+    if DATA_FLOW == "file":
+        threading.Thread(target=_history_file_recorder, daemon=True).start()
+    elif DATA_FLOW == "shm":
+        threading.Thread(target=_state_bus_pump, daemon=True).start()
     try:
+        if VIEWER_SERVER == "asyncio":
+            async_server.serve(
+                "0.0.0.0",
+                port,
+                route_get,
+                route_post,
+                POST_PATHS,
+                max_connections=VIEWER_MAX_CONNECTIONS,
+                keepalive=STREAM_KEEPALIVE_SECONDS,
+                write_timeout=STREAM_WRITE_TIMEOUT_SECONDS,
+                ingest_post=ingest_post,
+                ingest_paths=INGEST_PATHS,
+                max_ingest_bytes=FRONT_CAMERA_MAX_BYTES,
+                on_listening=lambda: print(
+                    f"Field viewer running on http://localhost:{port} "
+                    f"(asyncio, max {VIEWER_MAX_CONNECTIONS} connections)"
+                ),
+            )
+            return
+        ThreadingHTTPServer.allow_reuse_address = True
         server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
     except OSError as e:
         if getattr(e, "errno", None) == 48:
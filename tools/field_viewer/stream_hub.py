@@ -0,0 +1,180 @@
+# stream_hub.py
+# Publish/subscribe fan-out for the field viewer's SSE streams:
+# - producers (do_POST, remote pulls) call publish(); no per-client work happens there
+# - the frame for a version is encoded once, lazily, and the same bytes go to every subscriber
+# - subscribers only ever take the newest frame: a slow client skips versions instead of
+#   queueing them, so it cannot stall producers or other clients (per-client backpressure)
+# - polled sources (file data_flow, run_on_pi pulls) are refreshed once per interval for
+#   all subscribers together
+# - updates() serves threaded transports, aupdates() the asyncio one (async_server.py)
+import asyncio
+import threading
+import time
+
+# Idle SSE connections get a comment line this often so dead clients are noticed.
+DEFAULT_KEEPALIVE_SECONDS = 15.0
+KEEPALIVE_EVENT = b": keepalive\n\n"
+
+
+class StreamHub:
+    """Versioned latest-value channel with condition-variable wakeups.
+
+    encode()  -> frame for the current source state (None: nothing to send)
+    refresh() -> optional poll hook; a non-None return value is offered as a frame
+    """
+    def __init__(self, encode, refresh=None, refresh_interval=0.1):
+        self._encode = encode
+        self._refresh = refresh
+        self.refresh_interval = float(refresh_interval)
+        self._cond = threading.Condition()
+        self._encode_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._frame = None
+        self._frame_version = -1
+        self.version = 0
+        self.subscribers = 0
+        self.coalesced = 0
+        self._listeners = []
+
+    def publish(self):
+        """Mark the source as changed and wake every subscriber."""
+        with self._cond:
+            self.version += 1
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback()
+
+    def add_listener(self, callback):
+        """Call `callback()` from the publishing thread on every new version."""
+        with self._cond:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._cond:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def offer(self, frame):
+        """Publish an already-encoded frame if it differs from the current one."""
+        with self._encode_lock:
+            if self._frame_version >= 0 and frame == self._frame:
+                return False
+            with self._cond:
+                self.version += 1
+                self._frame = frame
+                self._frame_version = self.version
+                self._cond.notify_all()
+                listeners = list(self._listeners)
+        for callback in listeners:
+            callback()
+        return True
+
+    def frame(self):
+        """(version, frame) for the newest version; encodes at most once per version."""
+        with self._encode_lock:
+            version = self.version
+            if version != self._frame_version:
+                self._frame = self._encode()
+                self._frame_version = version
+            return version, self._frame
+
+    def wait(self, last_version, timeout=None):
+        """Block until a version newer than `last_version` exists or `timeout` elapses."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != last_version, timeout)
+            return self.version
+
+    def maybe_refresh(self):
+        """Run the poll hook at most once per interval, whichever subscriber gets there first."""
+        if self._refresh is None:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.monotonic()
+            if now - self._last_refresh < self.refresh_interval:
+                return
+            self._last_refresh = now
+            frame = self._refresh()
+        finally:
+            self._refresh_lock.release()
+        if frame is not None:
+            self.offer(frame)
+
+    def updates(self, keepalive=DEFAULT_KEEPALIVE_SECONDS):
+        """Yield each new frame for one subscriber; yields None after `keepalive` idle seconds.
+
+        The first frame is the current state. Versions published while the consumer
+        was still writing the previous frame are coalesced into the newest one.
+        """
+        with self._cond:
+            self.subscribers += 1
+        try:
+            last_version = -1
+            idle_since = time.monotonic()
+            wait_s = keepalive if self._refresh is None else min(keepalive, self.refresh_interval)
+            while True:
+                self.maybe_refresh()
+                if self.wait(last_version, wait_s) == last_version:
+                    if time.monotonic() - idle_since >= keepalive:
+                        idle_since = time.monotonic()
+                        yield None
+                    continue
+                version, frame = self.frame()
+                if last_version >= 0 and version - last_version > 1:
+                    self.coalesced += version - last_version - 1
+                last_version = version
+                idle_since = time.monotonic()
+                if frame is not None:
+                    yield frame
+        finally:
+            with self._cond:
+                self.subscribers -= 1
+
+    async def aupdates(self, run_blocking, keepalive=DEFAULT_KEEPALIVE_SECONDS):
+        """Async counterpart of updates() for one subscriber on an event loop.
+
+        `run_blocking(fn)` must run fn off the loop and return an awaitable; encoding
+        and polling may read files or pull from the Pi.
+        """
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+
+        def notify():
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass
+
+        self.add_listener(notify)
+        with self._cond:
+            self.subscribers += 1
+        try:
+            last_version = -1
+            idle_since = time.monotonic()
+            wait_s = keepalive if self._refresh is None else min(keepalive, self.refresh_interval)
+            while True:
+                wake.clear()
+                if self._refresh is not None:
+                    await run_blocking(self.maybe_refresh)
+                if self.version == last_version:
+                    try:
+                        await asyncio.wait_for(wake.wait(), wait_s)
+                    except asyncio.TimeoutError:
+                        if time.monotonic() - idle_since >= keepalive:
+                            idle_since = time.monotonic()
+                            yield None
+                    continue
+                version, frame = await run_blocking(self.frame)
+                if last_version >= 0 and version - last_version > 1:
+                    self.coalesced += version - last_version - 1
+                last_version = version
+                idle_since = time.monotonic()
+                if frame is not None:
+                    yield frame
+        finally:
+            self.remove_listener(notify)
+            with self._cond:
+                self.subscribers -= 1
@@ -0,0 +1,683 @@
+#!/usr/bin/env python3
+"""
+fast_sim.py
+
+Headless, Webots-free kinematic match simulator for batch strategy evaluation.
+
+Reproduces the game rules of controllers/supervisor_controller/supervisor_controller.py
+with the same shared modules (MotionController, ball placement, WorldRegistry
+absorption / visibility / radar) on an in-memory scene read from the .wbt world,
+and runs decision_making_<branch>/waypoints_cruise.py in-process every
+CRUISE_INTERVAL_FRAMES frames. A 180 s match takes seconds instead of real time.
+
+Not modelled: rigid-body physics (ball settling, robots pushing balls). Balls stay
+where they were placed until absorbed.
+
+Usage:
+  python3 tools/testing/fast_sim.py --branch cyc --mode improved_nearest_v3 --seed 1236
+  python3 tools/testing/fast_sim.py --branch cyc --mode nearest --seed-start 1000 --seed-end 1009 \
+      --avoidance off --json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Optional
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "..", ".."))
+SUPERVISOR_DIR = os.path.join(PROJECT_ROOT, "controllers", "supervisor_controller")
+if SUPERVISOR_DIR not in sys.path:
+    sys.path.append(SUPERVISOR_DIR)
+
+import ball_placement
+import decision_worker
+import match_log
+import sim_scheduler
+from motion_controller import MotionController, load_waypoint_list_from_file, parse_dynamic_waypoint
+from world_registry import WorldRegistry
+
+CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.json")
+DEFAULT_WORLD_FILE = os.path.join(PROJECT_ROOT, "worlds", "Decision_making.wbt")
+OBSTACLE_PLAN_FILE = os.path.join(SUPERVISOR_DIR, "real_time_data", "obstacle_plan.txt")
+RANDOM_SEED_FILE = os.path.join(SUPERVISOR_DIR, "random_seed.txt")
+
+# =============================================================================
+# GAME CONSTANTS
+# Mirrors of the supervisor_controller.py globals of the same name.
+# =============================================================================
+DEFAULT_RANDOM_SEED = 1236
+DEFAULT_LINEAR_VELOCITY_FALLBACK = 3.0
+DEFAULT_ANGULAR_VELOCITY_FALLBACK = 40.0
+DEFAULT_TIME_STEP_MS = 4
+MATCH_SECONDS = 180.0
+
+MAIN_ROBOT_NAME = "MY_ROBOT"
+OBSTACLE_ROBOT_NAMES = ["OBSTACLE_ROBOT_1", "OBSTACLE_ROBOT_2", "OBSTACLE_ROBOT_3"]
+OBSTACLE_START_INDICES = [1, 50, 99]
+
+BALL_PREFIX = "BALL_"
+BALL_COUNT = 40
+X_MIN, X_MAX = -0.86, 0.86
+Y_MIN, Y_MAX = -0.86, 0.86
+BALL_RADIUS = 0.02
+MIN_SEPARATION = 2.0 * BALL_RADIUS + 0.001
+MAX_TRIES_PER_BALL = 2000
+SETTLE_SECONDS_AFTER_PLACEMENT = 0.2
+Z_EPS = 0.001
+FIELD_OF_VIEW_DEGREES = 120.0
+VISIBLE_RANGE_METERS = 2.0
+RADAR_MAX_RANGE = 0.8
+RADAR_CORRIDOR = 0.2
+
+ROBOT_X = -0.8
+ROBOT_Y = 0.0
+ROBOT_HALF_SIZE = 0.1
+CLEARANCE = 0.05
+
+ABSORB_BOX_HALF_X = 0.12
+ABSORB_BOX_HALF_Y = 0.05
+ABSORB_LOCATION = (-1.1, 0.0, 0.1)
+
+CRUISE_INTERVAL_FRAMES = 15
+DECISIONS_REFRESH_EVERY_FRAMES = 25
+DECISION_MAKING_DEFAULTS = {
+    "waypoints_stack": "",
+}
+
+
+def _load_velocity_config() -> tuple[float, float]:
+    linear = DEFAULT_LINEAR_VELOCITY_FALLBACK
+    angular = DEFAULT_ANGULAR_VELOCITY_FALLBACK
+    try:
+        with open(CONFIG_FILE, "r") as f:
+            payload = json.loads(f.read().strip())
+        if isinstance(payload, dict):
+            try:
+                value = float(payload.get("default_linear_velocity", linear))
+                if value > 0:
+                    linear = value
+            except Exception:
+                pass
+            try:
+                value = float(payload.get("default_angular_velocity", angular))
+                if value > 0:
+                    angular = value
+            except Exception:
+                pass
+    except Exception:
+        pass
+    return linear, angular
+
+
+def _load_random_seed(path: str, default_seed: int = DEFAULT_RANDOM_SEED) -> int:
+    try:
+        with open(path, "r") as f:
+            return int(f.read().strip())
+    except Exception:
+        return default_seed
+
+
+# =============================================================================
+# KINEMATIC SCENE
+# Just enough of the Webots Supervisor node/field API for WorldRegistry and
+# MotionController: translation/rotation/robotName fields on DEF nodes.
+# =============================================================================
+class _Field:
+    def __init__(self, value):
+        self.value = value
+
+    def getSFVec3f(self):
+        return list(self.value)
+
+    def setSFVec3f(self, value):
+        self.value = [float(v) for v in value]
+
+    def getSFRotation(self):
+        return list(self.value)
+
+    def setSFRotation(self, value):
+        self.value = [float(v) for v in value]
+
+    def getSFString(self):
+        return self.value
+
+
+class _Node:
+    def __init__(self, fields):
+        self.fields = {name: _Field(value) for name, value in fields.items()}
+
+    def getField(self, name):
+        return self.fields.get(name)
+
+    def resetPhysics(self):
+        pass
+
+
+class KinematicScene:
+    """DEF nodes of a .wbt world with their top-level pose fields; time advances on step()."""
+    def __init__(self, world_file: str = DEFAULT_WORLD_FILE):
+        self.time = 0.0
+        self.basic_time_step = DEFAULT_TIME_STEP_MS
+        self.nodes = {}
+        self._load(world_file)
+
+    def _proto_defaults(self, world_dir: str, proto_paths: dict, proto: str) -> dict:
+        defaults = {"translation": [0.0, 0.0, 0.0], "rotation": [0.0, 0.0, 1.0, 0.0], "robotName": ""}
+        path = proto_paths.get(proto.lower())
+        if path is None:
+            return defaults
+        try:
+            with open(os.path.join(world_dir, path), "r") as f:
+                text = f.read()
+        except Exception:
+            return defaults
+        for name, size in (("translation", 3), ("rotation", 4)):
+            m = re.search(rf"field\s+SF\w+\s+{name}\s+((?:[-+.\deE]+\s+){{{size - 1}}}[-+.\deE]+)", text)
+            if m:
+                defaults[name] = [float(v) for v in m.group(1).split()]
+        return defaults
+
+    def _load(self, world_file: str):
+        world_dir = os.path.dirname(os.path.abspath(world_file))
+        with open(world_file, "r") as f:
+            lines = f.read().splitlines()
+
+        # EXTERNPROTO "../protos/PingBall.proto" -> proto name (case-insensitive on disk)
+        proto_paths = {}
+        for line in lines:
+            m = re.match(r'\s*EXTERNPROTO\s+"([^"]+)"', line)
+            if not m or "://" in m.group(1):
+                continue
+            rel = m.group(1)
+            rel_dir = os.path.dirname(rel)
+            try:
+                for entry in os.listdir(os.path.join(world_dir, rel_dir)):
+                    if entry.lower() == os.path.basename(rel).lower():
+                        proto_paths[os.path.splitext(entry)[0].lower()] = os.path.join(rel_dir, entry)
+            except Exception:
+                continue
+
+        current = None
+        depth = 0
+        for line in lines:
+            stripped = line.strip()
+            if current is None:
+                m = re.match(r"DEF\s+(\S+)\s+(\S+)\s*\{", stripped)
+                if m:
+                    name, proto = m.group(1), m.group(2)
+                    current = (name, self._proto_defaults(world_dir, proto_paths, proto))
+                    depth = stripped.count("{") - stripped.count("}")
+                    if depth <= 0:
+                        self.nodes[name] = _Node(current[1])
+                        current = None
+                continue
+            if depth == 1:
+                parts = stripped.split()
+                if parts and parts[0] in ("translation", "rotation") and len(parts) >= 4:
+                    current[1][parts[0]] = [float(v) for v in parts[1:]]
+                elif parts and parts[0] == "robotName" and len(parts) >= 2:
+                    current[1]["robotName"] = stripped.split(None, 1)[1].strip().strip('"')
+            depth += stripped.count("{") - stripped.count("}")
+            if depth <= 0:
+                self.nodes[current[0]] = _Node(current[1])
+                current = None
+
+        for line in lines:
+            m = re.match(r"\s*basicTimeStep\s+(\d+)", line)
+            if m:
+                self.basic_time_step = int(m.group(1))
+                break
+
+    def getFromDef(self, name):
+        return self.nodes.get(name)
+
+    def getTime(self):
+        return self.time
+
+    def getBasicTimeStep(self):
+        return self.basic_time_step
+
+    def step(self, time_step_ms):
+        self.time += time_step_ms / 1000.0
+        return 0
+
+
+# =============================================================================
+# IN-PROCESS DECISION SCRIPT
+# waypoints_cruise.py loaded once per match; its HTTP transport is replaced by
+# dicts standing in for the field viewer's simulation_data / decisions /
+# decision_making_data caches.
+# =============================================================================
+class InProcessDecision:
+    """Runs one decision_making_<branch>/waypoints_cruise.py mode without a server."""
+    def __init__(self, script_path: str, mode: str, avoidance: Optional[str] = None, quiet: bool = True):
+        self.script_path = script_path
+        self.mode = mode
+        self.quiet = quiet
+        self.sim_data = {}
+        self.decisions = {}
+        self.decision_making_data = dict(DECISION_MAKING_DEFAULTS)
+        self.decision_making_data["mode"] = mode
+        if avoidance is not None:
+            self.decision_making_data["collision_avoiding"] = avoidance
+        self.ticks = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self._devnull = None
+
+        with self._output():
+            self.module = decision_worker.load_cruise_module(script_path)
+        # parse_args() falls back to the CLI mode when mode.txt is empty
+        sys.argv = [script_path, mode]
+        self._install_transport()
+        self.snapshot = decision_worker.snapshot_transport_caches(self.module)
+
+    def _output(self):
+        if not self.quiet:
+            return contextlib.nullcontext()
+        if self._devnull is None:
+            self._devnull = open(os.devnull, "w")
+        return contextlib.redirect_stdout(self._devnull)
+
+    def close(self):
+        if self._devnull is not None:
+            self._devnull.close()
+            self._devnull = None
+
+    def _install_transport(self):
+        module = self.module
+        if hasattr(module, "DATA_FLOW"):
+            module.DATA_FLOW = "web"
+        # Lock-step: a tick's decision_making_data must be in place when tick() returns.
+        batch = getattr(module, "DECISION_MAKING_DATA_BATCH", None)
+        if batch is not None:
+            batch.async_flush = False
+
+        def _refresh_sim_data():
+            module.SIM_DATA_CACHE = dict(self.sim_data)
+
+        def _refresh_decisions_data():
+            module.DECISIONS_CACHE = dict(self.decisions)
+
+        def _post_decisions_data(payload):
+            self.decisions = dict(payload)
+            module.DECISIONS_CACHE = payload
+            return True
+
+        def _refresh_decision_making_data():
+            module.DECISION_MAKING_DATA_CACHE = dict(self.decision_making_data)
+            return True
+
+        def _post_decision_making_data(payload):
+            # Same merge as the field viewer's _set_decision_making_data_cache.
+            merged = dict(self.decision_making_data)
+            merged.update(payload)
+            for key, value in DECISION_MAKING_DEFAULTS.items():
+                merged.setdefault(key, value)
+            self.decision_making_data = merged
+            module.DECISION_MAKING_DATA_CACHE = payload
+            return True
+
+        module._refresh_sim_data = _refresh_sim_data
+        module._refresh_decisions_data = _refresh_decisions_data
+        module._post_decisions_data = _post_decisions_data
+        module._refresh_decision_making_data = _refresh_decision_making_data
+        module._post_decision_making_data = _post_decision_making_data
+
+    def tick(self, sim_data: dict) -> Optional[int]:
+        """One waypoints_cruise.py run against `sim_data` (as a fresh process would)."""
+        self.sim_data = sim_data
+        started = time.perf_counter()
+        rc = None
+        with self._output():
+            try:
+                decision_worker.restore_transport_caches(self.module, self.snapshot)
+                rc = self.module.main()
+            except SystemExit as e:
+                rc = e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                self.errors += 1
+                print(f"[fast_sim] decision tick failed: {e}", file=sys.stderr)
+        self.ticks += 1
+        self.total_ms += (time.perf_counter() - started) * 1000.0
+        return rc
+
+
+# =============================================================================
+# MATCH
+# The supervisor main loop, frame for frame, without Webots or HTTP.
+# =============================================================================
+class FastMatch:
+    """One seeded match of `mode` from decision_making_<branch>."""
+    def __init__(self, branch: str = "cyc", mode: Optional[str] = None, seed: Optional[int] = None,
+                 duration: float = MATCH_SECONDS, avoidance: Optional[str] = None,
+                 world_file: str = DEFAULT_WORLD_FILE, quiet: bool = True, lock_step: Optional[bool] = None,
+                 record_dir: Optional[str] = None):
+        self.branch = branch
+        self.seed = _load_random_seed(RANDOM_SEED_FILE) if seed is None else int(seed)
+        self.duration = float(duration)
+        self.script_path = os.path.join(PROJECT_ROOT, f"decision_making_{branch}", "waypoints_cruise.py")
+        self.linear_velocity, self.angular_velocity = _load_velocity_config()
+        # Same config keys as the supervisor; lock-step applies decisions right after each tick.
+        config_lock_step, self.decision_period_s, _ = sim_scheduler.load_lock_step_config(CONFIG_FILE)
+        self.lock_step = config_lock_step if lock_step is None else bool(lock_step)
+
+        self.scene = KinematicScene(world_file)
+        self.time_step = int(self.scene.getBasicTimeStep())
+        self.dt = self.time_step / 1000.0
+        if self.decision_period_s is None:
+            self.decision_period_s = CRUISE_INTERVAL_FRAMES * self.dt
+        self.world = WorldRegistry(self.scene, BALL_PREFIX, BALL_COUNT, MAIN_ROBOT_NAME, OBSTACLE_ROBOT_NAMES)
+        self.decision = InProcessDecision(self.script_path, mode or "", avoidance=avoidance, quiet=quiet)
+        self.mode = mode or ""
+
+        self.steel_stored = 0
+        self.ping_stored = 0
+        self.main_ball_taken = 0
+        self.ball_taken_history = []
+        self.frames = 0
+        self.decisions_cache = {}
+        # Optional match_log recording of every frame (same format as the supervisor's).
+        self.record_dir = record_dir
+
+    # -- supervisor helpers ---------------------------------------------------
+    def _randomize_balls(self):
+        random.seed(self.seed)
+        np.random.seed(self.seed)
+        margin = ROBOT_HALF_SIZE + CLEARANCE + BALL_RADIUS
+        zones = ball_placement.avoid_zones(ROBOT_X, ROBOT_Y, margin)
+        names = [f"{BALL_PREFIX}{i}" for i in range(BALL_COUNT) if f"{BALL_PREFIX}{i}" in self.world.ball_index]
+        positions, _ = ball_placement.place_balls(
+            names, (X_MIN, X_MAX), (Y_MIN, Y_MAX), zones, MIN_SEPARATION, MAX_TRIES_PER_BALL, True,
+            seed=self.seed,
+        )
+        z = BALL_RADIUS + Z_EPS
+        for name, (x, y) in zip(names, positions):
+            self.world.set_ball_position(self.world.ball_index[name], (x, y, z))
+        # The supervisor lets physics settle here; only the clock is advanced.
+        for _ in range(max(1, int(SETTLE_SECONDS_AFTER_PLACEMENT / self.dt))):
+            self.scene.step(self.time_step)
+        self.world.refresh()
+
+    def _load_dynamic_waypoint(self):
+        raw_payload = self.decisions_cache.get("dynamic_waypoints")
+        if not raw_payload:
+            x, y, ang = (float(v) for v in self.world.robot_pose[0])
+            return (x, y, ang)
+        return parse_dynamic_waypoint(raw_payload)
+
+    def _read_speed_mps(self, default_value):
+        raw = self.decisions_cache.get("speed")
+        if raw is None:
+            return default_value
+        try:
+            value = float(raw)
+        except Exception:
+            return default_value
+        if value <= 0:
+            return default_value
+        return value
+
+    def _absorb(self, ridx, absorb_location):
+        for i in self.world.absorb(ridx, ABSORB_BOX_HALF_X, ABSORB_BOX_HALF_Y, absorb_location):
+            if self.world.ball_is_steel[i]:
+                self.steel_stored += 1
+            else:
+                self.ping_stored += 1
+            if ridx == 0:
+                self.main_ball_taken += 1
+                self.ball_taken_history.append((self.scene.getTime(), self.main_ball_taken))
+
+    def _sim_payload(self, waypoint_status):
+        ball_positions_text, _ = self.world.format_ball_positions()
+        sim_time = self.scene.getTime()
+        radar_values = self.world.radar_distances(RADAR_MAX_RANGE, RADAR_CORRIDOR)
+        return {
+            "ball_position": ball_positions_text,
+            "current_position": self.world.format_current_position(),
+            "obstacle_robot": self.world.format_obstacle_positions(),
+            "time": f"{sim_time:.6f}",
+            "visible_balls": self.world.format_visible_balls(FIELD_OF_VIEW_DEGREES, VISIBLE_RANGE_METERS),
+            "ball_taken_number": f"{int(self.main_ball_taken)}",
+            "waypoint_status": waypoint_status,
+            "radar_sensor": (
+                f"{sim_time:.3f},{radar_values['front']:.6f},{radar_values['right']:.6f},"
+                f"{radar_values['left']:.6f},{radar_values['rear']:.6f}"
+            ),
+        }
+
+    # -- main loop --------------------------------------------------------------
+    def run(self) -> dict:
+        try:
+            return self._run()
+        finally:
+            self.decision.close()
+
+    def _run(self) -> dict:
+        started = time.perf_counter()
+        self._randomize_balls()
+        self.world.ball_absorbed[:] = False
+
+        main_robot = self.world.robot_nodes[0]
+        main_motion = MotionController(
+            main_robot.getField("translation"), main_robot.getField("rotation"), self.dt, cycle_mode=False,
+            default_velocity=self.linear_velocity, angular_velocity_deg=self.angular_velocity,
+        )
+        obstacle_motions = []
+        obstacle_waypoints = load_waypoint_list_from_file(OBSTACLE_PLAN_FILE)
+        if obstacle_waypoints:
+            for i, robot in enumerate(self.world.robot_nodes[1:]):
+                motion = MotionController(
+                    robot.getField("translation"), robot.getField("rotation"), self.dt, cycle_mode=True,
+                    default_velocity=self.linear_velocity, angular_velocity_deg=self.angular_velocity,
+                )
+                start_idx = OBSTACLE_START_INDICES[i] if i < len(OBSTACLE_START_INDICES) else i * 2
+                motion.load_waypoint_list(obstacle_waypoints, start_index=start_idx)
+                obstacle_motions.append(motion)
+
+        self.decisions_cache = dict(self.decision.decisions)
+        current_waypoint = self._load_dynamic_waypoint()
+        last_dynamic_waypoint = current_waypoint
+        last_dynamic_waypoint_raw = self.decisions_cache.get("dynamic_waypoints") or ""
+        if current_waypoint is not None:
+            x, y, ang = current_waypoint
+            main_motion.start(x, y, velocity=None, angle=ang)
+
+        waypoint_status = "going" if main_motion.active else "reached"
+        sim_payload = self._sim_payload(waypoint_status)
+        frame_counter = 0
+        decisions_frame_counter = 0
+        ball_taken_180_logged = False
+        decision_scheduler = sim_scheduler.SimTimeScheduler(self.decision_period_s, start_s=self.scene.getTime())
+        recorder = None
+        if self.record_dir:
+            recorder = match_log.MatchRecorder(
+                match_log.new_match_dir(self.record_dir, f"{self.branch}_seed{self.seed}"),
+                meta={
+                    "source": "fast_sim",
+                    "develop_branch": self.branch,
+                    "mode": self.mode,
+                    "random_seed": self.seed,
+                    "time_step_ms": self.time_step,
+                    "decision_period_s": self.decision_period_s,
+                    "lock_step": self.lock_step,
+                },
+            )
+
+        while True:
+            self.scene.step(self.time_step)
+            sim_time = self.scene.getTime()
+
+            if (sim_time > MATCH_SECONDS) and (not ball_taken_180_logged):
+                self.ball_taken_history.append((MATCH_SECONDS, self.main_ball_taken))
+                ball_taken_180_logged = True
+            if sim_time > self.duration:
+                break
+
+            decisions_frame_counter += 1
+            if (not self.lock_step) and decisions_frame_counter % DECISIONS_REFRESH_EVERY_FRAMES == 0:
+                self.decisions_cache = dict(self.decision.decisions)
+
+            raw_dynamic_waypoint = self.decisions_cache.get("dynamic_waypoints") or ""
+            if raw_dynamic_waypoint != last_dynamic_waypoint_raw:
+                new_waypoint = self._load_dynamic_waypoint()
+                if new_waypoint is not None and new_waypoint != last_dynamic_waypoint:
+                    current_waypoint = new_waypoint
+                    last_dynamic_waypoint = new_waypoint
+                    x, y, ang = current_waypoint
+                    main_motion.start(x, y, velocity=None, angle=ang)
+                last_dynamic_waypoint_raw = raw_dynamic_waypoint
+
+            main_motion.velocity = self._read_speed_mps(self.linear_velocity)
+            main_motion.update()
+            for motion in obstacle_motions:
+                motion.update()
+            self.world.refresh()
+            waypoint_status = "going" if main_motion.active else "reached"
+
+            # The decision script sees the payload posted at the end of the previous frame.
+            frame_counter += 1
+            if self.lock_step:
+                if decision_scheduler.due(sim_time):
+                    self.decision.tick(sim_payload)
+                    self.decisions_cache = dict(self.decision.decisions)
+            elif frame_counter % CRUISE_INTERVAL_FRAMES == 0:
+                self.decision.tick(sim_payload)
+
+            self._absorb(0, ABSORB_LOCATION)
+            for i in range(1, len(self.world.robot_nodes)):
+                self._absorb(i, (1.1 + (i - 1) * 0.1, 0.0, 0.1))
+
+            if not main_motion.active and current_waypoint is not None:
+                current_waypoint = None
+
+            # Only build the payload on frames whose successor runs the decision script.
+            if self.lock_step:
+                next_is_tick = decision_scheduler.is_due(sim_time + self.dt)
+            else:
+                next_is_tick = (frame_counter + 1) % CRUISE_INTERVAL_FRAMES == 0
+            if next_is_tick:
+                sim_payload = self._sim_payload(waypoint_status)
+            if recorder is not None:
+                recorder.record(sim_time, sim_payload if next_is_tick else self._sim_payload(waypoint_status),
+                                self.decisions_cache)
+            self.frames = frame_counter
+
+        if recorder is not None:
+            recorder.close()
+        return self._result(time.perf_counter() - started)
+
+    def _result(self, wall_seconds: float) -> dict:
+        last_ball_time = None
+        for t, count in self.ball_taken_history:
+            if t <= MATCH_SECONDS and count > 0:
+                last_ball_time = t
+        collision_count = None
+        text = str(self.decision.decision_making_data.get("collision_counter", "") or "")
+        for line in text.splitlines():
+            if line.strip().lower().startswith("count="):
+                try:
+                    collision_count = int(float(line.split("=", 1)[1]))
+                except Exception:
+                    pass
+                break
+        total_contact_time = None
+        try:
+            raw = str(self.decision.decision_making_data.get("total_contact_time", "") or "").strip()
+            total_contact_time = float(raw) if raw else None
+        except Exception:
+            pass
+        taken_at_180 = self.main_ball_taken
+        for t, count in self.ball_taken_history:
+            if t == MATCH_SECONDS:
+                taken_at_180 = count
+        # Same "<time>,<count>" line the supervisor appends to ball_taken_history.txt
+        history_last_line = None
+        if self.ball_taken_history:
+            t, count = self.ball_taken_history[-1]
+            history_last_line = f"{float(t):.3f},{int(count)}"
+        return {
+            "branch": self.branch,
+            "mode": self.mode,
+            "seed": self.seed,
+            "sim_seconds": round(self.scene.getTime(), 6),
+            "frames": self.frames,
+            "total_balls_taken": taken_at_180,
+            "last_ball_time": None if last_ball_time is None else round(last_ball_time, 3),
+            "ball_history_last_line": history_last_line,
+            "steel_stored": self.steel_stored,
+            "ping_stored": self.ping_stored,
+            "score": self.steel_stored,
+            "collision_count": collision_count,
+            "total_contact_time": total_contact_time,
+            "decision_ticks": self.decision.ticks,
+            "decision_errors": self.decision.errors,
+            "decision_ms": round(self.decision.total_ms, 3),
+            "lock_step": self.lock_step,
+            "wall_seconds": round(wall_seconds, 3),
+        }
+
+
+def run_match(branch="cyc", mode=None, seed=None, duration=MATCH_SECONDS, avoidance=None, quiet=True,
+              lock_step=None, record_dir=None) -> dict:
+    """Run one headless match and return its result row (lock_step=None follows config.json)."""
+    return FastMatch(branch=branch, mode=mode, seed=seed, duration=duration, avoidance=avoidance, quiet=quiet,
+                     lock_step=lock_step, record_dir=record_dir).run()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Headless kinematic match simulator (no Webots).")
+    p.add_argument("--branch", default="cyc", help="decision_making_<branch> to run (cyc/wly/xjj/ros)")
+    p.add_argument("--mode", default=None, help="waypoints_cruise.py mode (default: the script's DEFAULT_MODE)")
+    p.add_argument("--seed", type=int, default=None, help="ball placement seed (default: random_seed.txt)")
+    p.add_argument("--seed-start", type=int, default=None, help="first seed of a range (inclusive)")
+    p.add_argument("--seed-end", type=int, default=None, help="last seed of a range (inclusive)")
+    p.add_argument("--duration", type=float, default=MATCH_SECONDS, help="simulated seconds per match")
+    p.add_argument("--avoidance", default=None,
+                   help='collision_avoiding setting: "off" or a smart_factor number')
+    p.add_argument("--lock-step", action=argparse.BooleanOptionalAction, default=None,
+                   help="apply decisions right after each sim-time decision tick (default: config.json lock_step)")
+    p.add_argument("--record", default=None, metavar="DIR",
+                   help="record every frame to a match_log directory under DIR (replay with replay_match.py)")
+    p.add_argument("--verbose", action="store_true", help="show decision script output")
+    p.add_argument("--json", action="store_true", help="print one JSON object per match")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.seed_start is not None:
+        seed_end = args.seed_start if args.seed_end is None else args.seed_end
+        seeds = list(range(args.seed_start, seed_end + 1))
+    else:
+        seeds = [args.seed]
+
+    avoidance = None
+    if args.avoidance is not None:
+        avoidance = "off" if args.avoidance.strip().lower() == "off" else f"smart_factor = {args.avoidance.strip()}"
+
+    for seed in seeds:
+        result = run_match(args.branch, args.mode, seed, args.duration, avoidance, quiet=not args.verbose,
+                           lock_step=args.lock_step, record_dir=args.record)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(
+                f"[fast_sim] branch={result['branch']} mode={result['mode'] or 'default'} seed={result['seed']} "
+                f"balls={result['total_balls_taken']} last_ball={result['last_ball_time']} "
+                f"collisions={result['collision_count']} contact={result['total_contact_time']} "
+                f"sim={result['sim_seconds']:.1f}s wall={result['wall_seconds']:.2f}s"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+replay_match.py
+
+Offline replay of a recorded match (controllers/supervisor_controller/match_log.py;
+recorded by the supervisor with "match_log": true in config.json, or by
+fast_sim.py --record). No Webots needed.
+
+Two targets:
+  --viewer URL   POST every frame back into a field viewer (simulation_data and, when
+                 they change, decisions) at --speed times real time (0 = as fast as possible)
+  --decide       run the ROS planner (decision_cruise.decide_from_ros_state) open-loop on the
+                 recorded robot state at every decision tick and print one JSON line per tick;
+                 --compare a previous output to list the ticks whose decision changed
+
+Usage:
+  python3 tools/testing/replay_match.py match_logs/20260101_120000_seed1236 --viewer http://localhost:5001 --speed 4
+  python3 tools/testing/replay_match.py match_logs/20260101_120000_seed1236 --decide --mode improved_nearest_v3_5 \
+      --out before.jsonl
+  python3 tools/testing/replay_match.py match_logs/20260101_120000_seed1236 --decide --compare before.jsonl
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import re
+import sys
+import time
+import urllib.request
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "..", ".."))
+SUPERVISOR_DIR = os.path.join(PROJECT_ROOT, "controllers", "supervisor_controller")
+ROS_PLANNER_DIR = os.path.join(PROJECT_ROOT, "ROS", "ros2_ws", "src", "unibots", "unibots")
+if SUPERVISOR_DIR not in sys.path:
+    sys.path.append(SUPERVISOR_DIR)
+
+import match_log
+import sim_scheduler
+
+_NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+# Decision period for logs whose meta.json does not record one (15 frames of 4 ms).
+DEFAULT_DECISION_PERIOD_S = 0.06
+
+
+def _post_json(url, payload, timeout=1.0):
+    data = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(req, timeout=timeout) as res:
+        res.read()
+
+
+def replay_to_viewer(log, base_url, speed=1.0, stride=1):
+    """Feed the recorded frames to a field viewer; returns the number of frames posted."""
+    base_url = base_url.rstrip("/")
+    sim_url = f"{base_url}/data/simulation_data"
+    decisions_url = f"{base_url}/data/decisions"
+    started = time.monotonic()
+    first_t = None
+    last_decisions = None
+    posted = 0
+    for index, (t, simulation_data, decisions) in enumerate(log.frames()):
+        if index % stride:
+            continue
+        if first_t is None:
+            first_t = t
+        if speed > 0:
+            delay = started + (t - first_t) / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        if decisions != last_decisions:
+            _post_json(decisions_url, decisions)
+            last_decisions = decisions
+        _post_json(sim_url, simulation_data)
+        posted += 1
+    return posted
+
+
+def _load_planner():
+    if ROS_PLANNER_DIR not in sys.path:
+        sys.path.insert(0, ROS_PLANNER_DIR)
+    import decision_cruise
+    return decision_cruise
+
+
+def _pose(text):
+    values = [float(v) for v in _NUMBER_RE.findall(text or "")[:3]]
+    if len(values) < 3:
+        return None
+    return values[0], values[1], math.radians(values[2])
+
+
+def replay_decisions(log, mode, period_s=None, quiet=True):
+    """Yield one dict per decision tick from decide_from_ros_state on the recorded state."""
+    planner = _load_planner()
+    devnull = open(os.devnull, "w") if quiet else None
+    if period_s is None:
+        period_s = float(log.meta.get("decision_period_s") or DEFAULT_DECISION_PERIOD_S)
+    scheduler = None
+    for t, simulation_data, decisions in log.frames():
+        if scheduler is None:
+            scheduler = sim_scheduler.SimTimeScheduler(period_s, start_s=t)
+        if not scheduler.due(t):
+            continue
+        pose = _pose(simulation_data.get("current_position"))
+        if pose is None:
+            continue
+        # The planner logs its reasoning; keep stdout for the JSON lines.
+        with contextlib.redirect_stdout(devnull or sys.stderr), contextlib.redirect_stderr(devnull or sys.stderr):
+            result = planner.decide_from_ros_state(
+                current_x=pose[0],
+                current_y=pose[1],
+                current_theta=pose[2],
+                visible_balls_json=simulation_data.get("visible_balls", ""),
+                radar_sensor_text=simulation_data.get("radar_sensor", ""),
+                sim_time_seconds=t,
+                waypoint_status=simulation_data.get("waypoint_status", "going"),
+                mode=mode or planner.DEFAULT_MODE,
+            )
+        row = {"t": round(t, 6), "recorded": decisions.get("dynamic_waypoints", "")}
+        if result is None:
+            row.update({"waypoint": None, "collision_waypoint": None, "speed": None})
+        else:
+            waypoint = result.get("dynamic_waypoint")
+            collision = result.get("collision_avoiding_waypoint")
+            row.update({
+                "waypoint": None if waypoint is None else [None if v is None else round(v, 6) for v in waypoint],
+                "collision_waypoint": None if collision is None else [
+                    None if v is None else round(v, 6) for v in collision
+                ],
+                "speed": result.get("speed"),
+            })
+        yield row
+
+
+def _decision_key(row):
+    return row.get("waypoint"), row.get("collision_waypoint"), row.get("speed")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Replay a recorded match into the field viewer or the ROS planner.")
+    p.add_argument("log_dir", help="match_log directory (meta.json + chunk_*.npz)")
+    p.add_argument("--viewer", default=None, metavar="URL", help="field viewer base URL, e.g. http://localhost:5001")
+    p.add_argument("--speed", type=float, default=1.0, help="viewer replay speed (x real time, 0 = unthrottled)")
+    p.add_argument("--stride", type=int, default=1, help="viewer replay: post every Nth frame")
+    p.add_argument("--decide", action="store_true", help="run decide_from_ros_state at every decision tick")
+    p.add_argument("--mode", default=None, help="planner mode for --decide (default: the planner's DEFAULT_MODE)")
+    p.add_argument("--period", type=float, default=None,
+                   help="decision period in sim seconds (default: the log's decision_period_s)")
+    p.add_argument("--out", default=None, help="--decide: write the JSON lines here instead of stdout")
+    p.add_argument("--compare", default=None, help="--decide: previous output to diff against")
+    p.add_argument("--verbose", action="store_true", help="--decide: show the planner's output (on stderr)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    log = match_log.MatchLog(args.log_dir)
+    if not log.chunk_paths:
+        print(f"[replay] no chunks in {args.log_dir}")
+        return 1
+
+    if args.viewer:
+        started = time.perf_counter()
+        posted = replay_to_viewer(log, args.viewer, speed=args.speed, stride=max(1, args.stride))
+        print(f"[replay] posted {posted} frames to {args.viewer} in {time.perf_counter() - started:.2f}s")
+
+    if args.decide:
+        baseline = None
+        if args.compare:
+            with open(args.compare, "r") as f:
+                baseline = [json.loads(line) for line in f if line.strip()]
+        out = open(args.out, "w") if args.out else sys.stdout
+        started = time.perf_counter()
+        ticks = 0
+        changed = 0
+        try:
+            for row in replay_decisions(log, args.mode, args.period, quiet=not args.verbose):
+                if baseline is not None:
+                    before = baseline[ticks] if ticks < len(baseline) else None
+                    if before is None or _decision_key(before) != _decision_key(row):
+                        changed += 1
+                        print(f"[replay] t={row['t']:.3f} decision changed: {before and _decision_key(before)} "
+                              f"-> {_decision_key(row)}", file=sys.stderr)
+                ticks += 1
+                out.write(json.dumps(row) + "\n")
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        summary = f"[replay] {ticks} decision ticks in {time.perf_counter() - started:.2f}s"
+        if baseline is not None:
+            summary += f", {changed} differ from {args.compare}"
+            if len(baseline) != ticks:
+                summary += f" (baseline has {len(baseline)} ticks)"
+        print(summary, file=sys.stderr)
+        if baseline is not None and (changed or len(baseline) != ticks):
+            return 2
+
+    if not args.viewer and not args.decide:
+        print("[replay] nothing to do: pass --viewer URL and/or --decide")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,6 +20,13 @@ webots_auto_loop_crossplatform.py
         --seed-start 1000 --seed-end 1029 \
         --result-csv "~/Desktop/OxbotsSimulator/tools/testing/benchmark_results.csv"
 
+并行矩阵测试示例（每局独立临时目录 + 独立端口；--resume 跳过 CSV 中已完成的组合）：
+    python3 webots_auto_loop_crossplatform.py --benchmark-matrix --jobs 4 \
+        --modes improved_nearest nearest --avoidance off 1 2 --seed-start 1000 --seed-end 1029 \
+        --result-csv "~/Desktop/OxbotsSimulator/tools/testing/benchmark_results.csv" --resume
+    # 不启动 Webots，使用无界面运动学仿真（tools/testing/fast_sim.py）：
+    python3 webots_auto_loop_crossplatform.py --benchmark-matrix --backend fast --jobs 8 ...
+
 注意：
 - 请确保 Supervisor 控制器会把目标文本输出到 stdout 或 stderr（区分大小写）。
 - 在 Windows 上，若通过 PowerShell 运行，注意路径引号。
@@ -27,6 +34,7 @@ webots_auto_loop_crossplatform.py
 
 import argparse
 import csv
+import shutil
 import subprocess
 import sys
 import time
@@ -35,6 +43,8 @@ import queue
 import os
 import signal
 import atexit
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Optional, Tuple, TextIO
 
@@ -138,6 +148,34 @@ DEFAULT_RANDOM_SEED_FILE = os.path.join(PROJECT_ROOT, "controllers", "supervisor
 DEFAULT_BENCHMARK_MODES = ["realistic_nearest", "improved_nearest","nearest"]
 DEFAULT_AVOIDANCE_SETTINGS = ["100"]
 
+# 并行矩阵测试：每局使用 base_port + 槽位号 作为 field viewer 端口（写入该局的 html_port.txt）
+DEFAULT_PARALLEL_BASE_PORT = 5101
+DEFAULT_PARALLEL_WEBOTS_ARGS = ["--batch", "--minimize"]
+# 复制项目到每局临时目录时跳过的内容（体积大且仿真用不到）
+SANDBOX_IGNORE_PATTERNS = (
+    ".git", "__pycache__", "*.pdf", "*.xlsx",
+    "auto_photo_capture", "camera_calibration_matlab", "camera_calibration_python",
+)
+
+BENCHMARK_FIELDNAMES = [
+    "run_index",
+    "mode",
+    "avoidance",
+    "repeat_index",
+    "seed",
+    "watch_text_found",
+    "last_ball_time",
+    "total_balls_taken",
+    "collision_count",
+    "total_contact_time",
+    "ball_history_last_line",
+    "process_return_code",
+    "process_error",
+    "started_at",
+    "finished_at",
+    "backend",
+]
+
 
 def _ts() -> str:
     return datetime.now().strftime("%H:%M:%S")
@@ -194,11 +232,13 @@ def run_and_wait_for_text(webots_bin: str, world_file: str, extra_args: Optional
                           timeout: Optional[float]=None, log_file: Optional[str]=None,
                           status_file: Optional[str]=None,
                           status_running_values: Optional[list]=None,
-                          status_done_values: Optional[list]=None
+                          status_done_values: Optional[list]=None,
+                          echo: bool = True
                          ) -> Tuple[bool, subprocess.Popen]:
     """
     启动 webots 进程并监听输出，直到状态文件判定结束（返回 True）或进程自然结束/超时（返回 False）。
     返回 (found_flag, proc) —— proc 是 subprocess.Popen 实例（可能已结束）。
+    echo=False 时 Webots 输出只写入 log_file（并行运行时避免终端输出交错）。
     """
     cmd = [webots_bin, world_file]
     if extra_args:
@@ -276,7 +316,8 @@ def run_and_wait_for_text(webots_bin: str, world_file: str, extra_args: Optional
 
             if line is not None:
                 # 输出到终端与日志
-                print(line, end='')
+                if echo:
+                    print(line, end='')
                 if logfile:
                     logfile.write(line)
 
@@ -308,7 +349,8 @@ def run_and_wait_for_text(webots_bin: str, world_file: str, extra_args: Optional
                 # 进程已退出，继续吐尽队列
                 while not q.empty():
                     extra = q.get_nowait()
-                    print(extra, end='')
+                    if echo:
+                        print(extra, end='')
                     if logfile:
                         logfile.write(extra)
                 break
@@ -605,6 +647,243 @@ def read_runtime_run_config(mode_file: str, collision_config_file: str, random_s
     return mode_value, avoidance_value, seed_value
 
 
+def resolve_seed_values(args) -> list:
+    if args.seeds and len(args.seeds) > 0:
+        return [int(s) for s in args.seeds]
+    step = 1 if args.seed_end >= args.seed_start else -1
+    return list(range(args.seed_start, args.seed_end + step, step))
+
+
+def resolve_result_csv(args) -> str:
+    result_csv = args.result_csv
+    if not result_csv:
+        nowstr = datetime.now().strftime("%Y%m%d_%H%M%S")
+        result_csv = os.path.join(SCRIPT_DIR, f"benchmark_results_{nowstr}.csv")
+    return os.path.expanduser(os.path.expandvars(result_csv))
+
+
+def avoidance_run_values(avoidance: str) -> Tuple[str, str, str]:
+    """返回 (collision_avoiding.txt 内容, 日志标签, CSV 中的 avoidance 值)。"""
+    if avoidance.lower() == "off":
+        return "off\n", "off", "-1"
+    return f"smart_factor = {avoidance}\n", f"smart_factor={avoidance}", str(avoidance)
+
+
+def cell_key(mode, avoidance_csv_value, seed) -> Tuple[str, str, str]:
+    """矩阵中一个组合的唯一键 (mode, avoidance, seed)，取值与 CSV 列一致。"""
+    return (str(mode).strip(), str(avoidance_csv_value).strip(), str(seed).strip())
+
+
+def build_matrix_cells(modes: list, avoidance_settings: list, seed_values: list) -> list:
+    """按串行版的顺序（seed → avoidance → mode）展开矩阵，run_index 从 1 开始。"""
+    cells = []
+    for repeat_idx, seed in enumerate(seed_values, start=1):
+        for avoidance in avoidance_settings:
+            for mode in modes:
+                collision_text, avoidance_label, avoidance_csv_value = avoidance_run_values(avoidance)
+                cells.append({
+                    "run_index": len(cells) + 1,
+                    "mode": mode,
+                    "avoidance_label": avoidance_label,
+                    "avoidance_csv_value": avoidance_csv_value,
+                    "collision_text": collision_text,
+                    "repeat_index": repeat_idx,
+                    "seed": seed,
+                })
+    return cells
+
+
+def build_result_row(cell: dict, backend: str, found: bool = False,
+                     last_ball_time: Optional[float] = None, total_balls: Optional[int] = None,
+                     last_history_line: Optional[str] = None, collision_count: Optional[int] = None,
+                     total_contact_time: Optional[float] = None, return_code: Optional[int] = None,
+                     process_error: str = "", started_at: str = "") -> dict:
+    return {
+        "run_index": cell["run_index"],
+        "mode": cell["mode"],
+        "avoidance": cell["avoidance_csv_value"],
+        "repeat_index": cell["repeat_index"],
+        "seed": cell["seed"],
+        "watch_text_found": found,
+        "last_ball_time": "" if last_ball_time is None else f"{last_ball_time}",
+        "total_balls_taken": "" if total_balls is None else str(total_balls),
+        "collision_count": "" if collision_count is None else str(collision_count),
+        "total_contact_time": "" if total_contact_time is None else f"{total_contact_time:.6f}",
+        "ball_history_last_line": "" if last_history_line is None else last_history_line,
+        "process_return_code": "" if return_code is None else str(return_code),
+        "process_error": process_error,
+        "started_at": started_at,
+        "finished_at": datetime.now().isoformat(),
+        "backend": backend,
+    }
+
+
+# ---------- 结果 CSV（续跑 / 合并） ----------
+def load_result_rows(path: str) -> list:
+    try:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        log_warn(f"读取已有结果 CSV 失败：{path} ({e})")
+        return []
+
+
+def is_completed_row(row: dict) -> bool:
+    """有吃球数且没有进程错误视为已完成；失败/中断的组合在 --resume 时会重跑。"""
+    balls = str(row.get("total_balls_taken") or "").strip()
+    error = str(row.get("process_error") or "").strip()
+    return bool(balls) and not error
+
+
+def write_result_rows(path: str, fieldnames: list, rows: list) -> None:
+    """整体重写 CSV（先写临时文件再替换，中断时不会留下半个文件）。"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n", extrasaction="ignore", restval="")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def init_result_csv(path: str, fieldnames: list, resume: bool = False) -> set:
+    """初始化结果 CSV；resume=True 时保留已有行（表头升级为当前列），返回已完成组合的键集合。"""
+    rows = load_result_rows(path) if resume else []
+    write_result_rows(path, fieldnames, rows)
+    completed = {cell_key(r.get("mode"), r.get("avoidance"), r.get("seed")) for r in rows if is_completed_row(r)}
+    if resume:
+        log_info(f"续跑：CSV 已有 {len(rows)} 行，{len(completed)} 个组合已完成，将跳过")
+    log_info(f"CSV 已初始化（可实时查看）：{path}")
+    return completed
+
+
+def merge_result_csv(path: str, fieldnames: list, cells: list) -> int:
+    """按矩阵顺序整理 CSV：每个组合保留一行（已完成的优先），不属于本矩阵的旧行放在末尾。"""
+    order = {cell_key(c["mode"], c["avoidance_csv_value"], c["seed"]): i for i, c in enumerate(cells)}
+    latest = {}
+    others = []
+    for row in load_result_rows(path):
+        key = cell_key(row.get("mode"), row.get("avoidance"), row.get("seed"))
+        if key not in order:
+            others.append(row)
+            continue
+        prev = latest.get(key)
+        if prev is None or is_completed_row(row) or not is_completed_row(prev):
+            latest[key] = row
+    ordered = [latest[key] for key in sorted(latest, key=order.get)]
+    write_result_rows(path, fieldnames, ordered + others)
+    return len(ordered)
+
+
+# ---------- 并行运行（每局独立目录与端口） ----------
+def sandbox_path(run_root: str, path: str) -> str:
+    """把项目内的路径映射到 run_root 下的相同相对位置。"""
+    rel = os.path.relpath(os.path.abspath(path), PROJECT_ROOT)
+    if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+        raise RuntimeError(f"文件不在项目目录内，无法为并行运行隔离：{path}")
+    return os.path.join(run_root, rel)
+
+
+def prepare_run_sandbox(run_root: str, port: int, cell: dict, paths: dict) -> dict:
+    """
+    复制项目到 run_root，写入本局的 html_port / mode / 避障 / 种子，并清空结果文件。
+    paths 为原项目中的文件路径，返回映射到 run_root 下的同名字典。
+    """
+    if os.path.exists(run_root):
+        shutil.rmtree(run_root, ignore_errors=True)
+    shutil.copytree(PROJECT_ROOT, run_root, ignore=shutil.ignore_patterns(*SANDBOX_IGNORE_PATTERNS))
+    local = {name: sandbox_path(run_root, path) for name, path in paths.items() if path}
+    write_text_file(os.path.join(run_root, "controllers", "supervisor_controller", "html_port.txt"), f"{port}\n")
+    write_text_file(local["mode_file"], f"{cell['mode']}\n")
+    write_text_file(local["collision_config_file"], cell["collision_text"])
+    write_text_file(local["random_seed_file"], f"{cell['seed']}\n")
+    reset_runtime_metric_files(
+        ball_history_file=local["ball_history_file"],
+        collision_counter_file=local["collision_counter_file"],
+        total_contact_time_file=local["total_contact_time_file"],
+        planned_index_file=local.get("planned_index_file"),
+    )
+    return local
+
+
+def run_webots_cell(cell: dict, args, paths: dict, work_dir: str, port_pool: queue.Queue) -> dict:
+    """在独立临时目录 + 独立端口中跑一局 Webots（线程池中执行，真正的工作在 Webots 子进程里）。"""
+    port = port_pool.get()
+    run_name = f"run_{cell['run_index']:04d}"
+    run_root = os.path.join(work_dir, run_name)
+    started_at = datetime.now().isoformat()
+    found = False
+    return_code = None
+    process_error = ""
+    last_ball_time, total_balls, last_history_line = None, None, None
+    collision_count, total_contact_time = None, None
+    try:
+        local = prepare_run_sandbox(run_root, port, cell, paths)
+        log_info(f"[{run_name}] 启动：mode={cell['mode']}, collision={cell['avoidance_label']}, seed={cell['seed']}, port={port}")
+        found, proc = run_and_wait_for_text(
+            webots_bin=args.webots,
+            world_file=sandbox_path(run_root, args.world),
+            extra_args=args.extra_args or DEFAULT_PARALLEL_WEBOTS_ARGS,
+            timeout=args.timeout,
+            log_file=os.path.join(work_dir, "logs", f"{run_name}.log"),
+            status_file=local.get("status_file"),
+            status_running_values=args.status_running_values,
+            status_done_values=args.status_done_values,
+            echo=False,
+        )
+        if proc:
+            terminate_process(proc, grace=5)
+        return_code = proc.returncode if proc else None
+        last_ball_time, total_balls, last_history_line = parse_ball_taken_history_last_line(local["ball_history_file"])
+        collision_count = parse_collision_counter(local["collision_counter_file"])
+        total_contact_time = parse_total_contact_time(local["total_contact_time_file"])
+    except Exception as e:
+        process_error = str(e)
+        return_code = -1
+        log_error(f"[{run_name}] 运行失败：{e}")
+    finally:
+        port_pool.put(port)
+        if not args.keep_run_dirs:
+            shutil.rmtree(run_root, ignore_errors=True)
+    return build_result_row(
+        cell, "webots", found=found, last_ball_time=last_ball_time, total_balls=total_balls,
+        last_history_line=last_history_line, collision_count=collision_count,
+        total_contact_time=total_contact_time, return_code=return_code,
+        process_error=process_error, started_at=started_at,
+    )
+
+
+def run_fast_cell(cell: dict, branch: str, duration: float) -> dict:
+    """用 fast_sim.py 在当前（进程池子）进程内跑一局，不需要 Webots，也不读写项目文件。"""
+    started_at = datetime.now().isoformat()
+    try:
+        if SCRIPT_DIR not in sys.path:
+            sys.path.insert(0, SCRIPT_DIR)
+        import fast_sim
+        result = fast_sim.run_match(branch, cell["mode"], cell["seed"], duration, cell["collision_text"].strip())
+    except Exception as e:
+        return build_result_row(cell, "fast", return_code=-1, process_error=str(e), started_at=started_at)
+
+    last_ball_time, total_balls = None, None
+    last_history_line = result.get("ball_history_last_line")
+    if last_history_line:
+        parts = last_history_line.split(",")
+        last_ball_time = float(parts[0])
+        total_balls = int(parts[1])
+    errors = int(result.get("decision_errors") or 0)
+    return build_result_row(
+        cell, "fast", found=True, last_ball_time=last_ball_time, total_balls=total_balls,
+        last_history_line=last_history_line, collision_count=result.get("collision_count"),
+        total_contact_time=result.get("total_contact_time"), return_code=0,
+        process_error=f"decision_errors={errors}" if errors else "", started_at=started_at,
+    )
+
+
 def run_benchmark_matrix(args) -> int:
     modes = [m.strip() for m in args.modes if str(m).strip()]
     avoidance_settings = [a.strip() for a in args.avoidance if str(a).strip()]
@@ -625,12 +904,7 @@ def run_benchmark_matrix(args) -> int:
     status_file = os.path.expanduser(os.path.expandvars(args.status_file)) if args.status_file else None
     random_seed_file = os.path.expanduser(os.path.expandvars(args.random_seed_file))
 
-    seed_values = []
-    if args.seeds and len(args.seeds) > 0:
-        seed_values = [int(s) for s in args.seeds]
-    else:
-        step = 1 if args.seed_end >= args.seed_start else -1
-        seed_values = list(range(args.seed_start, args.seed_end + step, step))
+    seed_values = resolve_seed_values(args)
 
     if args.repeats_per_config <= 0:
         log_error("repeats_per_config 必须 > 0")
@@ -645,11 +919,7 @@ def run_benchmark_matrix(args) -> int:
             "当前版本按 seed 列表完整运行，不再截断种子。"
         )
 
-    nowstr = datetime.now().strftime("%Y%m%d_%H%M%S")
-    result_csv = args.result_csv
-    if not result_csv:
-        result_csv = os.path.join(SCRIPT_DIR, f"benchmark_results_{nowstr}.csv")
-    result_csv = os.path.expanduser(os.path.expandvars(result_csv))
+    result_csv = resolve_result_csv(args)
 
     total_runs = len(modes) * len(avoidance_settings) * len(seed_values)
     log_step(f"开始矩阵测试，总计 {total_runs} 组")
@@ -666,30 +936,8 @@ def run_benchmark_matrix(args) -> int:
     log_info(f"status_file={status_file}")
     log_info(f"random_seed_file={random_seed_file}")
 
-    fieldnames = [
-        "run_index",
-        "mode",
-        "avoidance",
-        "repeat_index",
-        "seed",
-        "watch_text_found",
-        "last_ball_time",
-        "total_balls_taken",
-        "collision_count",
-        "total_contact_time",
-        "ball_history_last_line",
-        "process_return_code",
-        "process_error",
-        "started_at",
-        "finished_at",
-    ]
-
-    csv_dir = os.path.dirname(result_csv) or "."
-    os.makedirs(csv_dir, exist_ok=True)
-    with open(result_csv, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
-        writer.writeheader()
-    log_info(f"CSV 已初始化（可实时查看）：{result_csv}")
+    fieldnames = list(BENCHMARK_FIELDNAMES)
+    completed = init_result_csv(result_csv, fieldnames, resume=args.resume)
 
     original_mode_content = read_text_file(mode_file)
     original_collision_content = read_text_file(collision_config_file)
@@ -706,14 +954,10 @@ def run_benchmark_matrix(args) -> int:
                 log_step(f"开始避障批次 {avoidance_idx}/{len(avoidance_settings)}：avoidance={avoidance}（mode 共 {len(modes)} 组）")
                 for mode_idx, mode in enumerate(modes, start=1):
                     run_count += 1
-                    if avoidance.lower() == "off":
-                        collision_text = "off\n"
-                        avoidance_label = "off"
-                        avoidance_csv_value = "-1"
-                    else:
-                        collision_text = f"smart_factor = {avoidance}\n"
-                        avoidance_label = f"smart_factor={avoidance}"
-                        avoidance_csv_value = str(avoidance)
+                    collision_text, avoidance_label, avoidance_csv_value = avoidance_run_values(avoidance)
+                    if cell_key(mode, avoidance_csv_value, seed) in completed:
+                        log_info(f"跳过已完成组合 [{run_count}/{total_runs}]：mode={mode}, collision={avoidance_label}, seed={seed}")
+                        continue
 
                     print(
                         f"\n=== [{run_count}/{total_runs}] mode={mode} collision={avoidance_label} seed={seed} "
@@ -772,23 +1016,19 @@ def run_benchmark_matrix(args) -> int:
                     total_contact_time = parse_total_contact_time(total_contact_time_file)
                     normalize_collision_counter_file(collision_counter_file, collision_count)
 
-                    row = {
+                    cell = {
                         "run_index": run_count,
                         "mode": mode,
-                        "avoidance": avoidance_csv_value,
+                        "avoidance_csv_value": avoidance_csv_value,
                         "repeat_index": repeat_idx,
                         "seed": seed,
-                        "watch_text_found": found,
-                        "last_ball_time": "" if last_ball_time is None else f"{last_ball_time}",
-                        "total_balls_taken": "" if total_balls is None else str(total_balls),
-                        "collision_count": "" if collision_count is None else str(collision_count),
-                        "total_contact_time": "" if total_contact_time is None else f"{total_contact_time:.6f}",
-                        "ball_history_last_line": "" if last_history_line is None else last_history_line,
-                        "process_return_code": "" if return_code is None else str(return_code),
-                        "process_error": process_error,
-                        "started_at": started_at,
-                        "finished_at": datetime.now().isoformat(),
                     }
+                    row = build_result_row(
+                        cell, "webots", found=found, last_ball_time=last_ball_time, total_balls=total_balls,
+                        last_history_line=last_history_line, collision_count=collision_count,
+                        total_contact_time=total_contact_time, return_code=return_code,
+                        process_error=process_error, started_at=started_at,
+                    )
                     results.append(row)
 
                     append_csv_row(result_csv, fieldnames, row)
@@ -821,6 +1061,110 @@ def run_benchmark_matrix(args) -> int:
     log_info(f"结果文件：{result_csv}")
     return 0
 
+def run_benchmark_matrix_parallel(args) -> int:
+    """
+    并行矩阵测试：最多 --jobs 局同时运行。
+    - webots：每局复制项目到独立临时目录，使用独立 field viewer 端口（base_port + 槽位），
+      共享的 mode.txt / collision_avoiding.txt / random_seed.txt 不会被改写
+    - fast：进程池中直接调用 fast_sim.run_match（无 Webots、无 HTTP）
+    结果按完成顺序追加到 CSV，结束后按矩阵顺序整理；--resume 跳过已完成的组合。
+    """
+    modes = [m.strip() for m in args.modes if str(m).strip()]
+    avoidance_settings = [a.strip() for a in args.avoidance if str(a).strip()]
+    if not modes:
+        log_error("modes 为空，无法执行基准测试。")
+        return 1
+    if not avoidance_settings:
+        log_error("avoidance 为空，无法执行基准测试。")
+        return 1
+
+    seed_values = resolve_seed_values(args)
+    if not seed_values:
+        log_error("未生成任何随机种子，请检查 --seed-start/--seed-end 或 --seeds")
+        return 1
+
+    paths = {
+        "mode_file": args.mode_file,
+        "collision_config_file": args.collision_config_file,
+        "planned_index_file": args.planned_index_file,
+        "ball_history_file": args.ball_history_file,
+        "collision_counter_file": args.collision_counter_file,
+        "total_contact_time_file": args.total_contact_time_file,
+        "status_file": args.status_file,
+        "random_seed_file": args.random_seed_file,
+    }
+    paths = {name: os.path.expanduser(os.path.expandvars(path)) for name, path in paths.items() if path}
+
+    backend = args.backend
+    jobs = max(1, int(args.jobs))
+    result_csv = resolve_result_csv(args)
+    cells = build_matrix_cells(modes, avoidance_settings, seed_values)
+    fieldnames = list(BENCHMARK_FIELDNAMES)
+    completed = init_result_csv(result_csv, fieldnames, resume=args.resume)
+    pending = [c for c in cells if cell_key(c["mode"], c["avoidance_csv_value"], c["seed"]) not in completed]
+
+    log_step(f"开始并行矩阵测试：backend={backend}, jobs={jobs}, 共 {len(cells)} 组，待运行 {len(pending)} 组")
+    log_info(f"modes={modes}")
+    log_info(f"avoidance={avoidance_settings}")
+    log_info(f"seed_values={seed_values}")
+    log_info(f"结果 CSV：{result_csv}")
+
+    if backend == "fast":
+        branch = args.branch
+        if not branch:
+            branch = os.path.basename(os.path.dirname(paths["mode_file"])).replace("decision_making_", "", 1)
+        log_info(f"fast 后端：branch={branch}, duration={args.fast_duration}s")
+        executor = ProcessPoolExecutor(max_workers=jobs)
+
+        def submit(cell):
+            return executor.submit(run_fast_cell, cell, branch, args.fast_duration)
+    else:
+        work_dir = args.work_dir or tempfile.mkdtemp(prefix="oxbots_matrix_")
+        work_dir = os.path.abspath(os.path.expanduser(os.path.expandvars(work_dir)))
+        if work_dir == PROJECT_ROOT or work_dir.startswith(PROJECT_ROOT + os.sep):
+            log_error(f"--work-dir 不能位于项目目录内（会被复制进每局目录）：{work_dir}")
+            return 1
+        os.makedirs(os.path.join(work_dir, "logs"), exist_ok=True)
+        # supervisor 以 env.setdefault("PORT", ...) 启动 field viewer；继承的 PORT 会让所有局抢同一端口。
+        os.environ.pop("PORT", None)
+        port_pool = queue.Queue()
+        for slot in range(jobs):
+            port_pool.put(args.base_port + slot)
+        log_info(f"webots 后端：work_dir={work_dir}, ports={args.base_port}..{args.base_port + jobs - 1}, "
+                 f"extra_args={args.extra_args or DEFAULT_PARALLEL_WEBOTS_ARGS}")
+        executor = ThreadPoolExecutor(max_workers=jobs)
+
+        def submit(cell):
+            return executor.submit(run_webots_cell, cell, args, paths, work_dir, port_pool)
+
+    results = []
+    try:
+        futures = {submit(cell): cell for cell in pending}
+        for future in as_completed(futures):
+            cell = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                row = build_result_row(cell, backend, return_code=-1, process_error=str(e))
+            results.append(row)
+            append_csv_row(result_csv, fieldnames, row)
+            log_info(
+                f"[{len(results)}/{len(pending)}] run_index={cell['run_index']} mode={cell['mode']} "
+                f"collision={cell['avoidance_label']} seed={cell['seed']}: "
+                f"balls={row['total_balls_taken'] or 'N/A'}, collision={row['collision_count'] or 'N/A'}, "
+                f"contact_time={row['total_contact_time'] or 'N/A'}"
+                + (f", error={row['process_error']}" if row["process_error"] else "")
+            )
+    except KeyboardInterrupt:
+        log_warn("收到 Ctrl-C：取消未开始的组合，等待运行中的组合结束（之后可用 --resume 续跑）。")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    merged = merge_result_csv(result_csv, fieldnames, cells)
+    log_step(f"并行矩阵测试结束：本次完成 {len(results)} 组，CSV 中本矩阵共 {merged} 组")
+    log_info(f"结果文件：{result_csv}")
+    return 0
+
 # ---------- 主流程 ----------
 def main():
     global WATCH_TEXT
@@ -855,6 +1199,14 @@ def main():
     parser.add_argument("--seed-end", type=int, default=1029, help="随机种子结束值（含）")
     parser.add_argument("--seeds", nargs="*", type=int, default=None, help="显式指定种子列表；提供后优先于 seed-start/seed-end")
     parser.add_argument("--result-csv", default=None, help="矩阵测试结果 CSV 路径（默认 testing/benchmark_results_时间戳.csv）")
+    parser.add_argument("--resume", action="store_true", help="保留已有结果 CSV，跳过其中已完成的 (mode, avoidance, seed) 组合")
+    parser.add_argument("--jobs", type=int, default=1, help="并行运行的局数（>1 时每局使用独立临时目录与端口）")
+    parser.add_argument("--backend", choices=["webots", "fast"], default="webots", help="webots：启动 Webots；fast：无界面运动学仿真（tools/testing/fast_sim.py）")
+    parser.add_argument("--base-port", type=int, default=DEFAULT_PARALLEL_BASE_PORT, help="并行时第一个 field viewer 端口（每个并行槽位 +1）")
+    parser.add_argument("--work-dir", default=None, help="并行时存放每局项目副本与日志的目录（默认系统临时目录）")
+    parser.add_argument("--keep-run-dirs", action="store_true", help="并行时保留每局的项目副本（便于排查）")
+    parser.add_argument("--branch", default=None, help="fast 后端使用的 decision_making_<branch>（默认由 --mode-file 所在目录推断）")
+    parser.add_argument("--fast-duration", type=float, default=180.0, help="fast 后端每局仿真秒数")
     args = parser.parse_args()
 
     setup_shared_output(args.shared_output_file)
@@ -871,6 +1223,8 @@ def main():
 
     if args.benchmark_matrix:
         log_step("进入矩阵测试模式")
+        if args.jobs > 1 or args.backend == "fast":
+            return run_benchmark_matrix_parallel(args)
         return run_benchmark_matrix(args)
 
     if not os.path.isabs(args.webots) or not os.path.exists(args.webots):